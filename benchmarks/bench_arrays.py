@@ -0,0 +1,54 @@
+"""
+Typed array storage: memory of int[N] and float[N] arrays against lists,
+and time of the array workload on each execution engine.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_arrays.py [--size N] [--repeat N]
+"""
+
+import argparse
+import sys
+
+from workloads import ARRAY_LOOPS, build_ast
+from bench_interpreter import measure, run_interpreter
+from bench_transpiler import run_transpiled
+from bench_vm import run_vm
+from src.runtime.values import new_array
+from src.transpiler.executor import CodeCache
+from src.utils.nodes import ArrayType, PrimitiveType
+from src.vm.compiler import Compiler
+
+
+def footprint(values) -> int:
+    """Bytes held by an array's storage and, for lists, its distinct boxed elements."""
+    size = sys.getsizeof(values)
+    if isinstance(values, list):
+        size += sum(sys.getsizeof(v) for v in {id(v): v for v in values}.values())
+    return size
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--size", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'element':<10}{'list (KiB)':>12}{'typed (KiB)':>13}")
+    for name, value in (("int", lambda i: i * 7919), ("float", lambda i: i / 3), ("boolean", lambda i: i % 2 == 0)):
+        boxed = [value(i) for i in range(args.size)]
+        typed = new_array(ArrayType(PrimitiveType(name), args.size))
+        for i, v in enumerate(boxed):
+            typed[i] = v
+        print(f"{name:<10}{footprint(boxed) / 1024:>12.1f}{footprint(typed) / 1024:>13.1f}")
+
+    program = build_ast(ARRAY_LOOPS)
+    module = Compiler().compile(program)
+    cache = CodeCache()
+    interp, _ = measure(run_interpreter, program, args.repeat)
+    vm, _ = measure(run_vm, module, args.repeat)
+    py, _ = measure(lambda p: run_transpiled(p, cache), program, args.repeat)
+    print(f"\narray_loops: interp {interp:.4f}s  vm {vm:.4f}s  py {py:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
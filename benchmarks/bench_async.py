@@ -0,0 +1,81 @@
+"""
+Async front end: event-loop responsiveness and throughput of concurrent
+compiles from coroutines, calling the parser directly on the loop against
+src/astgen/async_frontend.py with worker threads or processes.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_async.py [--requests N] [--workers N] [--queue N]
+
+Loop lag is how late a task that ticks every millisecond wakes up while
+the compiles run; a blocked loop shows it as the longest parse.
+"""
+
+import argparse
+import asyncio
+import time
+
+from generator import ProgramGenerator, Shape
+from bench_server import percentile
+from src.astgen import frontend
+from src.astgen.async_frontend import AsyncFrontEnd
+
+TICK = 0.001
+
+
+async def ticker(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def measure(compile_all):
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    count = await compile_all()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return count / elapsed, lags
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--requests", type=int, default=100)
+    arg_parser.add_argument("--workers", type=int, default=2)
+    arg_parser.add_argument("--queue", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    generator = ProgramGenerator()
+    sources = [generator.program(Shape(classes=2, methods=2, statements=6)) for _ in range(args.requests)]
+    frontend.load()
+    print(f"{'mode':<22}{'req/s':>8}{'lag p50 (ms)':>14}{'lag p99 (ms)':>14}{'lag max (ms)':>14}")
+
+    def report(mode, rate, lags):
+        p50, p99 = (percentile(lags, p) * 1e3 for p in (50, 99))
+        print(f"{mode:<22}{rate:>8.1f}{p50:>14.2f}{p99:>14.2f}{max(lags) * 1e3:>14.2f}")
+
+    async def blocking():
+        for source in sources:
+            frontend.parse(source)
+            await asyncio.sleep(0)
+        return len(sources)
+
+    report("blocking on the loop", *asyncio.run(measure(blocking)))
+
+    for processes in (False, True):
+        async def pooled():
+            async with AsyncFrontEnd(args.workers, args.queue, timeout=None, processes=processes) as front_end:
+                await asyncio.gather(*(front_end.compile(source) for source in sources[:args.workers]))
+                await asyncio.gather(*(front_end.compile(source) for source in sources))
+            return len(sources) + args.workers
+
+        mode = f"{args.workers} {'processes' if processes else 'threads'}"
+        report(mode, *asyncio.run(measure(pooled)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Scaling of CFG construction and the dataflow analyses with method size.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_dataflow.py [--sizes 500,1000,2000,4000]
+
+Each method declares n locals and runs n if statements inside a loop;
+times should grow roughly linearly with n.
+"""
+
+import argparse
+import time
+
+from workloads import build_ast
+from src.analysis.cfg import build_cfg
+from src.analysis.dataflow import definite_assignment, live_variables, reaching_definitions
+
+
+def method_source(n):
+    decls = " ".join(f"int v{i} := {i};" for i in range(n))
+    stmts = " ".join(f"if v{i} > 3 then v{(i + 1) % n} := v{i} + 1; else v{i} := 2;" for i in range(n))
+    return "class Main { static void main() { " + decls + " for k := 1 to 10 do { " + stmts + " } } }"
+
+
+def timed(run, *args):
+    start = time.perf_counter()
+    result = run(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--sizes", default="500,1000,2000,4000")
+    args = arg_parser.parse_args()
+
+    print(f"{'n':>6}{'blocks':>8}{'cfg (s)':>10}{'live (s)':>10}{'reach (s)':>11}{'assign (s)':>12}")
+    for n in map(int, args.sizes.split(",")):
+        method = build_ast(method_source(n)).class_decls[0].members[0]
+        cfg, build = timed(build_cfg, method)
+        _, live = timed(live_variables, cfg)
+        _, reach = timed(reaching_definitions, cfg)
+        _, assign = timed(definite_assignment, cfg)
+        print(f"{n:>6}{cfg.num_blocks:>8}{build:>10.4f}{live:>10.4f}{reach:>11.4f}{assign:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
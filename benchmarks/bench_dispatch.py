@@ -0,0 +1,36 @@
+"""
+Method dispatch on the VM: inline cache hit rates per call site and run
+times of the call-heavy workloads. The shared workloads call through
+monomorphic sites; dispatch_mix adds a polymorphic and a megamorphic one.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_dispatch.py [--repeat N]
+"""
+
+import argparse
+
+from workloads import DISPATCH_MIX, WORKLOADS, build_ast
+from bench_interpreter import measure
+from bench_vm import run_vm
+from src.vm.bytecode import POLYMORPHIC_LIMIT
+from src.vm.compiler import Compiler
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'site':<34}{'classes':>8}{'hits':>10}{'misses':>8}{'rate':>8}")
+    for name, source in dict(WORKLOADS, dispatch_mix=DISPATCH_MIX).items():
+        module = Compiler().compile(build_ast(source))
+        best, _ = measure(run_vm, module, args.repeat)
+        for cache in module.inline_caches:
+            kind = "mega" if cache.misses > len(cache) == POLYMORPHIC_LIMIT else len(cache)
+            print(f"{name:<14}{cache.site + ' ' + cache.name:<34}{kind:>8}{cache.hits:>10}{cache.misses:>8}"
+                  f"{cache.hit_rate:>8.1%}")
+        print(f"{name:<14}vm best {best:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
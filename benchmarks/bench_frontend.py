@@ -0,0 +1,94 @@
+"""
+Front-end throughput: lexing, parsing and AST generation of generated
+programs of each shape in generator.SHAPES, timed separately.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_frontend.py [--scale X] [--repeat N]
+        [--output results.json] [--compare baseline.json]
+
+Lexing is reported in tokens/s, parsing in tokens/s and parse-tree
+nodes/s and AST generation in AST nodes/s. --output stores the results as
+JSON; --compare prints the change of each best time against such a file,
+so runs on two commits can be compared.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+
+from workloads import ROOT_DIR
+from generator import SHAPES, ProgramGenerator
+from src.astgen.instrumentation import FrontEndReport, build_ast
+
+
+def run_phases(source: str) -> dict:
+    """Lex, parse and build the AST of source once, timing each phase."""
+    report = FrontEndReport()
+    build_ast(source, report)
+    result = {"tokens": report.tokens, "tree_nodes": report.tree_nodes, "ast_nodes": report.ast_nodes}
+    result.update((name, stats.seconds) for name, stats in report.phases.items())
+    return result
+
+
+def benchmark(source: str, repeat: int) -> dict:
+    runs = [run_phases(source) for _ in range(repeat)]
+    result = {key: runs[0][key] for key in ("tokens", "tree_nodes", "ast_nodes")}
+    for phase in ("lex", "parse", "ast"):
+        result[phase] = min(run[phase] for run in runs)
+    result["lex_tokens_per_s"] = result["tokens"] / result["lex"]
+    result["parse_tokens_per_s"] = result["tokens"] / result["parse"]
+    result["parse_nodes_per_s"] = result["tree_nodes"] / result["parse"]
+    result["ast_nodes_per_s"] = result["ast_nodes"] / result["ast"]
+    return result
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--scale", type=float, default=1.0)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output")
+    arg_parser.add_argument("--compare")
+    args = arg_parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["shapes"]
+
+    results = {}
+    print(f"{'shape':<18}{'tokens':>8}{'lex tok/s':>11}{'parse tok/s':>13}{'tree n/s':>10}{'ast n/s':>10}")
+    for name, (shape, fields) in SHAPES.items():
+        source = ProgramGenerator(args.seed).program(shape.scaled(args.scale, fields))
+        result = results[name] = benchmark(source, args.repeat)
+        print(f"{name:<18}{result['tokens']:>8}{result['lex_tokens_per_s']:>11.0f}"
+              f"{result['parse_tokens_per_s']:>13.0f}{result['parse_nodes_per_s']:>10.0f}"
+              f"{result['ast_nodes_per_s']:>10.0f}")
+        if name in baseline:
+            changes = "  ".join(
+                f"{phase} {result[phase] / baseline[name][phase] - 1:+.1%}" for phase in ("lex", "parse", "ast")
+            )
+            print(f"{'':<18}vs baseline: {changes}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "commit": commit(),
+                "python": platform.python_version(),
+                "scale": args.scale,
+                "seed": args.seed,
+                "shapes": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
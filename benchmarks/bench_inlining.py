@@ -0,0 +1,38 @@
+"""
+Devirtualisation and inlining: interpreter and VM with and without the pass.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_inlining.py [--repeat N]
+"""
+
+import argparse
+
+from workloads import WORKLOADS, build_ast
+from bench_interpreter import measure, run_interpreter
+from bench_vm import run_vm
+from src.optimizer.inlining import Inliner
+from src.vm.compiler import Compiler
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'inlined':>8}{'direct':>8}{'interp (s)':>12}{'opt (s)':>10}{'vm (s)':>10}{'opt (s)':>10}")
+    for name, source in WORKLOADS.items():
+        program = build_ast(source)
+        inliner = Inliner()
+        optimized = inliner.inline(build_ast(source))
+        module, optimized_module = Compiler().compile(program), Compiler().compile(optimized)
+        assert run_vm(optimized_module) == run_interpreter(optimized) == run_interpreter(program), name
+        interp, _ = measure(run_interpreter, program, args.repeat)
+        interp_opt, _ = measure(run_interpreter, optimized, args.repeat)
+        vm, _ = measure(run_vm, module, args.repeat)
+        vm_opt, _ = measure(run_vm, optimized_module, args.repeat)
+        print(f"{name:<14}{len(inliner.inlined):>8}{inliner.devirtualized:>8}"
+              f"{interp:>12.4f}{interp_opt:>10.4f}{vm:>10.4f}{vm_opt:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
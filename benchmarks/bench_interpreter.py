@@ -0,0 +1,45 @@
+"""
+Throughput baseline for the tree-walking interpreter.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_interpreter.py [--repeat N]
+"""
+
+import argparse
+import io
+import time
+
+from workloads import WORKLOADS, build_ast
+from src.runtime.interpreter import Interpreter
+from src.runtime.io_runtime import IORuntime
+
+
+def run_interpreter(program):
+    out = io.StringIO()
+    Interpreter(program, IORuntime(io.StringIO(), out)).run()
+    return out.getvalue()
+
+
+def measure(run, program, repeat):
+    """Return the best and mean wall time of repeat runs."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(program)
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'best (s)':>10}{'mean (s)':>10}")
+    for name, source in WORKLOADS.items():
+        best, mean = measure(run_interpreter, build_ast(source), args.repeat)
+        print(f"{name:<14}{best:>10.4f}{mean:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
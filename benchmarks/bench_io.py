@@ -0,0 +1,85 @@
+"""
+Buffered io: time and number of stream calls of an I/O-heavy program
+that reads N integers and writes each back, with per-call reads and
+writes and with the batched io runtime.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_io.py [--size N] [--repeat N]
+"""
+
+import argparse
+import io
+
+from workloads import build_ast
+from bench_interpreter import measure
+from src.runtime.interpreter import Interpreter
+from src.runtime.io_runtime import IORuntime
+from src.vm.compiler import Compiler
+from src.vm.machine import VM
+
+
+ECHO = """class Main {
+    static void main() {
+        int n := io.readInt();
+        for i := 1 to n do {
+            int x := io.readInt();
+            io.writeInt(x * 2);
+            io.writeStr(" ");
+            if i % 16 == 0 then io.writeStrLn("");
+        }
+        io.writeStrLn("");
+    }
+}"""
+
+
+class CountingIO(io.StringIO):
+    def __init__(self, value=""):
+        super().__init__(value)
+        self.calls = 0
+
+    def read(self, size=-1):
+        self.calls += 1
+        return super().read(size)
+
+    def readline(self, size=-1):
+        self.calls += 1
+        return super().readline(size)
+
+    def write(self, s):
+        self.calls += 1
+        return super().write(s)
+
+
+def runtime(stdin: str, per_call: bool) -> IORuntime:
+    result = IORuntime(CountingIO(stdin), CountingIO(), batch=1 if per_call else 4096)
+    # an interactive stdin is read one line at a time
+    result.interactive = per_call
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--size", type=int, default=20000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    stdin = f"{args.size}\n" + "".join(f"{i}\n" for i in range(args.size))
+    program = build_ast(ECHO)
+    module = Compiler().compile(program)
+    engines = {
+        "interp": lambda rt: Interpreter(program, rt).run(),
+        "vm": lambda rt: VM(module, rt).run(),
+    }
+    print(f"{'engine':<8}{'mode':<10}{'calls':>9}{'time (s)':>10}")
+    for engine, run in engines.items():
+        for mode in ("per-call", "batched"):
+            per_call = mode == "per-call"
+            rt = runtime(stdin, per_call)
+            run(rt)
+            calls = rt.stdin.calls + rt.stdout.calls
+            best, _ = measure(lambda _: run(runtime(stdin, per_call)), None, args.repeat)
+            print(f"{engine:<8}{mode:<10}{calls:>9}{best:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
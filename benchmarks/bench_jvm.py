@@ -0,0 +1,82 @@
+"""
+JVM backend against the bytecode VM.
+Run from the repository root after ./build.sh (needs `java` on PATH):
+
+    python benchmarks/bench_jvm.py [--repeat N]
+
+JVM times are wall-clock times of a whole `java` process, so they
+include JVM startup; the startup column is the time of an empty main.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from workloads import WORKLOADS, build_ast
+from bench_interpreter import measure
+from bench_vm import run_vm
+from src.codegen.runner import JVMRunner
+from src.vm.compiler import Compiler
+
+
+EMPTY = "class Main { static void main() {} }"
+
+
+def run_java(class_dir, entry):
+    return subprocess.run(["java", "-cp", class_dir, entry], capture_output=True, text=True,
+                          check=True).stdout
+
+
+def same_output(jvm, vm):
+    """Compare outputs line by line; Java formats large floats as 2.5E7."""
+    jvm_lines, vm_lines = jvm.splitlines(), vm.splitlines()
+    if len(jvm_lines) != len(vm_lines):
+        return False
+    for a, b in zip(jvm_lines, vm_lines):
+        if a != b:
+            try:
+                if float(a) != float(b):
+                    return False
+            except ValueError:
+                return False
+    return True
+
+
+def time_java(class_dir, entry, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_java(class_dir, entry)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    runner = JVMRunner()
+    work_dir = tempfile.mkdtemp(prefix="oplang-bench-")
+    try:
+        empty_dir = os.path.join(work_dir, "empty")
+        startup = time_java(empty_dir, runner.compile(build_ast(EMPTY), empty_dir), args.repeat)
+        print(f"{'workload':<14}{'vm (s)':>10}{'jvm (s)':>10}{'startup':>10}{'speedup':>9}")
+        for name, source in WORKLOADS.items():
+            program = build_ast(source)
+            class_dir = os.path.join(work_dir, name)
+            entry = runner.compile(program, class_dir)
+            module = Compiler().compile(program)
+            assert same_output(run_java(class_dir, entry), run_vm(module)), name
+            vm, _ = measure(run_vm, module, args.repeat)
+            jvm = time_java(class_dir, entry, args.repeat)
+            print(f"{name:<14}{vm:>10.4f}{jvm:>10.4f}{startup:>10.4f}{vm / jvm:>8.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Slot-based object layout: interpreter and VM times on the object-heavy
+workloads, and the footprint of one instance's field storage.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_layout.py [--repeat N]
+"""
+
+import argparse
+import sys
+
+from workloads import WORKLOADS, build_ast
+from bench_interpreter import measure, run_interpreter
+from bench_vm import run_vm
+from src.runtime.layout import compute_layouts
+from src.semantics.class_table import ClassTable
+from src.vm.compiler import Compiler
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'class':<12}{'slots':>6}{'dict (B)':>10}{'list (B)':>10}{'interp (s)':>12}{'vm (s)':>10}")
+    for name in ("objects", "shapes", "method_calls"):
+        program = build_ast(WORKLOADS[name])
+        layouts = compute_layouts(ClassTable(program))
+        widest = max(layouts.values(), key=len)
+        as_dict = sys.getsizeof({attr.name: None for _, attr in widest.attributes})
+        as_list = sys.getsizeof([None] * len(widest))
+        interp, _ = measure(run_interpreter, program, args.repeat)
+        vm, _ = measure(run_vm, Compiler().compile(program), args.repeat)
+        print(f"{name:<14}{widest.name:<12}{len(widest):>6}{as_dict:>10}{as_list:>10}{interp:>12.4f}{vm:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Scoped destruction: high-water mark of live objects and of allocated
+memory for a loop allocating one object with a destructor per iteration,
+when the object is owned by its block and when it escapes to a static.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_lifetimes.py [--size N] [--repeat N]
+"""
+
+import argparse
+import io
+import tracemalloc
+
+from workloads import build_ast
+from bench_interpreter import measure
+from src.runtime.interpreter import Interpreter
+from src.runtime.io_runtime import IORuntime
+from src.vm.compiler import Compiler
+from src.vm.machine import VM
+
+
+SCRATCH = """class Buffer {
+    static int freed;
+    static Buffer last;
+    int[64] data;
+    ~Buffer() { Buffer.freed := Buffer.freed + 1; }
+    void fill(int v) { for i := 0 to 63 do data[i] := v; }
+}
+class Main {
+    static void main() {
+        for k := 1 to %d do {
+            Buffer b := new Buffer();
+            b.fill(k);
+            %s
+        }
+        io.writeIntLn(Buffer.freed);
+    }
+}"""
+
+VARIANTS = {"scoped": "", "escaping": "Buffer.last := b;"}
+
+
+def run_interpreter(program):
+    engine = Interpreter(program, IORuntime(io.StringIO(), io.StringIO()))
+    engine.run()
+    return engine
+
+
+def run_vm(module):
+    engine = VM(module, IORuntime(io.StringIO(), io.StringIO()))
+    engine.run()
+    return engine
+
+
+def peak_memory(run, program) -> int:
+    tracemalloc.start()
+    try:
+        run(program)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--size", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'variant':<10}{'engine':<8}{'peak live':>10}{'peak (KiB)':>12}{'time (s)':>10}")
+    for variant, statement in VARIANTS.items():
+        program = build_ast(SCRATCH % (args.size, statement))
+        module = Compiler().compile(program)
+        for engine, run, code in (("interp", run_interpreter, program), ("vm", run_vm, module)):
+            live = run(code).live.peak
+            memory = peak_memory(run, code) / 1024
+            best, _ = measure(run, code, args.repeat)
+            print(f"{variant:<10}{engine:<8}{live:>10}{memory:>12.1f}{best:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
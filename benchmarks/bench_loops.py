@@ -0,0 +1,43 @@
+"""
+Loop optimisations: VM and transpiled Python with and without the pass.
+The shared workloads declare no loop variables, so the pass only marks
+their loops counted; loop_kernels gives it indices to strength-reduce
+and invariants to hoist. Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_loops.py [--repeat N]
+"""
+
+import argparse
+
+from workloads import LOOP_KERNELS, WORKLOADS, build_ast
+from bench_interpreter import measure, run_interpreter
+from bench_transpiler import run_transpiled
+from bench_vm import run_vm
+from src.optimizer.loops import LoopOptimizer
+from src.transpiler.executor import CodeCache
+from src.vm.compiler import Compiler
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'notes':>6}{'vm (s)':>10}{'vm+loops':>10}{'py (s)':>10}{'py+loops':>10}")
+    for name, source in dict(WORKLOADS, loop_kernels=LOOP_KERNELS).items():
+        program = build_ast(source)
+        loops = LoopOptimizer()
+        optimized = loops.optimize(build_ast(source))
+        module, optimized_module = Compiler().compile(program), Compiler().compile(optimized)
+        cache = CodeCache()
+        expected = run_interpreter(program)
+        assert run_vm(optimized_module) == run_transpiled(optimized, cache) == expected, name
+        vm, _ = measure(run_vm, module, args.repeat)
+        vm_opt, _ = measure(run_vm, optimized_module, args.repeat)
+        py, _ = measure(lambda p: run_transpiled(p, cache), program, args.repeat)
+        py_opt, _ = measure(lambda p: run_transpiled(p, cache), optimized, args.repeat)
+        print(f"{name:<14}{len(loops.notes):>6}{vm:>10.4f}{vm_opt:>10.4f}{py:>10.4f}{py_opt:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Per-decision and per-rule profile of the parser on generated programs,
+or on the OPLang files given, to find the grammar's prediction hot spots.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_parser_profile.py [--scale X] [--top N] [--warm] [file.op ...]
+"""
+
+import argparse
+
+from workloads import ROOT_DIR  # noqa: F401 (puts the repository root on sys.path)
+from generator import SHAPES, ProgramGenerator
+from src.astgen.profiling import profile_parse
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("files", nargs="*")
+    arg_parser.add_argument("--scale", type=float, default=0.2)
+    arg_parser.add_argument("--top", type=int, default=8)
+    arg_parser.add_argument("--warm", action="store_true", help="reuse the DFAs built by earlier parses")
+    args = arg_parser.parse_args()
+
+    if args.files:
+        sources = {}
+        for name in args.files:
+            with open(name) as f:
+                sources[name] = f.read()
+    else:
+        sources = {name: ProgramGenerator().program(shape.scaled(args.scale, fields))
+                   for name, (shape, fields) in SHAPES.items()}
+    for name, source in sources.items():
+        profile = profile_parse(source, cold=not args.warm)
+        print(f"== {name}: {profile.seconds:.4f} s")
+        print(profile.format(args.top))
+        print()
+
+
+if __name__ == "__main__":
+    main()
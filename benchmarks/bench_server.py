@@ -0,0 +1,95 @@
+"""
+Compile server load test: requests/s and latency percentiles of clients
+sending generated programs to src/astgen/server.py over a Unix socket,
+against starting a fresh process per compile.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_server.py [--clients N] [--requests N] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from workloads import ROOT_DIR
+from generator import ProgramGenerator, Shape
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def client(path, sources, latencies):
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(path)
+        reader = sock.makefile("r")
+        for i, source in enumerate(sources):
+            start = time.perf_counter()
+            sock.sendall((json.dumps({"id": i, "source": source}) + "\n").encode())
+            response = json.loads(reader.readline())
+            latencies.append(time.perf_counter() - start)
+            assert response["id"] == i and "ast" in response, response
+
+
+def load_test(path, sources, clients):
+    latencies = []
+    threads = [threading.Thread(target=client, args=(path, sources, latencies)) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies) / (time.perf_counter() - start), latencies
+
+
+def process_per_compile(source, repeat):
+    code = "import sys; from src.astgen.frontend import parse; parse(sys.stdin.read())"
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, input=source, text=True, check=True)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--clients", type=int, default=8)
+    arg_parser.add_argument("--requests", type=int, default=25, help="requests per client")
+    arg_parser.add_argument("--workers", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    generator = ProgramGenerator()
+    sources = [generator.program(Shape(classes=2, methods=2, statements=6)) for _ in range(args.requests)]
+    print(f"{'mode':<22}{'req/s':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+
+    def report(mode, rate, latencies):
+        p50, p95, p99 = (percentile(latencies, p) * 1e3 for p in (50, 95, 99))
+        print(f"{mode:<22}{rate:>8.1f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+
+    latencies = process_per_compile(sources[0], 5)
+    report("process per compile", len(latencies) / sum(latencies), latencies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "compile.sock")
+        server = subprocess.Popen([sys.executable, "-m", "src.astgen.server", "--socket", path,
+                                   "--workers", str(args.workers)], cwd=ROOT_DIR)
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.01)
+            load_test(path, sources[:2], 1)
+            report(f"server, {args.clients} clients", *load_test(path, sources, args.clients))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold start: import time, from python -X importtime, and wall time of
+fresh interpreter processes that import the front end and parse.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_startup.py [--repeat N] [--top N]
+        [--output results.json] [--compare baseline.json]
+
+Import time is the sum of the self times reported by -X importtime.
+--output stores the results as JSON and --compare prints the change of
+each scenario against such a file, as in bench_frontend.py.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from workloads import ROOT_DIR
+
+SOURCE = "class Main { static void main() { io.writeIntLn(1 + 2); } }"
+
+SCENARIOS = {
+    "python": "pass",
+    "frontend import": "import src.astgen.frontend",
+    "frontend parse": f"import src.astgen.frontend as f; f.parse({SOURCE!r})",
+    "tests/utils import": "import utils",
+    "tests/utils parse": f"import utils; utils.ASTGenerator({SOURCE!r}).generate()",
+}
+
+
+def run(code: str) -> tuple:
+    """Return the wall time, import time and per-module self times of one process."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_DIR, os.path.join(ROOT_DIR, "tests")]))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_us, _, name = line[len("import time:"):].split("|")
+            if self_us.strip().isdigit():
+                modules[name.strip()] = int(self_us)
+    return wall, sum(modules.values()) / 1e6, modules
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules")
+    arg_parser.add_argument("--output")
+    arg_parser.add_argument("--compare")
+    args = arg_parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["scenarios"]
+
+    results = {}
+    print(f"{'scenario':<22}{'wall (s)':>10}{'imports (s)':>13}{'modules':>9}")
+    for name, code in SCENARIOS.items():
+        runs = [run(code) for _ in range(args.repeat)]
+        wall = min(r[0] for r in runs)
+        imports = min(r[1] for r in runs)
+        modules = runs[0][2]
+        results[name] = {"wall": wall, "imports": imports, "modules": len(modules)}
+        line = f"{name:<22}{wall:>10.4f}{imports:>13.4f}{len(modules):>9}"
+        if name in baseline:
+            line += f"  vs baseline: wall {wall / baseline[name]['wall'] - 1:+.1%}" \
+                    f"  imports {imports / baseline[name]['imports'] - 1:+.1%}"
+        print(line)
+        for module, self_us in sorted(modules.items(), key=lambda m: m[1], reverse=True)[:args.top]:
+            print(f"    {module:<40}{self_us / 1e3:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "scenarios": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Streaming front end: peak memory and time of parsing a program with many
+classes whole, with frontend.parse, against iterating its classes from
+a file with src/astgen/streaming.py and dropping each one, as a consumer
+that compiles class by class would.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_streaming.py [--classes N ...] [--repeat N]
+
+Peak memory is measured with tracemalloc, so both runs are slowed alike.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from workloads import ROOT_DIR  # noqa: F401 (puts the repository root on sys.path)
+from generator import ProgramGenerator, Shape
+from src.astgen import frontend, streaming
+
+
+def whole(path):
+    with open(path) as f:
+        return len(frontend.parse(f.read()).class_decls)
+
+
+def streamed(path):
+    with open(path) as f:
+        return sum(1 for _ in streaming.iter_classes(f))
+
+
+def measure(run, path, repeat):
+    seconds = min(_timed(run, path) for _ in range(repeat))
+    tracemalloc.start()
+    try:
+        count = run(path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return count, seconds, peak
+
+
+def _timed(run, path):
+    start = time.perf_counter()
+    run(path)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--classes", type=int, nargs="+", default=[50, 200])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    frontend.load()
+    print(f"{'classes':>8}{'KiB':>9}  {'mode':<10}{'seconds':>9}{'peak (MiB)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for classes in args.classes:
+            path = os.path.join(tmp, f"program{classes}.op")
+            with open(path, "w") as f:
+                f.write(ProgramGenerator().program(Shape(classes=classes, methods=3, statements=4)))
+            size = os.path.getsize(path) / 1024
+            for mode, run in (("whole", whole), ("streaming", streamed)):
+                count, seconds, peak = measure(run, path, args.repeat)
+                print(f"{count:>8}{size:>9.0f}  {mode:<10}{seconds:>9.3f}{peak / 2 ** 20:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
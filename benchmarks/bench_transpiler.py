@@ -0,0 +1,49 @@
+"""
+Python transpiler against the bytecode VM.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_transpiler.py [--repeat N]
+
+Transpiled times include translation with a warm code cache; the cold
+column is one run that also compiles the generated Python.
+"""
+
+import argparse
+import io
+import time
+
+from workloads import WORKLOADS, build_ast
+from bench_interpreter import measure
+from bench_vm import run_vm
+from src.runtime.io_runtime import IORuntime
+from src.transpiler.executor import CodeCache, Executor
+from src.vm.compiler import Compiler
+
+
+def run_transpiled(program, cache):
+    out = io.StringIO()
+    Executor(program, IORuntime(io.StringIO(), out), cache).run()
+    return out.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'vm (s)':>10}{'py (s)':>10}{'cold (s)':>10}{'speedup':>9}")
+    for name, source in WORKLOADS.items():
+        program = build_ast(source)
+        module = Compiler().compile(program)
+        cache = CodeCache()
+        start = time.perf_counter()
+        output = run_transpiled(program, cache)
+        cold = time.perf_counter() - start
+        assert output == run_vm(module), name
+        vm, _ = measure(run_vm, module, args.repeat)
+        py, _ = measure(lambda p: run_transpiled(p, cache), program, args.repeat)
+        print(f"{name:<14}{vm:>10.4f}{py:>10.4f}{cold:>10.4f}{vm / py:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Bytecode VM against the tree-walking interpreter.
+Run from the repository root after ./build.sh:
+
+    python benchmarks/bench_vm.py [--repeat N]
+"""
+
+import argparse
+import io
+
+from workloads import WORKLOADS, build_ast
+from bench_interpreter import measure, run_interpreter
+from src.runtime.io_runtime import IORuntime
+from src.vm.compiler import Compiler
+from src.vm.machine import VM
+
+
+def run_vm(module):
+    out = io.StringIO()
+    VM(module, IORuntime(io.StringIO(), out)).run()
+    return out.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'workload':<14}{'interp (s)':>12}{'vm (s)':>10}{'speedup':>9}")
+    for name, source in WORKLOADS.items():
+        program = build_ast(source)
+        module = Compiler().compile(program)
+        assert run_vm(module) == run_interpreter(program), name
+        interp, _ = measure(run_interpreter, program, args.repeat)
+        vm, _ = measure(run_vm, module, args.repeat)
+        print(f"{name:<14}{interp:>12.4f}{vm:>10.4f}{interp / vm:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Synthetic OPLang programs for the front-end benchmarks.
+ProgramGenerator follows the grammar in src/grammar/OPLang.g4 and writes
+programs of a given shape: the number of classes, of methods per class
+and of statements per method, the depth of expressions, the length of
+postfix chains and the size of array literals. Generated programs are
+also well typed and terminate, so the execution engines can run them:
+expressions are over int, methods only call methods without calls, and
+loops have constant bounds and counters the body does not assign.
+
+SHAPES names the shapes used by bench_frontend.py; their counts are
+multiplied by the benchmark's --scale.
+"""
+
+import random
+from typing import Dict, List
+
+
+class Shape:
+    """Sizes of a generated program; scalable ones grow with scale."""
+
+    def __init__(self, classes=4, methods=4, statements=8, depth=3, chain=2, array=8):
+        self.classes = classes
+        self.methods = methods
+        self.statements = statements
+        self.depth = depth
+        self.chain = chain
+        self.array = array
+
+    def scaled(self, scale: float, fields: List[str]) -> "Shape":
+        sizes = dict(vars(self))
+        for name in fields:
+            sizes[name] = max(1, int(sizes[name] * scale))
+        return Shape(**sizes)
+
+
+# shape, and the fields that grow with the benchmark's scale
+SHAPES: Dict[str, tuple] = {
+    "many_classes": (Shape(classes=100, methods=3, statements=4), ["classes"]),
+    "long_methods": (Shape(classes=2, methods=2, statements=400), ["statements"]),
+    "deep_expressions": (Shape(classes=2, methods=4, statements=20, depth=9), ["statements"]),
+    "long_chains": (Shape(classes=4, methods=4, statements=40, chain=24), ["statements"]),
+    "big_arrays": (Shape(classes=4, methods=1, statements=2, array=2000), ["array"]),
+}
+
+
+class ProgramGenerator:
+    """Write random OPLang programs of a given shape."""
+
+    OPERATORS = ["+", "-", "*", "%", "\\"]
+    RELATIONS = ["<", ">", "<=", ">=", "==", "!="]
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+
+    def program(self, shape: Shape) -> str:
+        classes = [self.class_decl(i, shape) for i in range(shape.classes)]
+        return "\n".join(classes + [self.main(shape)]) + "\n"
+
+    # ------------------------------------------------------------------
+    # Declarations
+    # ------------------------------------------------------------------
+
+    def class_decl(self, index: int, shape: Shape) -> str:
+        name = f"C{index}"
+        header = f"class {name} extends C{index - 1} {{" if index and self.random.random() < 0.3 else f"class {name} {{"
+        literal = ", ".join(str(self.random.randrange(100)) for _ in range(shape.array))
+        lines = [
+            header,
+            f"    int a{index}, b{index} := {self.random.randrange(10)};",
+            f"    static int count{index};",
+            f"    int[{shape.array}] data{index} := {{{literal}}};",
+            f"    {name}() {{ a{index} := 1; {name}.count{index} := {name}.count{index} + 1; }}",
+            f"    {name} me() {{ return this; }}",
+            f"    int f(int x) {{ return x + a{index}; }}",
+        ]
+        for m in range(shape.methods):
+            lines.extend(self.method(index, m, shape))
+        lines.append("}")
+        return "\n".join(lines)
+
+    def method(self, index: int, m: int, shape: Shape) -> List[str]:
+        self.scope = {
+            "class": index, "method": m, "locals": ["p", "q"] + [f"v{i}" for i in range(3)],
+            "array": shape.array, "depth": shape.depth, "chain": shape.chain,
+        }
+        lines = [f"    int m{m}(int p; int q) {{"]
+        lines.append("        int " + ", ".join(f"v{i} := {self.random.randrange(10)}" for i in range(3)) + ";")
+        lines.append("        int i0, i1, i2;")
+        for _ in range(shape.statements):
+            lines.append("        " + self.statement(2))
+        lines.append(f"        return {self.expression(shape.depth)};")
+        lines.append("    }")
+        return lines
+
+    def main(self, shape: Shape) -> str:
+        lines = ["class Main {", "    static void main() {"]
+        lines.append("        int total := 0;")
+        for i in range(shape.classes):
+            lines.append(f"        total := total + new C{i}().m{self.random.randrange(shape.methods)}({i}, 1) % 1000;")
+        lines.append("        io.writeIntLn(total);")
+        lines.extend(["    }", "}"])
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def statement(self, nesting: int) -> str:
+        kind = self.random.random()
+        target = self.random.choice(self.scope["locals"][2:])
+        if kind < 0.5 or nesting <= 0:
+            return f"{target} := {self.expression(self.scope['depth'])} % 1000;"
+        if kind < 0.65:
+            return f"{self.lhs()} := {self.expression(self.scope['depth'])} % 1000;"
+        if kind < 0.8:
+            then = self.statement(nesting - 1)
+            other = self.statement(nesting - 1)
+            return f"if {self.condition()} then {then} else {other}"
+        if kind < 0.9:
+            body = " ".join(self.statement(nesting - 1) for _ in range(2))
+            return f"for i{nesting} := 1 to {self.random.randrange(2, 5)} do {{ {body} }}"
+        return f"this.me().f({self.expression(1)});"
+
+    def lhs(self) -> str:
+        index = self.scope["class"]
+        if self.random.random() < 0.5:
+            return f"this.a{index}"
+        return f"data{index}[{self.random.randrange(self.scope['array'])}]"
+
+    def condition(self) -> str:
+        left = f"{self.expression(1)} {self.random.choice(self.RELATIONS)} {self.expression(1)}"
+        if self.random.random() < 0.3:
+            return f"{left} && !({self.expression(1)} == 0)"
+        return left
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def expression(self, depth: int) -> str:
+        if depth <= 0:
+            return self.atom()
+        op = self.random.choice(self.OPERATORS)
+        left = self.expression(depth - 1)
+        if op in ("%", "\\"):
+            # a nonzero literal divisor cannot fail
+            return f"({left} {op} {self.random.randrange(1, 10)})"
+        return f"({left} {op} {self.expression(depth - 1)})"
+
+    def atom(self) -> str:
+        index, kind = self.scope["class"], self.random.random()
+        if kind < 0.35:
+            return self.random.choice(self.scope["locals"])
+        if kind < 0.55:
+            return str(self.random.randrange(100))
+        if kind < 0.7:
+            return f"data{index}[{self.random.randrange(self.scope['array'])}]"
+        if kind < 0.85:
+            return self.chain()
+        if kind < 0.95 and self.scope["method"]:
+            return f"this.m0({self.random.choice(self.scope['locals'])}, 2)"
+        return f"C{index}.count{index}"
+
+    def chain(self) -> str:
+        index = self.scope["class"]
+        calls = ".me()" * self.random.randint(1, self.scope["chain"])
+        return f"this{calls}.{self.random.choice(['a', 'b'])}{index}"
@@ -0,0 +1,211 @@
+"""
+Execution workloads shared by the benchmark scripts.
+Each workload is an OPLang program whose static main is the entry point;
+the programs follow the examples of the specification.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "build"))
+
+from antlr4 import InputStream, CommonTokenStream
+from build.OPLangLexer import OPLangLexer
+from build.OPLangParser import OPLangParser
+from src.astgen.ast_generation import ASTGeneration
+from src.utils.error_listener import NewErrorListener
+
+
+FACTORIAL = """
+class Fact {
+    int factorial(int n) {
+        if n == 0 then return 1; else return n * this.factorial(n - 1);
+    }
+    static void main() {
+        Fact f := new Fact();
+        int total := 0;
+        for i := 1 to 2000 do {
+            total := total + f.factorial(i % 13) % 1000;
+        }
+        io.writeIntLn(total);
+    }
+}
+"""
+
+ARRAY_LOOPS = """
+class Arrays {
+    static void main() {
+        int[1000] a;
+        int sum := 0;
+        for round := 1 to 20 do {
+            for i := 0 to 999 do {
+                a[i] := i * round;
+            }
+            for i := 999 downto 0 do {
+                if a[i] % 3 == 0 then continue;
+                sum := sum + a[i] \\ 2;
+            }
+        }
+        io.writeIntLn(sum);
+    }
+}
+"""
+
+OBJECTS = """
+class Shape {
+    float length, width;
+    static int count;
+    Shape(float length; float width) {
+        this.length := length;
+        this.width := width;
+        Shape.count := Shape.count + 1;
+    }
+    float getArea() { return 0.0; }
+}
+class Rectangle extends Shape {
+    float getArea() { return this.length * this.width; }
+}
+class Triangle extends Shape {
+    float getArea() { return this.length * this.width / 2; }
+}
+class Objects {
+    static void main() {
+        float total := 0.0;
+        Shape s;
+        for i := 1 to 5000 do {
+            if i % 2 == 0 then s := new Rectangle(i, 2); else s := new Triangle(i, 4);
+            total := total + s.getArea();
+        }
+        io.writeFloatLn(total);
+        io.writeIntLn(Shape.count);
+    }
+}
+"""
+
+METHOD_CALLS = """
+class Counter {
+    int value;
+    void add(int n) { this.value := this.value + n; }
+    int get() { return this.value; }
+    static int twice(int n) { return n * 2; }
+}
+class Calls {
+    static void main() {
+        Counter c := new Counter();
+        for i := 1 to 20000 do {
+            c.add(Counter.twice(i) - i);
+        }
+        io.writeIntLn(c.get());
+    }
+}
+"""
+
+SHAPES = """
+class Shape {
+    float length, width;
+    float getArea() { return 0.0; }
+    float getLength() { return this.length; }
+    float getWidth() { return this.width; }
+    void setSize(float length; float width) {
+        this.length := length;
+        this.width := width;
+    }
+}
+class Rectangle extends Shape {
+    float getArea() { return this.getLength() * this.getWidth(); }
+    float perimeter() { return 2 * (this.getLength() + this.getWidth()); }
+}
+class Triangle extends Shape {
+    float getArea() { return this.length * this.width / 2; }
+}
+class Shapes {
+    static void main() {
+        Rectangle r := new Rectangle();
+        Triangle t := new Triangle();
+        float total := 0.0;
+        for i := 1 to 5000 do {
+            r.setSize(i, 2);
+            t.setSize(i, 4);
+            total := total + r.getArea() + r.perimeter() + t.getArea();
+            if total > 1000000.0 then total := total - 1000000.0;
+        }
+        io.writeFloatLn(total);
+    }
+}
+"""
+
+# declared loop variables let src/optimizer/loops.py strength-reduce the
+# a[i * 2 + k] indices and hoist the invariant float arithmetic
+LOOP_KERNELS = """
+class Kernels {
+    static void main() {
+        int[4000] a;
+        float[2000] f;
+        float scale := 1.5, offset := 0.25, acc := 0.0;
+        int i, round, sum := 0;
+        for round := 1 to 10 do {
+            for i := 0 to 1999 do {
+                a[i * 2] := i + round;
+                a[i * 2 + 1] := i - round;
+                f[i] := i * (scale * offset + scale);
+            }
+            for i := 0 to 1999 do {
+                sum := sum + a[i * 2] - a[i * 2 + 1];
+                acc := acc + f[i] * (scale - offset) / 4;
+            }
+        }
+        io.writeIntLn(sum);
+        io.writeFloatLn(acc);
+    }
+}
+"""
+
+# one call site sees three receiver classes (polymorphic), another six,
+# more than an inline cache remembers (megamorphic)
+DISPATCH_MIX = """
+class Shape {
+    float size;
+    float area() { return 0.0; }
+    int sides() { return 0; }
+}
+class Square extends Shape { float area() { return this.size * this.size; } int sides() { return 4; } }
+class Circle extends Shape { float area() { return 3.14 * this.size * this.size; } }
+class Triangle extends Shape { float area() { return this.size * this.size / 2; } int sides() { return 3; } }
+class Pentagon extends Shape { float area() { return 1.72 * this.size * this.size; } int sides() { return 5; } }
+class Hexagon extends Shape { float area() { return 2.6 * this.size * this.size; } int sides() { return 6; } }
+class Octagon extends Shape { float area() { return 4.83 * this.size * this.size; } int sides() { return 8; } }
+class Mix {
+    static void main() {
+        Shape[6] zoo;
+        float total := 0.0;
+        int sides := 0;
+        zoo[0] := new Square(); zoo[1] := new Circle(); zoo[2] := new Triangle();
+        zoo[3] := new Pentagon(); zoo[4] := new Hexagon(); zoo[5] := new Octagon();
+        for i := 0 to 5 do zoo[i].size := i + 1;
+        for i := 1 to 6000 do {
+            total := total + zoo[i % 6].area();
+            sides := sides + zoo[i % 3].sides();
+        }
+        io.writeFloatLn(total);
+        io.writeIntLn(sides);
+    }
+}
+"""
+
+WORKLOADS = {
+    "factorial": FACTORIAL,
+    "array_loops": ARRAY_LOOPS,
+    "objects": OBJECTS,
+    "method_calls": METHOD_CALLS,
+    "shapes": SHAPES,
+}
+
+
+def build_ast(source):
+    """Parse source and return its Program AST."""
+    parser = OPLangParser(CommonTokenStream(OPLangLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    return ASTGeneration().visit(parser.program())
@@ -19,4 +19,7 @@ java -jar "$EXTERNAL_DIR/$ANTLR_JAR" \
     -o "$BUILD_DIR" \
     "${gfiles[@]}"
 
+# precompile the generated modules so the first import does not compile them
+python3 -m compileall -q "$BUILD_DIR"
+
 echo -e "\033[32mANTLR grammar files compiled to $BUILD_DIR\033[0m"
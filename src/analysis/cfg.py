@@ -0,0 +1,326 @@
+"""
+Control-flow graphs of OPLang method bodies.
+This module splits the body of a MethodDecl, ConstructorDecl or
+DestructorDecl into basic blocks. Blocks are stored in flat arrays: the
+elements of block b are elements[offsets[b]:offsets[b + 1]], and its
+successors and predecessors are likewise slices of two index arrays.
+
+Every local variable and parameter gets an index, with shadowing resolved
+by scope, so dataflow analyses (src/analysis/dataflow.py) can represent
+sets of variables as bitsets. Each element records the variables it
+defines and uses; attributes, statics and aliasing through references
+are not tracked.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+
+
+ENTRY, EXIT = 0, 1
+
+
+class ForInit:
+    """Assignment of a for loop's start value to its variable."""
+
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: ForStatement):
+        self.stmt = stmt
+
+
+class ForEnd:
+    """Single evaluation of a for loop's end value."""
+
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: ForStatement):
+        self.stmt = stmt
+
+
+class ForTest:
+    """Comparison of a for loop's variable against its end value."""
+
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: ForStatement):
+        self.stmt = stmt
+
+
+class ForStep:
+    """Increment or decrement of a for loop's variable."""
+
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: ForStatement):
+        self.stmt = stmt
+
+
+class Branch:
+    """Evaluation of an IfStatement's condition, ending its block."""
+
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: IfStatement):
+        self.stmt = stmt
+
+
+Element = Union[Parameter, Variable, AssignmentStatement, MethodInvocationStatement,
+                ReturnStatement, Branch, ForInit, ForEnd, ForTest, ForStep]
+
+
+def _freeze(lists: List[List[int]]) -> Tuple[array, array]:
+    offsets, flat = array("i", [0]), array("i")
+    for items in lists:
+        flat.extend(items)
+        offsets.append(len(flat))
+    return offsets, flat
+
+
+class CFG:
+    """Basic blocks of one method body; block 0 is the entry and block 1 the exit.
+
+    The entry block holds the method's parameters, each defining itself.
+    """
+
+    def __init__(self, decl: ClassMember, blocks: List[List[Element]], succs: List[List[int]],
+                 variables: List[str], defs: List[int], uses: List[int]):
+        self.decl = decl
+        self.num_blocks = len(blocks)
+        self.elements: List[Element] = [e for block in blocks for e in block]
+        self.offsets = array("i", [0])
+        for block in blocks:
+            self.offsets.append(self.offsets[-1] + len(block))
+        self.succ_offsets, self.succ = _freeze(succs)
+        preds: List[List[int]] = [[] for _ in blocks]
+        for b, targets in enumerate(succs):
+            for t in targets:
+                preds[t].append(b)
+        self.pred_offsets, self.pred = _freeze(preds)
+        self.variables = variables
+        self.defs = defs
+        self.uses = uses
+
+    def block(self, b: int) -> List[Element]:
+        return self.elements[self.offsets[b]:self.offsets[b + 1]]
+
+    def element_range(self, b: int) -> range:
+        return range(self.offsets[b], self.offsets[b + 1])
+
+    def successors(self, b: int) -> array:
+        return self.succ[self.succ_offsets[b]:self.succ_offsets[b + 1]]
+
+    def predecessors(self, b: int) -> array:
+        return self.pred[self.pred_offsets[b]:self.pred_offsets[b + 1]]
+
+    def names(self, bits: int) -> List[str]:
+        """Names of the variables in a bitset, in declaration order."""
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.variables[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+    def reverse_postorder(self) -> List[int]:
+        """Blocks reachable from the entry in reverse postorder, then the rest."""
+        seen = bytearray(self.num_blocks)
+        order: List[int] = []
+        stack = [(ENTRY, 0)]
+        seen[ENTRY] = 1
+        while stack:
+            b, i = stack.pop()
+            succs = self.successors(b)
+            if i < len(succs):
+                stack.append((b, i + 1))
+                s = succs[i]
+                if not seen[s]:
+                    seen[s] = 1
+                    stack.append((s, 0))
+            else:
+                order.append(b)
+        order.reverse()
+        return order + [b for b in range(self.num_blocks) if not seen[b]]
+
+    def describe(self, index: int) -> str:
+        element = self.elements[index]
+        defs = ",".join(self.names(self.defs[index]))
+        uses = ",".join(self.names(self.uses[index]))
+        text = type(element).__name__
+        if defs:
+            text += f" def {defs}"
+        if uses:
+            text += f" use {uses}"
+        return text
+
+    def __str__(self):
+        lines = []
+        for b in range(self.num_blocks):
+            body = "; ".join(self.describe(i) for i in self.element_range(b))
+            succs = ", ".join(f"B{s}" for s in self.successors(b))
+            lines.append(f"B{b}: [{body}]" + (f" -> {succs}" if succs else ""))
+        return "\n".join(lines)
+
+
+class _Names(BaseVisitor):
+    """Collect the identifiers an expression reads."""
+
+    def __init__(self):
+        self.names: List[str] = []
+
+    def visit_identifier(self, node, o=None):
+        self.names.append(node.name)
+
+
+class CFGBuilder:
+    """Build the CFG of a method, constructor or destructor."""
+
+    def __init__(self):
+        self.blocks: List[List[Element]] = []
+        self.succs: List[List[int]] = []
+        self.variables: List[str] = []
+        self.scopes: List[Dict[str, int]] = []
+        self.defs: List[List[int]] = []
+        self.uses: List[List[int]] = []
+        self.loops: List[Tuple[int, int]] = []
+        self.current = ENTRY
+
+    def build(self, decl: ClassMember) -> CFG:
+        self.__init__()
+        self.new_block()
+        self.new_block()
+        params = getattr(decl, "params", [])
+        self.scopes.append({})
+        for param in params:
+            self.add(param, defs=[self.declare(param.name)])
+        self.current = self.new_block()
+        self.edge(ENTRY, self.current)
+        self.statement(decl.body)
+        self.edge(self.current, EXIT)
+
+        defs = [bits for block in self.defs for bits in block]
+        uses = [bits for block in self.uses for bits in block]
+        return CFG(decl, self.blocks, self.succs, self.variables, defs, uses)
+
+    # ------------------------------------------------------------------
+    # Blocks, variables and elements
+    # ------------------------------------------------------------------
+
+    def new_block(self) -> int:
+        self.blocks.append([])
+        self.succs.append([])
+        self.defs.append([])
+        self.uses.append([])
+        return len(self.blocks) - 1
+
+    def edge(self, a: int, b: int):
+        if b not in self.succs[a]:
+            self.succs[a].append(b)
+
+    def declare(self, name: str) -> int:
+        self.variables.append(name)
+        self.scopes[-1][name] = len(self.variables) - 1
+        return len(self.variables) - 1
+
+    def lookup(self, name: str) -> Optional[int]:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def used_in(self, *exprs: Optional[ASTNode]) -> List[int]:
+        names = _Names()
+        for expr in exprs:
+            if expr is not None:
+                names.visit(expr)
+        found = (self.lookup(name) for name in names.names)
+        return [i for i in found if i is not None]
+
+    def add(self, element: Element, defs=(), uses=()):
+        self.blocks[self.current].append(element)
+        self.defs[self.current].append(sum(1 << i for i in set(defs)))
+        self.uses[self.current].append(sum(1 << i for i in set(uses)))
+
+    def jump(self, target: int):
+        """End the current block with an edge to target; what follows is unreachable."""
+        self.edge(self.current, target)
+        self.current = self.new_block()
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def statement(self, stmt: Statement):
+        if isinstance(stmt, BlockStatement):
+            self.scopes.append({})
+            for decl in stmt.var_decls:
+                for var in decl.variables:
+                    uses = self.used_in(var.init_value)
+                    self.add(var, defs=[self.declare(var.name)], uses=uses)
+            for s in stmt.statements:
+                self.statement(s)
+            self.scopes.pop()
+        elif isinstance(stmt, AssignmentStatement):
+            if isinstance(stmt.lhs, IdLHS):
+                target = self.lookup(stmt.lhs.name)
+                self.add(stmt, defs=[] if target is None else [target], uses=self.used_in(stmt.rhs))
+            else:
+                self.add(stmt, uses=self.used_in(stmt.lhs, stmt.rhs))
+        elif isinstance(stmt, IfStatement):
+            self.add(Branch(stmt), uses=self.used_in(stmt.condition))
+            branch, join = self.current, self.new_block()
+            self.current = self.new_block()
+            self.edge(branch, self.current)
+            self.statement(stmt.then_stmt)
+            self.edge(self.current, join)
+            if stmt.else_stmt is not None:
+                self.current = self.new_block()
+                self.edge(branch, self.current)
+                self.statement(stmt.else_stmt)
+                self.edge(self.current, join)
+            else:
+                self.edge(branch, join)
+            self.current = join
+        elif isinstance(stmt, ForStatement):
+            self.for_statement(stmt)
+        elif isinstance(stmt, ReturnStatement):
+            self.add(stmt, uses=self.used_in(stmt.value))
+            self.jump(EXIT)
+        elif isinstance(stmt, BreakStatement):
+            if self.loops:
+                self.jump(self.loops[-1][1])
+        elif isinstance(stmt, ContinueStatement):
+            if self.loops:
+                self.jump(self.loops[-1][0])
+        elif isinstance(stmt, MethodInvocationStatement):
+            self.add(stmt, uses=self.used_in(stmt.method_call))
+
+    def for_statement(self, stmt: ForStatement):
+        uses = self.used_in(stmt.start_expr)
+        var = self.lookup(stmt.variable)
+        if var is None:
+            # an undeclared loop variable is declared in the enclosing scope
+            var = self.declare(stmt.variable)
+        self.add(ForInit(stmt), defs=[var], uses=uses)
+        self.add(ForEnd(stmt), uses=self.used_in(stmt.end_expr))
+        header, step, exit_block = self.new_block(), self.new_block(), self.new_block()
+        self.edge(self.current, header)
+        self.current = header
+        self.add(ForTest(stmt), uses=[var])
+        self.current = self.new_block()
+        self.edge(header, self.current)
+        self.edge(header, exit_block)
+        self.loops.append((step, exit_block))
+        self.statement(stmt.body)
+        self.loops.pop()
+        self.edge(self.current, step)
+        self.current = step
+        self.add(ForStep(stmt), defs=[var], uses=[var])
+        self.edge(step, header)
+        self.current = exit_block
+
+
+def build_cfg(decl: ClassMember) -> CFG:
+    return CFGBuilder().build(decl)
@@ -0,0 +1,177 @@
+"""
+Bit-vector dataflow analyses over control-flow graphs.
+This module provides a worklist solver for gen/kill problems whose facts
+are sets held as Python int bitsets, and the classic instances built on
+src/analysis/cfg.py: live variables, reaching definitions and definite
+assignment. Block transfer functions are composed once from the
+elements' gen and kill sets, so each pass of the solver costs one bitset
+operation per edge.
+"""
+
+from collections import deque
+from typing import List, Tuple
+
+from src.utils.nodes import Variable
+from src.analysis.cfg import CFG, ENTRY, EXIT
+
+
+def bits_of(x: int):
+    """Yield the indices of the set bits of x, lowest first."""
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+
+class DataflowResult:
+    """Facts at the start (before) and end (after) of every block, in program order."""
+
+    def __init__(self, cfg: CFG, before: List[int], after: List[int]):
+        self.cfg = cfg
+        self.before = before
+        self.after = after
+
+
+class BitVectorProblem:
+    """A gen/kill dataflow problem.
+
+    Subclasses set forward and may_analysis (meet by union rather than
+    intersection) and define element_sets; boundary is the fact at the
+    entry of a forward problem or the exit of a backward one.
+    """
+
+    forward = True
+    may_analysis = True
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+
+    def universe(self) -> int:
+        return (1 << len(self.cfg.variables)) - 1
+
+    def boundary(self) -> int:
+        return 0
+
+    def element_sets(self, index: int) -> Tuple[int, int]:
+        """Return the (gen, kill) bitsets of one element."""
+        raise NotImplementedError
+
+    def block_sets(self) -> Tuple[List[int], List[int]]:
+        """Compose the element transfer functions of each block in flow order."""
+        gens, kills = [], []
+        for b in range(self.cfg.num_blocks):
+            indices = self.cfg.element_range(b)
+            gen = kill = 0
+            for i in (indices if self.forward else reversed(indices)):
+                g, k = self.element_sets(i)
+                gen = g | (gen & ~k)
+                kill |= k
+            gens.append(gen)
+            kills.append(kill)
+        return gens, kills
+
+
+def solve(problem: BitVectorProblem) -> DataflowResult:
+    """Run the worklist algorithm to a fixed point."""
+    cfg = problem.cfg
+    gens, kills = problem.block_sets()
+    top = 0 if problem.may_analysis else problem.universe()
+    before, after = [top] * cfg.num_blocks, [top] * cfg.num_blocks
+    order = cfg.reverse_postorder()
+    if problem.forward:
+        inputs, outputs, sources, targets, start = before, after, cfg.predecessors, cfg.successors, ENTRY
+    else:
+        order.reverse()
+        inputs, outputs, sources, targets, start = after, before, cfg.successors, cfg.predecessors, EXIT
+
+    worklist = deque(order)
+    queued = bytearray([1]) * cfg.num_blocks
+    while worklist:
+        b = worklist.popleft()
+        queued[b] = 0
+        if b == start:
+            fact = problem.boundary()
+        else:
+            fact = top
+            for s in sources(b):
+                fact = fact | outputs[s] if problem.may_analysis else fact & outputs[s]
+        inputs[b] = fact
+        out = gens[b] | (fact & ~kills[b])
+        if out != outputs[b]:
+            outputs[b] = out
+            for t in targets(b):
+                if not queued[t]:
+                    queued[t] = 1
+                    worklist.append(t)
+    return DataflowResult(cfg, before, after)
+
+
+class LiveVariables(BitVectorProblem):
+    """Variables whose current value may be read later."""
+
+    forward = False
+
+    def element_sets(self, index):
+        return self.cfg.uses[index], self.cfg.defs[index]
+
+
+class ReachingDefinitions(BitVectorProblem):
+    """Definitions that may reach a point; bit i stands for element i of the CFG."""
+
+    def __init__(self, cfg: CFG):
+        super().__init__(cfg)
+        self.sites_of = [0] * len(cfg.variables)
+        for i, bits in enumerate(cfg.defs):
+            for v in bits_of(bits):
+                self.sites_of[v] |= 1 << i
+
+    def universe(self) -> int:
+        return (1 << len(self.cfg.elements)) - 1
+
+    def element_sets(self, index):
+        bits, kill = self.cfg.defs[index], 0
+        if not bits:
+            return 0, 0
+        for v in bits_of(bits):
+            kill |= self.sites_of[v]
+        return 1 << index, kill
+
+
+class DefiniteAssignment(BitVectorProblem):
+    """Variables assigned explicitly on every path; declarations without an
+    initialiser do not count even though the runtime gives them a default."""
+
+    may_analysis = False
+
+    def element_sets(self, index):
+        element = self.cfg.elements[index]
+        if isinstance(element, Variable) and element.init_value is None:
+            return 0, 0
+        return self.cfg.defs[index], 0
+
+
+def live_variables(cfg: CFG) -> DataflowResult:
+    return solve(LiveVariables(cfg))
+
+
+def reaching_definitions(cfg: CFG) -> DataflowResult:
+    return solve(ReachingDefinitions(cfg))
+
+
+def definite_assignment(cfg: CFG) -> DataflowResult:
+    return solve(DefiniteAssignment(cfg))
+
+
+def unassigned_reads(cfg: CFG) -> List[Tuple[int, str]]:
+    """Return (element index, name) for each read of a variable not definitely assigned."""
+    result = definite_assignment(cfg)
+    found = []
+    for b in range(cfg.num_blocks):
+        assigned = result.before[b]
+        for i in cfg.element_range(b):
+            for name in cfg.names(cfg.uses[i] & ~assigned):
+                found.append((i, name))
+            element = cfg.elements[i]
+            if not (isinstance(element, Variable) and element.init_value is None):
+                assigned |= cfg.defs[i]
+    return found
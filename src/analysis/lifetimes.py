@@ -0,0 +1,178 @@
+"""
+Object lifetimes for deterministic destruction.
+This module finds the locals whose object can be destroyed when their
+block ends instead of at program end. A local qualifies when
+
+  * it is declared (not as a reference) with the initialiser new C(...)
+    for a class C that has a destructor,
+  * the rest of its block only uses it as the receiver of attribute
+    accesses and method calls, never assigning, redeclaring or passing it,
+  * neither the constructor used, nor C's destructor, nor its attribute
+    initialisers, nor any method called on it can let `this` escape, and
+  * it is not used in the return value of a method returning a reference.
+
+A member lets `this` escape when it uses `this` as a plain value, returns
+a reference from an instance method, or calls through `this` a method of
+that name that lets `this` escape in any class.
+
+The names of the qualifying locals of a BlockStatement are stored in its
+scoped attribute, in declaration order; engines destroy their objects,
+most recent first, whenever the block is left normally or through break,
+continue or return.
+"""
+
+from typing import Dict, List, Optional, Set
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable
+
+
+def _unparen(expr: Expr) -> Expr:
+    while isinstance(expr, ParenthesizedExpression):
+        expr = expr.expr
+    return expr
+
+
+class _Uses(BaseVisitor):
+    """Check how a subtree uses one local, or `this` when name is None."""
+
+    def __init__(self, name: Optional[str] = None, returns_ref: bool = False):
+        self.name = name
+        self.returns_ref = returns_ref
+        self.in_ref_return = False
+        self.escapes = False
+        self.calls: List[str] = []
+
+    def _is_target(self, expr: Expr) -> bool:
+        expr = _unparen(expr)
+        if self.name is None:
+            return isinstance(expr, ThisExpression)
+        return isinstance(expr, Identifier) and expr.name == self.name
+
+    def visit_postfix_expression(self, node, o=None):
+        first = node.postfix_ops[0] if node.postfix_ops else None
+        if isinstance(first, (MemberAccess, MethodCall)) and self._is_target(node.primary):
+            if self.in_ref_return:
+                self.escapes = True
+            if isinstance(first, MethodCall):
+                self.calls.append(first.method_name)
+            for op in node.postfix_ops:
+                self.visit(op, o)
+        else:
+            super().visit_postfix_expression(node, o)
+
+    def visit_identifier(self, node, o=None):
+        if node.name == self.name:
+            self.escapes = True
+
+    def visit_this_expression(self, node, o=None):
+        if self.name is None:
+            self.escapes = True
+
+    def visit_id_lhs(self, node, o=None):
+        if node.name == self.name:
+            self.escapes = True
+
+    def visit_variable(self, node, o=None):
+        if node.name == self.name:
+            self.escapes = True
+        super().visit_variable(node, o)
+
+    def visit_for_statement(self, node, o=None):
+        if node.variable == self.name:
+            self.escapes = True
+        super().visit_for_statement(node, o)
+
+    def visit_return_statement(self, node, o=None):
+        self.in_ref_return = self.returns_ref
+        super().visit_return_statement(node, o)
+        self.in_ref_return = False
+
+
+class LifetimeAnalysis(BaseVisitor):
+    """Set BlockStatement.scoped throughout a Program."""
+
+    def __init__(self, class_table: ClassTable):
+        self.class_table = class_table
+        self.leaking: Set[int] = set()
+        self.returns_ref = False
+        self.scoped = 0
+
+    def analyze(self, program: Program) -> int:
+        """Annotate every block of program and return the number of scoped locals."""
+        self._find_leaks()
+        self.visit(program)
+        return self.scoped
+
+    def _find_leaks(self):
+        by_name: Dict[str, List[MethodDecl]] = {}
+        calls: Dict[int, List[str]] = {}
+        for class_decl in self.class_table.classes.values():
+            for member in class_decl.members:
+                if isinstance(member, MethodDecl):
+                    by_name.setdefault(member.name, []).append(member)
+                if (isinstance(member, (MethodDecl, ConstructorDecl, DestructorDecl))
+                        and not getattr(member, "is_static", False)):
+                    returns_ref = isinstance(getattr(member, "return_type", None), ReferenceType)
+                    uses = _Uses(None)
+                    uses.visit(member.body)
+                    if uses.escapes or returns_ref:
+                        self.leaking.add(id(member))
+                    calls[id(member)] = uses.calls
+                elif isinstance(member, AttributeDecl) and not member.is_static:
+                    uses = _Uses(None)
+                    uses.visit(member)
+                    if uses.escapes:
+                        self.leaking.add(id(member))
+        changed = True
+        while changed:
+            changed = False
+            for key, names in calls.items():
+                if key not in self.leaking and any(id(m) in self.leaking for n in names for m in by_name.get(n, ())):
+                    self.leaking.add(key)
+                    changed = True
+
+    def _creation_leaks(self, creation: ObjectCreation) -> bool:
+        name = creation.class_name
+        dtor = self.class_table.find_destructor(name)
+        if dtor is None or id(dtor) in self.leaking:
+            return True
+        # without argument types, any constructor the creation may call counts
+        if any(id(ctor) in self.leaking for ctor in self.class_table.constructors_of(name)
+               if len(ctor.params) == len(creation.args)):
+            return True
+        return any(id(decl) in self.leaking for decl, _ in self.class_table.instance_attributes(name))
+
+    def _scoped(self, block: BlockStatement, index: int, var: Variable, creation: ObjectCreation) -> bool:
+        uses = _Uses(var.name, self.returns_ref)
+        for decl in block.var_decls[index + 1:]:
+            uses.visit(decl)
+        for stmt in block.statements:
+            uses.visit(stmt)
+        if uses.escapes:
+            return False
+        vtable = self.class_table.vtable(creation.class_name)
+        return all(name in vtable and id(vtable[name]) not in self.leaking for name in uses.calls)
+
+    # ------------------------------------------------------------------
+    # Members and blocks
+    # ------------------------------------------------------------------
+
+    def visit_method_decl(self, node, o=None):
+        self.returns_ref = isinstance(node.return_type, ReferenceType)
+        self.visit(node.body, o)
+        self.returns_ref = False
+
+    def visit_block_statement(self, node, o=None):
+        node.scoped = []
+        for index, decl in enumerate(node.var_decls):
+            if isinstance(decl.var_type, ReferenceType):
+                continue
+            for var in decl.variables:
+                creation = _unparen(var.init_value) if var.init_value is not None else None
+                if (isinstance(creation, ObjectCreation) and len(decl.variables) == 1
+                        and not self._creation_leaks(creation) and self._scoped(node, index, var, creation)):
+                    node.scoped.append(var.name)
+        self.scoped += len(node.scoped)
+        super().visit_block_statement(node, o)
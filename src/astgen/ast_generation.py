@@ -48,6 +48,8 @@ class ASTGeneration(OPLangVisitor):
         else :
             name = ctx.ID().getText()
             ret_type = self.visit(ctx.typeRet())
+            if ctx.AMP():
+                ret_type = ReferenceType(ret_type)
             param = self.visit(ctx.param_list()) if ctx.param_list() else []
             body = self.visit(ctx.block_stmt())
             return MethodDecl(is_static, ret_type, name, param, body)
@@ -180,7 +182,11 @@ class ASTGeneration(OPLangVisitor):
 
     # decl_part: localdecl+;
     def visitDecl_part(self, ctx: OPLangParser.Decl_partContext): 
-        return [self.visit(x) for x in ctx.localdecl()]
+        decls = []
+        for x in ctx.localdecl():
+            decl = self.visit(x)
+            decls.extend(decl if isinstance(decl, list) else [decl])
+        return decls
 
     # stmt_part: statement+;
     def visitStmt_part(self, ctx: OPLangParser.Stmt_partContext): 
@@ -188,10 +194,19 @@ class ASTGeneration(OPLangVisitor):
 
     # localdecl: FINAL? optype var_list SEMI;
     def visitLocaldecl(self, ctx: OPLangParser.LocaldeclContext): 
+        # & makes only its own variable a reference: a declaration mixing
+        # both kinds becomes one VariableDecl per run of the same kind
         is_final = bool(ctx.FINAL())
         typee = self.visit(ctx.optype())
-        name = self.visit(ctx.var_list())
-        return VariableDecl(is_final, typee, name)
+        decls, refs = [], None
+        for v in ctx.var_list().var():
+            if decls and bool(v.AMP()) == refs:
+                decls[-1].variables.append(self.visit(v))
+            else:
+                refs = bool(v.AMP())
+                decl_type = ReferenceType(typee) if refs else typee
+                decls.append(VariableDecl(is_final, decl_type, [self.visit(v)]))
+        return decls
 
     # assign_stmt: lhs ASSIGN expression SEMI;
     def visitAssign_stmt(self, ctx: OPLangParser.Assign_stmtContext):
@@ -242,7 +257,7 @@ class ASTGeneration(OPLangVisitor):
 
         if ops:
             if isinstance(node, PostfixExpression):
-                node = PostfixExpression(node.base, node.postfix_ops + ops)
+                node = PostfixExpression(node.primary, node.postfix_ops + ops)
             else:
                 node = PostfixExpression(node, ops)
 
@@ -314,7 +329,7 @@ class ASTGeneration(OPLangVisitor):
         for i in range(1, len(ctx.exprRel())):
             op = ctx.getChild(2 * i - 1).getText()
             right = self.visit(ctx.exprRel(i))
-            if isinstance(left, BinaryOp) and left.op in ["==", "!="]:
+            if isinstance(left, BinaryOp) and left.operator in ["==", "!="]:
                 left.right = BinaryOp(left.right, op, right)
             else:
                 left = BinaryOp(left, op, right)
@@ -434,7 +449,7 @@ class ASTGeneration(OPLangVisitor):
         if not postfix_ops:
             return base
         if isinstance(base, PostfixExpression):
-            return PostfixExpression(base.base, base.postfix_ops + postfix_ops)
+            return PostfixExpression(base.primary, base.postfix_ops + postfix_ops)
         return PostfixExpression(base, postfix_ops)
 
 
@@ -483,4 +498,4 @@ class ASTGeneration(OPLangVisitor):
 
 
 
-    
\ No newline at end of file
+    
\ No newline at end of file
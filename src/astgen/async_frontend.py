@@ -0,0 +1,111 @@
+"""
+asyncio front end for concurrent compile requests.
+AsyncFrontEnd.compile parses a source without blocking the event loop:
+the work runs in a bounded pool of worker processes (or threads, which
+parse one at a time because the ANTLR runtime's shared DFAs are not
+thread-safe) and the coroutine waits for it.
+
+At most workers + queue_size requests are admitted at once; further
+callers wait for a slot, or get FrontEndBusy at once with block=False.
+Every request has a deadline, by default the 3 seconds the test suite
+allows, covering both the wait for a slot and the parse; on timeout the
+coroutine raises asyncio.TimeoutError. A request cancelled or timed out
+before a worker picked it up is dropped from the pool; one already
+running finishes in its worker, which keeps its slot until then, and
+its result is discarded.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from src.astgen import frontend
+
+
+# seconds per request, as in the README's pytest --timeout=3
+DEFAULT_TIMEOUT = 3.0
+
+
+class CompileError(Exception):
+    """A lexical or syntax error in the compiled source."""
+
+
+class FrontEndBusy(Exception):
+    """Raised by compile(block=False) when the queue is full."""
+
+
+def _compile(source: str) -> Tuple[object, Optional[str]]:
+    try:
+        return frontend.parse(source), None
+    except Exception as e:
+        return None, str(e)
+
+
+_parse_lock = threading.Lock()
+
+
+def _compile_locked(source: str) -> Tuple[object, Optional[str]]:
+    with _parse_lock:
+        return _compile(source)
+
+
+class AsyncFrontEnd:
+    """Compile OPLang sources from coroutines through a bounded worker pool."""
+
+    def __init__(self, workers: int = 2, queue_size: int = 32, timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 processes: bool = True):
+        self.workers = workers
+        self.timeout = timeout
+        self.processes = processes
+        self.executor: Executor
+        if processes:
+            self.executor = ProcessPoolExecutor(workers, initializer=frontend.load)
+        else:
+            frontend.load()
+            self.executor = ThreadPoolExecutor(workers)
+        self.slots = asyncio.Semaphore(workers + queue_size)
+        # requests admitted and not yet finished by the pool
+        self.pending = 0
+
+    async def compile(self, source: str, timeout: Optional[float] = None, block: bool = True):
+        """Return the Program AST of source; raise CompileError on a syntax error."""
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._compile(source, block), timeout)
+
+    async def _compile(self, source: str, block: bool):
+        if not block and self.slots.locked():
+            raise FrontEndBusy(f"{self.pending} requests pending")
+        await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future: Future = self.executor.submit(_compile if self.processes else _compile_locked, source)
+        except BaseException:
+            self.slots.release()
+            raise
+        self.pending += 1
+        # the slot is free once the pool is done with the request, even if it was abandoned
+        future.add_done_callback(lambda _: self._release(loop))
+        program, error = await asyncio.wrap_future(future)
+        if error is not None:
+            raise CompileError(error)
+        return program
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        def release():
+            self.pending -= 1
+            self.slots.release()
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            pass  # the loop is closed, and its semaphore with it
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
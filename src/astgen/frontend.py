@@ -0,0 +1,41 @@
+"""
+Lean entry point of the OPLang front end.
+Importing this module imports nothing but the standard library modules
+it needs itself: antlr4, the generated lexer and parser (whose import
+deserialises their ATNs) and ASTGeneration are imported by the first
+call of parse(), or by load() for a process that wants to pay for them
+up front, so a process that never parses does not pay for them at all.
+"""
+
+import os
+import sys
+
+BUILD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "build")
+
+_pipeline = None
+
+
+def load():
+    """Import the lexer, the parser and ASTGeneration, once."""
+    global _pipeline
+    if _pipeline is None:
+        # the generated lexer imports lexererr from the build directory
+        if BUILD_DIR not in sys.path:
+            sys.path.insert(0, BUILD_DIR)
+        from antlr4 import CommonTokenStream, InputStream
+        from build.OPLangLexer import OPLangLexer
+        from build.OPLangParser import OPLangParser
+        from src.astgen.ast_generation import ASTGeneration
+        from src.utils.error_listener import NewErrorListener
+        _pipeline = (InputStream, CommonTokenStream, OPLangLexer, OPLangParser,
+                     ASTGeneration, NewErrorListener.INSTANCE)
+    return _pipeline
+
+
+def parse(source: str):
+    """Return the Program AST of source; lexical and syntax errors are raised."""
+    input_stream, token_stream, lexer, parser_class, generation, listener = load()
+    parser = parser_class(token_stream(lexer(input_stream(source))))
+    parser.removeErrorListeners()
+    parser.addErrorListener(listener)
+    return generation().visit(parser.program())
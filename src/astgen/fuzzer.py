@@ -0,0 +1,457 @@
+"""
+Grammar-aware differential fuzzer for the OPLang front end.
+GrammarGenerator writes random programs that src/grammar/OPLang.g4
+accepts by walking the ATN ANTLR built from its parser rules, and turns
+them into near-valid ones by mutating their tokens: deleting,
+duplicating, swapping, gluing or replacing them, splicing in a fragment
+generated from a random rule, or inserting text the lexer rejects.
+
+Fuzzer runs every input through the reference pipeline, OPLangLexer,
+OPLangParser and ASTGeneration as ASTGenerator in tests/utils.py runs
+them, and through each alternative pipeline, in a pool of worker
+processes, and compares their outcomes: the string of the AST, the
+message of the lexical or syntax error, or the type of any other
+exception. Inputs that reach parse-tree edges or error sites no earlier
+input reached join the corpus mutations start from, and every input
+whose outcomes differ is shrunk by delta debugging over its tokens to a
+minimal one that still mismatches.
+
+An alternative pipeline is a function from a source to its Program, or
+the string of it, that raises on errors like the reference; it raises
+Rejected for an error whose message is not comparable.
+
+Usage: python -m src.astgen.fuzzer [--iterations N] [--workers N] [--seed N]
+           [--pipeline NAME | --pipeline NAME=MODULE:FUNCTION ...] [--output DIR]
+"""
+
+import importlib
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from src.astgen import frontend
+
+IDENTIFIERS = ["a", "b", "x", "y", "io", "A", "B", "Main", "main", "value"]
+INTEGERS = ["0", "1", "7", "42", "1000"]
+FLOATS = ["1.5", "0.25", "3.", "2e3", "1.0E-2"]
+STRINGS = ['""', '"s"', '"hello world"', '"a\\nb"', '"q\\"q"']
+# an error character, an unclosed string and an illegal escape
+LEXER_ERRORS = ["@", "$", '"unclosed\n', '"bad \\q"']
+
+Outcome = Tuple[str, Optional[str]]
+
+
+class Rejected(Exception):
+    """Raised by a pipeline for an error, with the reference's message or None to compare only that it failed."""
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+
+
+# ============================================================================
+# Pipelines
+# ============================================================================
+
+
+def _errors() -> tuple:
+    frontend.load()
+    from lexererr import LexerError
+    from src.utils.error_listener import SyntaxException
+    return LexerError, SyntaxException
+
+
+def outcome(pipeline: Callable[[str], object], source: str) -> Outcome:
+    """Run pipeline on source and return ("ast", AST string), ("error", message) or ("crash", exception type)."""
+    try:
+        return "ast", str(pipeline(source))
+    except Rejected as e:
+        return "error", e.message
+    except _errors() as e:
+        return "error", str(e)
+    except Exception as e:
+        return "crash", type(e).__name__
+
+
+def matches(expected: Outcome, actual: Outcome) -> bool:
+    return actual == expected or (actual[0] == expected[0] == "error" and actual[1] is None)
+
+
+def reference(source: str) -> Tuple[Outcome, FrozenSet[tuple]]:
+    """The reference outcome of source and the parse-tree edges or error site it covers."""
+    from antlr4 import ParserRuleContext
+    from src.utils.error_listener import NewErrorListener
+
+    class CoverageListener(NewErrorListener):
+        site = None
+
+        def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+            self.site = ("syntax", recognizer._ctx.getRuleIndex(), getattr(offendingSymbol, "type", None))
+            super().syntaxError(recognizer, offendingSymbol, line, column, msg, e)
+
+    input_stream, token_stream, lexer_class, parser_class, generation_class, _ = frontend.load()
+    lexer_error, syntax_exception = _errors()
+    parser = parser_class(token_stream(lexer_class(input_stream(source))))
+    listener = CoverageListener()
+    parser.removeErrorListeners()
+    parser.addErrorListener(listener)
+    try:
+        tree = parser.program()
+        program = generation_class().visit(tree)
+    except lexer_error as e:
+        return ("error", str(e)), frozenset([("lexer", type(e).__name__)])
+    except syntax_exception as e:
+        return ("error", str(e)), frozenset([listener.site])
+    except Exception as e:
+        return ("crash", type(e).__name__), frozenset([("crash", type(e).__name__)])
+
+    coverage = set()
+    stack = [tree]
+    while stack:
+        ctx = stack.pop()
+        rule = ctx.getRuleIndex()
+        coverage.add(("arity", rule, min(ctx.getChildCount(), 8)))
+        for child in ctx.getChildren():
+            if isinstance(child, ParserRuleContext):
+                coverage.add(("edge", rule, child.getRuleIndex()))
+                stack.append(child)
+            else:
+                coverage.add(("token", rule, child.symbol.type))
+    return ("ast", str(program)), frozenset(coverage)
+
+
+def _frontend(source: str):
+    return frontend.parse(source)
+
+
+def _instrumented(source: str):
+    from src.astgen.instrumentation import FrontEndReport, build_ast
+    return build_ast(source, FrontEndReport())
+
+
+def _recovery(source: str):
+    from src.astgen import recovery
+    program, diagnostics = recovery.parse(source)
+    if diagnostics:
+        raise Rejected()
+    return program
+
+
+def _server(source: str):
+    from src.astgen.server import compile_source
+    response = compile_source(source)
+    if "error" in response:
+        raise Rejected(response["error"][len("Parser "):])
+    return response["ast"]
+
+
+def _streaming(source: str):
+    from src.astgen import streaming
+    return streaming.parse(source, block=16)
+
+
+PIPELINES: Dict[str, Callable[[str], object]] = {
+    "frontend": _frontend,
+    "instrumented": _instrumented,
+    "recovery": _recovery,
+    "server": _server,
+    "streaming": _streaming,
+}
+
+
+def load_pipeline(spec: str) -> Tuple[str, Callable[[str], object]]:
+    """Resolve NAME, one of PIPELINES, or NAME=MODULE:FUNCTION."""
+    name, _, target = spec.partition("=")
+    if not target:
+        return name, PIPELINES[name]
+    module, _, function = target.partition(":")
+    return name, getattr(importlib.import_module(module), function)
+
+
+_pipelines: Dict[str, Callable[[str], object]] = {}
+
+
+def _init_worker(pipelines: Dict[str, Callable[[str], object]]):
+    global _pipelines
+    _pipelines = pipelines
+    frontend.load()
+
+
+def _check(source: str, pipelines: Optional[Dict[str, Callable[[str], object]]] = None):
+    expected, coverage = reference(source)
+    actual = {name: outcome(pipeline, source) for name, pipeline in (pipelines or _pipelines).items()}
+    return expected, coverage, actual
+
+
+# ============================================================================
+# Generation
+# ============================================================================
+
+
+class GrammarGenerator:
+    """Random token sequences of the parser rules, from a walk of the parser's ATN.
+
+    Below max_depth nested rules and max_tokens tokens every alternative
+    and loop iteration is equally likely; past either, the walk takes the
+    alternative that finishes the current rule in the fewest tokens.
+    """
+
+    def __init__(self, rng: random.Random, max_depth: int = 40, max_tokens: int = 300):
+        from antlr4.atn.ATNState import RuleStopState
+        from antlr4.atn.Transition import RuleTransition
+
+        _, _, _, parser_class, _, _ = frontend.load()
+        self.rng = rng
+        self.max_depth = max_depth
+        self.max_tokens = max_tokens
+        self.atn = parser_class.atn
+        self.rule_names = list(parser_class.ruleNames)
+        self.literals = {t: name[1:-1] for t, name in enumerate(parser_class.literalNames) if name.startswith("'")}
+        self.samples = {parser_class.ID: IDENTIFIERS, parser_class.INTLIT: INTEGERS,
+                        parser_class.FLOATLIT: FLOATS, parser_class.STRINGLIT: STRINGS}
+        self.vocabulary = list(self.literals.values()) + [text for texts in self.samples.values() for text in texts]
+        self.rule_transition = RuleTransition
+
+        # fewest tokens from each state to the end of its rule, to a fixed point
+        states = [s for s in self.atn.states if s is not None]
+        self.costs = {s.stateNumber: 0 if isinstance(s, RuleStopState) else float("inf") for s in states}
+        changed = True
+        while changed:
+            changed = False
+            for state in states:
+                if isinstance(state, RuleStopState):
+                    continue
+                best = min((self._cost(t) for t in state.transitions), default=float("inf"))
+                if best < self.costs[state.stateNumber]:
+                    self.costs[state.stateNumber] = best
+                    changed = True
+
+    def _cost(self, transition) -> float:
+        if isinstance(transition, self.rule_transition):
+            return self.costs[transition.target.stateNumber] + self.costs[transition.followState.stateNumber]
+        token = 0 if transition.isEpsilon or getattr(transition, "label_", None) == -1 else 1
+        return token + self.costs[transition.target.stateNumber]
+
+    def program(self) -> List[str]:
+        return self.rule("program")
+
+    def rule(self, name: str) -> List[str]:
+        tokens: List[str] = []
+        self._walk(self.rule_names.index(name), 0, tokens)
+        return tokens
+
+    def _walk(self, rule: int, depth: int, tokens: List[str]):
+        state = self.atn.ruleToStartState[rule]
+        stop = self.atn.ruleToStopState[rule]
+        while state is not stop:
+            transitions = state.transitions
+            if len(transitions) == 1:
+                transition = transitions[0]
+            elif depth >= self.max_depth or len(tokens) >= self.max_tokens:
+                transition = min(transitions, key=self._cost)
+            else:
+                transition = self.rng.choice(transitions)
+            if isinstance(transition, self.rule_transition):
+                self._walk(transition.ruleIndex, depth + 1, tokens)
+                state = transition.followState
+                continue
+            if not transition.isEpsilon:
+                types = [t for r in transition.label.intervals for t in r]
+                token = self.rng.choice(types)
+                if token != -1:
+                    tokens.append(self.literals[token] if token in self.literals else self.rng.choice(self.samples[token]))
+            state = transition.target
+
+    def mutate(self, tokens: List[str]) -> List[str]:
+        """A near-valid variant of tokens."""
+        rng = self.rng
+        tokens = list(tokens)
+        n = len(tokens)
+        i = rng.randrange(n) if n else 0
+        op = rng.randrange(8)
+        if op == 0 and n:
+            del tokens[i:i + rng.randint(1, 3)]
+        elif op == 1 and n:
+            tokens.insert(i, tokens[i])
+        elif op == 2 and n > 1:
+            i = min(i, n - 2)
+            tokens[i], tokens[i + 1] = tokens[i + 1], tokens[i]
+        elif op == 3 and n > 1:
+            i = min(i, n - 2)
+            tokens[i:i + 2] = [tokens[i] + tokens[i + 1]]
+        elif op == 4:
+            tokens.insert(i, rng.choice(self.vocabulary))
+        elif op == 5 and n:
+            tokens[i] = rng.choice(self.vocabulary)
+        elif op == 6:
+            tokens[i:i + rng.randint(0, 3)] = self.rule(rng.choice(self.rule_names))
+        else:
+            tokens.insert(i, rng.choice(LEXER_ERRORS))
+        return tokens
+
+
+def minimise(tokens: List[str], failing: Callable[[List[str]], bool]) -> List[str]:
+    """Shrink tokens to a list that still fails and passes with any run of tokens removed.
+
+    Delta debugging removes aligned chunks, halving them as it goes; the
+    runs it cannot remove, such as a whole class member, which are only
+    valid when removed together, are then tried at every offset.
+    """
+    chunks = 2
+    while len(tokens) >= 2:
+        size = -(-len(tokens) // chunks)
+        for start in range(0, len(tokens), size):
+            complement = tokens[:start] + tokens[start + size:]
+            if failing(complement):
+                tokens = complement
+                chunks = max(chunks - 1, 2)
+                break
+        else:
+            if chunks >= len(tokens):
+                break
+            chunks = min(chunks * 2, len(tokens))
+    size = len(tokens) - 1
+    while size > 0:
+        for start in range(len(tokens) - size + 1):
+            complement = tokens[:start] + tokens[start + size:]
+            if failing(complement):
+                tokens = complement
+                size = min(size, len(tokens) - 1)
+                break
+        else:
+            size -= 1
+    return tokens
+
+
+# ============================================================================
+# Fuzzing
+# ============================================================================
+
+
+class Mismatch:
+    """An input on which a pipeline and the reference disagree, with their outcomes on its minimised form."""
+
+    __slots__ = ("pipeline", "source", "minimised", "expected", "actual")
+
+    def __init__(self, pipeline: str, source: str, minimised: str, expected: Outcome, actual: Outcome):
+        self.pipeline = pipeline
+        self.source = source
+        self.minimised = minimised
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self):
+        return f"{self.pipeline}: {self.minimised!r}\n  reference: {self.expected}\n  {self.pipeline}: {self.actual}"
+
+
+class FuzzReport:
+    """Counts, coverage and mismatches of a fuzzing run."""
+
+    def __init__(self):
+        self.inputs = 0
+        self.valid = 0
+        self.coverage: set = set()
+        self.corpus = 0
+        self.mismatches: List[Mismatch] = []
+
+    def __str__(self):
+        lines = [f"{self.inputs} inputs, {self.valid} valid, {len(self.coverage)} coverage points, "
+                 f"corpus {self.corpus}, {len(self.mismatches)} mismatches"]
+        lines.extend(str(m) for m in self.mismatches)
+        return "\n".join(lines)
+
+
+class Fuzzer:
+    """Compare alternative pipelines with the reference on generated inputs."""
+
+    def __init__(self, pipelines: Dict[str, Callable[[str], object]], workers: int = 0, seed: int = 0,
+                 batch: int = 64, mutation_rate: float = 0.5, max_depth: int = 40, max_tokens: int = 300,
+                 max_mismatches: int = 5):
+        self.pipelines = pipelines
+        self.workers = workers
+        self.batch = batch
+        self.mutation_rate = mutation_rate
+        self.max_mismatches = max_mismatches
+        self.rng = random.Random(seed)
+        self.generator = GrammarGenerator(self.rng, max_depth, max_tokens)
+        self.corpus: List[List[str]] = []
+
+    def next_input(self) -> List[str]:
+        if self.corpus and self.rng.random() < self.mutation_rate:
+            return self.generator.mutate(self.rng.choice(self.corpus))
+        return self.generator.program()
+
+    def run(self, iterations: int) -> FuzzReport:
+        report = FuzzReport()
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.pipelines,)) \
+            if self.workers else None
+        try:
+            while report.inputs < iterations:
+                inputs = [self.next_input() for _ in range(min(self.batch, iterations - report.inputs))]
+                sources = [" ".join(tokens) for tokens in inputs]
+                if pool is not None:
+                    results = pool.map(_check, sources, chunksize=max(1, len(sources) // (4 * self.workers)))
+                else:
+                    results = (_check(source, self.pipelines) for source in sources)
+                for tokens, source, (expected, coverage, actual) in zip(inputs, sources, results):
+                    self.record(report, tokens, source, expected, coverage, actual)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        report.corpus = len(self.corpus)
+        return report
+
+    def record(self, report: FuzzReport, tokens: List[str], source: str, expected: Outcome,
+               coverage: FrozenSet[tuple], actual: Dict[str, Outcome]):
+        report.inputs += 1
+        report.valid += expected[0] == "ast"
+        if not coverage <= report.coverage:
+            report.coverage |= coverage
+            self.corpus.append(tokens)
+        for name, result in actual.items():
+            if matches(expected, result):
+                continue
+            if sum(m.pipeline == name for m in report.mismatches) >= self.max_mismatches:
+                continue
+            minimised = " ".join(self.minimise(name, tokens))
+            if all(m.minimised != minimised for m in report.mismatches):
+                report.mismatches.append(Mismatch(name, source, minimised, reference(minimised)[0],
+                                                  outcome(self.pipelines[name], minimised)))
+
+    def minimise(self, name: str, tokens: List[str]) -> List[str]:
+        pipeline = self.pipelines[name]
+
+        def failing(candidate: List[str]) -> bool:
+            source = " ".join(candidate)
+            return not matches(reference(source)[0], outcome(pipeline, source))
+
+        return minimise(tokens, failing)
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the OPLang front-end pipelines")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pipeline", action="append", help="NAME or NAME=MODULE:FUNCTION, repeatable; "
+                                                             f"default all of {', '.join(PIPELINES)}")
+    parser.add_argument("--output", help="write each minimised mismatching input to this directory")
+    args = parser.parse_args(argv)
+
+    pipelines = dict(load_pipeline(spec) for spec in args.pipeline or PIPELINES)
+    report = Fuzzer(pipelines, args.workers, args.seed).run(args.iterations)
+    print(report)
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for i, mismatch in enumerate(report.mismatches):
+            with open(os.path.join(args.output, f"{mismatch.pipeline}-{i}.op"), "w") as f:
+                f.write(mismatch.minimised + "\n")
+    return 1 if report.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
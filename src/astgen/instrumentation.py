@@ -0,0 +1,151 @@
+"""
+Opt-in instrumentation of the OPLang front end.
+This module runs the lexer, the parser and ASTGeneration on a source
+string. Given a FrontEndReport, it times each phase separately, counts
+the tokens, parse-tree nodes and AST nodes, and optionally records the
+peak memory allocated by each phase with tracemalloc; without one it is
+the plain pipeline and costs nothing extra.
+
+With a report the token stream is filled before parsing starts, so that
+lexing is timed on its own; a lexical error met while filling it is
+raised only when the parser reaches it, so the error reported is the
+one the plain pipeline reports.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from antlr4 import CommonTokenStream, InputStream
+from antlr4.tree.Tree import TerminalNode
+from build.OPLangLexer import OPLangLexer
+from lexererr import LexerError
+from build.OPLangParser import OPLangParser
+from src.astgen.ast_generation import ASTGeneration
+from src.utils.error_listener import NewErrorListener
+from src.utils.nodes import ASTNode, Program
+
+
+def tree_size(tree) -> int:
+    """Number of nodes of a parse tree."""
+    count, stack = 0, [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if not isinstance(node, TerminalNode) and node.children:
+            stack.extend(node.children)
+    return count
+
+
+def ast_size(node: ASTNode) -> int:
+    """Number of nodes of an AST."""
+    count, stack = 0, [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, ASTNode):
+            count += 1
+            stack.extend(vars(item).values())
+    return count
+
+
+class PhaseStats:
+    """Wall time and peak traced memory of one front-end phase."""
+
+    __slots__ = ("name", "seconds", "peak_bytes")
+
+    def __init__(self, name: str, seconds: float = 0.0, peak_bytes: Optional[int] = None):
+        self.name = name
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+
+
+class FrontEndReport:
+    """Measurements of one run of the front end, filled in by build_ast."""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, PhaseStats] = {}
+        self.tokens = 0
+        self.tree_nodes = 0
+        self.ast_nodes = 0
+
+    @contextmanager
+    def phase(self, name: str):
+        started_tracing = False
+        if self.trace_memory:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stats = self.phases[name] = PhaseStats(name)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                stats.peak_bytes = tracemalloc.get_traced_memory()[1] - base
+                if started_tracing:
+                    tracemalloc.stop()
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stats.seconds for stats in self.phases.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "tree_nodes": self.tree_nodes,
+            "ast_nodes": self.ast_nodes,
+            "phases": {
+                name: {"seconds": stats.seconds, "peak_bytes": stats.peak_bytes}
+                for name, stats in self.phases.items()
+            },
+        }
+
+    def __str__(self):
+        counts = {"lex": f"{self.tokens} tokens", "parse": f"{self.tree_nodes} tree nodes",
+                  "ast": f"{self.ast_nodes} AST nodes"}
+        lines = []
+        for name, stats in self.phases.items():
+            memory = "" if stats.peak_bytes is None else f"  peak {stats.peak_bytes / 1024:.1f} KiB"
+            lines.append(f"{name:<6}{stats.seconds:>10.4f} s  {counts.get(name, '')}{memory}")
+        return "\n".join(lines)
+
+
+class _Failed:
+    """Token source left after a lexical error, raising it when the parser reads on."""
+
+    def __init__(self, error: LexerError):
+        self.error = error
+
+    def nextToken(self):
+        raise self.error
+
+
+def build_ast(source: str, report: Optional[FrontEndReport] = None) -> Program:
+    """Lex, parse and build the AST of source, measuring into report if given."""
+    lexer = OPLangLexer(InputStream(source))
+    stream = CommonTokenStream(lexer)
+    parser = OPLangParser(stream)
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    if report is None:
+        return ASTGeneration().visit(parser.program())
+    with report.phase("lex"):
+        try:
+            stream.fill()
+        except LexerError as e:
+            stream.tokenSource = _Failed(e)
+    report.tokens = len(stream.tokens)
+    with report.phase("parse"):
+        tree = parser.program()
+    report.tree_nodes = tree_size(tree)
+    with report.phase("ast"):
+        program = ASTGeneration().visit(tree)
+    report.ast_nodes = ast_size(program)
+    return program
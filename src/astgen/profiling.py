@@ -0,0 +1,199 @@
+"""
+Profiling of the OPLang parser by grammar decision and rule.
+The Python ANTLR runtime has no ProfilingATNSimulator, so this module
+provides one: ProfilingSimulator replaces the parser's ParserATNSimulator
+and records, for every decision that needs adaptive prediction (LL(1)
+decisions are switches in the generated parser and never reach it), how
+often it was predicted and how long that took, the lookahead depth of
+SLL and full-context (LL) prediction, how often SLL fell back to LL,
+how many steps were answered by the DFA cache or needed ATN simulation,
+and how many semantic predicates were evaluated. A parse listener adds
+the invocation count and inclusive time of every rule.
+
+profile_parse(source) runs the parser once and returns a ParseProfile;
+by default it predicts with empty DFAs, so the cost of building them is
+included, as on the first parse of a process.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from antlr4 import CommonTokenStream, InputStream, ParseTreeListener
+from antlr4.PredictionContext import PredictionContextCache
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.dfa.DFA import DFA
+from build.OPLangLexer import OPLangLexer
+from build.OPLangParser import OPLangParser
+from src.utils.error_listener import NewErrorListener
+
+
+class DecisionStats:
+    """Adaptive prediction counters of one grammar decision."""
+
+    def __init__(self, decision: int, rule: str):
+        self.decision = decision
+        self.rule = rule
+        self.invocations = 0
+        self.seconds = 0.0
+        self.sll_lookahead = 0
+        self.sll_max_lookahead = 0
+        self.ll_fallbacks = 0
+        self.ll_lookahead = 0
+        self.ll_max_lookahead = 0
+        self.dfa_transitions = 0
+        self.atn_transitions = 0
+        self.predicate_evals = 0
+
+
+class RuleStats:
+    """Invocation count and inclusive time of one grammar rule."""
+
+    def __init__(self, rule: str):
+        self.rule = rule
+        self.invocations = 0
+        self.seconds = 0.0
+        self.prediction_seconds = 0.0
+
+
+class ProfilingSimulator(ParserATNSimulator):
+    """A ParserATNSimulator recording DecisionStats for every decision."""
+
+    def __init__(self, parser, decision_to_dfa: List[DFA]):
+        super().__init__(parser, parser.atn, decision_to_dfa, PredictionContextCache())
+        self.decisions: Dict[int, DecisionStats] = {}
+        self.current: Optional[DecisionStats] = None
+        self.sll_stop = -1
+        self.ll_stop = -1
+
+    def stats(self, decision: int) -> DecisionStats:
+        stats = self.decisions.get(decision)
+        if stats is None:
+            rule = self.parser.ruleNames[self.atn.decisionToState[decision].ruleIndex]
+            stats = self.decisions[decision] = DecisionStats(decision, rule)
+        return stats
+
+    def adaptivePredict(self, input, decision, outerContext):
+        stats = self.current = self.stats(decision)
+        self.sll_stop = self.ll_stop = -1
+        start_index = input.index
+        start = time.perf_counter()
+        try:
+            return super().adaptivePredict(input, decision, outerContext)
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.invocations += 1
+            sll = self.sll_stop - start_index + 1 if self.sll_stop >= 0 else 1
+            stats.sll_lookahead += sll
+            stats.sll_max_lookahead = max(stats.sll_max_lookahead, sll)
+            if self.ll_stop >= 0:
+                ll = self.ll_stop - start_index + 1
+                stats.ll_fallbacks += 1
+                stats.ll_lookahead += ll
+                stats.ll_max_lookahead = max(stats.ll_max_lookahead, ll)
+            self.current = None
+
+    def getExistingTargetState(self, previousD, t):
+        self.sll_stop = self._input.index
+        existing = super().getExistingTargetState(previousD, t)
+        if existing is not None and self.current is not None:
+            self.current.dfa_transitions += 1
+        return existing
+
+    def computeTargetState(self, dfa, previousD, t):
+        if self.current is not None:
+            self.current.atn_transitions += 1
+        return super().computeTargetState(dfa, previousD, t)
+
+    def computeReachSet(self, closure, t, fullCtx):
+        if fullCtx:
+            self.ll_stop = self._input.index
+            if self.current is not None:
+                self.current.atn_transitions += 1
+        return super().computeReachSet(closure, t, fullCtx)
+
+    def evalSemanticContext(self, predPredictions, outerContext, complete):
+        if self.current is not None:
+            self.current.predicate_evals += len(predPredictions)
+        return super().evalSemanticContext(predPredictions, outerContext, complete)
+
+
+class _RuleTimer(ParseTreeListener):
+    """Count rule invocations and time them, including nested rules.
+
+    A rule invoked within itself is timed from its outermost invocation
+    only, so recursion is not counted twice.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.rules: Dict[str, RuleStats] = {}
+        self.active: Dict[str, int] = {}
+        self.started: Dict[str, float] = {}
+
+    def enterEveryRule(self, ctx):
+        name = self.parser.ruleNames[ctx.getRuleIndex()]
+        stats = self.rules.get(name)
+        if stats is None:
+            stats = self.rules[name] = RuleStats(name)
+        stats.invocations += 1
+        depth = self.active.get(name, 0)
+        if not depth:
+            self.started[name] = time.perf_counter()
+        self.active[name] = depth + 1
+
+    def exitEveryRule(self, ctx):
+        name = self.parser.ruleNames[ctx.getRuleIndex()]
+        self.active[name] -= 1
+        if not self.active[name]:
+            self.rules[name].seconds += time.perf_counter() - self.started[name]
+
+
+class ParseProfile:
+    """Decision and rule statistics of one profiled parse."""
+
+    def __init__(self, decisions: Dict[int, DecisionStats], rules: Dict[str, RuleStats], seconds: float):
+        self.decisions = decisions
+        self.rules = rules
+        self.seconds = seconds
+        for stats in decisions.values():
+            if stats.rule in rules:
+                rules[stats.rule].prediction_seconds += stats.seconds
+
+    def hot_decisions(self, limit: Optional[int] = None) -> List[DecisionStats]:
+        return sorted(self.decisions.values(), key=lambda s: s.seconds, reverse=True)[:limit]
+
+    def hot_rules(self, limit: Optional[int] = None) -> List[RuleStats]:
+        return sorted(self.rules.values(), key=lambda s: s.prediction_seconds, reverse=True)[:limit]
+
+    def format(self, limit: Optional[int] = None) -> str:
+        """The decision and rule tables, hottest first, limited to limit rows each."""
+        lines = [f"{'decision':<22}{'calls':>8}{'time (s)':>10}{'SLL k':>7}{'max':>5}"
+                 f"{'LL':>6}{'LL max':>7}{'DFA':>8}{'ATN':>6}{'preds':>7}"]
+        for s in self.hot_decisions(limit):
+            lines.append(f"{f'{s.rule} d{s.decision}':<22}{s.invocations:>8}{s.seconds:>10.4f}"
+                         f"{s.sll_lookahead / s.invocations:>7.2f}{s.sll_max_lookahead:>5}"
+                         f"{s.ll_fallbacks:>6}{s.ll_max_lookahead:>7}{s.dfa_transitions:>8}"
+                         f"{s.atn_transitions:>6}{s.predicate_evals:>7}")
+        lines.append("")
+        lines.append(f"{'rule':<22}{'calls':>8}{'time (s)':>10}{'predict (s)':>13}")
+        for r in self.hot_rules(limit):
+            lines.append(f"{r.rule:<22}{r.invocations:>8}{r.seconds:>10.4f}{r.prediction_seconds:>13.4f}")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+def profile_parse(source: str, cold: bool = True) -> ParseProfile:
+    """Parse source with profiling; cold predicts with empty DFAs."""
+    parser = OPLangParser(CommonTokenStream(OPLangLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    dfas = [DFA(state, i) for i, state in enumerate(parser.atn.decisionToState)] if cold \
+        else OPLangParser.decisionsToDFA
+    simulator = parser._interp = ProfilingSimulator(parser, dfas)
+    timer = _RuleTimer(parser)
+    parser.addParseListener(timer)
+    start = time.perf_counter()
+    parser.program()
+    return ParseProfile(simulator.decisions, timer.rules, time.perf_counter() - start)
@@ -0,0 +1,122 @@
+"""
+Error-recovering parse of OPLang sources.
+frontend.parse stops at the first lexical or syntax error, raising the
+message ASTGenerator reports. parse() here reports every error of the
+source in one pass instead: the lexer drops each erroneous token
+(ErrorToken, UncloseString, IllegalEscape) and carries on, the parser
+recovers with ANTLR's default strategy, resynchronising on the tokens
+that can follow the rule it was in, and every error is returned as a
+Diagnostic carrying the message fail-fast mode would have raised for it.
+
+The Program returned is partial: each class, member, local declaration
+or statement whose own tokens contain an error becomes an ErrorNode
+holding its source text, while the classes, members and statements
+around it, and those nested in it, are built as usual.
+"""
+
+from typing import List, Tuple
+
+from src.astgen import frontend
+from src.utils.error_listener import CollectingErrorListener
+from src.utils.nodes import ErrorNode, Program
+
+
+class Diagnostic:
+    """One lexical or syntax error, with the message fail-fast mode raises for it."""
+
+    __slots__ = ("kind", "line", "column", "message")
+
+    def __init__(self, kind: str, line: int, column: int, message: str):
+        self.kind = kind
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def as_dict(self) -> dict:
+        return {"kind": self.kind, "line": self.line, "column": self.column, "message": self.message}
+
+    def __str__(self):
+        return f"{self.line}:{self.column}: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.kind!r}, {self.line}, {self.column}, {self.message!r})"
+
+
+_classes = None
+
+
+def _load():
+    """Build the recovering lexer and AST generation on the pipeline frontend loads."""
+    global _classes
+    if _classes is None:
+        from antlr4.ParserRuleContext import ParserRuleContext
+        from antlr4.tree.Tree import ErrorNode as ParseErrorNode
+        from lexererr import LexerError
+        _, _, lexer_class, parser_class, generation_class, _ = frontend.load()
+
+        class RecoveringLexer(lexer_class):
+            """Record and skip the tokens the lexer raises on."""
+
+            def __init__(self, input, diagnostics: List[Diagnostic]):
+                super().__init__(input)
+                self.diagnostics = diagnostics
+
+            def nextToken(self):
+                while True:
+                    try:
+                        return super().nextToken()
+                    except LexerError as e:
+                        # emit() has built the token before raising, and the input is past it
+                        self.diagnostics.append(Diagnostic("lexer", self._token.line, self._token.column, str(e)))
+
+        units = (parser_class.ClassDeclContext, parser_class.MemberDeclContext,
+                 parser_class.LocaldeclContext, parser_class.StatementContext)
+
+        def broken(ctx) -> bool:
+            """Whether ctx has an error outside the units nested in it."""
+            if ctx.exception is not None:
+                return True
+            for child in ctx.getChildren():
+                if isinstance(child, ParseErrorNode):
+                    return True
+                if isinstance(child, ParserRuleContext) and not isinstance(child, units) and broken(child):
+                    return True
+            return False
+
+        class RecoveringASTGeneration(generation_class):
+            """Build ErrorNodes for the units of the parse tree that have errors."""
+
+            def __init__(self, source: str):
+                super().__init__()
+                self.source = source
+
+            def visit(self, tree):
+                if isinstance(tree, units) and broken(tree):
+                    return self.error_node(tree)
+                return super().visit(tree)
+
+            def error_node(self, ctx) -> ErrorNode:
+                start, stop = ctx.start, ctx.stop
+                # stop precedes start when the rule matched nothing; the slice is then empty
+                text = self.source[start.start:stop.stop + 1] if stop is not None else ""
+                return ErrorNode(text, start.line, start.column)
+
+        _classes = (RecoveringLexer, RecoveringASTGeneration)
+    return _classes
+
+
+def parse(source: str) -> Tuple[Program, List[Diagnostic]]:
+    """Return the partial Program AST of source and its errors in source order."""
+    input_stream, token_stream, _, parser_class, _, _ = frontend.load()
+    lexer_class, generation_class = _load()
+    diagnostics: List[Diagnostic] = []
+    tokens = token_stream(lexer_class(input_stream(source), diagnostics))
+    parser = parser_class(tokens)
+    listener = CollectingErrorListener()
+    parser.removeErrorListeners()
+    parser.addErrorListener(listener)
+    tree = parser.program()
+    program = generation_class(source).visit(tree)
+    diagnostics.extend(Diagnostic("syntax", line, column, message) for line, column, message in listener.errors)
+    diagnostics.sort(key=lambda d: (d.line, d.column))
+    return program, diagnostics
@@ -0,0 +1,152 @@
+"""
+Long-running compile server for the OPLang front end.
+A CompileServer keeps the lexer and parser loaded, with their prediction
+DFAs warm, and answers compile requests in the JSON-lines protocol: each
+request is a line {"id": ..., "source": "..."} and each response a line
+{"id": ..., "ast": "..."} holding the string form of the Program, or
+{"id": ..., "error": "..."} holding the message ASTGenerator in
+tests/utils.py would return. A request with "recover": true is parsed
+in recovery mode (src/astgen/recovery.py) and answered with the partial
+AST and an "errors" list of every error found. Responses carry the id
+of their request and may come back out of order.
+
+Requests are served over stdin/stdout or a Unix socket, concurrently:
+with workers=0 they are parsed in the server process one at a time (the
+ANTLR runtime's shared DFAs are not thread-safe), otherwise by a pool of
+that many warm worker processes.
+
+Usage: python -m src.astgen.server [--socket PATH] [--workers N]
+"""
+
+import json
+import os
+import socketserver
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, TextIO
+
+from src.astgen import frontend
+
+
+def compile_source(source: str, recover: bool = False) -> dict:
+    """Parse source and return the response fields for it."""
+    if recover:
+        from src.astgen import recovery
+        program, diagnostics = recovery.parse(source)
+        return {"ast": str(program), "errors": [d.as_dict() for d in diagnostics]}
+    try:
+        return {"ast": str(frontend.parse(source))}
+    except Exception as e:
+        return {"error": "Parser " + str(e)}
+
+
+class CompileServer:
+    """Answer JSON-lines compile requests with a warm front end."""
+
+    def __init__(self, workers: int = 0, threads: int = 32):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if workers:
+            self.pool = ProcessPoolExecutor(workers, initializer=frontend.load)
+        else:
+            frontend.load()
+        # threads waiting on parses, so requests of one stream overlap
+        self.threads: Executor = ThreadPoolExecutor(threads)
+
+    def compile(self, source: str, recover: bool = False) -> dict:
+        if self.pool is not None:
+            return self.pool.submit(compile_source, source, recover).result()
+        with self.lock:
+            return compile_source(source, recover)
+
+    def handle(self, line: str) -> str:
+        """Answer one request line with one response line."""
+        try:
+            request = json.loads(line)
+            source = request["source"]
+        except (ValueError, TypeError, KeyError):
+            return json.dumps({"id": None, "error": "Bad request"}) + "\n"
+        response = {"id": request.get("id")}
+        response.update(self.compile(source, bool(request.get("recover"))))
+        return json.dumps(response) + "\n"
+
+    def serve_stream(self, reader: TextIO, writer: TextIO):
+        """Answer every request read from reader, writing responses as they complete."""
+        write_lock = threading.Lock()
+
+        def answer(line: str):
+            response = self.handle(line)
+            with write_lock:
+                writer.write(response)
+                writer.flush()
+
+        pending = set()
+        for line in reader:
+            if line.strip():
+                future = self.threads.submit(answer, line)
+                pending.add(future)
+                future.add_done_callback(pending.discard)
+        for future in list(pending):
+            future.result()
+
+    def serve_unix(self, path: str):
+        """Serve every connection to the Unix socket at path until interrupted."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lines = (line.decode() for line in self.rfile)
+                server.serve_stream(lines, _SocketWriter(self.wfile))
+
+        if os.path.exists(path):
+            os.unlink(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as unix_server:
+            unix_server.daemon_threads = True
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.unlink(path)
+
+    def close(self):
+        self.threads.shutdown()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class _SocketWriter:
+    """Text writer over a socket's binary file."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str):
+        self.wfile.write(text.encode())
+
+    def flush(self):
+        self.wfile.flush()
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve OPLang compile requests as JSON lines")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=0, help="parse in this many worker processes")
+    args = parser.parse_args(argv)
+    server = CompileServer(args.workers)
+    try:
+        if args.socket:
+            server.serve_unix(args.socket)
+        else:
+            server.serve_stream(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,171 @@
+"""
+Streaming front end: the classes of a program, one at a time.
+iter_classes() parses a source class by class, calling the parser's
+classDecl rule on a fresh token stream for each and yielding its
+ClassDecl as soon as it is built. The tokens, parse-tree contexts and
+AST of a class are released once the consumer lets go of the ClassDecl,
+and a source read from a text file is held only a block at a time, so
+memory grows with the largest class rather than with the whole program.
+
+Errors are raised as frontend.parse raises them, with the same messages,
+but only when the generator reaches them: the classes before the first
+error have been yielded by then.
+"""
+
+import io
+from collections import deque
+from typing import Iterator, List, TextIO, Union
+
+from src.astgen import frontend
+from src.utils.nodes import ClassDecl, Program
+
+# characters read from a text file at a time
+BLOCK = 1 << 16
+
+EOF = -1
+
+
+class _ReaderStream:
+    """ANTLR character stream over a text reader.
+
+    Only the characters from the start of the token being lexed, which
+    the lexer marks, onwards are kept; earlier ones are dropped, so the
+    tokens must copy their text when they are created.
+    """
+
+    def __init__(self, reader: TextIO, block: int = BLOCK):
+        self.reader = reader
+        self.block = block
+        self.name = getattr(reader, "name", "<stream>")
+        self.buffer = ""
+        # index of buffer[0] in the whole input
+        self.offset = 0
+        self._index = 0
+        self.marks = 0
+        self.eof = False
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def size(self) -> int:
+        """Length of the input once the reader is exhausted."""
+        return self.offset + len(self.buffer) if self.eof else self._index + 1
+
+    def _fill(self, index: int):
+        while not self.eof and index >= self.offset + len(self.buffer):
+            chunk = self.reader.read(self.block)
+            if chunk:
+                self.buffer += chunk
+            else:
+                self.eof = True
+
+    def _trim(self):
+        # dropping a block at a time keeps the copying linear
+        if self._index - self.offset >= self.block:
+            self.buffer = self.buffer[self._index - self.offset:]
+            self.offset = self._index
+
+    def LA(self, offset: int) -> int:
+        if offset == 0:
+            return 0
+        index = self._index + offset - (1 if offset > 0 else 0)
+        if index < self.offset:
+            return EOF
+        self._fill(index)
+        position = index - self.offset
+        return ord(self.buffer[position]) if position < len(self.buffer) else EOF
+
+    LT = LA
+
+    def consume(self):
+        if self.LA(1) == EOF:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+        if not self.marks:
+            self._trim()
+
+    def mark(self) -> int:
+        self.marks += 1
+        return -self.marks
+
+    def release(self, marker: int):
+        self.marks -= 1
+        if not self.marks:
+            self._trim()
+
+    def seek(self, index: int):
+        self._index = index
+
+    def getText(self, start: int, stop: int) -> str:
+        self._fill(stop)
+        return self.buffer[start - self.offset:stop - self.offset + 1]
+
+
+class _Pending:
+    """Token source replaying the tokens a class's stream read past its end, then reading on."""
+
+    def __init__(self, tokens: List, lexer):
+        self.tokens = deque(tokens)
+        self.lexer = lexer
+        self._factory = lexer._factory
+
+    def nextToken(self):
+        return self.tokens.popleft() if self.tokens else self.lexer.nextToken()
+
+
+_factory = None
+
+
+def _copying_factory():
+    """Token factory copying each token's text out of the stream, which drops it."""
+    global _factory
+    if _factory is None:
+        from antlr4.CommonTokenFactory import CommonTokenFactory
+
+        class CopyingTokenFactory(CommonTokenFactory):
+            def create(self, source, type, text, channel, start, stop, line, column):
+                # EOF keeps no text, so that it reads <EOF> like the plain pipeline's
+                if text is None and type != EOF:
+                    text = source[1].getText(start, stop)
+                return super().create(source, type, text, channel, start, stop, line, column)
+
+        _factory = CopyingTokenFactory()
+    return _factory
+
+
+def iter_classes(source: Union[str, TextIO], block: int = BLOCK) -> Iterator[ClassDecl]:
+    """Yield the ClassDecl of each class of source, a string or text file, as it is parsed."""
+    _, token_stream, lexer_class, parser_class, generation_class, listener = frontend.load()
+    from src.utils.error_listener import SyntaxException, error_message
+
+    reader = io.StringIO(source) if isinstance(source, str) else source
+    lexer = lexer_class(_ReaderStream(reader, block))
+    lexer._factory = _copying_factory()
+    generation = generation_class()
+    parser = None
+    pending: List = []
+    while True:
+        stream = token_stream(_Pending(pending, lexer))
+        token = stream.LT(1)
+        if token.type == EOF and parser is not None:
+            return
+        if token.type != parser_class.CLASS:
+            # program: classDecl+ EOF; reports the token where a class must start
+            raise SyntaxException(error_message(token, token.line, token.column))
+        if parser is None:
+            parser = parser_class(stream)
+            parser.removeErrorListeners()
+            parser.addErrorListener(listener)
+        else:
+            parser.setTokenStream(stream)
+        class_decl = generation.visit(parser.classDecl())
+        # the tokens the parser looked at past the class start the next one
+        pending = stream.tokens[stream.index:]
+        yield class_decl
+
+
+def parse(source: Union[str, TextIO], block: int = BLOCK) -> Program:
+    """Return the Program AST of source, built from iter_classes()."""
+    return Program(list(iter_classes(source, block)))
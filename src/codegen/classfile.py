@@ -0,0 +1,259 @@
+"""
+JVM class file writer.
+This module serialises classes built by src/codegen/emitter.py into the
+binary class file format. It emits version 49.0 class files, which the
+JVM verifies without StackMapTable attributes, so branch targets need no
+frame descriptions.
+"""
+
+import struct
+from typing import Dict, List, Tuple
+
+
+MAGIC = 0xCAFEBABE
+MAJOR_VERSION = 49
+MINOR_VERSION = 0
+
+ACC_PUBLIC = 0x0001
+ACC_STATIC = 0x0008
+ACC_SUPER = 0x0020
+ACC_INTERFACE = 0x0200
+ACC_ABSTRACT = 0x0400
+
+# opcode name -> (byte, operand kind)
+OPCODES: Dict[str, Tuple[int, str]] = {
+    "aconst_null": (0x01, ""),
+    "iconst_m1": (0x02, ""), "iconst_0": (0x03, ""), "iconst_1": (0x04, ""),
+    "iconst_2": (0x05, ""), "iconst_3": (0x06, ""), "iconst_4": (0x07, ""),
+    "iconst_5": (0x08, ""), "lconst_0": (0x09, ""), "lconst_1": (0x0A, ""),
+    "fconst_0": (0x0B, ""), "fconst_1": (0x0C, ""), "fconst_2": (0x0D, ""),
+    "dconst_0": (0x0E, ""), "dconst_1": (0x0F, ""),
+    "bipush": (0x10, "s1"), "sipush": (0x11, "s2"),
+    "ldc": (0x12, "ldc"), "ldc2_w": (0x14, "ldc2"),
+    "iload": (0x15, "local"), "lload": (0x16, "local"), "fload": (0x17, "local"),
+    "dload": (0x18, "local"), "aload": (0x19, "local"),
+    "iaload": (0x2E, ""), "laload": (0x2F, ""), "faload": (0x30, ""), "daload": (0x31, ""),
+    "aaload": (0x32, ""), "baload": (0x33, ""),
+    "istore": (0x36, "local"), "lstore": (0x37, "local"), "fstore": (0x38, "local"),
+    "dstore": (0x39, "local"), "astore": (0x3A, "local"),
+    "iastore": (0x4F, ""), "lastore": (0x50, ""), "fastore": (0x51, ""), "dastore": (0x52, ""),
+    "aastore": (0x53, ""), "bastore": (0x54, ""),
+    "pop": (0x57, ""), "pop2": (0x58, ""), "dup": (0x59, ""), "dup_x1": (0x5A, ""),
+    "dup_x2": (0x5B, ""), "dup2": (0x5C, ""), "swap": (0x5F, ""),
+    "iadd": (0x60, ""), "ladd": (0x61, ""), "fadd": (0x62, ""), "dadd": (0x63, ""),
+    "isub": (0x64, ""), "lsub": (0x65, ""), "fsub": (0x66, ""), "dsub": (0x67, ""),
+    "imul": (0x68, ""), "lmul": (0x69, ""), "fmul": (0x6A, ""), "dmul": (0x6B, ""),
+    "idiv": (0x6C, ""), "ldiv": (0x6D, ""), "fdiv": (0x6E, ""), "ddiv": (0x6F, ""),
+    "irem": (0x70, ""), "lrem": (0x71, ""), "ineg": (0x74, ""), "lneg": (0x75, ""),
+    "fneg": (0x76, ""), "dneg": (0x77, ""), "ixor": (0x82, ""),
+    "iinc": (0x84, "iinc"), "i2l": (0x85, ""), "i2f": (0x86, ""), "i2d": (0x87, ""),
+    "l2i": (0x88, ""), "l2d": (0x8A, ""),
+    "lcmp": (0x94, ""), "fcmpl": (0x95, ""), "fcmpg": (0x96, ""), "dcmpl": (0x97, ""), "dcmpg": (0x98, ""),
+    "ifeq": (0x99, "branch"), "ifne": (0x9A, "branch"), "iflt": (0x9B, "branch"),
+    "ifge": (0x9C, "branch"), "ifgt": (0x9D, "branch"), "ifle": (0x9E, "branch"),
+    "if_icmpeq": (0x9F, "branch"), "if_icmpne": (0xA0, "branch"),
+    "if_icmplt": (0xA1, "branch"), "if_icmpge": (0xA2, "branch"),
+    "if_icmpgt": (0xA3, "branch"), "if_icmple": (0xA4, "branch"),
+    "if_acmpeq": (0xA5, "branch"), "if_acmpne": (0xA6, "branch"),
+    "goto": (0xA7, "branch"),
+    "ireturn": (0xAC, ""), "lreturn": (0xAD, ""), "freturn": (0xAE, ""), "dreturn": (0xAF, ""),
+    "areturn": (0xB0, ""), "return": (0xB1, ""),
+    "getstatic": (0xB2, "field"), "putstatic": (0xB3, "field"),
+    "getfield": (0xB4, "field"), "putfield": (0xB5, "field"),
+    "invokevirtual": (0xB6, "method"), "invokespecial": (0xB7, "method"),
+    "invokestatic": (0xB8, "method"), "invokeinterface": (0xB9, "interface"),
+    "new": (0xBB, "class"), "newarray": (0xBC, "atype"), "anewarray": (0xBD, "class"),
+    "arraylength": (0xBE, ""), "athrow": (0xBF, ""), "checkcast": (0xC0, "class"),
+    "instanceof": (0xC1, "class"),
+    "ifnull": (0xC6, "branch"), "ifnonnull": (0xC7, "branch"),
+}
+
+ARRAY_TYPES = {"boolean": 4, "float": 6, "double": 7, "int": 10, "long": 11}
+
+
+def modified_utf8(text: str) -> bytes:
+    """Encode text in the JVM's modified UTF-8."""
+    out = bytearray()
+    for unit in struct.unpack(f">{len(text.encode('utf-16-be')) // 2}H", text.encode("utf-16-be")):
+        if 0 < unit < 0x80:
+            out.append(unit)
+        elif unit < 0x800:
+            out += bytes((0xC0 | (unit >> 6), 0x80 | (unit & 0x3F)))
+        else:
+            out += bytes((0xE0 | (unit >> 12), 0x80 | ((unit >> 6) & 0x3F), 0x80 | (unit & 0x3F)))
+    return bytes(out)
+
+
+class ConstantPool:
+    """Deduplicating constant pool."""
+
+    def __init__(self):
+        self.entries: List[bytes] = []
+        self.index: Dict[tuple, int] = {}
+
+    def _add(self, key: tuple, data: bytes, wide: bool = False) -> int:
+        found = self.index.get(key)
+        if found is None:
+            found = self.index[key] = len(self.entries) + 1
+            self.entries.append(data)
+            if wide:
+                # long and double constants take two pool entries
+                self.entries.append(b"")
+        return found
+
+    def utf8(self, text: str) -> int:
+        encoded = modified_utf8(text)
+        return self._add(("utf8", text), struct.pack(">BH", 1, len(encoded)) + encoded)
+
+    def integer(self, value: int) -> int:
+        return self._add(("int", value), struct.pack(">Bi", 3, value))
+
+    def float(self, value: float) -> int:
+        data = struct.pack(">Bf", 4, value)
+        return self._add(("float", data), data)
+
+    def long(self, value: int) -> int:
+        return self._add(("long", value), struct.pack(">Bq", 5, value), wide=True)
+
+    def double(self, value: float) -> int:
+        data = struct.pack(">Bd", 6, value)
+        return self._add(("double", data), data, wide=True)
+
+    def string(self, text: str) -> int:
+        return self._add(("string", text), struct.pack(">BH", 8, self.utf8(text)))
+
+    def class_(self, name: str) -> int:
+        return self._add(("class", name), struct.pack(">BH", 7, self.utf8(name)))
+
+    def name_and_type(self, name: str, descriptor: str) -> int:
+        return self._add(
+            ("nat", name, descriptor),
+            struct.pack(">BHH", 12, self.utf8(name), self.utf8(descriptor)),
+        )
+
+    def member(self, tag: int, owner: str, name: str, descriptor: str) -> int:
+        return self._add(
+            ("member", tag, owner, name, descriptor),
+            struct.pack(">BHH", tag, self.class_(owner), self.name_and_type(name, descriptor)),
+        )
+
+    def field(self, owner: str, name: str, descriptor: str) -> int:
+        return self.member(9, owner, name, descriptor)
+
+    def method(self, owner: str, name: str, descriptor: str) -> int:
+        return self.member(10, owner, name, descriptor)
+
+    def interface_method(self, owner: str, name: str, descriptor: str) -> int:
+        return self.member(11, owner, name, descriptor)
+
+    def to_bytes(self) -> bytes:
+        return struct.pack(">H", len(self.entries) + 1) + b"".join(self.entries)
+
+
+def assemble(instructions: List[tuple], pool: ConstantPool) -> Tuple[bytes, bytes]:
+    """Encode (opcode, operand...) tuples as bytecode.
+
+    ("label", name) marks a branch target and ("catch", start, end,
+    handler, class name or None) adds an exception handler. Returns the
+    code and the encoded exception table.
+    """
+    encoded, offsets, pending, handlers = [], {}, [], []
+    position = 0
+    for ins in instructions:
+        if ins[0] == "label":
+            offsets[ins[1]] = position
+            continue
+        if ins[0] == "catch":
+            handlers.append(ins[1:])
+            continue
+        name = ins[0]
+        byte, kind = OPCODES[name]
+        if kind == "":
+            data = bytes((byte,))
+        elif kind == "s1":
+            data = struct.pack(">Bb", byte, ins[1])
+        elif kind == "s2":
+            data = struct.pack(">Bh", byte, ins[1])
+        elif kind == "ldc":
+            value = ins[1]
+            if isinstance(value, str):
+                index = pool.string(value)
+            elif isinstance(value, float):
+                index = pool.float(value)
+            else:
+                index = pool.integer(value)
+            data = struct.pack(">BB", byte, index) if index < 256 else struct.pack(">BH", 0x13, index)
+        elif kind == "ldc2":
+            value = ins[1]
+            index = pool.double(value) if isinstance(value, float) else pool.long(value)
+            data = struct.pack(">BH", byte, index)
+        elif kind == "local":
+            if ins[1] > 255:
+                data = struct.pack(">BBH", 0xC4, byte, ins[1])
+            else:
+                data = struct.pack(">BB", byte, ins[1])
+        elif kind == "iinc":
+            data = struct.pack(">BBb", byte, ins[1], ins[2])
+        elif kind == "branch":
+            pending.append((len(encoded), position, ins[1]))
+            data = struct.pack(">Bh", byte, 0)
+        elif kind == "field":
+            data = struct.pack(">BH", byte, pool.field(ins[1], ins[2], ins[3]))
+        elif kind == "method":
+            data = struct.pack(">BH", byte, pool.method(ins[1], ins[2], ins[3]))
+        elif kind == "interface":
+            nargs = ins[4]
+            data = struct.pack(">BHBB", byte, pool.interface_method(ins[1], ins[2], ins[3]), nargs, 0)
+        elif kind == "class":
+            data = struct.pack(">BH", byte, pool.class_(ins[1]))
+        elif kind == "atype":
+            data = struct.pack(">BB", byte, ARRAY_TYPES[ins[1]])
+        else:
+            raise ValueError(f"Unknown operand kind {kind}")
+        encoded.append(data)
+        position += len(data)
+    for index, at, label in pending:
+        offset = offsets[label] - at
+        encoded[index] = encoded[index][:1] + struct.pack(">h", offset)
+    table = struct.pack(">H", len(handlers))
+    for start, end, handler, class_name in handlers:
+        catch_type = pool.class_(class_name) if class_name else 0
+        table += struct.pack(">HHHH", offsets[start], offsets[end], offsets[handler], catch_type)
+    return b"".join(encoded), table
+
+
+def class_file(name: str, super_name: str, interfaces: List[str], access: int,
+               fields: List[tuple], methods: List[tuple]) -> bytes:
+    """Build a class file.
+
+    fields are (access, name, descriptor); methods are (access, name,
+    descriptor, instructions or None, max_stack, max_locals).
+    """
+    pool = ConstantPool()
+    this_index = pool.class_(name)
+    super_index = pool.class_(super_name)
+    interface_indexes = [pool.class_(i) for i in interfaces]
+
+    field_data = []
+    for f_access, f_name, f_desc in fields:
+        field_data.append(struct.pack(">HHHH", f_access, pool.utf8(f_name), pool.utf8(f_desc), 0))
+
+    method_data = []
+    for m_access, m_name, m_desc, instructions, max_stack, max_locals in methods:
+        head = struct.pack(">HHH", m_access, pool.utf8(m_name), pool.utf8(m_desc))
+        if instructions is None:
+            method_data.append(head + struct.pack(">H", 0))
+            continue
+        code, handlers = assemble(instructions, pool)
+        body = struct.pack(">HHI", max_stack, max_locals, len(code)) + code + handlers + struct.pack(">H", 0)
+        attribute = struct.pack(">HI", pool.utf8("Code"), len(body)) + body
+        method_data.append(head + struct.pack(">H", 1) + attribute)
+
+    out = bytearray(struct.pack(">IHH", MAGIC, MINOR_VERSION, MAJOR_VERSION))
+    out += pool.to_bytes()
+    out += struct.pack(">HHH", access, this_index, super_index)
+    out += struct.pack(">H", len(interface_indexes)) + b"".join(struct.pack(">H", i) for i in interface_indexes)
+    out += struct.pack(">H", len(field_data)) + b"".join(field_data)
+    out += struct.pack(">H", len(method_data)) + b"".join(method_data)
+    out += struct.pack(">H", 0)
+    return bytes(out)
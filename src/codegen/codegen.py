@@ -0,0 +1,1657 @@
+"""
+JVM code generation for OPLang programs.
+This module translates a Program AST into JVM classes: every OPLang
+class becomes a public JVM class, attributes become fields, methods and
+constructors become methods and the built-in io class is provided by the
+runtime class oplang/IO. The result can be printed as Jasmin assembly or
+written as class files (see src/codegen/runner.py).
+
+OPLang features without a direct JVM counterpart are lowered as follows:
+
+* reference parameters, variables and return values hold an
+  oplang/Ref, the location they are bound to: an oplang/Cell for a
+  local or a value, an oplang/FieldRef for an attribute (accessed by
+  reflection) or an oplang/ElementRef for an array element; objects
+  and arrays go through the Object accessors of the Ref and are cast
+  back on every read,
+* a local that may be aliased (the local a reference variable is bound
+  to, an argument of a reference parameter or the value of a reference
+  return) lives in a Cell shared by all its aliases,
+* new C(...) calls a static factory of C: <init>() of C initialises the
+  fields of C and its superclasses, and the constructor body, a method
+  named after its class, runs next; as in the other engines no
+  superclass constructor runs,
+* ints are JVM longs and floats JVM doubles, the ranges of the other
+  engines; int arithmetic uses the java/lang/Math exact methods so a
+  result beyond 64 bits fails instead of wrapping,
+* runtime errors are oplang/RuntimeError exceptions raised by explicit
+  checks (nil receivers, array indices, float division and input) or
+  JVM exceptions with an OPLang counterpart (integer division by zero,
+  overflow and stack overflow); the entry point reports either as
+  "Runtime Error: <message>" and exits with status 1,
+* destructors implement oplang/Destructible and run when the block of a
+  local owning the object ends (src/analysis/lifetimes.py), or otherwise
+  in reverse creation order when main returns.
+"""
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable, IO_CLASS
+from src.analysis.lifetimes import LifetimeAnalysis
+from src.semantics.type_inference import (
+    TypeInference, IO_METHODS, INT, FLOAT, BOOL, STRING, VOID, NIL, ARITH_OPS, INT_OPS,
+    ORDER_OPS, EQUALITY_OPS, strip_reference, type_name, is_numeric,
+)
+from src.runtime.values import INT_MAX, INT_MIN, decode_string
+from src.codegen.emitter import ClassBuilder, MethodBuilder, descriptor_words
+
+
+JAVA_OBJECT = "java/lang/Object"
+JAVA_STRING = "java/lang/String"
+IO_RUNTIME = "oplang/IO"
+RUNTIME_ERROR = "oplang/RuntimeError"
+DESTRUCTIBLE = "oplang/Destructible"
+REF = "oplang/Ref"
+CELL = "oplang/Cell"
+FIELD_REF = "oplang/FieldRef"
+ELEMENT_REF = "oplang/ElementRef"
+# '$' cannot appear in OPLang identifiers, so the name never clashes
+DESTRUCTOR_NAME = "destroy$"
+
+_PRIMITIVE_DESCRIPTORS = {
+    "int": "J", "float": "D", "boolean": "Z", "string": f"L{JAVA_STRING};", "void": "V",
+}
+# java.lang.reflect.Field accessors by descriptor; others use get and set
+_REFLECTED = {"I": "Int", "J": "Long", "F": "Float", "D": "Double", "Z": "Boolean"}
+# newarray element types of the primitive OPLang types
+_NEWARRAY = {"int": "long", "float": "double", "boolean": "boolean"}
+_CONDITIONS = {"==": "eq", "!=": "ne", "<": "lt", ">": "gt", "<=": "le", ">=": "ge"}
+_NEGATED = {"eq": "ne", "ne": "eq", "lt": "ge", "ge": "lt", "gt": "le", "le": "gt"}
+
+
+class CodegenError(Exception):
+    def __init__(self, msg):
+        self.message = "Codegen Error: " + msg
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
+
+
+def descriptor(t: Optional[Type]) -> str:
+    """Return the JVM field descriptor of an OPLang type."""
+    t = strip_reference(t)
+    if isinstance(t, PrimitiveType):
+        return _PRIMITIVE_DESCRIPTORS[t.type_name]
+    if isinstance(t, ArrayType):
+        return "[" + descriptor(t.element_type)
+    if isinstance(t, ClassType):
+        return f"L{t.class_name};"
+    raise CodegenError(f"Cannot map type {t} to the JVM")
+
+
+def is_boxed(t: Type) -> bool:
+    """A reference of any type is held as an oplang/Ref."""
+    return isinstance(t, ReferenceType)
+
+
+def ref_descriptor(t: Type) -> str:
+    """The descriptor the Ref accessors use for values of type t."""
+    return descriptor(t) if isinstance(t, PrimitiveType) else f"L{JAVA_OBJECT};"
+
+
+def param_descriptor(t: Type) -> str:
+    return f"L{REF};" if is_boxed(t) else descriptor(t)
+
+
+def method_descriptor(params: List[Parameter], return_type: Type) -> str:
+    return "(" + "".join(param_descriptor(p.param_type) for p in params) + ")" + param_descriptor(return_type)
+
+
+def _kind(t: Optional[Type]) -> str:
+    """'l' for int (a JVM long), 'i' for boolean, 'd' for float (a JVM double) and 'a' for references."""
+    name = type_name(t)
+    if name == "int":
+        return "l"
+    if name == "boolean":
+        return "i"
+    if name == "float":
+        return "d"
+    return "a"
+
+
+def _array_load(element: Type) -> str:
+    name = type_name(element)
+    return {"int": "laload", "float": "daload", "boolean": "baload"}.get(name, "aaload")
+
+
+def _array_store(element: Type) -> str:
+    name = type_name(element)
+    return {"int": "lastore", "float": "dastore", "boolean": "bastore"}.get(name, "aastore")
+
+
+def _words(t: Type) -> int:
+    """Number of stack words a value of type t takes."""
+    return 2 if _kind(t) in ("l", "d") else 1
+
+
+def _emit_raise(mb: MethodBuilder, emit_message: Callable[[], None]):
+    """Throw an oplang/RuntimeError with the string emit_message pushes."""
+    mb.emit("new", RUNTIME_ERROR)
+    mb.emit("dup")
+    emit_message()
+    mb.emit("invokespecial", RUNTIME_ERROR, "<init>", f"(L{JAVA_STRING};)V")
+    mb.emit("athrow")
+
+
+def _init_name(class_name: str, index: int) -> str:
+    """Name of the method holding the body of constructor index of class_name.
+    It names the class so that no subclass overrides it."""
+    return f"{class_name}$init{index}"
+
+
+def _unparen(expr: Expr) -> Expr:
+    while isinstance(expr, ParenthesizedExpression):
+        expr = expr.expr
+    return expr
+
+
+class _AliasedLocals(BaseVisitor):
+    """Collect the names of locals that must live in a Cell."""
+
+    def __init__(self, gen: "CodeGenerator", returns_ref: bool):
+        self.gen = gen
+        self.returns_ref = returns_ref
+        self.names: Set[str] = set()
+
+    def _add(self, expr: Expr):
+        expr = _unparen(expr)
+        if isinstance(expr, Identifier):
+            self.names.add(expr.name)
+
+    def visit_variable_decl(self, node, o=None):
+        if is_boxed(node.var_type):
+            for var in node.variables:
+                self.names.add(var.name)
+                if var.init_value is not None:
+                    self._add(var.init_value)
+        super().visit_variable_decl(node, o)
+
+    def visit_method_call(self, node, o=None):
+        positions = self.gen.method_ref_positions.get(node.method_name, ())
+        for i, arg in enumerate(node.args):
+            if i in positions:
+                self._add(arg)
+        super().visit_method_call(node, o)
+
+    def visit_object_creation(self, node, o=None):
+        positions = self.gen.ctor_ref_positions.get(node.class_name, ())
+        for i, arg in enumerate(node.args):
+            if i in positions:
+                self._add(arg)
+        super().visit_object_creation(node, o)
+
+    def visit_return_statement(self, node, o=None):
+        if self.returns_ref and node.value is not None:
+            self._add(node.value)
+        super().visit_return_statement(node, o)
+
+
+class MethodGenerator(BaseVisitor):
+    """Generate the instructions of one method, constructor or initialiser.
+
+    Expression visitors push one value and return its OPLang type;
+    statement visitors leave the operand stack unchanged.
+    """
+
+    def __init__(self, gen: "CodeGenerator", class_name: str, mb: MethodBuilder,
+                 return_type: Type = VOID):
+        self.gen = gen
+        self.class_name = class_name
+        self.mb = mb
+        self.return_type = strip_reference(return_type)
+        self.returns_ref = is_boxed(return_type)
+        self.scopes: List[Dict[str, Tuple[int, Type, bool]]] = [{}]
+        self.next_local = 0 if mb.is_static else 1
+        self.loops: List[Tuple[str, str]] = []
+        # number of enclosing blocks when each loop starts
+        self.loop_depths: List[int] = []
+        # slots of the locals owning their object, per enclosing block
+        self.owned: List[List[Tuple[int, Type, bool]]] = []
+        self.aliased: Set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Locals
+    # ------------------------------------------------------------------
+
+    def new_local(self, words: int = 1) -> int:
+        index = self.next_local
+        self.next_local += words
+        self.mb.use_local(index, words)
+        return index
+
+    def declare(self, name: str, t: Type, boxed: bool = False) -> int:
+        index = self.new_local(1 if boxed else _words(t))
+        self.scopes[-1][name] = (index, strip_reference(t), boxed)
+        return index
+
+    def declare_params(self, params: List[Parameter]):
+        for param in params:
+            self.declare(param.name, param.param_type, is_boxed(param.param_type))
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def generate_body(self, body: BlockStatement):
+        finder = _AliasedLocals(self.gen, self.returns_ref)
+        finder.visit(body)
+        self.aliased = finder.names
+        for name, (index, t, boxed) in list(self.scopes[0].items()):
+            if name in self.aliased and not boxed:
+                self.emit_box(t, lambda index=index, t=t: self.mb.emit(_kind(t) + "load", index))
+                box = self.declare(name, t, True)
+                self.mb.emit("astore", box)
+        self.visit(body)
+        self.emit_default_return()
+
+    def emit_default_return(self):
+        if not self.mb.reachable:
+            return
+        if self.returns_ref:
+            self.emit_box(self.return_type, lambda: self.emit_default(self.return_type))
+            self.mb.emit("areturn")
+        elif type_name(self.return_type) == "void":
+            self.mb.emit("return")
+        else:
+            self.emit_default(self.return_type)
+            self.mb.emit(_kind(self.return_type) + "return")
+
+    def emit_field_inits(self, class_decl: ClassDecl, is_static: bool):
+        """Initialise the attributes of class_decl whose JVM default differs."""
+        for member in class_decl.members:
+            if not isinstance(member, AttributeDecl) or member.is_static != is_static:
+                continue
+            t = strip_reference(member.attr_type)
+            for attr in member.attributes:
+                if attr.init_value is None and type_name(t) != "string" and not isinstance(t, ArrayType):
+                    continue
+                if not is_static:
+                    self.mb.emit("aload", 0)
+                if attr.init_value is not None:
+                    self.gen_value(attr.init_value, t)
+                else:
+                    self.emit_default(t)
+                op = "putstatic" if is_static else "putfield"
+                self.mb.emit(op, class_decl.name, attr.name, descriptor(t))
+
+    # ------------------------------------------------------------------
+    # Values
+    # ------------------------------------------------------------------
+
+    def type_of(self, node: ASTNode) -> Type:
+        t = self.gen.type_of(node)
+        if t is None:
+            raise CodegenError(f"Cannot determine the type of {node}")
+        return t
+
+    def emit_default(self, t: Type):
+        t = strip_reference(t)
+        name = type_name(t)
+        if name == "int":
+            self.mb.emit("lconst_0")
+        elif name == "boolean":
+            self.mb.emit("iconst_0")
+        elif name == "float":
+            self.mb.emit("dconst_0")
+        elif name == "string":
+            self.mb.emit("ldc", "")
+        elif isinstance(t, ArrayType):
+            self.emit_new_array(t)
+            if type_name(t.element_type) == "string":
+                self.mb.emit("dup")
+                self.mb.emit("ldc", "")
+                self.mb.emit("invokestatic", "java/util/Arrays", "fill",
+                             f"([L{JAVA_OBJECT};L{JAVA_OBJECT};)V")
+        else:
+            self.mb.emit("aconst_null")
+
+    def emit_new_array(self, t: ArrayType):
+        self.mb.push_int(t.size)
+        element = t.element_type
+        if type_name(element) in _NEWARRAY:
+            self.mb.emit("newarray", _NEWARRAY[type_name(element)])
+        elif isinstance(element, ClassType):
+            self.mb.emit("anewarray", element.class_name)
+        elif type_name(element) == "string":
+            self.mb.emit("anewarray", JAVA_STRING)
+        else:
+            self.mb.emit("anewarray", descriptor(element))
+
+    def emit_box(self, t: Type, emit_value: Callable[[], None]):
+        """Push a new Cell holding the value of type t pushed by emit_value."""
+        emit_value()
+        self.gen.uses_refs = True
+        self.mb.emit("invokestatic", CELL, "of", f"({ref_descriptor(t)})L{REF};")
+
+    def emit_ref_get(self, t: Type):
+        """Replace the Ref on top of the stack by the value of type t it holds."""
+        self.gen.uses_refs = True
+        self.mb.emit("invokeinterface", REF, "get", f"(){ref_descriptor(t)}", 1)
+        if ref_descriptor(t) != descriptor(t):
+            self.mb.emit("checkcast", t.class_name if isinstance(t, ClassType) else descriptor(t))
+
+    def emit_ref_set(self, t: Type):
+        """Store the value on top of the stack into the Ref below it."""
+        self.gen.uses_refs = True
+        self.mb.emit("invokeinterface", REF, "set", f"({ref_descriptor(t)})V", 1 + _words(t))
+
+    def emit_field_ref(self, owner: str, name: str):
+        """Push a FieldRef to attribute name of owner on the object on top of the stack (nil for statics)."""
+        self.gen.uses_refs = True
+        self.mb.emit("ldc", owner)
+        self.mb.emit("ldc", name)
+        self.mb.emit("invokestatic", FIELD_REF, "of",
+                     f"(L{JAVA_OBJECT};L{JAVA_STRING};L{JAVA_STRING};)L{REF};")
+
+    def emit_location(self, expr: Expr, t: Type):
+        """Push a Ref to the location of type t denoted by expr, or to a new Cell
+        holding its value when expr is not such a location."""
+        expr = _unparen(expr)
+        if type_name(strip_reference(self.type_of(expr))) != type_name(t):
+            self.emit_box(t, lambda: self.gen_value(expr, t))
+            return
+        if isinstance(expr, Identifier):
+            found = self.resolve(expr.name)
+            if found[0] == "local" and found[3]:
+                self.mb.emit("aload", found[1])
+                return
+            if found[0] == "field":
+                self.mb.emit("aload", 0)
+                self.emit_field_ref(found[1], expr.name)
+                return
+            if found[0] == "static":
+                self.mb.emit("aconst_null")
+                self.emit_field_ref(found[1], expr.name)
+                return
+        elif isinstance(expr, PostfixExpression) and expr.postfix_ops:
+            receiver = self.emit_chain(self.emit_primary(expr.primary), expr.postfix_ops[:-1])
+            last = expr.postfix_ops[-1]
+            if isinstance(last, MethodCall):
+                self.emit_call(receiver, last, location=True)
+            elif isinstance(last, MemberAccess):
+                if not self.emit_nil_check(receiver, f"Nil reference accessing {last.member_name}"):
+                    return
+                class_name = self._receiver_class(receiver)
+                owner, decl = self.attribute(class_name, last.member_name)
+                if decl.is_static:
+                    if receiver[0] == "value":
+                        self.mb.emit("pop")
+                    self.mb.emit("aconst_null")
+                elif receiver[0] == "class":
+                    raise CodegenError(f"Cannot access instance attribute {class_name}.{last.member_name}")
+                self.emit_field_ref(owner, last.member_name)
+            else:
+                if receiver[0] == "class" or not isinstance(receiver[1], ArrayType):
+                    raise CodegenError("Cannot index a non-array value")
+                self.emit_index(last.index)
+                self.gen.uses_refs = True
+                self.mb.emit("invokestatic", ELEMENT_REF, "of", f"(L{JAVA_OBJECT};I)L{REF};")
+            return
+        self.emit_box(t, lambda: self.gen_value(expr, t))
+
+    def coerce(self, source: Type, target: Type):
+        if type_name(target) == "float" and type_name(source) == "int":
+            self.mb.emit("l2d")
+
+    def gen_value(self, expr: Expr, target: Type):
+        """Push expr converted to target."""
+        self.coerce(self.visit(expr), strip_reference(target))
+
+    def emit_index(self, expr: Expr):
+        """Push the index expr into the array on the stack as a JVM int, failing
+        when the array is nil or the index is out of range."""
+        self.mb.emit("dup")
+        self.gen_value(expr, INT)
+        self.mb.emit("invokestatic", IO_RUNTIME, "index", f"(L{JAVA_OBJECT};J)I")
+
+    def emit_raise(self, message: str):
+        _emit_raise(self.mb, lambda: self.mb.emit("ldc", message))
+
+    def emit_nil_check(self, receiver, message: str) -> bool:
+        """Fail with message when the receiver on the stack is nil. Return False
+        when it is the nil literal, so the access that follows is never reached."""
+        if receiver[0] != "value":
+            return True
+        if type_name(receiver[1]) == "nil":
+            self.emit_raise(message)
+            return False
+        if not self.mb.is_static and self.mb.code[-1] == ("aload", 0):
+            # this is never nil
+            return True
+        self.mb.emit("dup")
+        self.mb.emit("ldc", message)
+        self.mb.emit("invokestatic", IO_RUNTIME, "checkNil", f"(L{JAVA_OBJECT};L{JAVA_STRING};)V")
+        return True
+
+    def emit_discard(self, t: Type):
+        """Pop the value of type t an expression pushed, if any."""
+        if type_name(t) != "void":
+            self.mb.emit("pop2" if _words(t) == 2 else "pop")
+
+    # ------------------------------------------------------------------
+    # Names
+    # ------------------------------------------------------------------
+
+    def resolve(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return ("local",) + scope[name]
+        for owner in self.gen.class_table.chain(self.class_name):
+            found = self.gen.class_table.attributes[owner].get(name)
+            if found:
+                decl, _ = found
+                t = strip_reference(decl.attr_type)
+                if decl.is_static:
+                    return ("static", owner, t)
+                if self.mb.is_static:
+                    raise CodegenError(f"Cannot use instance attribute {name} in a static method")
+                return ("field", owner, t)
+        if name in self.gen.class_table or name == IO_CLASS:
+            return ("class", name)
+        raise CodegenError(f"Undeclared identifier {name}")
+
+    def emit_load_name(self, name: str) -> Type:
+        found = self.resolve(name)
+        if found[0] == "local":
+            _, index, t, boxed = found
+            if boxed:
+                self.mb.emit("aload", index)
+                self.emit_ref_get(t)
+            else:
+                self.mb.emit(_kind(t) + "load", index)
+            return t
+        if found[0] == "field":
+            self.mb.emit("aload", 0)
+            self.mb.emit("getfield", found[1], name, descriptor(found[2]))
+            return found[2]
+        if found[0] == "static":
+            self.mb.emit("getstatic", found[1], name, descriptor(found[2]))
+            return found[2]
+        raise CodegenError(f"Class {name} used as a value")
+
+    def emit_store_name(self, name: str, emit_value: Callable[[Type], None]):
+        """Store into name the value pushed by emit_value(target type)."""
+        found = self.resolve(name)
+        if found[0] == "local":
+            _, index, t, boxed = found
+            if boxed:
+                self.mb.emit("aload", index)
+                emit_value(t)
+                self.emit_ref_set(t)
+            else:
+                emit_value(t)
+                self.mb.emit(_kind(t) + "store", index)
+        elif found[0] == "field":
+            self.mb.emit("aload", 0)
+            emit_value(found[2])
+            self.mb.emit("putfield", found[1], name, descriptor(found[2]))
+        elif found[0] == "static":
+            emit_value(found[2])
+            self.mb.emit("putstatic", found[1], name, descriptor(found[2]))
+        else:
+            raise CodegenError(f"Cannot assign to class {name}")
+
+    def attribute(self, class_name: str, name: str) -> Tuple[str, AttributeDecl]:
+        for owner in self.gen.class_table.chain(class_name):
+            found = self.gen.class_table.attributes[owner].get(name)
+            if found:
+                return owner, found[0]
+        raise CodegenError(f"Undeclared attribute {class_name}.{name}")
+
+    # ------------------------------------------------------------------
+    # Postfix chains and calls
+    # ------------------------------------------------------------------
+
+    def emit_primary(self, primary: Expr):
+        """Emit the primary of a postfix chain; return ('class', name) or ('value', type)."""
+        if isinstance(primary, Identifier):
+            found = self.resolve(primary.name)
+            if found[0] == "class":
+                return ("class", primary.name)
+        return ("value", self.visit(primary))
+
+    def emit_chain(self, receiver, ops: List[PostfixOp]):
+        for op in ops:
+            if isinstance(op, MemberAccess):
+                receiver = ("value", self.emit_member_load(receiver, op.member_name))
+            elif isinstance(op, ArrayAccess):
+                array_type = receiver[1]
+                if receiver[0] == "class" or not isinstance(array_type, ArrayType):
+                    raise CodegenError(f"Cannot index {type_name(array_type) or array_type}")
+                self.emit_index(op.index)
+                self.mb.emit(_array_load(array_type.element_type))
+                receiver = ("value", array_type.element_type)
+            else:
+                receiver = ("value", self.emit_call(receiver, op))
+        return receiver
+
+    def _receiver_class(self, receiver) -> str:
+        kind, info = receiver
+        if kind == "class":
+            return info
+        if isinstance(info, ClassType) and info.class_name in self.gen.class_table:
+            return info.class_name
+        raise CodegenError(f"Cannot access members of {type_name(info)}")
+
+    def emit_member_load(self, receiver, name: str) -> Type:
+        if not self.emit_nil_check(receiver, f"Nil reference accessing {name}"):
+            return NIL
+        class_name = self._receiver_class(receiver)
+        owner, decl = self.attribute(class_name, name)
+        t = strip_reference(decl.attr_type)
+        if decl.is_static:
+            if receiver[0] == "value":
+                self.mb.emit("pop")
+            self.mb.emit("getstatic", owner, name, descriptor(t))
+        elif receiver[0] == "class":
+            raise CodegenError(f"Cannot access instance attribute {class_name}.{name}")
+        else:
+            self.mb.emit("getfield", owner, name, descriptor(t))
+        return t
+
+    def emit_args(self, params: List[Parameter], args: List[Expr], callee: str):
+        """Push the arguments of a call; reference parameters receive locations."""
+        if len(params) != len(args):
+            raise CodegenError(f"{callee} expects {len(params)} arguments but got {len(args)}")
+        for param, arg in zip(params, args):
+            if is_boxed(param.param_type):
+                self.emit_location(arg, strip_reference(param.param_type))
+            else:
+                self.gen_value(arg, param.param_type)
+
+    def emit_call(self, receiver, node: MethodCall, location: bool = False) -> Type:
+        """Call node on receiver and push its result, or a Ref to it when location is true."""
+        name = node.method_name
+        table = self.gen.class_table
+        if receiver == ("class", IO_CLASS) and IO_CLASS not in table:
+            if name not in IO_METHODS:
+                raise CodegenError(f"Undeclared method io.{name}")
+            param_types, result = IO_METHODS[name]
+            if len(param_types) != len(node.args):
+                raise CodegenError(f"io.{name} expects {len(param_types)} arguments")
+            for t, arg in zip(param_types, node.args):
+                self.gen_value(arg, t)
+            desc = "(" + "".join(descriptor(t) for t in param_types) + ")" + descriptor(result)
+            self.mb.emit("invokestatic", IO_RUNTIME, name, desc)
+            if location:
+                self.emit_box(result, lambda: None)
+            return result
+        if not self.emit_nil_check(receiver, f"Nil reference calling {name}"):
+            return NIL
+        class_name = self._receiver_class(receiver)
+        method = table.lookup_method(class_name, name)
+        if method is None:
+            raise CodegenError(f"Undeclared method {class_name}.{name}")
+        owner = table.owner_of_method(class_name, name)
+        desc = method_descriptor(method.params, method.return_type)
+        if method.is_static:
+            if receiver[0] == "value":
+                self.mb.emit("pop")
+            self.emit_args(method.params, node.args, name)
+            self.mb.emit("invokestatic", owner, name, desc)
+        else:
+            if receiver[0] == "class":
+                self.mb.emit("aconst_null")
+            self.emit_args(method.params, node.args, name)
+            self.mb.emit("invokevirtual", class_name, name, desc)
+        result = strip_reference(method.return_type)
+        if is_boxed(method.return_type) and not location:
+            self.emit_ref_get(result)
+        elif location and not is_boxed(method.return_type):
+            self.emit_box(result, lambda: None)
+        return result
+
+    # ------------------------------------------------------------------
+    # Conditions
+    # ------------------------------------------------------------------
+
+    def branch_if(self, expr: Expr, label: str, when: bool):
+        """Jump to label when expr evaluates to when; fall through otherwise."""
+        expr = _unparen(expr)
+        if isinstance(expr, BoolLiteral):
+            if expr.value == when:
+                self.mb.emit("goto", label)
+            return
+        if isinstance(expr, UnaryOp) and expr.operator == "!":
+            self.branch_if(expr.operand, label, not when)
+            return
+        if isinstance(expr, BinaryOp) and expr.operator in ("&&", "||"):
+            if (expr.operator == "&&") == when:
+                skip = self.mb.new_label()
+                self.branch_if(expr.left, skip, not when)
+                self.branch_if(expr.right, label, when)
+                self.mb.label(skip)
+            else:
+                self.branch_if(expr.left, label, when)
+                self.branch_if(expr.right, label, when)
+            return
+        if isinstance(expr, BinaryOp) and expr.operator in _CONDITIONS:
+            self.branch_compare(expr, label, when)
+            return
+        self.gen_value(expr, BOOL)
+        self.mb.emit("ifne" if when else "ifeq", label)
+
+    def branch_compare(self, expr: BinaryOp, label: str, when: bool):
+        cond = _CONDITIONS[expr.operator]
+        if not when:
+            cond = _NEGATED[cond]
+        lt = strip_reference(self.type_of(expr.left))
+        rt = strip_reference(self.type_of(expr.right))
+        ln, rn = type_name(lt), type_name(rt)
+        if is_numeric(lt) and is_numeric(rt) and "float" in (ln, rn):
+            self.gen_value(expr.left, FLOAT)
+            self.gen_value(expr.right, FLOAT)
+            self.mb.emit("dcmpg" if expr.operator in ("<", "<=") else "dcmpl")
+            self.mb.emit("if" + cond, label)
+        elif _kind(lt) == "l" and _kind(rt) == "l":
+            self.visit(expr.left)
+            self.visit(expr.right)
+            self.mb.emit("lcmp")
+            self.mb.emit("if" + cond, label)
+        elif _kind(lt) == "i" and _kind(rt) == "i":
+            self.visit(expr.left)
+            self.visit(expr.right)
+            self.mb.emit("if_icmp" + cond, label)
+        elif expr.operator not in EQUALITY_OPS:
+            raise CodegenError(f"Cannot compare {ln} and {rn}")
+        elif ln == rn == "string":
+            self.visit(expr.left)
+            self.visit(expr.right)
+            self.mb.emit("invokestatic", "java/util/Objects", "equals",
+                         f"(L{JAVA_OBJECT};L{JAVA_OBJECT};)Z")
+            self.mb.emit("ifne" if cond == "eq" else "ifeq", label)
+        else:
+            self.visit(expr.left)
+            self.visit(expr.right)
+            self.mb.emit("if_acmp" + cond, label)
+
+    def emit_condition_value(self, expr: Expr):
+        """Push 1 when expr holds and 0 otherwise."""
+        true_label, end = self.mb.new_label(), self.mb.new_label()
+        self.branch_if(expr, true_label, True)
+        self.mb.emit("iconst_0")
+        self.mb.emit("goto", end)
+        self.mb.label(true_label)
+        self.mb.emit("iconst_1")
+        self.mb.label(end)
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visit_block_statement(self, node, o=None):
+        self.scopes.append({})
+        for decl in node.var_decls:
+            self.visit(decl)
+        self.owned.append([self.scopes[-1][name] for name in node.scoped])
+        for stmt in node.statements:
+            self.visit(stmt)
+        self.emit_release(self.owned.pop())
+        self.scopes.pop()
+
+    def emit_release(self, *blocks: List[Tuple[int, Type, bool]]):
+        """Destroy the objects owned by the given blocks, innermost and most recent first."""
+        for owners in reversed(blocks):
+            for index, t, boxed in reversed(owners):
+                self.mb.emit("aload", index)
+                if boxed:
+                    self.emit_ref_get(t)
+                self.mb.emit("invokestatic", IO_RUNTIME, "release", f"(L{JAVA_OBJECT};)V")
+
+    def visit_variable_decl(self, node, o=None):
+        t = strip_reference(node.var_type)
+        for var in node.variables:
+            if is_boxed(node.var_type) and var.init_value is not None:
+                # a reference variable holds the location it is bound to
+                self.emit_location(var.init_value, t)
+                self.mb.emit("astore", self.declare(var.name, t, True))
+                continue
+            if var.name in self.aliased:
+                if var.init_value is not None:
+                    self.emit_box(t, lambda: self.gen_value(var.init_value, t))
+                else:
+                    self.emit_box(t, lambda: self.emit_default(t))
+                self.mb.emit("astore", self.declare(var.name, t, True))
+                continue
+            if var.init_value is not None:
+                self.gen_value(var.init_value, t)
+            else:
+                self.emit_default(t)
+            index = self.declare(var.name, t)
+            self.mb.emit(_kind(t) + "store", index)
+
+    def visit_assignment_statement(self, node, o=None):
+        lhs = node.lhs
+        if isinstance(lhs, IdLHS):
+            self.emit_store_name(lhs.name, lambda t: self.gen_value(node.rhs, t))
+            return
+        expr = lhs.postfix_expr
+        if not isinstance(expr, PostfixExpression) or not expr.postfix_ops:
+            raise CodegenError("Invalid assignment target")
+        receiver = self.emit_chain(self.emit_primary(expr.primary), expr.postfix_ops[:-1])
+        last = expr.postfix_ops[-1]
+        if isinstance(last, ArrayAccess):
+            array_type = receiver[1]
+            if receiver[0] == "class" or not isinstance(array_type, ArrayType):
+                raise CodegenError("Cannot index a non-array value")
+            self.emit_index(last.index)
+            self.gen_value(node.rhs, array_type.element_type)
+            self.mb.emit(_array_store(array_type.element_type))
+        elif isinstance(last, MemberAccess):
+            if not self.emit_nil_check(receiver, f"Nil reference accessing {last.member_name}"):
+                return
+            class_name = self._receiver_class(receiver)
+            owner, decl = self.attribute(class_name, last.member_name)
+            t = strip_reference(decl.attr_type)
+            if decl.is_static:
+                if receiver[0] == "value":
+                    self.mb.emit("pop")
+                self.gen_value(node.rhs, t)
+                self.mb.emit("putstatic", owner, last.member_name, descriptor(t))
+            elif receiver[0] == "class":
+                raise CodegenError(f"Cannot assign instance attribute {class_name}.{last.member_name}")
+            else:
+                self.gen_value(node.rhs, t)
+                self.mb.emit("putfield", owner, last.member_name, descriptor(t))
+        else:
+            raise CodegenError("Cannot assign to a method call")
+
+    def visit_if_statement(self, node, o=None):
+        else_label = self.mb.new_label()
+        self.branch_if(node.condition, else_label, False)
+        self.visit(node.then_stmt)
+        if node.else_stmt:
+            end = self.mb.new_label()
+            self.mb.emit("goto", end)
+            self.mb.label(else_label)
+            self.visit(node.else_stmt)
+            self.mb.label(end)
+        else:
+            self.mb.label(else_label)
+
+    def visit_for_statement(self, node, o=None):
+        name = node.variable
+        declared = any(name in scope for scope in self.scopes)
+        if not declared and self.gen.class_table.lookup_attribute(self.class_name, name) is None:
+            if name in self.aliased:
+                self.emit_box(INT, lambda: self.gen_value(node.start_expr, INT))
+                self.mb.emit("astore", self.declare(name, INT, True))
+            else:
+                self.gen_value(node.start_expr, INT)
+                self.mb.emit("lstore", self.declare(name, INT))
+        else:
+            self.emit_store_name(name, lambda t: self.gen_value(node.start_expr, t))
+        end_local = self.new_local(2)
+        self.gen_value(node.end_expr, INT)
+        self.mb.emit("lstore", end_local)
+
+        up = node.direction == "to"
+        test, step, end = self.mb.new_label(), self.mb.new_label(), self.mb.new_label()
+        self.mb.label(test)
+        self.emit_load_name(name)
+        self.mb.emit("lload", end_local)
+        self.mb.emit("lcmp")
+        self.mb.emit("ifgt" if up else "iflt", end)
+        self.loops.append((step, end))
+        self.loop_depths.append(len(self.owned))
+        self.visit(node.body)
+        self.loop_depths.pop()
+        self.loops.pop()
+        self.mb.label(step)
+        def increment(t):
+            self.emit_load_name(name)
+            self.mb.emit("lconst_1")
+            self.mb.emit("invokestatic", "java/lang/Math", "addExact" if up else "subtractExact", "(JJ)J")
+        self.emit_store_name(name, increment)
+        self.mb.emit("goto", test)
+        self.mb.label(end)
+
+    def visit_break_statement(self, node, o=None):
+        if not self.loops:
+            raise CodegenError("Break outside loop")
+        self.emit_release(*self.owned[self.loop_depths[-1]:])
+        self.mb.emit("goto", self.loops[-1][1])
+
+    def visit_continue_statement(self, node, o=None):
+        if not self.loops:
+            raise CodegenError("Continue outside loop")
+        self.emit_release(*self.owned[self.loop_depths[-1]:])
+        self.mb.emit("goto", self.loops[-1][0])
+
+    def visit_return_statement(self, node, o=None):
+        if self.returns_ref:
+            if node.value is None:
+                self.emit_box(self.return_type, lambda: self.emit_default(self.return_type))
+            else:
+                self.emit_location(node.value, self.return_type)
+            self.emit_release(*self.owned)
+            self.mb.emit("areturn")
+            return
+        if type_name(self.return_type) == "void":
+            if node.value is not None:
+                # return nil; in a void method
+                self.emit_discard(self.visit(node.value))
+            self.emit_release(*self.owned)
+            self.mb.emit("return")
+            return
+        self.gen_value(node.value, self.return_type)
+        self.emit_release(*self.owned)
+        self.mb.emit(_kind(self.return_type) + "return")
+
+    def visit_method_invocation_statement(self, node, o=None):
+        self.emit_discard(self.visit(node.method_call))
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visit_binary_op(self, node, o=None):
+        op = node.operator
+        if op in ("&&", "||") or op in ORDER_OPS or op in EQUALITY_OPS:
+            self.emit_condition_value(node)
+            return BOOL
+        lt, rt = self.type_of(node.left), self.type_of(node.right)
+        if op == "^":
+            self.gen_value(node.left, STRING)
+            self.gen_value(node.right, STRING)
+            self.mb.emit("invokevirtual", JAVA_STRING, "concat",
+                         f"(L{JAVA_STRING};)L{JAVA_STRING};")
+            return STRING
+        if op in INT_OPS:
+            self.gen_value(node.left, INT)
+            self.gen_value(node.right, INT)
+            if op == "\\":
+                self.mb.emit("invokestatic", IO_RUNTIME, "divide", "(JJ)J")
+            else:
+                self.mb.emit("lrem")
+            return INT
+        if op in ARITH_OPS or op == "/":
+            result = FLOAT if op == "/" or "float" in (type_name(lt), type_name(rt)) else INT
+            self.gen_value(node.left, result)
+            self.gen_value(node.right, result)
+            if op == "/":
+                self.mb.emit("invokestatic", IO_RUNTIME, "divide", "(DD)D")
+            elif result is FLOAT:
+                self.mb.emit("d" + {"+": "add", "-": "sub", "*": "mul"}[op])
+            else:
+                # results beyond 64 bits overflow, as in the other engines
+                exact = {"+": "addExact", "-": "subtractExact", "*": "multiplyExact"}[op]
+                self.mb.emit("invokestatic", "java/lang/Math", exact, "(JJ)J")
+            return result
+        raise CodegenError(f"Unknown operator {op}")
+
+    def visit_unary_op(self, node, o=None):
+        if node.operator == "!":
+            self.gen_value(node.operand, BOOL)
+            self.mb.emit("iconst_1")
+            self.mb.emit("ixor")
+            return BOOL
+        t = self.visit(node.operand)
+        if node.operator == "-":
+            if type_name(t) == "float":
+                self.mb.emit("dneg")
+            else:
+                self.mb.emit("invokestatic", "java/lang/Math", "negateExact", "(J)J")
+        return t
+
+    def visit_postfix_expression(self, node, o=None):
+        receiver = self.emit_chain(self.emit_primary(node.primary), node.postfix_ops)
+        if receiver[0] == "class":
+            raise CodegenError(f"Class {receiver[1]} used as a value")
+        return receiver[1]
+
+    def visit_object_creation(self, node, o=None):
+        name = node.class_name
+        if name not in self.gen.class_table:
+            raise CodegenError(f"Undeclared class {name}")
+        ctor = self.gen.inference.constructor_of(node)
+        if ctor is None and node.args:
+            raise CodegenError(f"No constructor of {name} takes {len(node.args)} arguments")
+        params = ctor.params if ctor else []
+        self.emit_args(params, node.args, name)
+        self.mb.emit("invokestatic", name, self.gen.factory_name(name, ctor),
+                     method_descriptor(params, ClassType(name)))
+        return ClassType(name)
+
+    def visit_identifier(self, node, o=None):
+        return self.emit_load_name(node.name)
+
+    def visit_this_expression(self, node, o=None):
+        if self.mb.is_static:
+            raise CodegenError("this used in a static method")
+        self.mb.emit("aload", 0)
+        return ClassType(self.class_name)
+
+    def visit_parenthesized_expression(self, node, o=None):
+        return self.visit(node.expr)
+
+    def visit_nil_check(self, node, o=None):
+        t = self.visit(node.expr)
+        self.emit_nil_check(("value", t), f"Nil reference calling {node.method_name}")
+        return t
+
+    def visit_int_literal(self, node, o=None):
+        if not INT_MIN <= node.value <= INT_MAX:
+            self.emit_raise("Integer overflow")
+            self.mb.emit("lconst_0")
+            return INT
+        self.mb.push_long(node.value)
+        return INT
+
+    def visit_float_literal(self, node, o=None):
+        self.mb.push_double(node.value)
+        return FLOAT
+
+    def visit_bool_literal(self, node, o=None):
+        self.mb.emit("iconst_1" if node.value else "iconst_0")
+        return BOOL
+
+    def visit_string_literal(self, node, o=None):
+        self.mb.emit("ldc", decode_string(node.value))
+        return STRING
+
+    def visit_array_literal(self, node, o=None):
+        t = self.type_of(node)
+        self.emit_new_array(t)
+        for i, elem in enumerate(node.value):
+            self.mb.emit("dup")
+            self.mb.push_int(i)
+            self.gen_value(elem, t.element_type)
+            self.mb.emit(_array_store(t.element_type))
+        return t
+
+    def visit_nil_literal(self, node, o=None):
+        self.mb.emit("aconst_null")
+        return NIL
+
+
+class CodeGenerator:
+    """Translate a Program into JVM classes keyed by internal class name."""
+
+    def __init__(self):
+        self.class_table: Optional[ClassTable] = None
+        self.inference: Optional[TypeInference] = None
+        self.classes: Dict[str, ClassBuilder] = {}
+        self.entry_class: Optional[str] = None
+        self.method_ref_positions: Dict[str, Set[int]] = {}
+        self.ctor_ref_positions: Dict[str, Set[int]] = {}
+        # set when the program holds references to primitives or strings
+        self.uses_refs = False
+
+    def type_of(self, node: ASTNode) -> Optional[Type]:
+        return self.inference.type_of(node)
+
+    def generate(self, program: Program) -> Dict[str, ClassBuilder]:
+        self.class_table = ClassTable(program)
+        self.inference = TypeInference()
+        self.inference.infer(program)
+        LifetimeAnalysis(self.class_table).analyze(program)
+        self.classes = {}
+        self.uses_refs = False
+        self.method_ref_positions, self.ctor_ref_positions = {}, {}
+        for class_decl in program.class_decls:
+            for member in class_decl.members:
+                if isinstance(member, MethodDecl):
+                    self._note_ref_positions(self.method_ref_positions, member.name, member.params)
+                elif isinstance(member, ConstructorDecl):
+                    self._note_ref_positions(self.ctor_ref_positions, class_decl.name, member.params)
+        for class_decl in program.class_decls:
+            self.classes[class_decl.name] = self._generate_class(class_decl)
+        self.classes[IO_RUNTIME] = self._io_runtime()
+        runtime_error = ClassBuilder(RUNTIME_ERROR, "java/lang/RuntimeException")
+        mb = runtime_error.add_method(MethodBuilder("<init>", f"(L{JAVA_STRING};)V"))
+        mb.emit("aload", 0)
+        mb.emit("aload", 1)
+        mb.emit("invokespecial", "java/lang/RuntimeException", "<init>", f"(L{JAVA_STRING};)V")
+        mb.emit("return")
+        self.classes[RUNTIME_ERROR] = runtime_error
+        if self.class_table.destructors:
+            destructible = ClassBuilder(DESTRUCTIBLE, is_interface=True)
+            destructible.add_method(MethodBuilder(DESTRUCTOR_NAME, "()V", is_abstract=True))
+            self.classes[DESTRUCTIBLE] = destructible
+        if self.uses_refs:
+            for cb in self._ref_runtime():
+                self.classes[cb.name] = cb
+        self._generate_entry(program)
+        return self.classes
+
+    @staticmethod
+    def _note_ref_positions(table, name, params):
+        positions = table.setdefault(name, set())
+        for i, param in enumerate(params):
+            if is_boxed(param.param_type):
+                positions.add(i)
+
+    # ------------------------------------------------------------------
+    # Classes
+    # ------------------------------------------------------------------
+
+    def _superclass(self, class_decl: ClassDecl) -> str:
+        if class_decl.superclass in self.class_table:
+            return class_decl.superclass
+        return JAVA_OBJECT
+
+    def _generate_class(self, class_decl: ClassDecl) -> ClassBuilder:
+        name = class_decl.name
+        interfaces = [DESTRUCTIBLE] if name in self.class_table.destructors else []
+        cb = ClassBuilder(name, self._superclass(class_decl), interfaces)
+        has_statics = False
+        for member in class_decl.members:
+            if isinstance(member, AttributeDecl):
+                has_statics = has_statics or member.is_static
+                for attr in member.attributes:
+                    cb.add_field(attr.name, descriptor(member.attr_type), member.is_static)
+
+        if has_statics:
+            mb = cb.add_method(MethodBuilder("<clinit>", "()V", is_static=True))
+            method_gen = MethodGenerator(self, name, mb)
+            method_gen.emit_field_inits(class_decl, True)
+            mb.emit("return")
+
+        # <init>() only initialises fields: OPLang never runs the constructor
+        # of a superclass, whose fields <init>() of the superclass initialises
+        mb = cb.add_method(MethodBuilder("<init>", "()V"))
+        mb.emit("aload", 0)
+        mb.emit("invokespecial", self._superclass(class_decl), "<init>", "()V")
+        MethodGenerator(self, name, mb).emit_field_inits(class_decl, False)
+        mb.emit("return")
+        for index, ctor in enumerate(self.class_table.constructors[name]):
+            mb = cb.add_method(MethodBuilder(_init_name(name, index), method_descriptor(ctor.params, VOID)))
+            method_gen = MethodGenerator(self, name, mb)
+            method_gen.declare_params(ctor.params)
+            method_gen.generate_body(ctor.body)
+        for ctor in [None] + self.class_table.constructors_of(name):
+            self._generate_factory(cb, ctor)
+
+        for member in class_decl.members:
+            if isinstance(member, MethodDecl):
+                mb = cb.add_method(MethodBuilder(
+                    member.name, method_descriptor(member.params, member.return_type), member.is_static,
+                ))
+                method_gen = MethodGenerator(self, name, mb, member.return_type)
+                method_gen.declare_params(member.params)
+                method_gen.generate_body(member.body)
+            elif isinstance(member, DestructorDecl):
+                mb = cb.add_method(MethodBuilder(DESTRUCTOR_NAME, "()V"))
+                MethodGenerator(self, name, mb).generate_body(member.body)
+        return cb
+
+    def factory_name(self, class_name: str, ctor: Optional[ConstructorDecl]) -> str:
+        """Name of the static method of class_name creating an object with ctor."""
+        if ctor is None:
+            return "new$"
+        ctors = self.class_table.constructors_of(class_name)
+        return f"new${next(i for i, c in enumerate(ctors) if c is ctor)}"
+
+    def _generate_factory(self, cb: ClassBuilder, ctor: Optional[ConstructorDecl]):
+        """Add the factory creating an object of cb with ctor: it initialises the
+        fields, evaluated after the arguments as in the other engines, runs the
+        constructor body and registers the object for destruction."""
+        name = cb.name
+        params = ctor.params if ctor else []
+        desc = method_descriptor(params, ClassType(name))
+        mb = cb.add_method(MethodBuilder(self.factory_name(name, ctor), desc, is_static=True))
+        obj, _ = descriptor_words(desc)
+        mb.emit("new", name)
+        mb.emit("dup")
+        mb.emit("invokespecial", name, "<init>", "()V")
+        mb.emit("astore", obj)
+        if ctor is not None:
+            owner = next(c for c in self.class_table.chain(name)
+                         if any(k is ctor for k in self.class_table.constructors[c]))
+            index = next(i for i, c in enumerate(self.class_table.constructors[owner]) if c is ctor)
+            mb.emit("aload", obj)
+            slot = 0
+            for param in params:
+                boxed = is_boxed(param.param_type)
+                mb.emit(("a" if boxed else _kind(param.param_type)) + "load", slot)
+                slot += 1 if boxed else _words(param.param_type)
+            mb.emit("invokevirtual", owner, _init_name(owner, index), method_descriptor(params, VOID))
+        if self.class_table.find_destructor(name):
+            mb.emit("getstatic", IO_RUNTIME, "live", "Ljava/util/ArrayList;")
+            mb.emit("aload", obj)
+            mb.emit("invokevirtual", "java/util/ArrayList", "add", f"(L{JAVA_OBJECT};)Z")
+            mb.emit("pop")
+        mb.emit("aload", obj)
+        mb.emit("areturn")
+
+    def _generate_entry(self, program: Program):
+        """Add main(String[]) to the class declaring the OPLang entry point."""
+        for class_decl in program.class_decls:
+            main = self.class_table.methods[class_decl.name].get("main")
+            if main and not main.params:
+                break
+        else:
+            raise CodegenError("No entry point main()")
+        name = self.entry_class = class_decl.name
+        mb = self.classes[name].add_method(MethodBuilder("main", f"([L{JAVA_STRING};)V", is_static=True))
+        start, end, handler = mb.new_label(), mb.new_label(), mb.new_label()
+        mb.label(start)
+        desc = method_descriptor(main.params, main.return_type)
+        if main.is_static:
+            mb.emit("invokestatic", name, "main", desc)
+        else:
+            ctor = self.class_table.find_constructor(name, [])
+            mb.emit("invokestatic", name, self.factory_name(name, ctor), f"()L{name};")
+            mb.emit("invokevirtual", name, "main", desc)
+        _, result = descriptor_words(desc)
+        if result:
+            mb.emit("pop2" if result == 2 else "pop")
+        if self.class_table.destructors:
+            # for (i = live.size() - 1; i >= 0; i--) live.get(i).destroy$()
+            loop, done = mb.new_label(), mb.new_label()
+            mb.emit("getstatic", IO_RUNTIME, "live", "Ljava/util/ArrayList;")
+            mb.emit("invokevirtual", "java/util/ArrayList", "size", "()I")
+            mb.emit("istore", 1)
+            mb.label(loop)
+            mb.emit("iinc", 1, -1)
+            mb.emit("iload", 1)
+            mb.emit("iflt", done)
+            mb.emit("getstatic", IO_RUNTIME, "live", "Ljava/util/ArrayList;")
+            mb.emit("iload", 1)
+            mb.emit("invokevirtual", "java/util/ArrayList", "get", f"(I)L{JAVA_OBJECT};")
+            mb.emit("checkcast", DESTRUCTIBLE)
+            mb.emit("invokeinterface", DESTRUCTIBLE, DESTRUCTOR_NAME, "()V", 1)
+            mb.emit("goto", loop)
+            mb.label(done)
+        mb.label(end)
+        mb.emit("invokestatic", IO_RUNTIME, "flush", "()V")
+        mb.emit("return")
+        # report an error escaping main after what was written before it
+        mb.catch(start, end, handler)
+        mb.label(handler)
+        mb.emit("invokestatic", IO_RUNTIME, "fail", "(Ljava/lang/Throwable;)V")
+        mb.emit("return")
+
+    # ------------------------------------------------------------------
+    # References
+    # ------------------------------------------------------------------
+
+    def _ref_runtime(self) -> List[ClassBuilder]:
+        """Ref and its Cell, FieldRef and ElementRef implementations.
+
+        Ref declares get and set for every primitive descriptor, string and
+        Object (objects and arrays); each implementation supports all of
+        them, so one Ref type serves every reference parameter, variable
+        and return value.
+        """
+        ref = ClassBuilder(REF, is_interface=True)
+        cell = ClassBuilder(CELL, interfaces=[REF])
+        field_ref = ClassBuilder(FIELD_REF, interfaces=[REF])
+        element_ref = ClassBuilder(ELEMENT_REF, interfaces=[REF])
+        field_ref.add_field("target", f"L{JAVA_OBJECT};")
+        field_ref.add_field("field", "Ljava/lang/reflect/Field;")
+        element_ref.add_field("array", f"L{JAVA_OBJECT};")
+        element_ref.add_field("index", "I")
+        for cb in (cell, field_ref, element_ref):
+            mb = cb.add_method(MethodBuilder("<init>", "()V"))
+            mb.emit("aload", 0)
+            mb.emit("invokespecial", JAVA_OBJECT, "<init>", "()V")
+            mb.emit("return")
+
+        # FieldRef.of(target, owner, name) and ElementRef.of(array, index)
+        mb = field_ref.add_method(MethodBuilder(
+            "of", f"(L{JAVA_OBJECT};L{JAVA_STRING};L{JAVA_STRING};)L{REF};", is_static=True))
+        mb.emit("new", FIELD_REF)
+        mb.emit("dup")
+        mb.emit("invokespecial", FIELD_REF, "<init>", "()V")
+        mb.emit("dup")
+        mb.emit("aload", 0)
+        mb.emit("putfield", FIELD_REF, "target", f"L{JAVA_OBJECT};")
+        mb.emit("dup")
+        mb.emit("aload", 1)
+        mb.emit("invokestatic", "java/lang/Class", "forName", f"(L{JAVA_STRING};)Ljava/lang/Class;")
+        mb.emit("aload", 2)
+        mb.emit("invokevirtual", "java/lang/Class", "getField", f"(L{JAVA_STRING};)Ljava/lang/reflect/Field;")
+        mb.emit("putfield", FIELD_REF, "field", "Ljava/lang/reflect/Field;")
+        mb.emit("areturn")
+        mb = element_ref.add_method(MethodBuilder("of", f"(L{JAVA_OBJECT};I)L{REF};", is_static=True))
+        mb.emit("new", ELEMENT_REF)
+        mb.emit("dup")
+        mb.emit("invokespecial", ELEMENT_REF, "<init>", "()V")
+        mb.emit("dup")
+        mb.emit("aload", 0)
+        mb.emit("putfield", ELEMENT_REF, "array", f"L{JAVA_OBJECT};")
+        mb.emit("dup")
+        mb.emit("iload", 1)
+        mb.emit("putfield", ELEMENT_REF, "index", "I")
+        mb.emit("areturn")
+
+        # None stands for objects and arrays, held as java/lang/Object
+        for t in (INT, FLOAT, BOOL, STRING, None):
+            desc, kind = (descriptor(t), _kind(t)) if t else (f"L{JAVA_OBJECT};", "a")
+            get, put = f"(){desc}", f"({desc})V"
+            ref.add_method(MethodBuilder("get", get, is_abstract=True))
+            ref.add_method(MethodBuilder("set", put, is_abstract=True))
+
+            # a Cell keeps one value field per descriptor
+            cell.add_field("value", desc)
+            mb = cell.add_method(MethodBuilder("of", f"({desc})L{REF};", is_static=True))
+            mb.emit("new", CELL)
+            mb.emit("dup")
+            mb.emit("invokespecial", CELL, "<init>", "()V")
+            mb.emit("dup")
+            mb.emit(kind + "load", 0)
+            mb.emit("putfield", CELL, "value", desc)
+            mb.emit("areturn")
+            mb = cell.add_method(MethodBuilder("get", get))
+            mb.emit("aload", 0)
+            mb.emit("getfield", CELL, "value", desc)
+            mb.emit(kind + "return")
+            mb = cell.add_method(MethodBuilder("set", put))
+            mb.emit("aload", 0)
+            mb.emit(kind + "load", 1)
+            mb.emit("putfield", CELL, "value", desc)
+            mb.emit("return")
+
+            # FieldRef goes through java.lang.reflect.Field
+            accessor = _REFLECTED.get(desc, "")
+            value = f"L{JAVA_OBJECT};" if kind == "a" else desc
+            mb = field_ref.add_method(MethodBuilder("get", get))
+            mb.emit("aload", 0)
+            mb.emit("getfield", FIELD_REF, "field", "Ljava/lang/reflect/Field;")
+            mb.emit("aload", 0)
+            mb.emit("getfield", FIELD_REF, "target", f"L{JAVA_OBJECT};")
+            mb.emit("invokevirtual", "java/lang/reflect/Field", "get" + accessor, f"(L{JAVA_OBJECT};){value}")
+            if desc == f"L{JAVA_STRING};":
+                mb.emit("checkcast", JAVA_STRING)
+            mb.emit(kind + "return")
+            mb = field_ref.add_method(MethodBuilder("set", put))
+            mb.emit("aload", 0)
+            mb.emit("getfield", FIELD_REF, "field", "Ljava/lang/reflect/Field;")
+            mb.emit("aload", 0)
+            mb.emit("getfield", FIELD_REF, "target", f"L{JAVA_OBJECT};")
+            mb.emit(kind + "load", 1)
+            mb.emit("invokevirtual", "java/lang/reflect/Field", "set" + accessor, f"(L{JAVA_OBJECT};{value})V")
+            mb.emit("return")
+
+            # arrays of objects and of arrays are all Object[]
+            element = "[" + desc
+            for name, signature in (("get", get), ("set", put)):
+                mb = element_ref.add_method(MethodBuilder(name, signature))
+                mb.emit("aload", 0)
+                mb.emit("getfield", ELEMENT_REF, "array", f"L{JAVA_OBJECT};")
+                mb.emit("checkcast", element)
+                mb.emit("aload", 0)
+                mb.emit("getfield", ELEMENT_REF, "index", "I")
+                if name == "get":
+                    mb.emit(_array_load(t))
+                    mb.emit(kind + "return")
+                else:
+                    mb.emit(kind + "load", 1)
+                    mb.emit(_array_store(t))
+                    mb.emit("return")
+        return [ref, cell, field_ref, element_ref]
+
+    # ------------------------------------------------------------------
+    # io runtime
+    # ------------------------------------------------------------------
+
+    def _io_runtime(self) -> ClassBuilder:
+        """The io class: buffered stdout, line-based stdin and the destructor list."""
+        cb = ClassBuilder(IO_RUNTIME)
+        cb.add_field("in", "Ljava/io/BufferedReader;", True)
+        cb.add_field("out", "Ljava/io/PrintStream;", True)
+        cb.add_field("live", "Ljava/util/ArrayList;", True)
+
+        mb = cb.add_method(MethodBuilder("<clinit>", "()V", is_static=True))
+        mb.emit("new", "java/io/BufferedReader")
+        mb.emit("dup")
+        mb.emit("new", "java/io/InputStreamReader")
+        mb.emit("dup")
+        mb.emit("getstatic", "java/lang/System", "in", "Ljava/io/InputStream;")
+        mb.emit("invokespecial", "java/io/InputStreamReader", "<init>", "(Ljava/io/InputStream;)V")
+        mb.emit("invokespecial", "java/io/BufferedReader", "<init>", "(Ljava/io/Reader;)V")
+        mb.emit("putstatic", IO_RUNTIME, "in", "Ljava/io/BufferedReader;")
+        mb.emit("new", "java/io/PrintStream")
+        mb.emit("dup")
+        mb.emit("new", "java/io/BufferedOutputStream")
+        mb.emit("dup")
+        mb.emit("getstatic", "java/lang/System", "out", "Ljava/io/PrintStream;")
+        mb.push_int(1 << 16)
+        mb.emit("invokespecial", "java/io/BufferedOutputStream", "<init>", "(Ljava/io/OutputStream;I)V")
+        mb.emit("iconst_0")
+        mb.emit("invokespecial", "java/io/PrintStream", "<init>", "(Ljava/io/OutputStream;Z)V")
+        mb.emit("putstatic", IO_RUNTIME, "out", "Ljava/io/PrintStream;")
+        mb.emit("new", "java/util/ArrayList")
+        mb.emit("dup")
+        mb.emit("invokespecial", "java/util/ArrayList", "<init>", "()V")
+        mb.emit("putstatic", IO_RUNTIME, "live", "Ljava/util/ArrayList;")
+        mb.emit("return")
+
+        # release(obj): if (live.remove(obj)) ((Destructible) obj).destroy$()
+        mb = cb.add_method(MethodBuilder("release", f"(L{JAVA_OBJECT};)V", is_static=True))
+        done = mb.new_label()
+        mb.emit("getstatic", IO_RUNTIME, "live", "Ljava/util/ArrayList;")
+        mb.emit("aload", 0)
+        mb.emit("invokevirtual", "java/util/ArrayList", "remove", f"(L{JAVA_OBJECT};)Z")
+        mb.emit("ifeq", done)
+        mb.emit("aload", 0)
+        mb.emit("checkcast", DESTRUCTIBLE)
+        mb.emit("invokeinterface", DESTRUCTIBLE, DESTRUCTOR_NAME, "()V", 1)
+        mb.label(done)
+        mb.emit("return")
+
+        mb = cb.add_method(MethodBuilder("flush", "()V", is_static=True))
+        mb.emit("getstatic", IO_RUNTIME, "out", "Ljava/io/PrintStream;")
+        mb.emit("invokevirtual", "java/io/PrintStream", "flush", "()V")
+        mb.emit("return")
+
+        parsers = {
+            "int": ("java/lang/Long", "parseLong", "J"),
+            "float": ("java/lang/Double", "parseDouble", "D"),
+        }
+        self._format_float(cb)
+        for name, (param_types, result) in IO_METHODS.items():
+            desc = "(" + "".join(descriptor(t) for t in param_types) + ")" + descriptor(result)
+            mb = cb.add_method(MethodBuilder(name, desc, is_static=True))
+            if param_types:
+                value = descriptor(param_types[0])
+                print_name = "println" if name.endswith("Ln") else "print"
+                mb.emit("getstatic", IO_RUNTIME, "out", "Ljava/io/PrintStream;")
+                mb.emit(_kind(param_types[0]) + "load", 0)
+                if value == "D":
+                    mb.emit("invokestatic", IO_RUNTIME, "formatFloat", f"(D)L{JAVA_STRING};")
+                    value = f"L{JAVA_STRING};"
+                mb.emit("invokevirtual", "java/io/PrintStream", print_name, f"({value})V")
+                mb.emit("return")
+                continue
+            # reads flush pending output first so prompts appear in order
+            mb.emit("invokestatic", IO_RUNTIME, "flush", "()V")
+            mb.emit("getstatic", IO_RUNTIME, "in", "Ljava/io/BufferedReader;")
+            mb.emit("invokevirtual", "java/io/BufferedReader", "readLine", f"()L{JAVA_STRING};")
+            mb.emit("astore", 0)
+            line = mb.new_label()
+            mb.emit("aload", 0)
+            mb.emit("ifnonnull", line)
+            _emit_raise(mb, lambda: mb.emit("ldc", "Unexpected end of input"))
+            mb.label(line)
+            mb.emit("aload", 0)
+            kind = type_name(result)
+            if kind == "string":
+                mb.emit("areturn")
+                continue
+            mb.emit("invokevirtual", JAVA_STRING, "trim", f"()L{JAVA_STRING};")
+            if kind == "boolean":
+                mb.emit("ldc", "true")
+                mb.emit("invokevirtual", JAVA_STRING, "equals", f"(L{JAVA_OBJECT};)Z")
+                mb.emit("ireturn")
+                continue
+            mb.emit("astore", 0)
+            start, end, invalid = mb.new_label(), mb.new_label(), mb.new_label()
+            owner, method, code = parsers[kind]
+            mb.label(start)
+            mb.emit("aload", 0)
+            mb.emit("invokestatic", owner, method, f"(L{JAVA_STRING};){code}")
+            mb.label(end)
+            mb.emit(_kind(result) + "return")
+            mb.catch(start, end, invalid, "java/lang/NumberFormatException")
+            mb.label(invalid)
+            mb.emit("pop")
+
+            def invalid_input(kind=kind):
+                mb.emit("ldc", f"Invalid {'integer' if kind == 'int' else kind} input: ")
+                mb.emit("aload", 0)
+                mb.emit("invokevirtual", JAVA_STRING, "concat", f"(L{JAVA_STRING};)L{JAVA_STRING};")
+            _emit_raise(mb, invalid_input)
+        self._runtime_errors(cb)
+        return cb
+
+    @staticmethod
+    def _runtime_errors(cb: ClassBuilder):
+        """Add the checks raising OPLang runtime errors and fail(Throwable),
+        which reports an error escaping main as the other engines do."""
+        string, obj = f"L{JAVA_STRING};", f"L{JAVA_OBJECT};"
+        concat = ("invokevirtual", JAVA_STRING, "concat", f"({string}){string}")
+
+        # checkNil(obj, message): if (obj == null) throw new RuntimeError(message)
+        mb = cb.add_method(MethodBuilder("checkNil", f"({obj}{string})V", is_static=True))
+        ok = mb.new_label()
+        mb.emit("aload", 0)
+        mb.emit("ifnonnull", ok)
+        _emit_raise(mb, lambda: mb.emit("aload", 1))
+        mb.label(ok)
+        mb.emit("return")
+
+        # index(array, i): the int i after checking array is not nil and i is in range
+        mb = cb.add_method(MethodBuilder("index", f"({obj}J)I", is_static=True))
+        not_nil, out_of_range = mb.new_label(), mb.new_label()
+        mb.emit("aload", 0)
+        mb.emit("ifnonnull", not_nil)
+        _emit_raise(mb, lambda: mb.emit("ldc", "Nil array access"))
+        mb.label(not_nil)
+        mb.emit("lload", 1)
+        mb.emit("lconst_0")
+        mb.emit("lcmp")
+        mb.emit("iflt", out_of_range)
+        mb.emit("lload", 1)
+        mb.emit("aload", 0)
+        mb.emit("invokestatic", "java/lang/reflect/Array", "getLength", f"({obj})I")
+        mb.emit("i2l")
+        mb.emit("lcmp")
+        mb.emit("ifge", out_of_range)
+        mb.emit("lload", 1)
+        mb.emit("l2i")
+        mb.emit("ireturn")
+        mb.label(out_of_range)
+
+        def index_message():
+            mb.emit("ldc", "Index ")
+            mb.emit("lload", 1)
+            mb.emit("invokestatic", JAVA_STRING, "valueOf", f"(J){string}")
+            mb.emit(*concat)
+            mb.emit("ldc", " out of range")
+            mb.emit(*concat)
+        _emit_raise(mb, index_message)
+
+        # divide(a, b): a / b, failing when b is zero instead of giving inf or nan
+        mb = cb.add_method(MethodBuilder("divide", "(DD)D", is_static=True))
+        nonzero = mb.new_label()
+        mb.emit("dload", 2)
+        mb.emit("dconst_0")
+        mb.emit("dcmpl")
+        mb.emit("ifne", nonzero)
+        _emit_raise(mb, lambda: mb.emit("ldc", "Division by zero"))
+        mb.label(nonzero)
+        mb.emit("dload", 0)
+        mb.emit("dload", 2)
+        mb.emit("ddiv")
+        mb.emit("dreturn")
+
+        # divide(a, b): a \ b, failing when b is zero or the quotient overflows
+        mb = cb.add_method(MethodBuilder("divide", "(JJ)J", is_static=True))
+        other = mb.new_label()
+        mb.emit("lload", 0)
+        mb.emit("lload", 2)
+        mb.push_long(-1)
+        mb.emit("lcmp")
+        mb.emit("ifne", other)
+        mb.emit("invokestatic", "java/lang/Math", "negateExact", "(J)J")
+        mb.emit("lreturn")
+        mb.label(other)
+        mb.emit("lload", 2)
+        mb.emit("ldiv")
+        mb.emit("lreturn")
+
+        # fail(error): print "Runtime Error: <message>" and exit with status 1
+        # for the errors OPLang defines; rethrow anything else
+        mb = cb.add_method(MethodBuilder("fail", "(Ljava/lang/Throwable;)V", is_static=True))
+        not_overflow, not_arithmetic, not_oplang, overflow, report = (mb.new_label() for _ in range(5))
+        mb.emit("invokestatic", IO_RUNTIME, "flush", "()V")
+        mb.emit("aload", 0)
+        mb.emit("instanceof", "java/lang/StackOverflowError")
+        mb.emit("ifeq", not_overflow)
+        mb.emit("ldc", "Stack overflow")
+        mb.emit("goto", report)
+        mb.label(not_overflow)
+        # integer division by zero reports "/ by zero"; the Math exact methods overflow
+        mb.emit("aload", 0)
+        mb.emit("instanceof", "java/lang/ArithmeticException")
+        mb.emit("ifeq", not_arithmetic)
+        mb.emit("ldc", "/ by zero")
+        mb.emit("aload", 0)
+        mb.emit("invokevirtual", "java/lang/Throwable", "getMessage", f"(){string}")
+        mb.emit("invokevirtual", JAVA_STRING, "equals", f"({obj})Z")
+        mb.emit("ifeq", overflow)
+        mb.emit("ldc", "Division by zero")
+        mb.emit("goto", report)
+        mb.label(overflow)
+        mb.emit("ldc", "Integer overflow")
+        mb.emit("goto", report)
+        mb.label(not_arithmetic)
+        mb.emit("aload", 0)
+        mb.emit("instanceof", RUNTIME_ERROR)
+        mb.emit("ifeq", not_oplang)
+        mb.emit("aload", 0)
+        mb.emit("invokevirtual", "java/lang/Throwable", "getMessage", f"(){string}")
+        mb.emit("goto", report)
+        mb.label(not_oplang)
+        mb.emit("aload", 0)
+        mb.emit("athrow")
+        mb.label(report)
+        mb.emit("astore", 1)
+        mb.emit("getstatic", "java/lang/System", "err", "Ljava/io/PrintStream;")
+        mb.emit("ldc", "Runtime Error: ")
+        mb.emit("aload", 1)
+        mb.emit(*concat)
+        mb.emit("invokevirtual", "java/io/PrintStream", "print", f"({string})V")
+        mb.emit("getstatic", "java/lang/System", "err", "Ljava/io/PrintStream;")
+        mb.emit("invokevirtual", "java/io/PrintStream", "flush", "()V")
+        mb.emit("iconst_1")
+        mb.emit("invokestatic", "java/lang/System", "exit", "(I)V")
+        mb.emit("return")
+
+    @staticmethod
+    def _format_float(cb: ClassBuilder):
+        """Add formatFloat(double), which spells a float as Python's repr does.
+
+        Double.toString gives the same shortest digits but switches to
+        exponent notation outside [1e-3, 1e7) where repr does outside
+        [1e-4, 1e16), and spells nan and inf differently.
+        """
+        string = f"L{JAVA_STRING};"
+        concat = ("invokevirtual", JAVA_STRING, "concat", f"({string}){string}")
+        mb = cb.add_method(MethodBuilder("formatFloat", f"(D){string}", is_static=True))
+        finite, negative, number, fixed, whole, mantissa, stripped, non_negative, signed, two_digits = (
+            mb.new_label() for _ in range(10))
+        mb.emit("dload", 0)
+        mb.emit("invokestatic", "java/lang/Double", "isNaN", "(D)Z")
+        mb.emit("ifeq", finite)
+        mb.emit("ldc", "nan")
+        mb.emit("areturn")
+        mb.label(finite)
+        mb.emit("dload", 0)
+        mb.emit("invokestatic", "java/lang/Double", "isInfinite", "(D)Z")
+        mb.emit("ifeq", number)
+        mb.emit("dload", 0)
+        mb.emit("dconst_0")
+        mb.emit("dcmpl")
+        mb.emit("iflt", negative)
+        mb.emit("ldc", "inf")
+        mb.emit("areturn")
+        mb.label(negative)
+        mb.emit("ldc", "-inf")
+        mb.emit("areturn")
+        # s = Double.toString(d); e = s.indexOf('E'); s is final without an exponent
+        mb.label(number)
+        mb.emit("dload", 0)
+        mb.emit("invokestatic", "java/lang/Double", "toString", f"(D){string}")
+        mb.emit("astore", 2)
+        mb.emit("aload", 2)
+        mb.push_int(ord("E"))
+        mb.emit("invokevirtual", JAVA_STRING, "indexOf", "(I)I")
+        mb.emit("istore", 3)
+        mb.emit("iload", 3)
+        mb.emit("ifge", fixed)
+        mb.emit("aload", 2)
+        mb.emit("areturn")
+        # exp = Integer.parseInt(s.substring(e + 1))
+        mb.label(fixed)
+        mb.emit("aload", 2)
+        mb.emit("iload", 3)
+        mb.emit("iconst_1")
+        mb.emit("iadd")
+        mb.emit("invokevirtual", JAVA_STRING, "substring", f"(I){string}")
+        mb.emit("invokestatic", "java/lang/Integer", "parseInt", f"({string})I")
+        mb.emit("istore", 4)
+        mb.emit("iload", 4)
+        mb.push_int(-4)
+        mb.emit("if_icmplt", mantissa)
+        mb.emit("iload", 4)
+        mb.push_int(16)
+        mb.emit("if_icmpge", mantissa)
+        # -4 <= exp < 16: the plain digits of new BigDecimal(s), with .0 when whole
+        mb.emit("new", "java/math/BigDecimal")
+        mb.emit("dup")
+        mb.emit("aload", 2)
+        mb.emit("invokespecial", "java/math/BigDecimal", "<init>", f"({string})V")
+        mb.emit("invokevirtual", "java/math/BigDecimal", "stripTrailingZeros", "()Ljava/math/BigDecimal;")
+        mb.emit("invokevirtual", "java/math/BigDecimal", "toPlainString", f"(){string}")
+        mb.emit("astore", 2)
+        mb.emit("aload", 2)
+        mb.push_int(ord("."))
+        mb.emit("invokevirtual", JAVA_STRING, "indexOf", "(I)I")
+        mb.emit("iflt", whole)
+        mb.emit("aload", 2)
+        mb.emit("areturn")
+        mb.label(whole)
+        mb.emit("aload", 2)
+        mb.emit("ldc", ".0")
+        mb.emit(*concat)
+        mb.emit("areturn")
+        # otherwise the mantissa without a trailing .0, e, the sign and at least two digits
+        mb.label(mantissa)
+        mb.emit("aload", 2)
+        mb.emit("iconst_0")
+        mb.emit("iload", 3)
+        mb.emit("invokevirtual", JAVA_STRING, "substring", f"(II){string}")
+        mb.emit("astore", 2)
+        mb.emit("aload", 2)
+        mb.emit("ldc", ".0")
+        mb.emit("invokevirtual", JAVA_STRING, "endsWith", f"({string})Z")
+        mb.emit("ifeq", stripped)
+        mb.emit("aload", 2)
+        mb.emit("iconst_0")
+        mb.emit("iload", 3)
+        mb.emit("iconst_2")
+        mb.emit("isub")
+        mb.emit("invokevirtual", JAVA_STRING, "substring", f"(II){string}")
+        mb.emit("astore", 2)
+        mb.label(stripped)
+        mb.emit("aload", 2)
+        mb.emit("iload", 4)
+        mb.emit("ifge", non_negative)
+        mb.emit("ldc", "e-")
+        mb.emit(*concat)
+        mb.emit("iload", 4)
+        mb.emit("ineg")
+        mb.emit("istore", 4)
+        mb.emit("goto", signed)
+        mb.label(non_negative)
+        mb.emit("ldc", "e+")
+        mb.emit(*concat)
+        # the stack holds the mantissa and sign; exponents below 10 get a leading 0
+        mb.label(signed)
+        mb.emit("iload", 4)
+        mb.push_int(10)
+        mb.emit("if_icmpge", two_digits)
+        mb.emit("ldc", "0")
+        mb.emit(*concat)
+        mb.label(two_digits)
+        mb.emit("iload", 4)
+        mb.emit("invokestatic", JAVA_STRING, "valueOf", f"(I){string}")
+        mb.emit(*concat)
+        mb.emit("areturn")
@@ -0,0 +1,264 @@
+"""
+Jasmin-style emitter for JVM classes.
+This module holds the ClassBuilder and MethodBuilder used by the code
+generator. A method is kept as a list of symbolic instructions that can
+be printed as Jasmin assembly or assembled into a class file by
+src/codegen/classfile.py. The builder tracks the operand stack depth and
+the number of local slots so .limit directives are always exact.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from src.codegen.classfile import (
+    ACC_ABSTRACT, ACC_INTERFACE, ACC_PUBLIC, ACC_STATIC, ACC_SUPER, OPCODES, class_file,
+)
+
+
+# Fixed stack effect of each opcode, in words (long and double values
+# take two); calls, field accesses and branches are computed from their
+# operands.
+_STACK_EFFECT: Dict[str, int] = {
+    "aconst_null": 1, "iconst_m1": 1, "iconst_0": 1, "iconst_1": 1, "iconst_2": 1,
+    "iconst_3": 1, "iconst_4": 1, "iconst_5": 1, "lconst_0": 2, "lconst_1": 2,
+    "fconst_0": 1, "fconst_1": 1, "fconst_2": 1, "dconst_0": 2, "dconst_1": 2,
+    "bipush": 1, "sipush": 1, "ldc": 1, "ldc2_w": 2,
+    "iload": 1, "lload": 2, "fload": 1, "dload": 2, "aload": 1,
+    "istore": -1, "lstore": -2, "fstore": -1, "dstore": -2, "astore": -1,
+    "iaload": -1, "laload": 0, "faload": -1, "daload": 0, "aaload": -1, "baload": -1,
+    "iastore": -3, "lastore": -4, "fastore": -3, "dastore": -4, "aastore": -3, "bastore": -3,
+    "pop": -1, "pop2": -2, "dup": 1, "dup_x1": 1, "dup_x2": 1, "dup2": 2, "swap": 0,
+    "iadd": -1, "ladd": -2, "fadd": -1, "dadd": -2, "isub": -1, "lsub": -2, "fsub": -1, "dsub": -2,
+    "imul": -1, "lmul": -2, "fmul": -1, "dmul": -2, "idiv": -1, "ldiv": -2, "fdiv": -1, "ddiv": -2,
+    "irem": -1, "lrem": -2, "ineg": 0, "lneg": 0, "fneg": 0, "dneg": 0, "ixor": -1,
+    "iinc": 0, "i2l": 1, "i2f": 0, "i2d": 1, "l2i": -1, "l2d": 0,
+    "lcmp": -3, "fcmpl": -1, "fcmpg": -1, "dcmpl": -3, "dcmpg": -3,
+    "ifeq": -1, "ifne": -1, "iflt": -1, "ifge": -1, "ifgt": -1, "ifle": -1,
+    "if_icmpeq": -2, "if_icmpne": -2, "if_icmplt": -2, "if_icmpge": -2,
+    "if_icmpgt": -2, "if_icmple": -2, "if_acmpeq": -2, "if_acmpne": -2,
+    "ifnull": -1, "ifnonnull": -1, "goto": 0,
+    "ireturn": -1, "lreturn": -2, "freturn": -1, "dreturn": -2, "areturn": -1, "return": 0,
+    "new": 1, "newarray": 0, "anewarray": 0, "arraylength": 0, "athrow": -1,
+    "checkcast": 0, "instanceof": 0,
+}
+
+_UNCONDITIONAL = ("goto", "ireturn", "lreturn", "freturn", "dreturn", "areturn", "return", "athrow")
+_WIDE_LOCALS = ("lload", "dload", "lstore", "dstore")
+
+
+def value_words(descriptor: str) -> int:
+    """Number of stack words (and local slots) a value of a field descriptor takes."""
+    return {"V": 0, "J": 2, "D": 2}.get(descriptor[0], 1)
+
+
+def descriptor_words(descriptor: str) -> Tuple[int, int]:
+    """Return the words taken by the arguments and by the result of a method descriptor."""
+    args, i = 0, 1
+    while descriptor[i] != ")":
+        start = i
+        while descriptor[i] == "[":
+            i += 1
+        if descriptor[i] == "L":
+            i = descriptor.index(";", i)
+        i += 1
+        args += value_words(descriptor[start:i])
+    return args, value_words(descriptor[i + 1:])
+
+
+class MethodBuilder:
+    """Instructions and limits of one JVM method."""
+
+    def __init__(self, name: str, descriptor: str, is_static: bool = False,
+                 is_abstract: bool = False):
+        self.name = name
+        self.descriptor = descriptor
+        self.is_static = is_static
+        self.is_abstract = is_abstract
+        self.code: List[tuple] = []
+        self.depth = 0
+        self.max_stack = 0
+        self.reachable = True
+        self.label_depths: Dict[str, int] = {}
+        self.nlabels = 0
+        nargs, _ = descriptor_words(descriptor)
+        self.max_locals = nargs + (0 if is_static else 1)
+
+    # ------------------------------------------------------------------
+    # Emission
+    # ------------------------------------------------------------------
+
+    def new_label(self) -> str:
+        self.nlabels += 1
+        return f"L{self.nlabels}"
+
+    def label(self, name: str):
+        self.code.append(("label", name))
+        if not self.reachable:
+            self.depth = self.label_depths.get(name, 0)
+            self.max_stack = max(self.max_stack, self.depth)
+            self.reachable = True
+
+    def catch(self, start: str, end: str, handler: str, class_name: Optional[str] = None):
+        """Route exceptions of class_name (any when None) raised in [start, end) to handler."""
+        self.code.append(("catch", start, end, handler, class_name))
+        self.label_depths[handler] = 1
+
+    def _adjust(self, delta: int):
+        self.depth += delta
+        if self.depth > self.max_stack:
+            self.max_stack = self.depth
+
+    def emit(self, op: str, *operands):
+        if op not in OPCODES:
+            raise ValueError(f"Unknown JVM opcode {op}")
+        self.code.append((op,) + operands)
+        if op in ("invokevirtual", "invokespecial", "invokestatic", "invokeinterface"):
+            nargs, result = descriptor_words(operands[2])
+            self._adjust(-nargs - (0 if op == "invokestatic" else 1) + result)
+        elif op in ("getstatic", "putstatic", "getfield", "putfield"):
+            words = value_words(operands[2])
+            self._adjust({"getstatic": words, "putstatic": -words,
+                          "getfield": words - 1, "putfield": -words - 1}[op])
+        else:
+            self._adjust(_STACK_EFFECT[op])
+        if OPCODES[op][1] == "branch":
+            target = operands[0]
+            self.label_depths[target] = max(self.label_depths.get(target, 0), self.depth)
+        if OPCODES[op][1] == "local" or op == "iinc":
+            self.use_local(operands[0], 2 if op in _WIDE_LOCALS else 1)
+        if op in _UNCONDITIONAL:
+            self.reachable = False
+
+    def use_local(self, index: int, words: int = 1):
+        if index + words > self.max_locals:
+            self.max_locals = index + words
+
+    # Convenience emitters -------------------------------------------------
+
+    def push_int(self, value: int):
+        if -1 <= value <= 5:
+            self.emit("iconst_m1" if value == -1 else f"iconst_{value}")
+        elif -128 <= value <= 127:
+            self.emit("bipush", value)
+        elif -32768 <= value <= 32767:
+            self.emit("sipush", value)
+        else:
+            self.emit("ldc", value)
+
+    def push_long(self, value: int):
+        if value in (0, 1):
+            self.emit(f"lconst_{value}")
+        else:
+            self.emit("ldc2_w", value)
+
+    def push_double(self, value: float):
+        if value in (0.0, 1.0) and str(value)[0] != "-":
+            self.emit(f"dconst_{int(value)}")
+        else:
+            self.emit("ldc2_w", float(value))
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def access(self) -> int:
+        flags = ACC_PUBLIC
+        if self.is_static:
+            flags |= ACC_STATIC
+        if self.is_abstract:
+            flags |= ACC_ABSTRACT
+        return flags
+
+    def to_jasmin(self) -> List[str]:
+        modifiers = "public" + (" static" if self.is_static else "") + (" abstract" if self.is_abstract else "")
+        lines = [f".method {modifiers} {self.name}{self.descriptor}"]
+        if not self.is_abstract:
+            lines.append(f"\t.limit stack {self.max_stack}")
+            lines.append(f"\t.limit locals {self.max_locals}")
+            for ins in self.code:
+                lines.append(_jasmin_instruction(ins))
+        lines.append(".end method")
+        return lines
+
+    def to_tuple(self) -> tuple:
+        code = None if self.is_abstract else self.code
+        return (self.access(), self.name, self.descriptor, code, self.max_stack, self.max_locals)
+
+
+def _jasmin_string(text: str) -> str:
+    escaped = (text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               .replace("\t", "\\t").replace("\r", "\\r").replace("\b", "\\b").replace("\f", "\\f"))
+    return f'"{escaped}"'
+
+
+def _jasmin_instruction(ins: tuple) -> str:
+    op = ins[0]
+    if op == "label":
+        return f"{ins[1]}:"
+    if op == "catch":
+        return f"\t.catch {ins[4] or 'all'} from {ins[1]} to {ins[2]} using {ins[3]}"
+    kind = OPCODES[op][1]
+    if kind == "field":
+        return f"\t{op} {ins[1]}/{ins[2]} {ins[3]}"
+    if kind == "method":
+        return f"\t{op} {ins[1]}/{ins[2]}{ins[3]}"
+    if kind == "interface":
+        return f"\t{op} {ins[1]}/{ins[2]}{ins[3]} {ins[4]}"
+    if kind in ("ldc", "ldc2"):
+        value = ins[1]
+        if isinstance(value, str):
+            return f"\t{op} {_jasmin_string(value)}"
+        return f"\t{op} {value!r}"
+    if len(ins) == 1:
+        return f"\t{op}"
+    return "\t" + op + " " + " ".join(str(x) for x in ins[1:])
+
+
+class ClassBuilder:
+    """Fields and methods of one JVM class or interface."""
+
+    def __init__(self, name: str, superclass: str = "java/lang/Object",
+                 interfaces: Optional[List[str]] = None, is_interface: bool = False):
+        self.name = name
+        self.superclass = superclass
+        self.interfaces = interfaces or []
+        self.is_interface = is_interface
+        self.fields: List[Tuple[str, str, bool]] = []
+        self.methods: List[MethodBuilder] = []
+
+    def add_field(self, name: str, descriptor: str, is_static: bool = False):
+        self.fields.append((name, descriptor, is_static))
+
+    def add_method(self, method: MethodBuilder) -> MethodBuilder:
+        self.methods.append(method)
+        return method
+
+    def find_method(self, name: str, descriptor: str) -> Optional[MethodBuilder]:
+        for method in self.methods:
+            if method.name == name and method.descriptor == descriptor:
+                return method
+        return None
+
+    def to_jasmin(self) -> str:
+        kind = ".interface public abstract" if self.is_interface else ".class public"
+        lines = [f".source {self.name.rsplit('/', 1)[-1]}.j", f"{kind} {self.name}",
+                 f".super {self.superclass}"]
+        for interface in self.interfaces:
+            lines.append(f".implements {interface}")
+        for name, descriptor, is_static in self.fields:
+            lines.append(f".field public {'static ' if is_static else ''}{name} {descriptor}")
+        for method in self.methods:
+            lines.append("")
+            lines.extend(method.to_jasmin())
+        return "\n".join(lines) + "\n"
+
+    def to_bytes(self) -> bytes:
+        if self.is_interface:
+            access = ACC_PUBLIC | ACC_INTERFACE | ACC_ABSTRACT
+        else:
+            access = ACC_PUBLIC | ACC_SUPER
+        fields = [
+            (ACC_PUBLIC | (ACC_STATIC if is_static else 0), name, descriptor)
+            for name, descriptor, is_static in self.fields
+        ]
+        return class_file(self.name, self.superclass, self.interfaces, access, fields,
+                          [m.to_tuple() for m in self.methods])
@@ -0,0 +1,129 @@
+"""
+End-to-end JVM runner for OPLang programs.
+This module writes the classes produced by src/codegen/codegen.py to a
+directory, either directly as class files or as Jasmin sources assembled
+with external/jasmin.jar, and runs the entry class with `java`.
+
+Usage: python -m src.codegen.runner program.op [--jasmin] [--out DIR]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from src.utils.nodes import Program
+from src.codegen.codegen import CodeGenerator, CodegenError
+from src.codegen.emitter import ClassBuilder
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+JASMIN_JAR = os.path.join(ROOT_DIR, "external", "jasmin.jar")
+
+
+def write_class_files(classes: Dict[str, ClassBuilder], out_dir: str) -> List[str]:
+    """Write one .class file per class; package names become directories."""
+    paths = []
+    for name, cb in classes.items():
+        path = os.path.join(out_dir, *name.split("/")) + ".class"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(cb.to_bytes())
+        paths.append(path)
+    return paths
+
+
+def write_jasmin_files(classes: Dict[str, ClassBuilder], out_dir: str) -> List[str]:
+    """Write one Jasmin .j source per class."""
+    paths = []
+    for name, cb in classes.items():
+        path = os.path.join(out_dir, name.replace("/", "_") + ".j")
+        os.makedirs(out_dir, exist_ok=True)
+        with open(path, "w") as f:
+            f.write(cb.to_jasmin())
+        paths.append(path)
+    return paths
+
+
+class JVMRunner:
+    """Compile a Program for the JVM and run it."""
+
+    def __init__(self, java: str = "java", jasmin_jar: Optional[str] = None):
+        self.java = java
+        self.jasmin_jar = jasmin_jar or os.environ.get("JASMIN_JAR", JASMIN_JAR)
+
+    def compile(self, program: Program, out_dir: str, use_jasmin: bool = False) -> str:
+        """Write the program's classes to out_dir and return the entry class name."""
+        generator = CodeGenerator()
+        classes = generator.generate(program)
+        if not use_jasmin:
+            write_class_files(classes, out_dir)
+            return generator.entry_class
+        if not os.path.isfile(self.jasmin_jar):
+            raise CodegenError(
+                f"Jasmin assembler not found at {self.jasmin_jar}; "
+                "download jasmin.jar into external/ or set JASMIN_JAR"
+            )
+        sources = write_jasmin_files(classes, out_dir)
+        result = subprocess.run(
+            [self.java, "-jar", self.jasmin_jar, "-d", out_dir] + sources,
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CodegenError("Jasmin failed: " + (result.stderr or result.stdout).strip())
+        return generator.entry_class
+
+    def run(self, program: Program, stdin: str = "", use_jasmin: bool = False,
+            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Compile into a temporary directory and run; return the finished process."""
+        if shutil.which(self.java) is None and not os.path.isfile(self.java):
+            raise CodegenError(f"Java runtime {self.java} not found")
+        out_dir = tempfile.mkdtemp(prefix="oplang-jvm-")
+        try:
+            entry = self.compile(program, out_dir, use_jasmin)
+            return subprocess.run(
+                [self.java, "-cp", out_dir, entry],
+                input=stdin, capture_output=True, text=True, timeout=timeout,
+            )
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def _parse(source: str) -> Program:
+    sys.path.insert(0, os.path.join(ROOT_DIR, "build"))
+    from antlr4 import CommonTokenStream, InputStream
+    from build.OPLangLexer import OPLangLexer
+    from build.OPLangParser import OPLangParser
+    from src.astgen.ast_generation import ASTGeneration
+    from src.utils.error_listener import NewErrorListener
+
+    parser = OPLangParser(CommonTokenStream(OPLangLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    return ASTGeneration().visit(parser.program())
+
+
+def main(argv: List[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile an OPLang program for the JVM and run it")
+    parser.add_argument("source")
+    parser.add_argument("--jasmin", action="store_true", help="assemble with external/jasmin.jar")
+    parser.add_argument("--out", help="keep the generated classes in this directory instead of running")
+    args = parser.parse_args(argv)
+    with open(args.source) as f:
+        program = _parse(f.read())
+    runner = JVMRunner()
+    if args.out:
+        print(runner.compile(program, args.out, args.jasmin))
+        return 0
+    result = runner.run(program, sys.stdin.read() if not sys.stdin.isatty() else "", args.jasmin)
+    sys.stdout.write(result.stdout)
+    sys.stderr.write(result.stderr)
+    return result.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
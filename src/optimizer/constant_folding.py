@@ -0,0 +1,173 @@
+"""
+Constant folding and algebraic simplification for OPLang ASTs.
+This module rewrites BinaryOp and UnaryOp trees whose operands are
+literals into literals, computing them exactly as src/runtime/interpreter.py
+would, simplifies identities such as x + 0, x * 1 and true && x, and
+removes ParenthesizedExpression wrappers, which every backend treats as
+transparent.
+
+An expression is never folded when evaluating it could fail at run time
+(division by zero, or an int operand or result outside the 64 bits every
+engine gives ints, which overflows), when its result is a non-finite
+float, or when removing an operator would turn a value into an lvalue
+bound by a reference. For the same reason --x is kept: it overflows when
+x is the smallest int.
+"""
+
+import math
+from typing import Optional
+
+from src.utils.nodes import *
+from src.runtime.values import INT_MAX, INT_MIN, float_div, int_div, int_mod
+from src.optimizer.references import LOCATION, ReferenceAwareTransformer
+
+_FOLDABLE = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": float_div,
+    "\\": int_div,
+    "%": int_mod,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _number(node: Expr) -> bool:
+    """A float literal, or an int literal that does not overflow when evaluated."""
+    if isinstance(node, IntLiteral):
+        return INT_MIN <= node.value <= INT_MAX
+    return isinstance(node, FloatLiteral)
+
+
+def _is_int(node: Expr, value: int) -> bool:
+    return isinstance(node, IntLiteral) and node.value == value
+
+
+def _is_bool(node: Expr, value: bool) -> bool:
+    return isinstance(node, BoolLiteral) and node.value is value
+
+
+def _is_empty_string(node: Expr) -> bool:
+    return isinstance(node, StringLiteral) and node.value == ""
+
+
+def make_literal(value, like: ASTNode) -> Optional[Literal]:
+    """Return a literal holding value at like's position, or None if no literal can."""
+    if isinstance(value, bool):
+        literal = BoolLiteral(value)
+    elif isinstance(value, int):
+        if not INT_MIN <= value <= INT_MAX:
+            return None
+        literal = IntLiteral(value)
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            return None
+        literal = FloatLiteral(value)
+    else:
+        return None
+    literal.line, literal.column = like.line, like.column
+    return literal
+
+
+class ConstantFolder(ReferenceAwareTransformer):
+    """Fold constant subexpressions of a Program in place."""
+
+    def __init__(self):
+        super().__init__()
+        self.folded = 0
+
+    def fold(self, program: Program) -> Program:
+        self.prepare(program)
+        return self.visit(program)
+
+    def _keep(self, survivor: Expr, node: Expr, o) -> Expr:
+        """Replace node by survivor unless that would expose an lvalue to a reference."""
+        if o == LOCATION and isinstance(survivor, (Identifier, PostfixExpression)):
+            return node
+        self.folded += 1
+        return survivor
+
+    def visit_parenthesized_expression(self, node, o=None):
+        self.folded += 1
+        return self.visit(node.expr, o)
+
+    # ------------------------------------------------------------------
+    # Operators
+    # ------------------------------------------------------------------
+
+    def visit_unary_op(self, node, o=None):
+        operand = node.operand = self.visit(node.operand)
+        op = node.operator
+        if op == "+":
+            return self._keep(operand, node, o)
+        if op == "-" and _number(operand):
+            return self._literal(-operand.value, node)
+        if op == "!" and isinstance(operand, BoolLiteral):
+            return self._literal(not operand.value, node)
+        if isinstance(operand, UnaryOp) and op == operand.operator == "!":
+            return self._keep(operand.operand, node, o)
+        return node
+
+    def visit_binary_op(self, node, o=None):
+        left = node.left = self.visit(node.left)
+        right = node.right = self.visit(node.right)
+        op = node.operator
+
+        if op in ("&&", "||"):
+            if isinstance(left, BoolLiteral):
+                # true && x is x, false && x is false; dually for ||
+                if left.value == (op == "&&"):
+                    return self._keep(right, node, o)
+                return self._literal(left.value, node)
+            if _is_bool(right, op == "&&"):
+                return self._keep(left, node, o)
+            return node
+
+        if op == "^":
+            if isinstance(left, StringLiteral) and isinstance(right, StringLiteral):
+                folded = StringLiteral(left.value + right.value)
+                folded.line, folded.column = node.line, node.column
+                self.folded += 1
+                return folded
+            if _is_empty_string(right):
+                return self._keep(left, node, o)
+            if _is_empty_string(left):
+                return self._keep(right, node, o)
+            return node
+
+        if op in _FOLDABLE and self._constant_operands(op, left, right):
+            if op in ("/", "\\", "%") and right.value == 0:
+                return node
+            try:
+                value = _FOLDABLE[op](left.value, right.value)
+            except OverflowError:
+                return node
+            return self._literal(value, node)
+
+        # identities whose result has the type of the surviving operand
+        if (op in ("+", "-") and _is_int(right, 0)) or (op in ("*", "\\") and _is_int(right, 1)):
+            return self._keep(left, node, o)
+        if (op == "+" and _is_int(left, 0)) or (op == "*" and _is_int(left, 1)):
+            return self._keep(right, node, o)
+        return node
+
+    @staticmethod
+    def _constant_operands(op: str, left: Expr, right: Expr) -> bool:
+        if _number(left) and _number(right):
+            return op not in ("\\", "%") or (isinstance(left, IntLiteral) and isinstance(right, IntLiteral))
+        if op in ("==", "!="):
+            both = (BoolLiteral, StringLiteral)
+            return any(isinstance(left, t) and isinstance(right, t) for t in both)
+        return False
+
+    def _literal(self, value, node: Expr) -> Expr:
+        literal = make_literal(value, node)
+        if literal is None:
+            return node
+        self.folded += 1
+        return literal
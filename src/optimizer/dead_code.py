@@ -0,0 +1,189 @@
+"""
+Dead code elimination for OPLang ASTs.
+This module removes statements that can never run (those following a
+return, break or continue in the same block), branches of IfStatements
+whose condition is a BoolLiteral, for loops that cannot iterate, and
+local variables that are never mentioned, recording each removal in
+DeadCodeEliminator.removed.
+"""
+
+from typing import List, Set
+
+from src.utils.nodes import *
+from src.utils.visitor import ASTTransformer, BaseVisitor
+from src.runtime.values import INT_MAX, INT_MIN
+
+
+# operators failing on a zero divisor or an int result beyond 64 bits
+_FAILING = ("+", "-", "*", "/", "\\", "%")
+
+
+def is_pure(expr: Expr) -> bool:
+    """Whether evaluating expr can neither fail nor have side effects."""
+    if isinstance(expr, IntLiteral):
+        return INT_MIN <= expr.value <= INT_MAX
+    if isinstance(expr, (Literal, Identifier, ThisExpression)) and not isinstance(expr, ArrayLiteral):
+        return True
+    if isinstance(expr, ArrayLiteral):
+        return all(is_pure(elem) for elem in expr.value)
+    if isinstance(expr, ParenthesizedExpression):
+        return is_pure(expr.expr)
+    if isinstance(expr, UnaryOp):
+        return expr.operator != "-" and is_pure(expr.operand)
+    if isinstance(expr, BinaryOp):
+        return expr.operator not in _FAILING and is_pure(expr.left) and is_pure(expr.right)
+    return False
+
+
+def terminates(stmt: Statement) -> bool:
+    """Whether control never reaches the statement following stmt."""
+    if isinstance(stmt, (ReturnStatement, BreakStatement, ContinueStatement)):
+        return True
+    if isinstance(stmt, BlockStatement):
+        return any(terminates(s) for s in stmt.statements)
+    if isinstance(stmt, IfStatement):
+        return stmt.else_stmt is not None and terminates(stmt.then_stmt) and terminates(stmt.else_stmt)
+    return False
+
+
+def _is_empty(stmt: Statement) -> bool:
+    return isinstance(stmt, BlockStatement) and not stmt.var_decls and not stmt.statements
+
+
+class _MentionedNames(BaseVisitor):
+    """Collect every name read, assigned or used as a loop variable."""
+
+    def __init__(self):
+        self.names: Set[str] = set()
+
+    def visit_identifier(self, node, o=None):
+        self.names.add(node.name)
+
+    def visit_id_lhs(self, node, o=None):
+        self.names.add(node.name)
+
+    def visit_for_statement(self, node, o=None):
+        self.names.add(node.variable)
+        super().visit_for_statement(node, o)
+
+
+class _UnusedLocals(ASTTransformer):
+    """Remove local variables not in names whose initialiser is pure."""
+
+    def __init__(self, names: Set[str]):
+        self.names = names
+        self.removed: List[str] = []
+
+    def visit_block_statement(self, node, o=None):
+        var_decls = []
+        for decl in node.var_decls:
+            kept = []
+            for var in decl.variables:
+                if var.name in self.names or (var.init_value and not is_pure(var.init_value)):
+                    kept.append(var)
+                else:
+                    self.removed.append(var.name)
+            if kept:
+                decl.variables = kept
+                var_decls.append(decl)
+        node.var_decls = var_decls
+        for stmt in node.statements:
+            self.visit(stmt, o)
+        return node
+
+
+class DeadCodeEliminator(ASTTransformer):
+    """Remove unreachable statements and unused locals of a Program in place."""
+
+    def __init__(self):
+        self.removed: List[str] = []
+        self.class_name = ""
+        self.where = ""
+        self.scopes: List[Set[str]] = []
+
+    def eliminate(self, program: Program) -> Program:
+        return self.visit(program)
+
+    def _report(self, what: str):
+        self.removed.append(f"{self.where}: {what}")
+
+    def _in_scope(self, name: str) -> bool:
+        return any(name in scope for scope in self.scopes)
+
+    # ------------------------------------------------------------------
+    # Members
+    # ------------------------------------------------------------------
+
+    def visit_class_decl(self, node, o=None):
+        self.class_name = node.name
+        return super().visit_class_decl(node, o)
+
+    def _body(self, node, where: str, params: List[Parameter]):
+        self.where = where
+        self.scopes = [{param.name for param in params}]
+        node.body = self._statement(node.body, None)
+        while True:
+            mentioned = _MentionedNames()
+            mentioned.visit(node.body)
+            unused = _UnusedLocals(mentioned.names)
+            unused.visit(node.body)
+            if not unused.removed:
+                break
+            for name in unused.removed:
+                self._report(f"unused variable {name}")
+        return node
+
+    def visit_method_decl(self, node, o=None):
+        return self._body(node, f"{self.class_name}.{node.name}", node.params)
+
+    def visit_constructor_decl(self, node, o=None):
+        return self._body(node, f"{self.class_name}.{node.name}", node.params)
+
+    def visit_destructor_decl(self, node, o=None):
+        return self._body(node, f"{self.class_name}.~{self.class_name}", [])
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visit_block_statement(self, node, o=None):
+        self.scopes.append({var.name for decl in node.var_decls for var in decl.variables})
+        statements = []
+        for i, stmt in enumerate(node.statements):
+            result = self.visit(stmt, o)
+            if result is None:
+                continue
+            statements.extend(result if isinstance(result, list) else [result])
+            if statements and terminates(statements[-1]):
+                rest = len(node.statements) - i - 1
+                if rest:
+                    self._report(f"{rest} unreachable statement{'s' if rest > 1 else ''}")
+                break
+        node.statements = statements
+        self.scopes.pop()
+        return node
+
+    def visit_if_statement(self, node, o=None):
+        node = super().visit_if_statement(node, o)
+        if isinstance(node.condition, BoolLiteral):
+            self._report(f"branch of constant condition {str(node.condition.value).lower()}")
+            return node.then_stmt if node.condition.value else node.else_stmt
+        if node.else_stmt is not None and _is_empty(node.else_stmt):
+            node.else_stmt = None
+        if node.else_stmt is None and _is_empty(node.then_stmt) and is_pure(node.condition):
+            self._report("empty if statement")
+            return None
+        return node
+
+    def visit_for_statement(self, node, o=None):
+        declared = self._in_scope(node.variable)
+        if not declared:
+            # an undeclared loop variable is declared in the enclosing scope
+            self.scopes[-1].add(node.variable)
+        node = super().visit_for_statement(node, o)
+        start, end = node.start_expr, node.end_expr
+        if declared and isinstance(start, IntLiteral) and isinstance(end, IntLiteral):
+            if (start.value > end.value) if node.direction == "to" else (start.value < end.value):
+                self._report(f"for loop over {node.variable} that never iterates")
+                return AssignmentStatement(IdLHS(node.variable), start)
+        return node
@@ -0,0 +1,338 @@
+"""
+Devirtualisation and inlining of OPLang method calls.
+This module uses class hierarchy analysis: a call whose receiver has
+static class C is monomorphic when no subclass of C overrides the method
+found from C. Such calls, and calls of static methods through their
+class, get a target attribute naming the class that declares the method,
+which backends may use to call it directly (see CALL_DIRECT in
+src/vm/bytecode.py).
+
+Small leaf methods reached this way are inlined when the receiver is
+this or a variable and every argument is pure:
+  * a method whose body is `return e;` is replaced by e,
+  * a void method whose body is one assignment, in a statement of its
+    own, is replaced by the assignment, and a void method with an empty
+    body, in a statement of its own, is removed.
+Inside the inlined code parameters are replaced by the arguments and
+attribute names are qualified by the receiver or their class. A receiver
+variable is wrapped in a NilCheck, which reports a nil receiver as the
+call it replaced; calls through a variable are only inlined when the
+body always accesses an instance attribute, and so always checks it.
+"""
+
+import copy
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.nodes import *
+from src.utils.visitor import ASTTransformer, BaseVisitor
+from src.semantics.class_table import ClassTable, IO_CLASS
+from src.semantics.type_inference import TypeInference, strip_reference
+from src.optimizer.dead_code import is_pure
+from src.optimizer.references import LOCATION, ReferenceAwareTransformer
+
+
+# Statement context: the call's value is discarded
+STATEMENT = "statement"
+
+
+class _Size(BaseVisitor):
+    def __init__(self):
+        self.nodes = 0
+        self.calls = 0
+        self.names: List[str] = []
+        self.assigned: List[str] = []
+        self.uses_this = False
+        self.short_circuits = False
+        # attributes accessed as this.name
+        self.members: List[str] = []
+
+    def visit(self, node, o=None):
+        self.nodes += 1
+        return super().visit(node, o)
+
+    def visit_method_call(self, node, o=None):
+        self.calls += 1
+        super().visit_method_call(node, o)
+
+    def visit_object_creation(self, node, o=None):
+        self.calls += 1
+        super().visit_object_creation(node, o)
+
+    def visit_identifier(self, node, o=None):
+        self.names.append(node.name)
+
+    def visit_id_lhs(self, node, o=None):
+        self.names.append(node.name)
+        self.assigned.append(node.name)
+
+    def visit_this_expression(self, node, o=None):
+        self.uses_this = True
+
+    def visit_postfix_expression(self, node, o=None):
+        if isinstance(node.primary, ThisExpression) and isinstance(node.postfix_ops[0], MemberAccess):
+            self.members.append(node.postfix_ops[0].member_name)
+        super().visit_postfix_expression(node, o)
+
+    def visit_binary_op(self, node, o=None):
+        if node.operator in ("&&", "||"):
+            self.short_circuits = True
+        super().visit_binary_op(node, o)
+
+
+class _Callee:
+    """The inlinable body of a method: kind is 'return', 'assign' or 'empty'."""
+
+    def __init__(self, owner: str, method: MethodDecl, kind: str, body: Optional[ASTNode], names: List[str]):
+        self.owner = owner
+        self.method = method
+        self.kind = kind
+        self.body = body
+        self.params = [p.name for p in method.params]
+        self.uses = {name: names.count(name) for name in self.params}
+        # class names the inlined code will mention
+        self.classes: Set[str] = set()
+        # whether the inlined code always accesses an instance attribute of
+        # the receiver, and so still fails on a nil receiver
+        self.dereferences = False
+
+
+class _Substitute(ASTTransformer):
+    """Rewrite a copy of a callee body into the caller's terms."""
+
+    def __init__(self, inliner: "Inliner", callee: _Callee, receiver: Optional[Expr], args: List[Expr]):
+        self.inliner = inliner
+        self.callee = callee
+        self.receiver = receiver
+        self.args = dict(zip(callee.params, args))
+
+    def qualified(self, name: str) -> Expr:
+        if name in self.args:
+            return copy.deepcopy(self.args[name])
+        decl, _ = self.inliner.class_table.lookup_attribute(self.callee.owner, name)
+        if decl.is_static:
+            owner = self.inliner.attribute_owner(self.callee.owner, name)
+            return PostfixExpression(Identifier(owner), [MemberAccess(name)])
+        return PostfixExpression(self.checked_receiver(), [MemberAccess(name)])
+
+    def checked_receiver(self) -> Expr:
+        receiver = copy.deepcopy(self.receiver)
+        if isinstance(receiver, ThisExpression):
+            return receiver
+        return NilCheck(receiver, self.callee.method.name)
+
+    def visit_identifier(self, node, o=None):
+        if node.name in self.args or self.inliner.class_table.lookup_attribute(self.callee.owner, node.name):
+            return self.qualified(node.name)
+        return node
+
+    def visit_this_expression(self, node, o=None):
+        return self.checked_receiver()
+
+    def visit_id_lhs(self, node, o=None):
+        return PostfixLHS(self.qualified(node.name))
+
+    def visit_postfix_expression(self, node, o=None):
+        node = super().visit_postfix_expression(node, o)
+        if isinstance(node.primary, PostfixExpression):
+            node.postfix_ops = node.primary.postfix_ops + node.postfix_ops
+            node.primary = node.primary.primary
+        return node
+
+
+class Inliner(ReferenceAwareTransformer):
+    """Devirtualise calls and inline small leaf methods of a Program in place."""
+
+    def __init__(self, max_nodes: int = 16):
+        super().__init__()
+        self.max_nodes = max_nodes
+        self.class_table: Optional[ClassTable] = None
+        self.types: Optional[TypeInference] = None
+        self.callees: Dict[int, Optional[_Callee]] = {}
+        self.class_name = ""
+        self.where = ""
+        self.scopes: List[Set[str]] = []
+        self.devirtualized = 0
+        self.inlined: List[str] = []
+
+    def inline(self, program: Program) -> Program:
+        self.prepare(program)
+        self.class_table = ClassTable(program)
+        self.types = TypeInference()
+        self.types.infer(program)
+        return self.visit(program)
+
+    # ------------------------------------------------------------------
+    # Class hierarchy
+    # ------------------------------------------------------------------
+
+    def attribute_owner(self, class_name: str, name: str) -> Optional[str]:
+        for owner in self.class_table.chain(class_name):
+            if name in self.class_table.attributes[owner]:
+                return owner
+        return None
+
+    def monomorphic(self, class_name: str, name: str) -> bool:
+        """Whether no subclass of class_name overrides the method it finds for name."""
+        return not any(name in self.class_table.methods[sub] for sub in self.class_table.subclasses(class_name))
+
+    def callee(self, owner: str, method: MethodDecl) -> Optional[_Callee]:
+        """Return the inlinable form of method, or None."""
+        if id(method) in self.callees:
+            return self.callees[id(method)]
+        result = None
+        body = method.body
+        if (not isinstance(method.return_type, ReferenceType)
+                and not any(isinstance(p.param_type, ReferenceType) for p in method.params)
+                and isinstance(body, BlockStatement) and not body.var_decls
+                and len(body.statements) <= 1):
+            size = _Size()
+            stmt = body.statements[0] if body.statements else None
+            if stmt is not None:
+                size.visit(stmt)
+            is_void = isinstance(method.return_type, PrimitiveType) and method.return_type.type_name == "void"
+            if stmt is None:
+                kind = "empty" if is_void else None
+            elif isinstance(stmt, ReturnStatement) and not is_void:
+                kind, stmt = "return", stmt.value
+            elif isinstance(stmt, AssignmentStatement) and is_void:
+                kind = "assign"
+            else:
+                kind = None
+            params = {p.name for p in method.params}
+            names_ok = all(
+                name in params or self.class_table.lookup_attribute(owner, name) or name in self.class_table
+                for name in size.names
+            )
+            if method.is_static:
+                names_ok = names_ok and not size.uses_this and all(
+                    self.class_table.lookup_attribute(owner, name)[0].is_static
+                    for name in size.names
+                    if name not in params and self.class_table.lookup_attribute(owner, name)
+                )
+            if (kind and size.calls == 0 and size.nodes <= self.max_nodes and names_ok
+                    and not any(name in params for name in size.assigned)):
+                result = _Callee(owner, method, kind, stmt, size.names)
+                result.classes = {name for name in size.names if name not in params
+                                  and not self.class_table.lookup_attribute(owner, name)}
+                for name in size.names:
+                    found = self.class_table.lookup_attribute(owner, name)
+                    if name not in params and found and found[0].is_static:
+                        result.classes.add(self.attribute_owner(owner, name))
+                    elif name not in params and found:
+                        result.dereferences = not size.short_circuits
+                for name in size.members:
+                    found = self.class_table.lookup_attribute(owner, name)
+                    if found and not found[0].is_static:
+                        result.dereferences = not size.short_circuits
+        self.callees[id(method)] = result
+        return result
+
+    # ------------------------------------------------------------------
+    # Scopes
+    # ------------------------------------------------------------------
+
+    def is_local(self, name: str) -> bool:
+        return any(name in scope for scope in self.scopes)
+
+    def visit_class_decl(self, node, o=None):
+        self.class_name = node.name
+        return super().visit_class_decl(node, o)
+
+    def _member(self, node, params: List[Parameter]):
+        self.where = f"{self.class_name}.{node.name}"
+        self.scopes = [{p.name for p in params}]
+        node.body = self._statement(node.body, None)
+        self.scopes = []
+        return node
+
+    def visit_method_decl(self, node, o=None):
+        self.returns_ref = isinstance(node.return_type, ReferenceType)
+        self._member(node, node.params)
+        self.returns_ref = False
+        return node
+
+    def visit_constructor_decl(self, node, o=None):
+        return self._member(node, node.params)
+
+    def visit_destructor_decl(self, node, o=None):
+        return self._member(node, [])
+
+    def visit_block_statement(self, node, o=None):
+        self.scopes.append({var.name for decl in node.var_decls for var in decl.variables})
+        node = super().visit_block_statement(node, o)
+        self.scopes.pop()
+        return node
+
+    def visit_for_statement(self, node, o=None):
+        if self.scopes and not self.is_local(node.variable):
+            self.scopes[-1].add(node.variable)
+        return super().visit_for_statement(node, o)
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def resolve(self, primary: Expr, ops: List[PostfixOp], call: MethodCall) -> Tuple[Optional[str], Optional[MethodDecl], bool]:
+        """Return (owner, method, through class) for a call that has a single target."""
+        name = call.method_name
+        if not ops and isinstance(primary, Identifier) and not self.is_local(primary.name) \
+                and not self.class_table.lookup_attribute(self.class_name, primary.name):
+            if primary.name == IO_CLASS or primary.name not in self.class_table:
+                return None, None, True
+            method = self.class_table.lookup_method(primary.name, name)
+            if method is None or not method.is_static:
+                return None, None, True
+            return self.class_table.owner_of_method(primary.name, name), method, True
+        receiver = strip_reference(self.types.type_of(ops[-1] if ops else primary))
+        if not isinstance(receiver, ClassType) or receiver.class_name not in self.class_table:
+            return None, None, False
+        method = self.class_table.lookup_method(receiver.class_name, name)
+        if method is None or method.is_static or not self.monomorphic(receiver.class_name, name):
+            return None, None, False
+        return self.class_table.owner_of_method(receiver.class_name, name), method, False
+
+    def visit_postfix_expression(self, node, o=None):
+        node = super().visit_postfix_expression(node, o)
+        inlined = None
+        for i, op in enumerate(node.postfix_ops):
+            if not isinstance(op, MethodCall):
+                continue
+            owner, method, through_class = self.resolve(node.primary, node.postfix_ops[:i], op)
+            if method is None:
+                continue
+            if not through_class:
+                op.target = owner
+                self.devirtualized += 1
+            if i == len(node.postfix_ops) - 1 and o != LOCATION and len(method.params) == len(op.args):
+                receiver = None if through_class else node.primary
+                if through_class or (not i and isinstance(receiver, (ThisExpression, Identifier))):
+                    inlined = self.instantiate(owner, method, receiver, op, o == STATEMENT)
+        return node if inlined is None else inlined
+
+    def instantiate(self, owner: str, method: MethodDecl, receiver: Optional[Expr], call: MethodCall,
+                    as_statement: bool):
+        callee = self.callee(owner, method)
+        if callee is None or (callee.kind == "return") == as_statement:
+            return None
+        if any(self.is_local(name) for name in callee.classes):
+            return None
+        if isinstance(receiver, Identifier) and not callee.dereferences:
+            return None
+        for name, arg in zip(callee.params, call.args):
+            if not is_pure(arg):
+                return None
+            if callee.uses[name] > 1 and not isinstance(arg, (Literal, Identifier, ThisExpression)):
+                return None
+            if isinstance(arg, ArrayLiteral) and callee.uses[name]:
+                return None
+        self.inlined.append(f"{self.where}: inlined {owner}.{method.name}")
+        if callee.kind == "empty":
+            return []
+        return _Substitute(self, callee, receiver, call.args).visit(copy.deepcopy(callee.body))
+
+    def visit_method_invocation_statement(self, node, o=None):
+        result = self.visit(node.method_call, STATEMENT)
+        if isinstance(result, (list, AssignmentStatement)):
+            return result
+        node.method_call = result
+        return node
@@ -0,0 +1,290 @@
+"""
+Loop optimisations for OPLang for statements.
+This module recognises counted loops, whose variable is a local the body
+never assigns or binds to a reference, and marks them with
+counted = True so backends can run them as native range loops. For a
+loop whose variable is a declared local it also
+
+  * hoists loop-invariant expressions (pure arithmetic that cannot fail,
+    over locals the body neither assigns nor declares) into temporaries
+    evaluated once before the loop; int arithmetic may overflow, so only
+    float arithmetic, comparisons and concatenations qualify, and
+  * strength-reduces array indices of the form i * c + d in counted
+    loops over i into a temporary advanced by c on every iteration.
+
+The temporaries and the loop are wrapped in a new block. Locals that may
+be aliased through a reference are never treated as invariant.
+"""
+
+import copy
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.type_inference import TypeInference, INT, strip_reference, type_name
+from src.runtime.values import INT_MAX, INT_MIN
+from src.optimizer.references import LOCATION, ReferenceAwareTransformer
+
+
+class _Names(BaseVisitor):
+    """Collect identifiers, assigned names and declared names of a subtree."""
+
+    def __init__(self):
+        self.read: Set[str] = set()
+        self.assigned: Set[str] = set()
+        self.declared: Set[str] = set()
+
+    def visit_identifier(self, node, o=None):
+        self.read.add(node.name)
+
+    def visit_id_lhs(self, node, o=None):
+        self.assigned.add(node.name)
+
+    def visit_for_statement(self, node, o=None):
+        self.assigned.add(node.variable)
+        super().visit_for_statement(node, o)
+
+    def visit_variable(self, node, o=None):
+        self.declared.add(node.name)
+        super().visit_variable(node, o)
+
+    def visit_parameter(self, node, o=None):
+        self.declared.add(node.name)
+
+
+class _Aliased(ReferenceAwareTransformer):
+    """Collect the names bound to a reference anywhere in a member."""
+
+    def __init__(self, parent: ReferenceAwareTransformer):
+        super().__init__()
+        self.method_ref_positions = parent.method_ref_positions
+        self.ctor_ref_positions = parent.ctor_ref_positions
+        self.names: Set[str] = set()
+
+    def visit_identifier(self, node, o=None):
+        if o == LOCATION:
+            self.names.add(node.name)
+        return node
+
+    def visit_parameter(self, node, o=None):
+        if isinstance(node.param_type, ReferenceType):
+            self.names.add(node.name)
+        return node
+
+    def visit_variable_decl(self, node, o=None):
+        if isinstance(node.var_type, ReferenceType):
+            self.names.update(var.name for var in node.variables)
+        return super().visit_variable_decl(node, o)
+
+
+class _Rewrite(ReferenceAwareTransformer):
+    """Replace invariant expressions and reducible indices inside one loop body."""
+
+    def __init__(self, loop: "LoopOptimizer", variable: str, variant: Set[str], counted: bool):
+        super().__init__()
+        self.method_ref_positions = loop.method_ref_positions
+        self.ctor_ref_positions = loop.ctor_ref_positions
+        self.loop = loop
+        self.variable = variable
+        self.variant = variant
+        self.counted = counted
+        # source text -> (temporary, expression, type)
+        self.hoisted: Dict[str, Tuple[str, Expr, Type]] = {}
+        # source text -> (temporary, initial expression, step)
+        self.induction: Dict[str, Tuple[str, Expr, Expr]] = {}
+
+    def cannot_fail(self, expr: Expr) -> bool:
+        """Whether expr is arithmetic over literals and names that can neither fail nor have effects."""
+        if isinstance(expr, IntLiteral):
+            return INT_MIN <= expr.value <= INT_MAX
+        if isinstance(expr, (FloatLiteral, BoolLiteral, StringLiteral, Identifier)):
+            return True
+        # int +, - and * overflow beyond 64 bits; float arithmetic never fails
+        overflows = type_name(self.loop.types.type_of(expr)) != "float"
+        if isinstance(expr, UnaryOp):
+            return not (expr.operator == "-" and overflows) and self.cannot_fail(expr.operand)
+        if isinstance(expr, BinaryOp):
+            if expr.operator in ("/", "\\", "%") or expr.operator in ("+", "-", "*") and overflows:
+                return False
+            return self.cannot_fail(expr.left) and self.cannot_fail(expr.right)
+        return False
+
+    def invariant(self, expr: Expr) -> bool:
+        names = _Names()
+        names.visit(expr)
+        return (self.cannot_fail(expr) and not names.read & self.variant
+                and all(self.loop.is_local(name) and name not in self.loop.aliased for name in names.read))
+
+    def _hoist(self, node: Expr, o) -> Optional[Expr]:
+        if o == LOCATION or not self.invariant(node):
+            return None
+        names = _Names()
+        names.visit(node)
+        t = self.loop.types.type_of(node)
+        if not names.read or not isinstance(strip_reference(t), PrimitiveType):
+            return None
+        key = str(node)
+        if key not in self.hoisted:
+            self.hoisted[key] = (self.loop.temporary("inv"), node, strip_reference(t))
+        return Identifier(self.hoisted[key][0])
+
+    def visit_binary_op(self, node, o=None):
+        return self._hoist(node, o) or super().visit_binary_op(node, o)
+
+    def visit_unary_op(self, node, o=None):
+        return self._hoist(node, o) or super().visit_unary_op(node, o)
+
+    def _step(self, expr: Expr) -> Optional[Expr]:
+        """Return c when expr is i * c or c * i with c an invariant int literal or name."""
+        if not isinstance(expr, BinaryOp) or expr.operator != "*":
+            return None
+        for var, step in ((expr.left, expr.right), (expr.right, expr.left)):
+            if (isinstance(var, Identifier) and var.name == self.variable
+                    and (isinstance(step, IntLiteral)
+                         or isinstance(step, Identifier) and self.invariant(step)
+                         and strip_reference(self.loop.types.type_of(step)) == INT)):
+                return step
+        return None
+
+    def visit_array_access(self, node, o=None):
+        index = node.index
+        step = self._step(index)
+        if step is None and isinstance(index, BinaryOp) and index.operator in ("+", "-"):
+            offset = index.right
+            if isinstance(offset, IntLiteral) or isinstance(offset, Identifier) and self.invariant(offset):
+                step = self._step(index.left)
+        if step is None or not self.counted:
+            return super().visit_array_access(node, o)
+        key = str(index)
+        if key not in self.induction:
+            self.induction[key] = (self.loop.temporary("idx"), index, step)
+        node.index = Identifier(self.induction[key][0])
+        return node
+
+
+class _Advance(ReferenceAwareTransformer):
+    """Advance induction temporaries before each continue of the loop being rewritten."""
+
+    def __init__(self, steps: List[Statement]):
+        super().__init__()
+        self.steps = steps
+
+    def visit_for_statement(self, node, o=None):
+        # continue statements of nested loops belong to those loops
+        return node
+
+    def visit_continue_statement(self, node, o=None):
+        return copy.deepcopy(self.steps) + [node]
+
+
+class LoopOptimizer(ReferenceAwareTransformer):
+    """Optimise the for statements of a Program in place."""
+
+    def __init__(self):
+        super().__init__()
+        self.types: Optional[TypeInference] = None
+        self.class_name = ""
+        self.where = ""
+        self.scopes: List[Set[str]] = []
+        self.aliased: Set[str] = set()
+        self.taken: Set[str] = set()
+        self.notes: List[str] = []
+
+    def optimize(self, program: Program) -> Program:
+        self.prepare(program)
+        self.types = TypeInference()
+        self.types.infer(program)
+        return self.visit(program)
+
+    def temporary(self, prefix: str) -> str:
+        n = 1
+        while f"_{prefix}{n}" in self.taken:
+            n += 1
+        self.taken.add(f"_{prefix}{n}")
+        return f"_{prefix}{n}"
+
+    def is_local(self, name: str) -> bool:
+        return any(name in scope for scope in self.scopes)
+
+    # ------------------------------------------------------------------
+    # Members and scopes
+    # ------------------------------------------------------------------
+
+    def visit_class_decl(self, node, o=None):
+        self.class_name = node.name
+        return super().visit_class_decl(node, o)
+
+    def _member(self, node, params: List[Parameter]):
+        self.where = f"{self.class_name}.{node.name}"
+        aliased = _Aliased(self)
+        aliased.visit(node)
+        self.aliased = aliased.names
+        names = _Names()
+        names.visit(node)
+        self.taken = names.read | names.assigned | names.declared
+        self.scopes = [{p.name for p in params}]
+        node.body = self._statement(node.body, None)
+        self.scopes = []
+        return node
+
+    def visit_method_decl(self, node, o=None):
+        self.returns_ref = isinstance(node.return_type, ReferenceType)
+        self._member(node, node.params)
+        self.returns_ref = False
+        return node
+
+    def visit_constructor_decl(self, node, o=None):
+        return self._member(node, node.params)
+
+    def visit_destructor_decl(self, node, o=None):
+        return self._member(node, [])
+
+    def visit_block_statement(self, node, o=None):
+        self.scopes.append({var.name for decl in node.var_decls for var in decl.variables})
+        node = super().visit_block_statement(node, o)
+        self.scopes.pop()
+        return node
+
+    # ------------------------------------------------------------------
+    # Loops
+    # ------------------------------------------------------------------
+
+    def visit_for_statement(self, node, o=None):
+        declared = self.is_local(node.variable)
+        if not declared and self.types.class_table.lookup_attribute(self.class_name, node.variable):
+            # the loop runs over an attribute, which calls in the body may change
+            return super().visit_for_statement(node, o)
+        if not declared and self.scopes:
+            # an undeclared loop variable is declared in the enclosing scope
+            self.scopes[-1].add(node.variable)
+        node = super().visit_for_statement(node, o)
+
+        names = _Names()
+        names.visit(node.body)
+        node.counted = node.variable not in names.assigned and node.variable not in self.aliased
+        if not declared or node.variable in self.aliased:
+            return node
+
+        variant = names.assigned | names.declared | {node.variable}
+        rewrite = _Rewrite(self, node.variable, variant, node.counted)
+        node.body = rewrite._statement(node.body, None)
+        if not rewrite.hoisted and not rewrite.induction:
+            return node
+
+        var_decls, statements = [], []
+        for name, expr, t in rewrite.hoisted.values():
+            var_decls.append(VariableDecl(False, t, [Variable(name, expr)]))
+            self.notes.append(f"{self.where}: hoisted {name}")
+        if rewrite.induction:
+            # evaluate the start once into the loop variable so the temporaries can use it
+            statements.append(AssignmentStatement(IdLHS(node.variable), node.start_expr))
+            node.start_expr = Identifier(node.variable)
+            steps = []
+            for name, index, step in rewrite.induction.values():
+                var_decls.append(VariableDecl(False, PrimitiveType("int"), [Variable(name)]))
+                statements.append(AssignmentStatement(IdLHS(name), index))
+                advance = BinaryOp(Identifier(name), "+" if node.direction == "to" else "-", copy.deepcopy(step))
+                steps.append(AssignmentStatement(IdLHS(name), advance))
+                self.notes.append(f"{self.where}: strength-reduced {name}")
+            node.body = BlockStatement([], [_Advance(steps)._statement(node.body, None)] + copy.deepcopy(steps))
+        return BlockStatement(var_decls, statements + [node])
@@ -0,0 +1,54 @@
+"""
+Optimisation pipeline for OPLang programs.
+This module runs the AST passes of src/optimizer in order; every
+execution backend accepts the optimised Program unchanged.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from src.utils.nodes import Program
+from src.optimizer.constant_folding import ConstantFolder
+from src.optimizer.dead_code import DeadCodeEliminator
+from src.optimizer.inlining import Inliner
+from src.optimizer.loops import LoopOptimizer
+
+
+def _dead_code(program: Program, report: List[str]) -> Program:
+    eliminator = DeadCodeEliminator()
+    program = eliminator.eliminate(program)
+    report.extend(eliminator.removed)
+    return program
+
+
+def _inline(program: Program, report: List[str]) -> Program:
+    inliner = Inliner()
+    program = inliner.inline(program)
+    report.extend(inliner.inlined)
+    return program
+
+
+def _loops(program: Program, report: List[str]) -> Program:
+    optimizer = LoopOptimizer()
+    program = optimizer.optimize(program)
+    report.extend(optimizer.notes)
+    return program
+
+
+# Passes in the order they run; each rewrites a Program and may append
+# notes on what it changed to the report
+PASSES: Dict[str, Callable[[Program, List[str]], Program]] = {
+    "inline": _inline,
+    "fold": lambda program, report: ConstantFolder().fold(program),
+    "dce": _dead_code,
+    "loops": _loops,
+}
+
+
+def optimize(program: Program, passes: Optional[List[str]] = None,
+             report: Optional[List[str]] = None) -> Program:
+    """Run the named passes (all of them by default) over program."""
+    report = report if report is not None else []
+    for name, run in PASSES.items():
+        if passes is None or name in passes:
+            program = run(program, report)
+    return program
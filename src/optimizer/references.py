@@ -0,0 +1,75 @@
+"""
+Reference contexts for AST passes.
+A pass that replaces an expression must not turn a value into an lvalue
+where a reference is bound, or the reference would alias the lvalue
+instead of a copy. This module marks those positions: arguments for
+reference parameters, initialisers of reference variables and values
+returned from methods returning a reference.
+"""
+
+from typing import Dict, Set
+
+from src.utils.nodes import *
+from src.utils.visitor import ASTTransformer
+
+
+# Context marking an expression whose location, not just value, may be taken
+LOCATION = "location"
+
+
+class ReferenceAwareTransformer(ASTTransformer):
+    """ASTTransformer visiting expressions bound by a reference with o == LOCATION.
+
+    Call prepare(program) before visiting. Reference parameters are known
+    by method name (any class) and by constructor class.
+    """
+
+    def __init__(self):
+        self.method_ref_positions: Dict[str, Set[int]] = {}
+        self.ctor_ref_positions: Dict[str, Set[int]] = {}
+        self.returns_ref = False
+
+    def prepare(self, program: Program):
+        for class_decl in program.class_decls:
+            for member in class_decl.members:
+                if isinstance(member, MethodDecl):
+                    table, name = self.method_ref_positions, member.name
+                elif isinstance(member, ConstructorDecl):
+                    table, name = self.ctor_ref_positions, class_decl.name
+                else:
+                    continue
+                positions = table.setdefault(name, set())
+                for i, param in enumerate(member.params):
+                    if isinstance(param.param_type, ReferenceType):
+                        positions.add(i)
+
+    def visit_method_decl(self, node, o=None):
+        self.returns_ref = isinstance(node.return_type, ReferenceType)
+        node.body = self._statement(node.body, o)
+        self.returns_ref = False
+        return node
+
+    def visit_variable_decl(self, node, o=None):
+        context = LOCATION if isinstance(node.var_type, ReferenceType) else None
+        node.variables = [self.visit(var, context) for var in node.variables]
+        return node
+
+    def visit_return_statement(self, node, o=None):
+        if node.value:
+            node.value = self.visit(node.value, LOCATION if self.returns_ref else None)
+        return node
+
+    def visit_method_call(self, node, o=None):
+        positions = self.method_ref_positions.get(node.method_name, ())
+        node.args = [self.visit(arg, LOCATION if i in positions else None) for i, arg in enumerate(node.args)]
+        return node
+
+    def visit_object_creation(self, node, o=None):
+        positions = self.ctor_ref_positions.get(node.class_name, ())
+        node.args = [self.visit(arg, LOCATION if i in positions else None) for i, arg in enumerate(node.args)]
+        return node
+
+    def visit_postfix_expression(self, node, o=None):
+        node.primary = self.visit(node.primary)
+        node.postfix_ops = [self.visit(op) for op in node.postfix_ops]
+        return node
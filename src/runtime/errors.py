@@ -0,0 +1,7 @@
+class OPLangRuntimeError(Exception):
+    def __init__(self, msg):
+        self.message = "Runtime Error: " + msg
+        super().__init__(self.message)
+
+    def __str__(self):
+        return self.message
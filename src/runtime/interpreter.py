@@ -0,0 +1,463 @@
+"""
+Tree-walking interpreter for OPLang programs.
+This module executes a Program AST directly through the visitor
+interface: statements are visited for their effects and expressions
+for their values.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable, IO_CLASS
+from src.semantics.type_inference import TypeInference
+from src.analysis.lifetimes import LifetimeAnalysis
+from src.runtime.errors import OPLangRuntimeError
+from src.runtime.io_runtime import IORuntime
+from src.runtime.layout import ClassLayout, SlotResolver, compute_layouts
+from src.runtime.stack import run_with_large_stack
+from src.runtime.values import *
+
+
+class _Break(Exception):
+    pass
+
+
+class _Continue(Exception):
+    pass
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class Frame:
+    """Activation record of one method invocation."""
+
+    __slots__ = ("this", "class_name", "scopes", "returns_ref")
+
+    def __init__(self, this: Optional[Instance], class_name: str, returns_ref: bool = False):
+        self.this = this
+        self.class_name = class_name
+        self.scopes: List[Dict[str, Any]] = [{}]
+        self.returns_ref = returns_ref
+
+    def lookup(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def declare(self, name: str, location):
+        self.scopes[-1][name] = location
+
+
+class Interpreter(BaseVisitor):
+    """Execute a Program starting from its parameterless main method.
+
+    Local variables, parameters and static attributes live in Cells so
+    that reference variables and reference parameters can alias them.
+    Destructors run when the block owning the object ends, for the locals
+    found by src/analysis/lifetimes.py, and otherwise at program end,
+    most recently created first. Instances store their attributes
+    by slot (src/runtime/layout.py); member accesses on receivers of a
+    statically known class use the slot resolved before the program runs.
+    """
+
+    def __init__(self, program: Program, io: Optional[IORuntime] = None):
+        self.program = program
+        self.class_table = ClassTable(program)
+        self.layouts: Dict[str, ClassLayout] = compute_layouts(self.class_table)
+        self.inference = TypeInference()
+        self.inference.infer(program)
+        SlotResolver(self.layouts, self.inference).resolve(program)
+        LifetimeAnalysis(self.class_table).analyze(program)
+        self.io = io if io is not None else IORuntime()
+        self.statics: Dict[str, Dict[str, Cell]] = {}
+        self.owners: Dict[int, str] = {}
+        self.live = LiveObjects()
+        for name, class_decl in self.class_table.classes.items():
+            for member in class_decl.members:
+                if not isinstance(member, AttributeDecl):
+                    self.owners[id(member)] = name
+
+    def run(self):
+        run_with_large_stack(self._run)
+
+    def _run(self):
+        try:
+            self._init_statics()
+            class_name, main = self._find_main()
+            ctor = self.class_table.find_constructor(class_name, [])
+            this = None if main.is_static else self._new(class_name, [], None, ctor)
+            self.invoke(main, this, [])
+            while self.live:
+                self._destroy(self.live.pop())
+        except RecursionError:
+            raise OPLangRuntimeError("Stack overflow") from None
+        except OverflowError:
+            raise OPLangRuntimeError("Integer overflow") from None
+        finally:
+            self.io.flush()
+
+    def _find_main(self):
+        for class_decl in self.program.class_decls:
+            main = self.class_table.methods[class_decl.name].get("main")
+            if main and not main.params:
+                return class_decl.name, main
+        raise OPLangRuntimeError("No entry point main()")
+
+    def _init_statics(self):
+        for name, class_decl in self.class_table.classes.items():
+            cells = self.statics[name] = {}
+            frame = Frame(None, name)
+            for member in class_decl.members:
+                if isinstance(member, AttributeDecl) and member.is_static:
+                    for attr in member.attributes:
+                        cells[attr.name] = Cell(
+                            self.visit(attr.init_value, frame)
+                            if attr.init_value
+                            else default_value(member.attr_type)
+                        )
+
+    # ------------------------------------------------------------------
+    # Objects and invocation
+    # ------------------------------------------------------------------
+
+    def _new(self, class_name: str, arg_nodes: List[Expr], frame: Optional[Frame],
+             ctor: Optional[ConstructorDecl]) -> Instance:
+        if class_name not in self.class_table:
+            raise OPLangRuntimeError(f"Undeclared class {class_name}")
+        if ctor is None and arg_nodes:
+            raise OPLangRuntimeError(f"No constructor of {class_name} takes {len(arg_nodes)} arguments")
+        args = self._arguments(ctor.params, arg_nodes, frame) if ctor else []
+        layout = self.layouts[class_name]
+        obj = Instance(layout)
+        init_frame = Frame(obj, class_name)
+        for decl, attr in self.class_table.instance_attributes(class_name):
+            obj.fields[layout.slots[attr.name]] = (
+                self.visit(attr.init_value, init_frame)
+                if attr.init_value
+                else default_value(decl.attr_type)
+            )
+        if ctor:
+            self.invoke(ctor, obj, args)
+        if self.class_table.find_destructor(class_name):
+            self.live.add(obj)
+        return obj
+
+    def _destroy(self, obj: Instance):
+        dtor = self.class_table.find_destructor(obj.class_name)
+        if dtor:
+            self.invoke(dtor, obj, [])
+
+    def _arguments(self, params: List[Parameter], arg_nodes: List[Expr], frame: Frame) -> List[Any]:
+        """Evaluate arguments left to right; reference parameters receive locations."""
+        if len(params) != len(arg_nodes):
+            raise OPLangRuntimeError(f"Expected {len(params)} arguments but got {len(arg_nodes)}")
+        args = []
+        for param, arg in zip(params, arg_nodes):
+            if isinstance(param.param_type, ReferenceType):
+                args.append(self._location(arg, frame) or Cell(self.visit(arg, frame)))
+            else:
+                args.append(Cell(self.visit(arg, frame)))
+        return args
+
+    def invoke(self, method, this: Optional[Instance], args: List[Any], want_location: bool = False):
+        """Run method with already-evaluated argument locations."""
+        returns_ref = isinstance(getattr(method, "return_type", None), ReferenceType)
+        frame = Frame(this, self.owners[id(method)], returns_ref)
+        scope = frame.scopes[0]
+        for param, location in zip(getattr(method, "params", ()), args):
+            scope[param.name] = location
+        try:
+            self.visit(method.body, frame)
+        except _Return as ret:
+            result = ret.value
+        else:
+            return Cell(None) if want_location else None
+        if returns_ref:
+            return result if want_location else result.value
+        return Cell(result) if want_location else result
+
+    def _call(self, receiver, node: MethodCall, frame: Frame, want_location: bool = False):
+        if isinstance(receiver, ClassRef):
+            name = receiver.name
+            if name == IO_CLASS and name not in self.class_table:
+                result = self.io.call(node.method_name, [self.visit(a, frame) for a in node.args])
+                return Cell(result) if want_location else result
+            this = None
+        elif isinstance(receiver, Instance):
+            name, this = receiver.class_name, receiver
+        elif receiver is None:
+            raise OPLangRuntimeError(f"Nil reference calling {node.method_name}")
+        else:
+            raise OPLangRuntimeError(f"Cannot call {node.method_name} on a non-object")
+        method = self.class_table.vtable(name).get(node.method_name)
+        if method is None:
+            raise OPLangRuntimeError(f"Undeclared method {name}.{node.method_name}")
+        args = self._arguments(method.params, node.args, frame)
+        return self.invoke(method, None if method.is_static else this, args, want_location)
+
+    # ------------------------------------------------------------------
+    # Names and locations
+    # ------------------------------------------------------------------
+
+    def _static_cell(self, class_name: str, name: str) -> Optional[Cell]:
+        for owner in self.class_table.chain(class_name):
+            cell = self.statics[owner].get(name)
+            if cell is not None:
+                return cell
+        return None
+
+    def _name_location(self, name: str, frame: Frame):
+        location = frame.lookup(name)
+        if location is not None:
+            return location
+        if frame.this is not None:
+            slot = frame.this.layout.slots.get(name)
+            if slot is not None:
+                return FieldRef(frame.this, slot)
+        return self._static_cell(frame.class_name, name)
+
+    def _member_location(self, receiver, name: str, slot: Optional[int] = None):
+        if isinstance(receiver, Instance):
+            if slot is None:
+                slot = receiver.layout.slots.get(name)
+            if slot is None:
+                cell = self._static_cell(receiver.class_name, name)
+                if cell is None:
+                    raise OPLangRuntimeError(f"Undeclared attribute {name}")
+                return cell
+            return FieldRef(receiver, slot)
+        if isinstance(receiver, ClassRef):
+            cell = self._static_cell(receiver.name, name)
+            if cell is None:
+                raise OPLangRuntimeError(f"Undeclared attribute {receiver.name}.{name}")
+            return cell
+        if receiver is None:
+            raise OPLangRuntimeError(f"Nil reference accessing {name}")
+        raise OPLangRuntimeError(f"Cannot access {name} on a non-object")
+
+    def _location(self, expr: Expr, frame: Frame):
+        """Return the storage location denoted by expr, or None if it is not an lvalue."""
+        if isinstance(expr, Identifier):
+            return self._name_location(expr.name, frame)
+        if isinstance(expr, ParenthesizedExpression):
+            return self._location(expr.expr, frame)
+        if isinstance(expr, PostfixExpression):
+            value = self.visit(expr.primary, frame)
+            for op in expr.postfix_ops[:-1]:
+                value = self.visit(op, (value, frame))
+            last = expr.postfix_ops[-1]
+            if isinstance(last, MemberAccess):
+                return self._member_location(value, last.member_name, last.slot)
+            if isinstance(last, ArrayAccess):
+                index = self.visit(last.index, frame)
+                return ElementRef(value, check_index(value, index))
+            return self._call(value, last, frame, want_location=True)
+        return None
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visit_block_statement(self, node, o=None):
+        o.scopes.append({})
+        try:
+            for decl in node.var_decls:
+                self.visit(decl, o)
+            for stmt in node.statements:
+                self.visit(stmt, o)
+        except (_Break, _Continue, _Return):
+            if node.scoped:
+                self._end_scope(node, o.scopes[-1])
+            raise
+        else:
+            if node.scoped:
+                self._end_scope(node, o.scopes[-1])
+        finally:
+            o.scopes.pop()
+
+    def _end_scope(self, node: BlockStatement, scope: Dict[str, Any]):
+        """Destroy the objects owned by the locals of a block that is being left."""
+        for name in reversed(node.scoped):
+            obj = scope[name].value
+            if self.live.release(obj):
+                self._destroy(obj)
+                obj.fields.clear()
+
+    def visit_variable_decl(self, node, o=None):
+        is_ref = isinstance(node.var_type, ReferenceType)
+        for var in node.variables:
+            if var.init_value is None:
+                location = Cell(default_value(node.var_type))
+            elif is_ref:
+                location = self._location(var.init_value, o) or Cell(self.visit(var.init_value, o))
+            else:
+                location = Cell(self.visit(var.init_value, o))
+            o.declare(var.name, location)
+
+    def visit_assignment_statement(self, node, o=None):
+        lhs = node.lhs
+        if isinstance(lhs, IdLHS):
+            location = self._name_location(lhs.name, o)
+            if location is None:
+                raise OPLangRuntimeError(f"Undeclared identifier {lhs.name}")
+        else:
+            location = self._location(lhs.postfix_expr, o)
+        location.value = self.visit(node.rhs, o)
+
+    def visit_if_statement(self, node, o=None):
+        if self.visit(node.condition, o):
+            self.visit(node.then_stmt, o)
+        elif node.else_stmt:
+            self.visit(node.else_stmt, o)
+
+    def visit_for_statement(self, node, o=None):
+        start = self.visit(node.start_expr, o)
+        location = self._name_location(node.variable, o)
+        if location is None:
+            location = Cell()
+            o.declare(node.variable, location)
+        location.value = start
+        end = self.visit(node.end_expr, o)
+        up = node.direction == "to"
+        step = 1 if up else -1
+        while location.value <= end if up else location.value >= end:
+            try:
+                self.visit(node.body, o)
+            except _Break:
+                break
+            except _Continue:
+                pass
+            location.value += step
+        # the step after the last iteration of a loop ending at INT_MAX or INT_MIN
+        check_int(location.value)
+
+    def visit_break_statement(self, node, o=None):
+        raise _Break()
+
+    def visit_continue_statement(self, node, o=None):
+        raise _Continue()
+
+    def visit_return_statement(self, node, o=None):
+        if node.value is None:
+            raise _Return(Cell(None) if o.returns_ref else None)
+        if o.returns_ref:
+            raise _Return(self._location(node.value, o) or Cell(self.visit(node.value, o)))
+        raise _Return(self.visit(node.value, o))
+
+    def visit_method_invocation_statement(self, node, o=None):
+        self.visit(node.method_call, o)
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visit_binary_op(self, node, o=None):
+        op = node.operator
+        left = self.visit(node.left, o)
+        if op == "&&":
+            return left and self.visit(node.right, o)
+        if op == "||":
+            return left or self.visit(node.right, o)
+        right = self.visit(node.right, o)
+        if op == "+":
+            return check_int(left + right)
+        if op == "-":
+            return check_int(left - right)
+        if op == "*":
+            return check_int(left * right)
+        if op == "/":
+            return float_div(left, right)
+        if op == "\\":
+            return int_div(left, right)
+        if op == "%":
+            return int_mod(left, right)
+        if op == "^":
+            return left + right
+        if op == "==":
+            return left == right
+        if op == "!=":
+            return left != right
+        if op == "<":
+            return left < right
+        if op == ">":
+            return left > right
+        if op == "<=":
+            return left <= right
+        if op == ">=":
+            return left >= right
+        raise OPLangRuntimeError(f"Unknown operator {op}")
+
+    def visit_unary_op(self, node, o=None):
+        value = self.visit(node.operand, o)
+        if node.operator == "!":
+            return not value
+        if node.operator == "-":
+            return check_int(-value)
+        return value
+
+    def visit_postfix_expression(self, node, o=None):
+        value = self.visit(node.primary, o)
+        for op in node.postfix_ops:
+            value = self.visit(op, (value, o))
+        return value
+
+    def visit_method_call(self, node, o=None):
+        receiver, frame = o
+        return self._call(receiver, node, frame)
+
+    def visit_member_access(self, node, o=None):
+        receiver, _ = o
+        if node.slot is not None and type(receiver) is Instance:
+            return receiver.fields[node.slot]
+        return self._member_location(receiver, node.member_name).value
+
+    def visit_array_access(self, node, o=None):
+        receiver, frame = o
+        index = self.visit(node.index, frame)
+        return receiver[check_index(receiver, index)]
+
+    def visit_object_creation(self, node, o=None):
+        return self._new(node.class_name, node.args, o, self.inference.constructor_of(node))
+
+    def visit_identifier(self, node, o=None):
+        location = self._name_location(node.name, o)
+        if location is not None:
+            return location.value
+        if node.name in self.class_table or node.name == IO_CLASS:
+            return ClassRef(node.name)
+        raise OPLangRuntimeError(f"Undeclared identifier {node.name}")
+
+    def visit_this_expression(self, node, o=None):
+        return o.this
+
+    def visit_parenthesized_expression(self, node, o=None):
+        return self.visit(node.expr, o)
+
+    def visit_nil_check(self, node, o=None):
+        value = self.visit(node.expr, o)
+        if value is None:
+            raise OPLangRuntimeError(f"Nil reference calling {node.method_name}")
+        return value
+
+    def visit_int_literal(self, node, o=None):
+        return check_int(node.value)
+
+    def visit_float_literal(self, node, o=None):
+        return node.value
+
+    def visit_bool_literal(self, node, o=None):
+        return node.value
+
+    def visit_string_literal(self, node, o=None):
+        return decode_string(node.value)
+
+    def visit_array_literal(self, node, o=None):
+        return array_of([self.visit(elem, o) for elem in node.value], self.inference.type_of(node))
+
+    def visit_nil_literal(self, node, o=None):
+        return None
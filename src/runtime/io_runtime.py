@@ -0,0 +1,151 @@
+"""
+Runtime implementation of the OPLang io class.
+This module provides IORuntime, whose methods are the static methods of
+the built-in io class listed in the specification.
+
+Output is collected in a buffer and written to stdout in batches: when
+the buffer holds BATCH pieces, when the program ends (engines call flush
+even when a runtime error stops it) and before a read from an
+interactive stdin, so prompts are shown. Input stays line-based, but a
+non-interactive stdin is read in blocks of BLOCK characters and split
+into lines in bulk instead of calling readline once per read.
+"""
+
+import io
+import sys
+from typing import List, Optional, TextIO
+
+from src.runtime.errors import OPLangRuntimeError
+from src.runtime.values import INT_MAX, INT_MIN
+from src.semantics.type_inference import IO_METHODS
+
+
+# pieces of output buffered before they are written to stdout
+BATCH = 4096
+# characters read from a non-interactive stdin at a time
+BLOCK = 1 << 16
+
+
+def _isatty(stream: TextIO) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+class IORuntime:
+    """The io class, reading one line per read call."""
+
+    def __init__(self, stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None,
+                 batch: int = BATCH):
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.stdout = stdout if stdout is not None else sys.stdout
+        self.batch = batch
+        self.interactive = _isatty(self.stdin)
+        self.out: List[str] = []
+        # complete input lines not read yet, and the unterminated rest of the last block
+        self.lines: List[str] = []
+        self.next_line = 0
+        self.rest = ""
+
+    @classmethod
+    def in_memory(cls, stdin: str = "") -> "IORuntime":
+        """An io class reading stdin from a string and writing to a StringIO."""
+        return cls(io.StringIO(stdin), io.StringIO())
+
+    def output(self) -> str:
+        """Flush and return everything written, for an in-memory stdout."""
+        self.flush()
+        return self.stdout.getvalue()
+
+    def call(self, name: str, args):
+        if name not in IO_METHODS:
+            raise OPLangRuntimeError(f"Undeclared method io.{name}")
+        return getattr(self, name)(*args)
+
+    def _write(self, text: str):
+        out = self.out
+        out.append(text)
+        if len(out) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if self.out:
+            self.stdout.write("".join(self.out))
+            self.out.clear()
+        self.stdout.flush()
+
+    def _fill(self) -> bool:
+        """Read the next block of input into lines; False at end of input."""
+        if self.interactive:
+            self.flush()
+            line = self.stdin.readline()
+            if not line:
+                return False
+            self.lines, self.next_line = [line.rstrip("\r\n")], 0
+            return True
+        block = self.stdin.read(BLOCK)
+        if not block:
+            if not self.rest:
+                return False
+            self.lines, self.next_line, self.rest = [self.rest.rstrip("\r")], 0, ""
+            return True
+        lines = (self.rest + block).split("\n")
+        self.rest = lines.pop()
+        self.lines, self.next_line = [line.rstrip("\r") for line in lines], 0
+        return True
+
+    def _readline(self) -> str:
+        while self.next_line == len(self.lines):
+            if not self._fill():
+                raise OPLangRuntimeError("Unexpected end of input")
+        line = self.lines[self.next_line]
+        self.next_line += 1
+        return line
+
+    def readInt(self) -> int:
+        text = self._readline().strip()
+        try:
+            value = int(text)
+        except ValueError:
+            value = None
+        if value is None or not INT_MIN <= value <= INT_MAX:
+            raise OPLangRuntimeError(f"Invalid integer input: {text}")
+        return value
+
+    def writeInt(self, value: int):
+        self._write(str(value))
+
+    def writeIntLn(self, value: int):
+        self._write(f"{value}\n")
+
+    def readFloat(self) -> float:
+        text = self._readline().strip()
+        try:
+            return float(text)
+        except ValueError:
+            raise OPLangRuntimeError(f"Invalid float input: {text}")
+
+    def writeFloat(self, value: float):
+        self._write(str(float(value)))
+
+    def writeFloatLn(self, value: float):
+        self._write(f"{float(value)}\n")
+
+    def readBool(self) -> bool:
+        return self._readline().strip() == "true"
+
+    def writeBool(self, value: bool):
+        self._write("true" if value else "false")
+
+    def writeBoolLn(self, value: bool):
+        self._write("true\n" if value else "false\n")
+
+    def readStr(self) -> str:
+        return self._readline()
+
+    def writeStr(self, value: str):
+        self._write(value)
+
+    def writeStrLn(self, value: str):
+        self._write(value + "\n")
@@ -0,0 +1,99 @@
+"""
+Object layout shared by the OPLang execution engines.
+Every class gets a ClassLayout assigning each instance attribute a fixed
+slot: the slots of the superclass come first, in the same order, so a
+slot index denotes the same attribute in every subclass. An attribute
+redeclared in a subclass keeps the slot of the inherited one.
+
+Instances then store their attributes in a list indexed by slot, and
+member accesses whose receiver has a statically known class can be
+resolved to a slot before the program runs.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable
+from src.semantics.type_inference import TypeInference
+
+
+class ClassLayout:
+    """Field slots of the instances of one class."""
+
+    __slots__ = ("name", "superclass", "slots", "attributes")
+
+    def __init__(self, name: str, superclass: Optional["ClassLayout"] = None):
+        self.name = name
+        self.superclass = superclass
+        self.slots: Dict[str, int] = dict(superclass.slots) if superclass else {}
+        # the declaration of the attribute stored in each slot
+        self.attributes: List[Tuple[AttributeDecl, Attribute]] = list(superclass.attributes) if superclass else []
+
+    def add(self, decl: AttributeDecl, attr: Attribute) -> int:
+        slot = self.slots.get(attr.name)
+        if slot is None:
+            slot = self.slots[attr.name] = len(self.attributes)
+            self.attributes.append((decl, attr))
+        else:
+            self.attributes[slot] = (decl, attr)
+        return slot
+
+    def __len__(self):
+        return len(self.attributes)
+
+    def __repr__(self):
+        return f"<layout {self.name} {list(self.slots)}>"
+
+
+def compute_layouts(class_table: ClassTable) -> Dict[str, ClassLayout]:
+    """Lay out every class of class_table, superclasses before subclasses."""
+    layouts: Dict[str, ClassLayout] = {}
+
+    def layout_of(name: str, pending: Tuple[str, ...] = ()) -> ClassLayout:
+        layout = layouts.get(name)
+        if layout is None:
+            class_decl = class_table.classes[name]
+            parent = class_decl.superclass
+            # a class in a cyclic hierarchy is laid out without its superclass
+            inherited = (parent in class_table.classes and parent not in pending and parent != name)
+            superclass = layout_of(parent, pending + (name,)) if inherited else None
+            layout = layouts[name] = ClassLayout(name, superclass)
+            for member in class_decl.members:
+                if isinstance(member, AttributeDecl) and not member.is_static:
+                    for attr in member.attributes:
+                        layout.add(member, attr)
+        return layout
+
+    for name in class_table.classes:
+        layout_of(name)
+    return layouts
+
+
+class SlotResolver(BaseVisitor):
+    """Annotate every MemberAccess of a Program with the slot it reads, as node.slot.
+
+    The slot is None unless the receiver's static type is a class with
+    an instance attribute of that name.
+    """
+
+    def __init__(self, layouts: Dict[str, ClassLayout], inference: TypeInference):
+        self.layouts = layouts
+        self.inference = inference
+        self.resolved = 0
+
+    def resolve(self, program: Program) -> int:
+        self.visit(program)
+        return self.resolved
+
+    def visit_postfix_expression(self, node, o=None):
+        self.visit(node.primary, o)
+        receiver = node.primary
+        for op in node.postfix_ops:
+            self.visit(op, o)
+            if isinstance(op, MemberAccess):
+                t = self.inference.type_of(receiver)
+                layout = self.layouts.get(t.class_name) if isinstance(t, ClassType) else None
+                op.slot = layout.slots.get(op.member_name) if layout is not None else None
+                self.resolved += op.slot is not None
+            receiver = op
@@ -0,0 +1,45 @@
+"""
+Deep recursion for the execution engines.
+Every engine runs an OPLang call as one or more nested Python calls, so
+a deeply recursive program needs a higher recursion limit and a larger
+stack than the main thread has. run_with_large_stack runs the program on
+a thread providing both.
+"""
+
+import sys
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# An OPLang call nests about 16 Python frames in the interpreter and fewer
+# in the other engines; the stack is large enough for calls some 10000 deep.
+RECURSION_LIMIT = 200_000
+STACK_SIZE = 512 * 1024 * 1024
+
+
+def run_with_large_stack(function: Callable[[], T]) -> T:
+    """Call function on a thread with a large stack and recursion limit,
+    returning its result or raising its exception."""
+    results = []
+    errors = []
+
+    def target():
+        try:
+            results.append(function())
+        except BaseException as e:
+            errors.append(e)
+
+    limit = sys.getrecursionlimit()
+    stack_size = threading.stack_size(STACK_SIZE)
+    sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(stack_size)
+        sys.setrecursionlimit(limit)
+    if errors:
+        raise errors[0]
+    return results[0]
@@ -0,0 +1,242 @@
+"""
+Runtime values for executing OPLang programs.
+This module defines the storage locations (cells, field and element
+references) used to implement OPLang reference semantics, and the
+object representations shared by the execution engines.
+
+Arrays of int and float elements are stored in typed contiguous arrays
+(array('q') and array('d')) and arrays of booleans in a bytearray, whose
+elements read back as 0 and 1; other arrays are Python lists.
+
+Ints are signed 64-bit in every engine, as on the JVM: an int literal,
+input or arithmetic result outside [INT_MIN, INT_MAX] fails with an
+OverflowError (check_int), which the engines report as an integer
+overflow, and so does storing such an int into an int array.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.utils.nodes import *
+from src.runtime.errors import OPLangRuntimeError
+
+INT_MIN, INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class Cell:
+    """A mutable storage location holding one value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any = None):
+        self.value = value
+
+
+class FieldRef:
+    """Location of an instance attribute by slot, usable wherever a Cell is."""
+
+    __slots__ = ("obj", "slot")
+
+    def __init__(self, obj: "Instance", slot: int):
+        self.obj = obj
+        self.slot = slot
+
+    @property
+    def value(self):
+        return self.obj.fields[self.slot]
+
+    @value.setter
+    def value(self, v):
+        self.obj.fields[self.slot] = v
+
+
+class AttrRef:
+    """Location of a Python attribute (a field of a transpiled object or a
+    static attribute of a transpiled class), usable wherever a Cell is."""
+
+    __slots__ = ("obj", "name")
+
+    def __init__(self, obj: Any, name: str):
+        self.obj = obj
+        self.name = name
+
+    @property
+    def value(self):
+        return getattr(self.obj, self.name)
+
+    @value.setter
+    def value(self, v):
+        setattr(self.obj, self.name, v)
+
+
+class ElementRef:
+    """Location of one array element, usable wherever a Cell is."""
+
+    __slots__ = ("array", "index")
+
+    def __init__(self, array: List[Any], index: int):
+        self.array = array
+        self.index = index
+
+    @property
+    def value(self):
+        return self.array[self.index]
+
+    @value.setter
+    def value(self, v):
+        self.array[self.index] = v
+
+
+class Instance:
+    """An object of a user-defined class; fields are indexed by the slots of its layout."""
+
+    __slots__ = ("class_name", "layout", "fields")
+
+    def __init__(self, layout: "ClassLayout", fields: Optional[List[Any]] = None):
+        self.class_name = layout.name
+        self.layout = layout
+        self.fields = fields if fields is not None else [None] * len(layout)
+
+    def __repr__(self):
+        return f"<{self.class_name} object>"
+
+
+class LiveObjects:
+    """Objects with a destructor that has not run yet, in creation order.
+
+    Counts every tracked object and those released when their scope
+    ended, and keeps the high-water mark of objects alive at once.
+    """
+
+    __slots__ = ("objects", "created", "released", "peak")
+
+    def __init__(self):
+        self.objects: Dict[int, Any] = {}
+        self.created = 0
+        self.released = 0
+        self.peak = 0
+
+    def add(self, obj: Any):
+        self.objects[id(obj)] = obj
+        self.created += 1
+        if len(self.objects) > self.peak:
+            self.peak = len(self.objects)
+
+    def release(self, obj: Any) -> bool:
+        """Stop tracking obj before its scope ends; False if it was not tracked."""
+        if self.objects.pop(id(obj), None) is None:
+            return False
+        self.released += 1
+        return True
+
+    def pop(self) -> Any:
+        """Remove and return the most recently created object."""
+        return self.objects.popitem()[1]
+
+    def __len__(self):
+        return len(self.objects)
+
+
+class ClassRef:
+    """Value of an identifier that names a class, used for static access."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def default_value(t: Type) -> Any:
+    """Return the value of an uninitialised variable of type t."""
+    if isinstance(t, ReferenceType):
+        t = t.referenced_type
+    if isinstance(t, PrimitiveType):
+        return {"int": 0, "float": 0.0, "boolean": False, "string": ""}.get(t.type_name)
+    if isinstance(t, ArrayType):
+        return new_array(t)
+    return None
+
+
+# Typecodes of the typed storage for arrays of each primitive element type
+ARRAY_TYPECODES = {"int": "q", "float": "d"}
+
+
+def new_array(t: ArrayType):
+    """Return the storage of a new array of type t, filled with default values."""
+    element = t.element_type.referenced_type if isinstance(t.element_type, ReferenceType) else t.element_type
+    if isinstance(element, PrimitiveType):
+        if element.type_name == "boolean":
+            return bytearray(t.size)
+        code = ARRAY_TYPECODES.get(element.type_name)
+        if code is not None:
+            return array(code, bytes(8 * t.size))
+    return [default_value(element) for _ in range(t.size)]
+
+
+def array_of(values: List[Any], t: Optional[ArrayType] = None):
+    """Return the storage of an array literal of type t, by default typed by
+    its elements as in type inference."""
+    if t is not None and isinstance(t.element_type, PrimitiveType) and t.element_type.type_name == "float":
+        return array("d", values)
+    if values and all(type(v) is bool for v in values):
+        return bytearray(values)
+    if values and all(type(v) in (int, float) for v in values):
+        return array("d" if any(type(v) is float for v in values) else "q", values)
+    return values
+
+
+def check_index(array: List[Any], index: int) -> int:
+    if array is None:
+        raise OPLangRuntimeError("Nil array access")
+    if not 0 <= index < len(array):
+        raise OPLangRuntimeError(f"Index {index} out of range")
+    return index
+
+
+def check_int(value):
+    """Return an arithmetic result, failing when it is an int beyond 64 bits."""
+    if (value > INT_MAX or value < INT_MIN) and type(value) is int:
+        raise OverflowError("int does not fit in 64 bits")
+    return value
+
+
+def _quotient(a: int, b: int) -> int:
+    if b == 0:
+        raise OPLangRuntimeError("Division by zero")
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def int_div(a: int, b: int) -> int:
+    """Integer division truncating toward zero, as on the JVM."""
+    return check_int(_quotient(a, b))
+
+
+def int_mod(a: int, b: int) -> int:
+    """Remainder with the sign of the dividend, matching int_div."""
+    return a - b * _quotient(a, b)
+
+
+def float_div(a, b) -> float:
+    if b == 0:
+        raise OPLangRuntimeError("Division by zero")
+    return a / b
+
+
+_ESCAPES = {"b": "\b", "f": "\f", "r": "\r", "n": "\n", "t": "\t", '"': '"', "\\": "\\"}
+
+
+def decode_string(text: str) -> str:
+    """Translate the escape sequences kept in a StringLiteral's text."""
+    if "\\" not in text:
+        return text
+    out, i, n = [], 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "\\" and i + 1 < n:
+            out.append(_ESCAPES.get(text[i + 1], text[i + 1]))
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
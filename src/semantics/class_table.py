@@ -0,0 +1,163 @@
+"""
+Class table for OPLang programs.
+This module indexes the class declarations of a Program so that later
+passes can resolve attributes, methods, constructors and destructors
+through the superclass chain without re-scanning member lists.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils.nodes import *
+
+
+IO_CLASS = "io"
+
+
+class ClassTable:
+    """Index of the classes declared in a Program."""
+
+    def __init__(self, program: Program):
+        self.classes: Dict[str, ClassDecl] = {}
+        self.attributes: Dict[str, Dict[str, Tuple[AttributeDecl, Attribute]]] = {}
+        self.methods: Dict[str, Dict[str, MethodDecl]] = {}
+        self.constructors: Dict[str, List[ConstructorDecl]] = {}
+        self.destructors: Dict[str, DestructorDecl] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.vtables: Dict[str, Dict[str, MethodDecl]] = {}
+        for class_decl in program.class_decls:
+            self.add_class(class_decl)
+
+    def add_class(self, class_decl: ClassDecl):
+        name = class_decl.name
+        self.classes[name] = class_decl
+        self.vtables.clear()
+        attrs, methods, ctors = {}, {}, []
+        for member in class_decl.members:
+            if isinstance(member, AttributeDecl):
+                for attr in member.attributes:
+                    attrs[attr.name] = (member, attr)
+            elif isinstance(member, MethodDecl):
+                methods[member.name] = member
+            elif isinstance(member, ConstructorDecl):
+                ctors.append(member)
+            elif isinstance(member, DestructorDecl):
+                self.destructors[name] = member
+        self.attributes[name] = attrs
+        self.methods[name] = methods
+        self.constructors[name] = ctors
+        if class_decl.superclass:
+            self.children.setdefault(class_decl.superclass, []).append(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.classes
+
+    def chain(self, name: str) -> Iterator[str]:
+        """Yield name and then each of its declared superclasses."""
+        seen = set()
+        while name in self.classes and name not in seen:
+            seen.add(name)
+            yield name
+            name = self.classes[name].superclass
+
+    def is_subclass(self, name: str, ancestor: str) -> bool:
+        return any(c == ancestor for c in self.chain(name))
+
+    def subclasses(self, name: str) -> List[str]:
+        """Return every transitive subclass of name."""
+        result, stack = [], list(self.children.get(name, []))
+        while stack:
+            child = stack.pop()
+            if child not in result:
+                result.append(child)
+                stack.extend(self.children.get(child, []))
+        return result
+
+    def lookup_attribute(
+        self, class_name: str, attr_name: str
+    ) -> Optional[Tuple[AttributeDecl, Attribute]]:
+        for name in self.chain(class_name):
+            found = self.attributes[name].get(attr_name)
+            if found:
+                return found
+        return None
+
+    def lookup_method(self, class_name: str, method_name: str) -> Optional[MethodDecl]:
+        for name in self.chain(class_name):
+            found = self.methods[name].get(method_name)
+            if found:
+                return found
+        return None
+
+    def vtable(self, class_name: str) -> Dict[str, MethodDecl]:
+        """Return the own and inherited methods of class_name by name."""
+        table = self.vtables.get(class_name)
+        if table is None:
+            table = {}
+            for name in reversed(list(self.chain(class_name))):
+                table.update(self.methods[name])
+            self.vtables[class_name] = table
+        return table
+
+    def owner_of_method(self, class_name: str, method_name: str) -> Optional[str]:
+        for name in self.chain(class_name):
+            if method_name in self.methods[name]:
+                return name
+        return None
+
+    def constructors_of(self, class_name: str) -> List[ConstructorDecl]:
+        """Return the constructors of class_name, or those of its nearest
+        superclass declaring any when it declares none of its own."""
+        for name in self.chain(class_name):
+            if self.constructors[name]:
+                return self.constructors[name]
+        return []
+
+    def find_constructor(self, class_name: str, arg_types: List[Optional[Type]]) -> Optional[ConstructorDecl]:
+        """Pick the constructor of class_name whose parameters accept arguments
+        of arg_types, preferring exact matches over conversions. Unknown
+        argument types (None) match anything; when no constructor accepts the
+        types, the first one taking as many arguments is returned."""
+        candidates = [c for c in self.constructors_of(class_name) if len(c.params) == len(arg_types)]
+        best, best_score = None, -1
+        for ctor in candidates:
+            scores = [self._match(p.param_type, t) for p, t in zip(ctor.params, arg_types)]
+            if all(scores) and sum(scores) > best_score:
+                best, best_score = ctor, sum(scores)
+        return best or (candidates[0] if candidates else None)
+
+    def _match(self, param_type: Type, arg_type: Optional[Type]) -> int:
+        """2 when arg_type is param_type, 1 when a value of arg_type converts
+        to param_type (an int to a float, a subclass or nil to a class, or an
+        unknown type) and 0 otherwise."""
+        while isinstance(param_type, ReferenceType):
+            param_type = param_type.referenced_type
+        while isinstance(arg_type, ReferenceType):
+            arg_type = arg_type.referenced_type
+        if arg_type is None:
+            return 1
+        if isinstance(param_type, PrimitiveType) and isinstance(arg_type, PrimitiveType):
+            if param_type.type_name == arg_type.type_name:
+                return 2
+            return int(param_type.type_name == "float" and arg_type.type_name == "int")
+        if isinstance(param_type, ClassType) and isinstance(arg_type, ClassType):
+            if param_type.class_name == arg_type.class_name:
+                return 2
+            return int(arg_type.class_name == "nil" or self.is_subclass(arg_type.class_name, param_type.class_name))
+        if isinstance(param_type, ArrayType) and isinstance(arg_type, ArrayType):
+            return self._match(param_type.element_type, arg_type.element_type) if param_type.size == arg_type.size else 0
+        return 0
+
+    def find_destructor(self, class_name: str) -> Optional[DestructorDecl]:
+        for name in self.chain(class_name):
+            if name in self.destructors:
+                return self.destructors[name]
+        return None
+
+    def instance_attributes(self, class_name: str) -> List[Tuple[AttributeDecl, Attribute]]:
+        """Return instance attributes of class_name, inherited ones first."""
+        result = []
+        for name in reversed(list(self.chain(class_name))):
+            for decl, attr in self.attributes[name].values():
+                if not decl.is_static:
+                    result.append((decl, attr))
+        return result
@@ -0,0 +1,325 @@
+"""
+Type inference for OPLang expressions.
+This module contains the TypeInference pass, which walks a Program once
+and records the static type of every expression node in a side table
+keyed by node id, so later passes can read types in O(1).
+"""
+
+from typing import Dict, List, Optional
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable, IO_CLASS
+
+
+INT = PrimitiveType("int")
+FLOAT = PrimitiveType("float")
+BOOL = PrimitiveType("boolean")
+STRING = PrimitiveType("string")
+VOID = PrimitiveType("void")
+NIL = ClassType("nil")
+
+# Static methods of the built-in io class: name -> (parameter types, return type)
+IO_METHODS = {
+    "readInt": ([], INT),
+    "writeInt": ([INT], VOID),
+    "writeIntLn": ([INT], VOID),
+    "readFloat": ([], FLOAT),
+    "writeFloat": ([FLOAT], VOID),
+    "writeFloatLn": ([FLOAT], VOID),
+    "readBool": ([], BOOL),
+    "writeBool": ([BOOL], VOID),
+    "writeBoolLn": ([BOOL], VOID),
+    "readStr": ([], STRING),
+    "writeStr": ([STRING], VOID),
+    "writeStrLn": ([STRING], VOID),
+}
+
+ARITH_OPS = ("+", "-", "*")
+INT_OPS = ("\\", "%")
+LOGIC_OPS = ("&&", "||")
+ORDER_OPS = ("<", ">", "<=", ">=")
+EQUALITY_OPS = ("==", "!=")
+
+
+def strip_reference(t: Optional[Type]) -> Optional[Type]:
+    """Return the referenced type of a ReferenceType, or t itself."""
+    while isinstance(t, ReferenceType):
+        t = t.referenced_type
+    return t
+
+
+def type_name(t: Optional[Type]) -> Optional[str]:
+    """Return a short name for t: 'int', 'Shape', 'float[5]', ..."""
+    t = strip_reference(t)
+    if isinstance(t, PrimitiveType):
+        return t.type_name
+    if isinstance(t, ClassType):
+        return t.class_name
+    if isinstance(t, ArrayType):
+        return f"{type_name(t.element_type)}[{t.size}]"
+    return None
+
+
+def is_numeric(t: Optional[Type]) -> bool:
+    return type_name(t) in ("int", "float")
+
+
+class Context:
+    """Lexical scope used while inferring types inside one class."""
+
+    def __init__(self, class_name: str, frames: Optional[List[Dict[str, Type]]] = None,
+                 return_type: Optional[Type] = None):
+        self.class_name = class_name
+        self.frames = frames if frames is not None else [{}]
+        self.return_type = return_type
+
+    def push(self, return_type: Optional[Type] = None) -> "Context":
+        return Context(self.class_name, self.frames + [{}], return_type or self.return_type)
+
+    def declare(self, name: str, t: Type):
+        self.frames[-1][name] = t
+
+    def lookup(self, name: str) -> Optional[Type]:
+        for frame in reversed(self.frames):
+            if name in frame:
+                return frame[name]
+        return None
+
+
+class TypeInference(BaseVisitor):
+    """Annotate every expression of a Program with its static type.
+
+    Types are stored in ``types`` keyed by ``id(node)``; the Program must
+    stay alive while the table is used. Expressions whose type cannot be
+    determined (unknown names, ill-typed operands) map to None. The
+    constructor each ObjectCreation calls, chosen by the types of its
+    arguments, is stored in ``constructors`` the same way.
+    """
+
+    def __init__(self):
+        self.types: Dict[int, Optional[Type]] = {}
+        self.constructors: Dict[int, Optional[ConstructorDecl]] = {}
+        self.class_table: Optional[ClassTable] = None
+
+    def infer(self, program: Program) -> Dict[int, Optional[Type]]:
+        self.types = {}
+        self.constructors = {}
+        self.visit(program)
+        return self.types
+
+    def type_of(self, node: ASTNode) -> Optional[Type]:
+        return self.types.get(id(node))
+
+    def constructor_of(self, node: ObjectCreation) -> Optional[ConstructorDecl]:
+        return self.constructors.get(id(node))
+
+    def _record(self, node: ASTNode, t: Optional[Type]) -> Optional[Type]:
+        self.types[id(node)] = t
+        return t
+
+    def _visit_stored(self, expr: Expr, t: Optional[Type], o: Context) -> Optional[Type]:
+        """Visit expr, a value stored in a variable, attribute, parameter or
+        return value of type t. An array literal of ints stored as a float
+        array has the float array type, so that its storage holds floats."""
+        return self._stored(expr, self.visit(expr, o), t)
+
+    def _stored(self, expr: Expr, found: Optional[Type], t: Optional[Type]) -> Optional[Type]:
+        t = strip_reference(t)
+        if (isinstance(expr, ArrayLiteral) and isinstance(found, ArrayType) and isinstance(t, ArrayType)
+                and type_name(found.element_type) == "int" and type_name(t.element_type) == "float"):
+            found = self._record(expr, ArrayType(FLOAT, found.size))
+        return found
+
+    def _name_type(self, name: str, o: Context) -> Optional[Type]:
+        t = o.lookup(name)
+        if t is None:
+            found = self.class_table.lookup_attribute(o.class_name, name)
+            if found:
+                t = strip_reference(found[0].attr_type)
+            elif name in self.class_table or name == IO_CLASS:
+                t = ClassType(name)
+        return t
+
+    # ------------------------------------------------------------------
+    # Declarations and statements
+    # ------------------------------------------------------------------
+
+    def visit_program(self, node, o=None):
+        self.class_table = ClassTable(node)
+        for class_decl in node.class_decls:
+            self.visit(class_decl, Context(class_decl.name))
+
+    def visit_attribute_decl(self, node, o=None):
+        for attr in node.attributes:
+            if attr.init_value:
+                self._visit_stored(attr.init_value, node.attr_type, o)
+
+    def visit_method_decl(self, node, o=None):
+        ctx = o.push(getattr(node, "return_type", None))
+        for param in node.params:
+            ctx.declare(param.name, strip_reference(param.param_type))
+        self.visit(node.body, ctx)
+
+    def visit_constructor_decl(self, node, o=None):
+        self.visit_method_decl(node, o)
+
+    def visit_block_statement(self, node, o=None):
+        ctx = o.push()
+        for decl in node.var_decls:
+            self.visit(decl, ctx)
+        for stmt in node.statements:
+            self.visit(stmt, ctx)
+
+    def visit_variable_decl(self, node, o=None):
+        for var in node.variables:
+            if var.init_value:
+                self._visit_stored(var.init_value, node.var_type, o)
+            o.declare(var.name, strip_reference(node.var_type))
+
+    def visit_assignment_statement(self, node, o=None):
+        if isinstance(node.lhs, IdLHS):
+            t = self._name_type(node.lhs.name, o)
+        else:
+            t = self.visit(node.lhs.postfix_expr, o)
+        self._visit_stored(node.rhs, t, o)
+
+    def visit_return_statement(self, node, o=None):
+        if node.value:
+            self._visit_stored(node.value, o.return_type, o)
+
+    def visit_for_statement(self, node, o=None):
+        self.visit(node.start_expr, o)
+        self.visit(node.end_expr, o)
+        if o.lookup(node.variable) is None:
+            o.declare(node.variable, INT)
+        self.visit(node.body, o)
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visit_binary_op(self, node, o=None):
+        lt = self.visit(node.left, o)
+        rt = self.visit(node.right, o)
+        op, ln, rn = node.operator, type_name(lt), type_name(rt)
+        result = None
+        if op in ARITH_OPS:
+            if is_numeric(lt) and is_numeric(rt):
+                result = FLOAT if "float" in (ln, rn) else INT
+        elif op == "/":
+            if is_numeric(lt) and is_numeric(rt):
+                result = FLOAT
+        elif op in INT_OPS:
+            if ln == rn == "int":
+                result = INT
+        elif op == "^":
+            if ln == rn == "string":
+                result = STRING
+        elif op in LOGIC_OPS:
+            if ln == rn == "boolean":
+                result = BOOL
+        elif op in ORDER_OPS:
+            if is_numeric(lt) and is_numeric(rt):
+                result = BOOL
+        elif op in EQUALITY_OPS:
+            if ln == rn and ln in ("int", "boolean"):
+                result = BOOL
+        return self._record(node, result)
+
+    def visit_unary_op(self, node, o=None):
+        t = self.visit(node.operand, o)
+        result = None
+        if node.operator == "!":
+            if type_name(t) == "boolean":
+                result = BOOL
+        elif is_numeric(t):
+            result = t
+        return self._record(node, result)
+
+    def visit_postfix_expression(self, node, o=None):
+        t = self.visit(node.primary, o)
+        for op in node.postfix_ops:
+            t = self.visit(op, (t, o))
+        return self._record(node, t)
+
+    def visit_member_access(self, node, o=None):
+        # o is (receiver type, context) for every postfix op
+        receiver, _ = o
+        result = None
+        if isinstance(receiver, ClassType):
+            found = self.class_table.lookup_attribute(receiver.class_name, node.member_name)
+            if found:
+                result = strip_reference(found[0].attr_type)
+        return self._record(node, result)
+
+    def visit_method_call(self, node, o=None):
+        receiver, ctx = o
+        method = result = None
+        if isinstance(receiver, ClassType):
+            if receiver.class_name == IO_CLASS and receiver.class_name not in self.class_table:
+                sig = IO_METHODS.get(node.method_name)
+                result = sig[1] if sig else None
+            else:
+                method = self.class_table.lookup_method(receiver.class_name, node.method_name)
+                if method:
+                    result = strip_reference(method.return_type)
+        self._visit_arguments(node.args, method, ctx)
+        return self._record(node, result)
+
+    def _visit_arguments(self, args: List[Expr], callee, o: Context):
+        params = callee.params if callee is not None and len(callee.params) == len(args) else None
+        for i, arg in enumerate(args):
+            self._visit_stored(arg, params[i].param_type if params else None, o)
+
+    def visit_array_access(self, node, o=None):
+        receiver, ctx = o
+        self.visit(node.index, ctx)
+        result = None
+        if isinstance(receiver, ArrayType):
+            result = receiver.element_type
+        return self._record(node, result)
+
+    def visit_object_creation(self, node, o=None):
+        arg_types = [self.visit(arg, o) for arg in node.args]
+        if node.class_name in self.class_table:
+            ctor = self.class_table.find_constructor(node.class_name, arg_types)
+            self.constructors[id(node)] = ctor
+            if ctor is not None:
+                for param, arg, t in zip(ctor.params, node.args, arg_types):
+                    self._stored(arg, t, param.param_type)
+        return self._record(node, ClassType(node.class_name))
+
+    def visit_identifier(self, node, o=None):
+        return self._record(node, self._name_type(node.name, o))
+
+    def visit_this_expression(self, node, o=None):
+        return self._record(node, ClassType(o.class_name))
+
+    def visit_parenthesized_expression(self, node, o=None):
+        return self._record(node, self.visit(node.expr, o))
+
+    def visit_nil_check(self, node, o=None):
+        return self._record(node, self.visit(node.expr, o))
+
+    def visit_int_literal(self, node, o=None):
+        return self._record(node, INT)
+
+    def visit_float_literal(self, node, o=None):
+        return self._record(node, FLOAT)
+
+    def visit_bool_literal(self, node, o=None):
+        return self._record(node, BOOL)
+
+    def visit_string_literal(self, node, o=None):
+        return self._record(node, STRING)
+
+    def visit_array_literal(self, node, o=None):
+        elem_types = [self.visit(elem, o) for elem in node.value]
+        elem = elem_types[0] if elem_types else None
+        if any(is_numeric(t) for t in elem_types) and all(is_numeric(t) for t in elem_types):
+            elem = FLOAT if any(type_name(t) == "float" for t in elem_types) else INT
+        return self._record(node, ArrayType(elem, len(elem_types)) if elem else None)
+
+    def visit_nil_literal(self, node, o=None):
+        return self._record(node, NIL)
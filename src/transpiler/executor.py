@@ -0,0 +1,121 @@
+"""
+Execution of transpiled OPLang programs.
+This module compiles the Python sources produced by
+src/transpiler/transpiler.py into code objects, caching them per class
+by a digest of their source (optionally on disk with marshal), and runs
+them with the helpers of src/transpiler/runtime.py.
+"""
+
+import hashlib
+import marshal
+import os
+from types import CodeType
+from typing import Dict, Optional
+
+from src.utils.nodes import Program
+from src.runtime.io_runtime import IORuntime
+from src.runtime.stack import run_with_large_stack
+from src.runtime.values import LiveObjects
+from src.transpiler.runtime import NAMESPACE, TRANSLATED_ERRORS, OPObject, translate_error
+from src.transpiler.transpiler import Transpiler, TranspiledProgram
+
+
+class CodeCache:
+    """Code objects of transpiled classes keyed by the SHA-256 of their source.
+
+    A class whose translation did not change between two programs, or two
+    runs when a directory is given, is not compiled again.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.codes: Dict[str, CodeType] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, source: str) -> CodeType:
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        code = self.codes.get(key)
+        if code is None and self.directory:
+            code = self._load(key)
+        if code is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            code = compile(source, f"<oplang {name}>", "exec")
+            if self.directory:
+                self._store(key, code)
+        self.codes[key] = code
+        return code
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".marshal")
+
+    def _load(self, key: str) -> Optional[CodeType]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _store(self, key: str, code: CodeType):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + f".{os.getpid()}"
+        with open(tmp, "wb") as f:
+            marshal.dump(code, f)
+        os.replace(tmp, self._path(key))
+
+
+class Executor:
+    """Run a Program by transpiling it to Python.
+
+    Objects owned by a block-local variable are destroyed when the block
+    ends (src/analysis/lifetimes.py); destructors of objects still alive
+    when main returns run at program end, most recently created first, as
+    in the interpreter.
+    """
+
+    def __init__(self, program: Program, io: Optional[IORuntime] = None,
+                 cache: Optional[CodeCache] = None):
+        self.program = program
+        self.io = io if io is not None else IORuntime()
+        self.cache = cache if cache is not None else CodeCache()
+        self.translation: TranspiledProgram = Transpiler().transpile(program)
+        self.live = LiveObjects()
+
+    def _track(self, obj: OPObject) -> OPObject:
+        self.live.add(obj)
+        return obj
+
+    def _release(self, obj: Optional[OPObject]):
+        if self.live.release(obj):
+            obj._destroy()
+
+    def load(self) -> dict:
+        """Execute the generated class statements and return their namespace."""
+        namespace = dict(NAMESPACE)
+        namespace["_io"] = self.io
+        namespace["_track"] = self._track
+        namespace["_release"] = self._release
+        for name, source in self.translation.sources.items():
+            exec(self.cache.get(name, source), namespace)
+        exec(self.cache.get("<entry>", self.translation.entry), namespace)
+        return namespace
+
+    def run(self):
+        namespace = self.load()
+        run_with_large_stack(lambda: self._run(namespace))
+
+    def _run(self, namespace: dict):
+        try:
+            namespace["_clinit"]()
+            namespace["_main"]()
+            while self.live:
+                self.live.pop()._destroy()
+        except TRANSLATED_ERRORS as e:
+            error = translate_error(e)
+            if error is None:
+                raise
+            raise error from e
+        finally:
+            self.io.flush()
@@ -0,0 +1,121 @@
+"""
+Runtime support for transpiled OPLang programs.
+Generated Python code refers to the helpers of this module through the
+names in NAMESPACE. Objects are instances of generated subclasses of
+OPObject; instance attributes are slots named f_<name>, static
+attributes are class attributes named s_<name> and methods are m_<name>.
+"""
+
+import re
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.runtime.errors import OPLangRuntimeError
+from src.runtime.values import AttrRef, Cell, ElementRef, array_of, check_index, check_int, int_div, int_mod
+
+
+class OPObject:
+    """Root of every transpiled class."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"<{type(self).__name__[2:]} object>"
+
+
+def fail(message: str):
+    """Raise a runtime error from inside an expression."""
+    raise OPLangRuntimeError(message)
+
+
+def check_nil(obj: Any, method_name: str):
+    """Return obj, the receiver of an inlined call of method_name, unless it is nil."""
+    if obj is None:
+        raise OPLangRuntimeError(f"Nil reference calling {method_name}")
+    return obj
+
+
+def load_element(array: List[Any], index: int):
+    return array[check_index(array, index)]
+
+
+def store_element(array: List[Any], index: int, value: Any):
+    array[check_index(array, index)] = value
+
+
+def element_ref(array: List[Any], index: int) -> ElementRef:
+    return ElementRef(array, check_index(array, index))
+
+
+def _find_member(obj: Any, name: str) -> AttrRef:
+    """Resolve name on an object whose class was not known statically."""
+    if obj is None:
+        raise OPLangRuntimeError(f"Nil reference accessing {name}")
+    if not isinstance(obj, OPObject):
+        raise OPLangRuntimeError(f"Cannot access {name} on a non-object")
+    for cls in type(obj).__mro__:
+        if "f_" + name in cls.__dict__.get("__slots__", ()):
+            return AttrRef(obj, "f_" + name)
+        if "s_" + name in cls.__dict__:
+            return AttrRef(cls, "s_" + name)
+    raise OPLangRuntimeError(f"Undeclared attribute {name}")
+
+
+def get_member(obj: Any, name: str):
+    return _find_member(obj, name).value
+
+
+def set_member(obj: Any, name: str, value: Any):
+    _find_member(obj, name).value = value
+
+
+def member_ref(obj: Any, name: str) -> AttrRef:
+    return _find_member(obj, name)
+
+
+_MISSING_ATTRIBUTE = re.compile(r"'NoneType' object has no attribute '([fsmk])_?(\w*)'")
+
+
+# Python errors generated code raises on purpose: float division by zero,
+# ints beyond 64 bits, deep recursion and members of a nil receiver
+TRANSLATED_ERRORS = (ZeroDivisionError, OverflowError, RecursionError, AttributeError)
+
+
+def translate_error(exc: Exception) -> Optional[OPLangRuntimeError]:
+    """Turn a Python error raised on purpose by generated code into an OPLang
+    runtime error; return None for any other error, a bug of the transpiler."""
+    if isinstance(exc, ZeroDivisionError):
+        return OPLangRuntimeError("Division by zero")
+    if isinstance(exc, RecursionError):
+        return OPLangRuntimeError("Stack overflow")
+    if isinstance(exc, OverflowError):
+        return OPLangRuntimeError("Integer overflow")
+    if isinstance(exc, AttributeError):
+        match = _MISSING_ATTRIBUTE.search(str(exc))
+        if match:
+            kind, name = match.groups()
+            if kind == "m":
+                return OPLangRuntimeError(f"Nil reference calling {name}")
+            return OPLangRuntimeError(f"Nil reference accessing {name}")
+    return None
+
+
+# Names visible to generated code, besides the generated classes C_<name>
+NAMESPACE: Dict[str, Any] = {
+    "_Object": OPObject,
+    "_Cell": Cell,
+    "_array": array,
+    "_array_of": array_of,
+    "_AttrRef": AttrRef,
+    "_fail": fail,
+    "_check_nil": check_nil,
+    "_check_int": check_int,
+    "_int_div": int_div,
+    "_int_mod": int_mod,
+    "_load": load_element,
+    "_store": store_element,
+    "_elem_ref": element_ref,
+    "_get_member": get_member,
+    "_set_member": set_member,
+    "_member_ref": member_ref,
+}
@@ -0,0 +1,771 @@
+"""
+Python transpiler for OPLang programs.
+This module translates a Program AST into Python source, one class
+statement per OPLang class, which src/transpiler/executor.py compiles
+and runs. Names are mangled so OPLang identifiers never clash with
+Python keywords: classes become C_<name>, locals v_<name>, instance
+attributes f_<name>, static attributes s_<name>, methods m_<name> and
+constructors k<index>, class methods that create the object once the
+arguments are evaluated.
+
+Locals that may be aliased live in Cells, reference parameters receive
+locations (Cell, AttrRef or ElementRef) and reference-returning methods
+return locations, following the interpreter in src/runtime.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable, IO_CLASS
+from src.semantics.type_inference import TypeInference, IO_METHODS, strip_reference, type_name
+from src.analysis.lifetimes import LifetimeAnalysis
+from src.runtime.values import ARRAY_TYPECODES, INT_MAX, INT_MIN, decode_string
+
+
+_PYTHON_OPERATORS = {
+    "+": "+", "-": "-", "*": "*", "/": "/", "^": "+", "&&": "and", "||": "or",
+    "==": "==", "!=": "!=", "<": "<", ">": ">", "<=": "<=", ">=": ">=",
+}
+_INDENT = "    "
+
+
+def _unparen(expr: Expr) -> Expr:
+    while isinstance(expr, ParenthesizedExpression):
+        expr = expr.expr
+    return expr
+
+
+def python_default(t: Type) -> str:
+    """Python expression for the value of an uninitialised variable of type t."""
+    t = strip_reference(t)
+    if isinstance(t, PrimitiveType):
+        return {"int": "0", "float": "0.0", "boolean": "False", "string": "''"}.get(t.type_name, "None")
+    if isinstance(t, ArrayType):
+        element = strip_reference(t.element_type)
+        if isinstance(element, ArrayType):
+            return f"[{python_default(element)} for _ in range({t.size})]"
+        if isinstance(element, PrimitiveType) and element.type_name == "boolean":
+            return f"bytearray({t.size})"
+        if isinstance(element, PrimitiveType) and element.type_name in ARRAY_TYPECODES:
+            return f"_array({ARRAY_TYPECODES[element.type_name]!r}, bytes({8 * t.size}))"
+        return f"[{python_default(element)}] * {t.size}"
+    return "None"
+
+
+class _AliasedLocals(BaseVisitor):
+    """Collect the names of locals that must live in a Cell.
+
+    A local is aliased when it is declared as a reference, bound by a
+    reference declaration, passed at a position where some method or
+    constructor of that name takes a reference parameter, or returned
+    from a method returning a reference.
+    """
+
+    def __init__(self, transpiler: "Transpiler", returns_ref: bool):
+        self.transpiler = transpiler
+        self.returns_ref = returns_ref
+        self.names: Set[str] = set()
+
+    def _add(self, expr):
+        expr = _unparen(expr)
+        if isinstance(expr, Identifier):
+            self.names.add(expr.name)
+
+    def visit_variable_decl(self, node, o=None):
+        if isinstance(node.var_type, ReferenceType):
+            for var in node.variables:
+                self.names.add(var.name)
+                if var.init_value:
+                    self._add(var.init_value)
+        super().visit_variable_decl(node, o)
+
+    def visit_method_call(self, node, o=None):
+        positions = self.transpiler.method_ref_positions.get(node.method_name, ())
+        for i, arg in enumerate(node.args):
+            if i in positions:
+                self._add(arg)
+        super().visit_method_call(node, o)
+
+    def visit_object_creation(self, node, o=None):
+        positions = self.transpiler.ctor_ref_positions.get(node.class_name, ())
+        for i, arg in enumerate(node.args):
+            if i in positions:
+                self._add(arg)
+        super().visit_object_creation(node, o)
+
+    def visit_return_statement(self, node, o=None):
+        if self.returns_ref and node.value:
+            self._add(node.value)
+        super().visit_return_statement(node, o)
+
+
+class _AssignedNames(BaseVisitor):
+    """Collect the names assigned by IdLHS targets and for loops."""
+
+    def __init__(self):
+        self.names: Set[str] = set()
+
+    def visit_id_lhs(self, node, o=None):
+        self.names.add(node.name)
+
+    def visit_for_statement(self, node, o=None):
+        self.names.add(node.variable)
+        super().visit_for_statement(node, o)
+
+
+class MethodTranspiler(BaseVisitor):
+    """Translate the body of one method, constructor, destructor or initialiser.
+
+    Statement visitors append lines; expression visitors return Python
+    expression text, parenthesised whenever it is not atomic.
+    """
+
+    def __init__(self, transpiler: "Transpiler", class_name: str, is_static: bool,
+                 returns_ref: bool = False, is_ctor: bool = False, indent: int = 2):
+        self.tr = transpiler
+        self.class_name = class_name
+        self.is_static = is_static
+        self.returns_ref = returns_ref
+        self.is_ctor = is_ctor
+        self.indent = indent
+        self.lines: List[str] = []
+        self.scopes: List[Dict[str, Tuple[str, bool]]] = [{}]
+        self.used: Set[str] = set()
+        self.loops: List[Optional[str]] = []
+        # number of enclosing blocks when each loop starts
+        self.loop_depths: List[int] = []
+        # Python names of the locals owning their object, per enclosing block (src/analysis/lifetimes.py)
+        self.owned: List[List[str]] = []
+        self.aliased: Set[str] = set()
+        self.ntemps = 0
+
+    # ------------------------------------------------------------------
+    # Output helpers
+    # ------------------------------------------------------------------
+
+    def line(self, text: str):
+        self.lines.append(_INDENT * self.indent + text)
+
+    def nested(self, stmt: Statement):
+        """Emit stmt one level deeper, adding pass if it produced nothing."""
+        self.indent += 1
+        count = len(self.lines)
+        self.visit(stmt)
+        if len(self.lines) == count:
+            self.line("pass")
+        self.indent -= 1
+
+    def temp(self) -> str:
+        self.ntemps += 1
+        return f"_t{self.ntemps}"
+
+    def fresh(self, name: str) -> str:
+        pyname, n = "v_" + name, 1
+        while pyname in self.used:
+            n += 1
+            pyname = f"v_{name}_{n}"
+        self.used.add(pyname)
+        return pyname
+
+    def declare(self, name: str, is_location: bool) -> str:
+        pyname = self.fresh(name)
+        self.scopes[-1][name] = (pyname, is_location)
+        return pyname
+
+    def fail(self, message: str) -> str:
+        return f"_fail({message!r})"
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def declare_params(self, params: List[Parameter]) -> List[str]:
+        return [self.declare(p.name, isinstance(p.param_type, ReferenceType)) for p in params]
+
+    def transpile_body(self, body: BlockStatement, params: List[Parameter]):
+        finder = _AliasedLocals(self.tr, self.returns_ref)
+        finder.visit(body)
+        self.aliased = finder.names
+        for param in params:
+            pyname, is_location = self.scopes[0][param.name]
+            if param.name in self.aliased and not is_location:
+                self.line(f"{pyname} = _Cell({pyname})")
+                self.scopes[0][param.name] = (pyname, True)
+        self.visit(body)
+        if self.is_ctor:
+            self.line("return self")
+        elif not self.lines:
+            self.line("pass")
+
+    # ------------------------------------------------------------------
+    # Names
+    # ------------------------------------------------------------------
+
+    def resolve(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                pyname, is_location = scope[name]
+                return ("local", pyname, is_location)
+        for owner in self.tr.class_table.chain(self.class_name):
+            found = self.tr.class_table.attributes[owner].get(name)
+            if found:
+                if found[0].is_static:
+                    return ("static", owner)
+                if not self.is_static:
+                    return ("field", owner)
+        if name in self.tr.class_table or name == IO_CLASS:
+            return ("class", name)
+        return None
+
+    def load_name(self, name: str) -> str:
+        found = self.resolve(name)
+        if found is None or found[0] == "class":
+            return self.fail(f"Undeclared identifier {name}")
+        if found[0] == "local":
+            return found[1] + ".value" if found[2] else found[1]
+        if found[0] == "field":
+            return f"self.f_{name}"
+        return f"C_{found[1]}.s_{name}"
+
+    def store_name(self, name: str, value: str) -> str:
+        found = self.resolve(name)
+        if found is None or found[0] == "class":
+            return self.fail(f"Undeclared identifier {name}")
+        if found[0] == "local":
+            return f"{found[1]}.value = {value}" if found[2] else f"{found[1]} = {value}"
+        if found[0] == "field":
+            return f"self.f_{name} = {value}"
+        return f"C_{found[1]}.s_{name} = {value}"
+
+    def location(self, expr: Expr) -> str:
+        """Python expression evaluating to a location for expr."""
+        expr = _unparen(expr)
+        if isinstance(expr, Identifier):
+            found = self.resolve(expr.name)
+            if found and found[0] == "local":
+                return found[1] if found[2] else f"_Cell({found[1]})"
+            if found and found[0] == "field":
+                return f"_AttrRef(self, 'f_{expr.name}')"
+            if found and found[0] == "static":
+                return f"_AttrRef(C_{found[1]}, 's_{expr.name}')"
+        elif isinstance(expr, PostfixExpression) and expr.postfix_ops:
+            receiver = self.chain(self.primary(expr.primary), expr.postfix_ops[:-1])
+            last = expr.postfix_ops[-1]
+            if isinstance(last, MemberAccess):
+                return self.member(receiver, last.member_name, location=True)
+            if isinstance(last, ArrayAccess):
+                if receiver[0] == "class":
+                    return self.fail(f"Cannot index class {receiver[1]}")
+                return f"_elem_ref({receiver[2]}, {self.visit(last.index)})"
+            return self.call(receiver, last, location=True)
+        return f"_Cell({self.visit(expr)})"
+
+    # ------------------------------------------------------------------
+    # Postfix chains and calls
+    # ------------------------------------------------------------------
+
+    def primary(self, primary: Expr):
+        """Return ('class', name, None) or ('value', static type, code) for a chain's primary."""
+        if isinstance(primary, Identifier):
+            found = self.resolve(primary.name)
+            if found and found[0] == "class":
+                return ("class", primary.name, None)
+        return ("value", self.tr.type_of(primary), self.visit(primary))
+
+    def chain(self, receiver, ops: List[PostfixOp]):
+        for op in ops:
+            if isinstance(op, MemberAccess):
+                code = self.member(receiver, op.member_name)
+            elif isinstance(op, ArrayAccess):
+                if receiver[0] == "class":
+                    code = self.fail(f"Cannot index class {receiver[1]}")
+                else:
+                    code = f"_load({receiver[2]}, {self.visit(op.index)})"
+            else:
+                code = self.call(receiver, op)
+            receiver = ("value", self.tr.type_of(op), code)
+        return receiver
+
+    def _known_class(self, receiver) -> Optional[str]:
+        kind, info, _ = receiver
+        if kind == "class":
+            return info
+        info = strip_reference(info)
+        if isinstance(info, ClassType) and info.class_name in self.tr.class_table:
+            return info.class_name
+        return None
+
+    def _attribute(self, class_name: str, name: str):
+        for owner in self.tr.class_table.chain(class_name):
+            found = self.tr.class_table.attributes[owner].get(name)
+            if found:
+                return owner, found[0]
+        return None, None
+
+    @staticmethod
+    def _discard(receiver, code: str) -> str:
+        """Evaluate a receiver whose value is not needed before code."""
+        if receiver[0] == "class" or receiver[2] in ("self", "None") or receiver[2].isidentifier():
+            return code
+        return f"({receiver[2]}, {code})[1]"
+
+    def member(self, receiver, name: str, location: bool = False) -> str:
+        class_name = self._known_class(receiver)
+        owner, decl = self._attribute(class_name, name) if class_name else (None, None)
+        if receiver[0] == "class":
+            if decl is None or not decl.is_static:
+                return self.fail(f"Undeclared attribute {class_name}.{name}")
+        if decl is None:
+            helper = "_member_ref" if location else "_get_member"
+            return f"{helper}({receiver[2]}, {name!r})"
+        if decl.is_static:
+            code = f"_AttrRef(C_{owner}, 's_{name}')" if location else f"C_{owner}.s_{name}"
+            return self._discard(receiver, code)
+        if location:
+            return f"_AttrRef({receiver[2]}, 'f_{name}')"
+        return f"{receiver[2]}.f_{name}"
+
+    def arguments(self, params: Optional[List[Parameter]], args: List[Expr], positions=()) -> str:
+        codes = []
+        for i, arg in enumerate(args):
+            if params is not None:
+                is_ref = isinstance(params[i].param_type, ReferenceType)
+            else:
+                is_ref = i in positions
+            codes.append(self.location(arg) if is_ref else self.visit(arg))
+        return ", ".join(codes)
+
+    def call(self, receiver, node: MethodCall, location: bool = False) -> str:
+        name = node.method_name
+        table = self.tr.class_table
+        kind, _, recv_code = receiver
+        if receiver[:2] == ("class", IO_CLASS) and IO_CLASS not in table:
+            if name not in IO_METHODS:
+                return self.fail(f"Undeclared method io.{name}")
+            code = f"_io.{name}({self.arguments(None, node.args)})"
+            return f"_Cell({code})" if location else code
+        class_name = self._known_class(receiver)
+        method = table.lookup_method(class_name, name) if class_name else None
+        if method is None and kind == "class":
+            return self.fail(f"Undeclared method {class_name}.{name}")
+        if method is not None:
+            if len(method.params) != len(node.args):
+                return self.fail(f"Expected {len(method.params)} arguments but got {len(node.args)}")
+            args = self.arguments(method.params, node.args)
+            owner = table.owner_of_method(class_name, name)
+            if method.is_static:
+                code = self._discard(receiver, f"C_{owner}.m_{name}({args})")
+            elif kind == "class":
+                code = f"C_{owner}.m_{name}(None{', ' if args else ''}{args})"
+            else:
+                code = f"{recv_code}.m_{name}({args})"
+            returns_ref = isinstance(method.return_type, ReferenceType)
+        else:
+            args = self.arguments(None, node.args, self.tr.method_ref_positions.get(name, ()))
+            code = f"{recv_code}.m_{name}({args})"
+            returns_ref = name in self.tr.ref_returning
+        if returns_ref:
+            return code if location else code + ".value"
+        return f"_Cell({code})" if location else code
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visit_block_statement(self, node, o=None):
+        self.scopes.append({})
+        for decl in node.var_decls:
+            self.visit(decl)
+        self.owned.append([self.load_name(name) for name in node.scoped])
+        for stmt in node.statements:
+            self.visit(stmt)
+        self.release(self.owned.pop())
+        self.scopes.pop()
+
+    def release(self, *blocks: List[str]):
+        """Destroy the objects owned by the given blocks, innermost and most recent first."""
+        for names in reversed(blocks):
+            for name in reversed(names):
+                self.line(f"_release({name})")
+
+    def visit_variable_decl(self, node, o=None):
+        is_ref = isinstance(node.var_type, ReferenceType)
+        for var in node.variables:
+            if is_ref:
+                value = self.location(var.init_value) if var.init_value else f"_Cell({python_default(node.var_type)})"
+                self.line(f"{self.declare(var.name, True)} = {value}")
+                continue
+            value = self.visit(var.init_value) if var.init_value else python_default(node.var_type)
+            if var.name in self.aliased:
+                self.line(f"{self.declare(var.name, True)} = _Cell({value})")
+            else:
+                self.line(f"{self.declare(var.name, False)} = {value}")
+
+    def visit_assignment_statement(self, node, o=None):
+        lhs = node.lhs
+        if isinstance(lhs, IdLHS):
+            self.line(self.store_name(lhs.name, self.visit(node.rhs)))
+            return
+        expr = lhs.postfix_expr
+        if not isinstance(expr, PostfixExpression) or not expr.postfix_ops:
+            self.line(self.fail("Invalid assignment target"))
+            return
+        receiver = self.chain(self.primary(expr.primary), expr.postfix_ops[:-1])
+        last = expr.postfix_ops[-1]
+        if isinstance(last, ArrayAccess) and receiver[0] == "value":
+            self.line(f"_store({receiver[2]}, {self.visit(last.index)}, {self.visit(node.rhs)})")
+        elif isinstance(last, MemberAccess):
+            target = self.member(receiver, last.member_name, location=True)
+            if target.startswith("_AttrRef("):
+                # write the attribute directly instead of through a reference
+                obj, attr = target[len("_AttrRef("):-1].rsplit(", ", 1)
+                self.line(f"{obj}.{attr[1:-1]} = {self.visit(node.rhs)}")
+            elif target.startswith("_member_ref("):
+                self.line(f"_set_member({target[len('_member_ref('):-1]}, {self.visit(node.rhs)})")
+            else:
+                self.line(target)
+        elif isinstance(last, MethodCall):
+            self.line(f"{self.call(receiver, last, location=True)}.value = {self.visit(node.rhs)}")
+        else:
+            self.line(self.fail(f"Cannot index class {receiver[1]}"))
+
+    def visit_if_statement(self, node, o=None):
+        self.line(f"if {self.visit(node.condition)}:")
+        self.nested(node.then_stmt)
+        if node.else_stmt:
+            self.line("else:")
+            self.nested(node.else_stmt)
+
+    def visit_for_statement(self, node, o=None):
+        name = node.variable
+        found = self.resolve(name)
+        start = self.visit(node.start_expr)
+        if found is None or found[0] == "class":
+            pyname = self.declare(name, name in self.aliased)
+            self.line(f"{pyname} = _Cell({start})" if name in self.aliased else f"{pyname} = {start}")
+            found = self.resolve(name)
+        else:
+            self.line(self.store_name(name, start))
+        end = self.temp()
+        self.line(f"{end} = {self.visit(node.end_expr)}")
+        up = node.direction == "to"
+
+        counted = getattr(node, "counted", None)
+        if counted is None:
+            # not analysed by src/optimizer/loops.py
+            assigned = _AssignedNames()
+            assigned.visit(node.body)
+            counted = name not in assigned.names
+        if found[0] == "local" and not found[2] and counted:
+            # Python's for loop, with the final value the OPLang loop leaves behind
+            pyname = found[1]
+            bounds = f"{pyname}, {end} + 1" if up else f"{pyname}, {end} - 1, -1"
+            self.line(f"for {pyname} in range({bounds}):")
+            self.loops.append(None)
+            self.loop_depths.append(len(self.owned))
+            self.nested(node.body)
+            self.loop_depths.pop()
+            self.loops.pop()
+            self.line("else:")
+            self.indent += 1
+            if up:
+                self.line(f"if {pyname} <= {end}: {pyname} = _check_int({end} + 1)")
+            else:
+                self.line(f"if {pyname} >= {end}: {pyname} = _check_int({end} - 1)")
+            self.indent -= 1
+            return
+
+        current = self.load_name(name)
+        step = self.store_name(name, f"_check_int({current} {'+' if up else '-'} 1)")
+        self.line(f"while {current} {'<=' if up else '>='} {end}:")
+        self.loops.append(step)
+        self.loop_depths.append(len(self.owned))
+        self.indent += 1
+        self.visit(node.body)
+        self.line(step)
+        self.indent -= 1
+        self.loop_depths.pop()
+        self.loops.pop()
+
+    def visit_break_statement(self, node, o=None):
+        if not self.loops:
+            self.line(self.fail("Break outside loop"))
+            return
+        self.release(*self.owned[self.loop_depths[-1]:])
+        self.line("break")
+
+    def visit_continue_statement(self, node, o=None):
+        if not self.loops:
+            self.line(self.fail("Continue outside loop"))
+            return
+        self.release(*self.owned[self.loop_depths[-1]:])
+        if self.loops[-1] is not None:
+            self.line(self.loops[-1])
+        self.line("continue")
+
+    def visit_return_statement(self, node, o=None):
+        if self.is_ctor:
+            value = "self"
+        elif node.value is None:
+            value = "_Cell(None)" if self.returns_ref else ""
+        elif self.returns_ref:
+            value = self.location(node.value)
+        else:
+            value = self.visit(node.value)
+        if any(self.owned) and value and value != "self":
+            result = self.temp()
+            self.line(f"{result} = {value}")
+            value = result
+        self.release(*self.owned)
+        self.line(f"return {value}" if value else "return")
+
+    def visit_method_invocation_statement(self, node, o=None):
+        self.line(self.visit(node.method_call))
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visit_binary_op(self, node, o=None):
+        left, right = self.visit(node.left), self.visit(node.right)
+        if node.operator == "\\":
+            return f"_int_div({left}, {right})"
+        if node.operator == "%":
+            return f"_int_mod({left}, {right})"
+        return self.checked(node, f"({left} {_PYTHON_OPERATORS[node.operator]} {right})")
+
+    def visit_unary_op(self, node, o=None):
+        operand = self.visit(node.operand)
+        if node.operator == "!":
+            return f"(not {operand})"
+        if node.operator == "-":
+            return self.checked(node, f"(-{operand})")
+        return operand
+
+    def checked(self, node: Expr, code: str) -> str:
+        """Wrap int arithmetic in an overflow check; float results need none."""
+        if node.operator in ("+", "-", "*") and type_name(self.tr.type_of(node)) != "float":
+            return f"_check_int{code}"
+        return code
+
+    def visit_postfix_expression(self, node, o=None):
+        receiver = self.chain(self.primary(node.primary), node.postfix_ops)
+        if receiver[0] == "class":
+            return self.fail(f"Undeclared identifier {receiver[1]}")
+        return receiver[2]
+
+    def visit_object_creation(self, node, o=None):
+        return self.tr.creation(node.class_name, node.args, self, self.tr.inference.constructor_of(node))
+
+    def visit_identifier(self, node, o=None):
+        return self.load_name(node.name)
+
+    def visit_this_expression(self, node, o=None):
+        return "None" if self.is_static else "self"
+
+    def visit_parenthesized_expression(self, node, o=None):
+        return self.visit(node.expr)
+
+    def visit_nil_check(self, node, o=None):
+        return f"_check_nil({self.visit(node.expr)}, {node.method_name!r})"
+
+    def visit_int_literal(self, node, o=None):
+        if not INT_MIN <= node.value <= INT_MAX:
+            return f"_check_int({node.value})"
+        return repr(node.value)
+
+    def visit_float_literal(self, node, o=None):
+        return repr(node.value)
+
+    def visit_bool_literal(self, node, o=None):
+        return "True" if node.value else "False"
+
+    def visit_string_literal(self, node, o=None):
+        return repr(decode_string(node.value))
+
+    def visit_array_literal(self, node, o=None):
+        elements = "[" + ", ".join(self.visit(elem) for elem in node.value) + "]"
+        t = self.tr.type_of(node)
+        if isinstance(t, ArrayType) and isinstance(t.element_type, PrimitiveType) and t.element_type.type_name == "float":
+            return f"_array('d', {elements})"
+        return f"_array_of({elements})"
+
+    def visit_nil_literal(self, node, o=None):
+        return "None"
+
+
+class TranspiledProgram:
+    """Python sources of a Program: one per class, superclasses first, plus
+    an entry source defining _clinit() and _main()."""
+
+    def __init__(self, sources: Dict[str, str], entry: str):
+        self.sources = sources
+        self.entry = entry
+
+    def __str__(self):
+        return "\n\n".join(list(self.sources.values()) + [self.entry])
+
+
+class Transpiler:
+    """Translate a Program into Python source."""
+
+    def __init__(self):
+        self.class_table: Optional[ClassTable] = None
+        self.inference: Optional[TypeInference] = None
+        self.method_ref_positions: Dict[str, Set[int]] = {}
+        self.ctor_ref_positions: Dict[str, Set[int]] = {}
+        self.ref_returning: Set[str] = set()
+        # id(ConstructorDecl) -> Python method name, k<index> among its class's constructors
+        self.ctor_names: Dict[int, str] = {}
+
+    def type_of(self, node: ASTNode) -> Optional[Type]:
+        return self.inference.type_of(node)
+
+    def transpile(self, program: Program) -> TranspiledProgram:
+        self.class_table = ClassTable(program)
+        LifetimeAnalysis(self.class_table).analyze(program)
+        self.inference = TypeInference()
+        self.inference.infer(program)
+        self.method_ref_positions, self.ctor_ref_positions = {}, {}
+        self.ref_returning = set()
+        self.ctor_names = {id(ctor): f"k{i}" for ctors in self.class_table.constructors.values()
+                           for i, ctor in enumerate(ctors)}
+        for class_decl in program.class_decls:
+            for member in class_decl.members:
+                if isinstance(member, MethodDecl):
+                    self._note_ref_positions(self.method_ref_positions, member.name, member.params)
+                    if isinstance(member.return_type, ReferenceType):
+                        self.ref_returning.add(member.name)
+                elif isinstance(member, ConstructorDecl):
+                    self._note_ref_positions(self.ctor_ref_positions, class_decl.name, member.params)
+
+        sources = {}
+        for class_decl in self._ordered_classes(program):
+            sources[class_decl.name] = self.transpile_class(class_decl)
+        return TranspiledProgram(sources, self._entry(program))
+
+    @staticmethod
+    def _note_ref_positions(table, name, params):
+        positions = table.setdefault(name, set())
+        for i, param in enumerate(params):
+            if isinstance(param.param_type, ReferenceType):
+                positions.add(i)
+
+    def _ordered_classes(self, program: Program) -> List[ClassDecl]:
+        """Return class declarations with every superclass before its subclasses."""
+        ordered, done = [], set()
+
+        def add(class_decl):
+            if class_decl.name in done:
+                return
+            done.add(class_decl.name)
+            parent = self.class_table.classes.get(class_decl.superclass)
+            if parent is not None:
+                add(parent)
+            ordered.append(class_decl)
+
+        for class_decl in program.class_decls:
+            add(class_decl)
+        return ordered
+
+    def creation(self, class_name: str, args: List[Expr], mt: MethodTranspiler,
+                 ctor: Optional[ConstructorDecl]) -> str:
+        """Python expression creating an object, shared by new and the entry point."""
+        if class_name not in self.class_table:
+            return mt.fail(f"Undeclared class {class_name}")
+        if ctor is None and args:
+            return mt.fail(f"No constructor of {class_name} takes {len(args)} arguments")
+        # a constructor is a class method creating the object, so that the
+        # arguments are evaluated before the field initialisers run
+        if ctor is None:
+            code = f"C_{class_name}()"
+        else:
+            code = f"C_{class_name}.{self.ctor_names[id(ctor)]}({mt.arguments(ctor.params, args)})"
+        if self.class_table.find_destructor(class_name):
+            code = f"_track({code})"
+        return code
+
+    # ------------------------------------------------------------------
+    # Classes
+    # ------------------------------------------------------------------
+
+    def transpile_class(self, class_decl: ClassDecl) -> str:
+        name = class_decl.name
+        parent = class_decl.superclass if class_decl.superclass in self.class_table else None
+        fields = [
+            (decl, attr) for decl, attr in self.class_table.attributes[name].values() if not decl.is_static
+        ]
+        statics = [
+            (decl, attr) for decl, attr in self.class_table.attributes[name].values() if decl.is_static
+        ]
+        slots = "".join(f"'f_{attr.name}', " for _, attr in fields)
+        lines = [f"class C_{name}({'C_' + parent if parent else '_Object'}):",
+                 f"{_INDENT}__slots__ = ({slots.rstrip(' ')})"]
+        for _, attr in statics:
+            lines.append(f"{_INDENT}s_{attr.name} = None")
+
+        init = MethodTranspiler(self, name, is_static=False)
+        if parent:
+            init.line(f"C_{parent}.__init__(self)")
+        for decl, attr in fields:
+            value = init.visit(attr.init_value) if attr.init_value else python_default(decl.attr_type)
+            init.line(f"self.f_{attr.name} = {value}")
+        lines += self._function("def __init__(self):", init)
+
+        if statics:
+            clinit = MethodTranspiler(self, name, is_static=True)
+            for decl, attr in statics:
+                value = clinit.visit(attr.init_value) if attr.init_value else python_default(decl.attr_type)
+                clinit.line(f"C_{name}.s_{attr.name} = {value}")
+            lines += self._function("@staticmethod\ndef _clinit():", clinit)
+
+        for member in class_decl.members:
+            if isinstance(member, ConstructorDecl):
+                mt = MethodTranspiler(self, name, is_static=False, is_ctor=True)
+                params = ["cls"] + mt.declare_params(member.params)
+                mt.line("self = cls()")
+                mt.transpile_body(member.body, member.params)
+                header = f"@classmethod\ndef {self.ctor_names[id(member)]}({', '.join(params)}):"
+                lines += self._function(header, mt)
+            elif isinstance(member, MethodDecl):
+                mt = MethodTranspiler(self, name, member.is_static,
+                                      returns_ref=isinstance(member.return_type, ReferenceType))
+                params = ([] if member.is_static else ["self"]) + mt.declare_params(member.params)
+                mt.transpile_body(member.body, member.params)
+                header = f"def m_{member.name}({', '.join(params)}):"
+                if member.is_static:
+                    header = "@staticmethod\n" + header
+                lines += self._function(header, mt)
+            elif isinstance(member, DestructorDecl):
+                mt = MethodTranspiler(self, name, is_static=False)
+                mt.transpile_body(member.body, [])
+                lines += self._function("def _destroy(self):", mt)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _function(header: str, mt: MethodTranspiler) -> List[str]:
+        lines = [""] + [_INDENT + h for h in header.split("\n")]
+        return lines + (mt.lines or [_INDENT * 2 + "pass"])
+
+    def _entry(self, program: Program) -> str:
+        lines = ["def _clinit():"]
+        for class_decl in program.class_decls:
+            if any(decl.is_static for decl, _ in self.class_table.attributes[class_decl.name].values()):
+                lines.append(f"{_INDENT}C_{class_decl.name}._clinit()")
+        if len(lines) == 1:
+            lines.append(f"{_INDENT}pass")
+        lines += ["", "def _main():"]
+        for class_decl in program.class_decls:
+            main = self.class_table.methods[class_decl.name].get("main")
+            if main and not main.params:
+                if main.is_static:
+                    lines.append(f"{_INDENT}C_{class_decl.name}.m_main()")
+                else:
+                    mt = MethodTranspiler(self, class_decl.name, is_static=True)
+                    ctor = self.class_table.find_constructor(class_decl.name, [])
+                    lines.append(f"{_INDENT}{self.creation(class_decl.name, [], mt, ctor)}.m_main()")
+                break
+        else:
+            lines.append(f"{_INDENT}_fail('No entry point main()')")
+        return "\n".join(lines) + "\n"
@@ -1,15 +1,27 @@
-from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.ErrorListener import ConsoleErrorListener, ErrorListener
 
 class SyntaxException(Exception):
     def __init__(self, msg):
         self.message = msg
         super().__init__(msg)
 
+def error_message(offendingSymbol, line, column):
+    text = getattr(offendingSymbol, 'text', str(offendingSymbol))
+    return f"Error on line {line} col {column}: {text}"
+
 class NewErrorListener(ConsoleErrorListener):
     INSTANCE = None
 
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        text = getattr(offendingSymbol, 'text', str(offendingSymbol))
-        raise SyntaxException(f"Error on line {line} col {column}: {text}")
+        raise SyntaxException(error_message(offendingSymbol, line, column))
 
 NewErrorListener.INSTANCE = NewErrorListener()
+
+class CollectingErrorListener(ErrorListener):
+    """Record every syntax error, for the parser to recover from, instead of raising."""
+
+    def __init__(self):
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append((line, column, error_message(offendingSymbol, line, column)))
@@ -293,6 +293,8 @@ class BlockStatement(Statement):
         super().__init__()
         self.var_decls = var_decls
         self.statements = statements
+        # locals whose objects die with the block, set by src/analysis/lifetimes.py
+        self.scoped: List[str] = []
 
     def accept(self, visitor, o=None):
         return visitor.visit_block_statement(self, o)
@@ -582,6 +584,8 @@ class MemberAccess(PostfixOp):
     def __init__(self, member_name: str):
         super().__init__()
         self.member_name = member_name
+        # instance attribute slot, when resolved by src/runtime/layout.py
+        self.slot: Optional[int] = None
 
     def accept(self, visitor, o=None):
         return visitor.visit_member_access(self, o)
@@ -661,6 +665,26 @@ class ParenthesizedExpression(Expr):
         return f"ParenthesizedExpression(({self.expr}))"
 
 
+class NilCheck(Expr):
+    """Value of expr, which must not be nil.
+
+    Not produced by the parser: the inliner (src/optimizer/inlining.py)
+    wraps the receiver of an inlined call in it, so that a nil receiver
+    is still reported as the call of method_name.
+    """
+
+    def __init__(self, expr: Expr, method_name: str):
+        super().__init__()
+        self.expr = expr
+        self.method_name = method_name
+
+    def accept(self, visitor, o=None):
+        return visitor.visit_nil_check(self, o)
+
+    def __str__(self):
+        return f"NilCheck({self.expr}, {self.method_name})"
+
+
 # ============================================================================
 # Literal Expressions
 # ============================================================================
@@ -751,3 +775,28 @@ class NilLiteral(Literal):
 
     def __str__(self):
         return "NilLiteral(nil)"
+
+
+# ============================================================================
+# Error Recovery
+# ============================================================================
+
+
+class ErrorNode(ClassMember, Statement):
+    """Placeholder for a class, member, declaration or statement that failed to parse.
+
+    Only built in recovery mode (src/astgen/recovery.py), in place of the
+    node the erroneous source would have produced.
+    """
+
+    def __init__(self, text: str, line: Optional[int] = None, column: Optional[int] = None):
+        super().__init__()
+        self.text = text
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor, o=None):
+        return visitor.visit_error_node(self, o)
+
+    def __str__(self):
+        return f"ErrorNode({self.text!r})"
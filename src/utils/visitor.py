@@ -0,0 +1,545 @@
+"""
+Visitor base classes for OPLang AST nodes.
+This module defines the ASTVisitor interface that every node's accept()
+dispatches to, BaseVisitor, which walks all children by default, and
+ASTTransformer, which rebuilds the tree from the nodes its visits return.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+from .nodes import *
+
+
+class ASTVisitor(ABC):
+    """Abstract base class for AST visitors."""
+
+    def visit(self, node: ASTNode, o: Any = None):
+        return node.accept(self, o)
+
+    # Program and declarations
+    @abstractmethod
+    def visit_program(self, node: "Program", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_class_decl(self, node: "ClassDecl", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_attribute_decl(self, node: "AttributeDecl", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_attribute(self, node: "Attribute", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_method_decl(self, node: "MethodDecl", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_constructor_decl(self, node: "ConstructorDecl", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_destructor_decl(self, node: "DestructorDecl", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_parameter(self, node: "Parameter", o: Any = None):
+        pass
+
+    # Types
+    @abstractmethod
+    def visit_primitive_type(self, node: "PrimitiveType", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_array_type(self, node: "ArrayType", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_class_type(self, node: "ClassType", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_reference_type(self, node: "ReferenceType", o: Any = None):
+        pass
+
+    # Statements
+    @abstractmethod
+    def visit_block_statement(self, node: "BlockStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_variable_decl(self, node: "VariableDecl", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_variable(self, node: "Variable", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_assignment_statement(self, node: "AssignmentStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_if_statement(self, node: "IfStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_for_statement(self, node: "ForStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_break_statement(self, node: "BreakStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_continue_statement(self, node: "ContinueStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_return_statement(self, node: "ReturnStatement", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_method_invocation_statement(
+        self, node: "MethodInvocationStatement", o: Any = None
+    ):
+        pass
+
+    # Left-hand sides
+    @abstractmethod
+    def visit_id_lhs(self, node: "IdLHS", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_postfix_lhs(self, node: "PostfixLHS", o: Any = None):
+        pass
+
+    # Expressions
+    @abstractmethod
+    def visit_binary_op(self, node: "BinaryOp", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_unary_op(self, node: "UnaryOp", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_postfix_expression(self, node: "PostfixExpression", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_method_call(self, node: "MethodCall", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_member_access(self, node: "MemberAccess", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_array_access(self, node: "ArrayAccess", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_object_creation(self, node: "ObjectCreation", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_identifier(self, node: "Identifier", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_this_expression(self, node: "ThisExpression", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_parenthesized_expression(
+        self, node: "ParenthesizedExpression", o: Any = None
+    ):
+        pass
+
+    @abstractmethod
+    def visit_nil_check(self, node: "NilCheck", o: Any = None):
+        pass
+
+    # Literals
+    @abstractmethod
+    def visit_int_literal(self, node: "IntLiteral", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_float_literal(self, node: "FloatLiteral", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_bool_literal(self, node: "BoolLiteral", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_string_literal(self, node: "StringLiteral", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_array_literal(self, node: "ArrayLiteral", o: Any = None):
+        pass
+
+    @abstractmethod
+    def visit_nil_literal(self, node: "NilLiteral", o: Any = None):
+        pass
+
+    # Error recovery
+    @abstractmethod
+    def visit_error_node(self, node: "ErrorNode", o: Any = None):
+        pass
+
+
+class BaseVisitor(ASTVisitor):
+    """Visitor that walks every child node and returns None.
+
+    Subclasses override only the node kinds they care about.
+    """
+
+    def visit_program(self, node, o=None):
+        for class_decl in node.class_decls:
+            self.visit(class_decl, o)
+
+    def visit_class_decl(self, node, o=None):
+        for member in node.members:
+            self.visit(member, o)
+
+    def visit_attribute_decl(self, node, o=None):
+        for attr in node.attributes:
+            self.visit(attr, o)
+
+    def visit_attribute(self, node, o=None):
+        if node.init_value:
+            self.visit(node.init_value, o)
+
+    def visit_method_decl(self, node, o=None):
+        for param in node.params:
+            self.visit(param, o)
+        self.visit(node.body, o)
+
+    def visit_constructor_decl(self, node, o=None):
+        for param in node.params:
+            self.visit(param, o)
+        self.visit(node.body, o)
+
+    def visit_destructor_decl(self, node, o=None):
+        self.visit(node.body, o)
+
+    def visit_parameter(self, node, o=None):
+        pass
+
+    def visit_primitive_type(self, node, o=None):
+        pass
+
+    def visit_array_type(self, node, o=None):
+        pass
+
+    def visit_class_type(self, node, o=None):
+        pass
+
+    def visit_reference_type(self, node, o=None):
+        pass
+
+    def visit_block_statement(self, node, o=None):
+        for decl in node.var_decls:
+            self.visit(decl, o)
+        for stmt in node.statements:
+            self.visit(stmt, o)
+
+    def visit_variable_decl(self, node, o=None):
+        for var in node.variables:
+            self.visit(var, o)
+
+    def visit_variable(self, node, o=None):
+        if node.init_value:
+            self.visit(node.init_value, o)
+
+    def visit_assignment_statement(self, node, o=None):
+        self.visit(node.lhs, o)
+        self.visit(node.rhs, o)
+
+    def visit_if_statement(self, node, o=None):
+        self.visit(node.condition, o)
+        self.visit(node.then_stmt, o)
+        if node.else_stmt:
+            self.visit(node.else_stmt, o)
+
+    def visit_for_statement(self, node, o=None):
+        self.visit(node.start_expr, o)
+        self.visit(node.end_expr, o)
+        self.visit(node.body, o)
+
+    def visit_break_statement(self, node, o=None):
+        pass
+
+    def visit_continue_statement(self, node, o=None):
+        pass
+
+    def visit_return_statement(self, node, o=None):
+        if node.value:
+            self.visit(node.value, o)
+
+    def visit_method_invocation_statement(self, node, o=None):
+        self.visit(node.method_call, o)
+
+    def visit_id_lhs(self, node, o=None):
+        pass
+
+    def visit_postfix_lhs(self, node, o=None):
+        self.visit(node.postfix_expr, o)
+
+    def visit_binary_op(self, node, o=None):
+        self.visit(node.left, o)
+        self.visit(node.right, o)
+
+    def visit_unary_op(self, node, o=None):
+        self.visit(node.operand, o)
+
+    def visit_postfix_expression(self, node, o=None):
+        self.visit(node.primary, o)
+        for op in node.postfix_ops:
+            self.visit(op, o)
+
+    def visit_method_call(self, node, o=None):
+        for arg in node.args:
+            self.visit(arg, o)
+
+    def visit_member_access(self, node, o=None):
+        pass
+
+    def visit_array_access(self, node, o=None):
+        self.visit(node.index, o)
+
+    def visit_object_creation(self, node, o=None):
+        for arg in node.args:
+            self.visit(arg, o)
+
+    def visit_identifier(self, node, o=None):
+        pass
+
+    def visit_this_expression(self, node, o=None):
+        pass
+
+    def visit_parenthesized_expression(self, node, o=None):
+        self.visit(node.expr, o)
+
+    def visit_nil_check(self, node, o=None):
+        self.visit(node.expr, o)
+
+    def visit_int_literal(self, node, o=None):
+        pass
+
+    def visit_float_literal(self, node, o=None):
+        pass
+
+    def visit_bool_literal(self, node, o=None):
+        pass
+
+    def visit_string_literal(self, node, o=None):
+        pass
+
+    def visit_array_literal(self, node, o=None):
+        for elem in node.value:
+            self.visit(elem, o)
+
+    def visit_nil_literal(self, node, o=None):
+        pass
+
+    def visit_error_node(self, node, o=None):
+        pass
+
+
+class ASTTransformer(BaseVisitor):
+    """Visitor that replaces every child with the result of visiting it.
+
+    Each visit returns the node to put in place of the one visited, by
+    default the node itself with its children transformed. Inside a block
+    a statement visit may also return None to delete the statement or a
+    list of statements to splice in its place.
+    """
+
+    def _statement(self, stmt, o):
+        """Transform a statement that must remain a single statement."""
+        result = self.visit(stmt, o)
+        if result is None:
+            return BlockStatement([], [])
+        if isinstance(result, list):
+            return BlockStatement([], result)
+        return result
+
+    def visit_program(self, node, o=None):
+        node.class_decls = [self.visit(class_decl, o) for class_decl in node.class_decls]
+        return node
+
+    def visit_class_decl(self, node, o=None):
+        node.members = [self.visit(member, o) for member in node.members]
+        return node
+
+    def visit_attribute_decl(self, node, o=None):
+        node.attributes = [self.visit(attr, o) for attr in node.attributes]
+        return node
+
+    def visit_attribute(self, node, o=None):
+        if node.init_value:
+            node.init_value = self.visit(node.init_value, o)
+        return node
+
+    def visit_method_decl(self, node, o=None):
+        node.body = self._statement(node.body, o)
+        return node
+
+    def visit_constructor_decl(self, node, o=None):
+        node.body = self._statement(node.body, o)
+        return node
+
+    def visit_destructor_decl(self, node, o=None):
+        node.body = self._statement(node.body, o)
+        return node
+
+    def visit_parameter(self, node, o=None):
+        return node
+
+    def visit_primitive_type(self, node, o=None):
+        return node
+
+    def visit_array_type(self, node, o=None):
+        return node
+
+    def visit_class_type(self, node, o=None):
+        return node
+
+    def visit_reference_type(self, node, o=None):
+        return node
+
+    def visit_block_statement(self, node, o=None):
+        node.var_decls = [self.visit(decl, o) for decl in node.var_decls]
+        statements = []
+        for stmt in node.statements:
+            result = self.visit(stmt, o)
+            if isinstance(result, list):
+                statements.extend(result)
+            elif result is not None:
+                statements.append(result)
+        node.statements = statements
+        return node
+
+    def visit_variable_decl(self, node, o=None):
+        node.variables = [self.visit(var, o) for var in node.variables]
+        return node
+
+    def visit_variable(self, node, o=None):
+        if node.init_value:
+            node.init_value = self.visit(node.init_value, o)
+        return node
+
+    def visit_assignment_statement(self, node, o=None):
+        node.lhs = self.visit(node.lhs, o)
+        node.rhs = self.visit(node.rhs, o)
+        return node
+
+    def visit_if_statement(self, node, o=None):
+        node.condition = self.visit(node.condition, o)
+        node.then_stmt = self._statement(node.then_stmt, o)
+        if node.else_stmt:
+            node.else_stmt = self._statement(node.else_stmt, o)
+        return node
+
+    def visit_for_statement(self, node, o=None):
+        node.start_expr = self.visit(node.start_expr, o)
+        node.end_expr = self.visit(node.end_expr, o)
+        node.body = self._statement(node.body, o)
+        return node
+
+    def visit_break_statement(self, node, o=None):
+        return node
+
+    def visit_continue_statement(self, node, o=None):
+        return node
+
+    def visit_return_statement(self, node, o=None):
+        if node.value:
+            node.value = self.visit(node.value, o)
+        return node
+
+    def visit_method_invocation_statement(self, node, o=None):
+        node.method_call = self.visit(node.method_call, o)
+        return node
+
+    def visit_id_lhs(self, node, o=None):
+        return node
+
+    def visit_postfix_lhs(self, node, o=None):
+        node.postfix_expr = self.visit(node.postfix_expr, o)
+        return node
+
+    def visit_binary_op(self, node, o=None):
+        node.left = self.visit(node.left, o)
+        node.right = self.visit(node.right, o)
+        return node
+
+    def visit_unary_op(self, node, o=None):
+        node.operand = self.visit(node.operand, o)
+        return node
+
+    def visit_postfix_expression(self, node, o=None):
+        node.primary = self.visit(node.primary, o)
+        node.postfix_ops = [self.visit(op, o) for op in node.postfix_ops]
+        return node
+
+    def visit_method_call(self, node, o=None):
+        node.args = [self.visit(arg, o) for arg in node.args]
+        return node
+
+    def visit_member_access(self, node, o=None):
+        return node
+
+    def visit_array_access(self, node, o=None):
+        node.index = self.visit(node.index, o)
+        return node
+
+    def visit_object_creation(self, node, o=None):
+        node.args = [self.visit(arg, o) for arg in node.args]
+        return node
+
+    def visit_identifier(self, node, o=None):
+        return node
+
+    def visit_this_expression(self, node, o=None):
+        return node
+
+    def visit_parenthesized_expression(self, node, o=None):
+        node.expr = self.visit(node.expr, o)
+        return node
+
+    def visit_nil_check(self, node, o=None):
+        node.expr = self.visit(node.expr, o)
+        return node
+
+    def visit_int_literal(self, node, o=None):
+        return node
+
+    def visit_float_literal(self, node, o=None):
+        return node
+
+    def visit_bool_literal(self, node, o=None):
+        return node
+
+    def visit_string_literal(self, node, o=None):
+        return node
+
+    def visit_array_literal(self, node, o=None):
+        node.value = [self.visit(elem, o) for elem in node.value]
+        return node
+
+    def visit_nil_literal(self, node, o=None):
+        return node
+
+    def visit_error_node(self, node, o=None):
+        return node
@@ -0,0 +1,216 @@
+"""
+Bytecode format for the OPLang virtual machine.
+This module defines the opcodes, the CodeObject holding one compiled
+method, the VMClass/VMObject runtime representation and a disassembler.
+
+Every instruction is two words in an array('i'): the opcode and one
+integer operand. Instructions that need more than one operand take an
+index into the constant pool, whose entry is a tuple.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.runtime.layout import ClassLayout
+
+
+OPCODES = [
+    # locals and constants
+    "LOAD_LOCAL",        # push locals[arg]
+    "STORE_LOCAL",       # locals[arg] = pop
+    "LOAD_CONST",        # push consts[arg]
+    "LOAD_CELL",         # push locals[arg].value
+    "STORE_CELL",        # locals[arg].value = pop
+    "NEW_CELL",          # locals[arg] = Cell(pop)
+    "BOX_LOCAL",         # locals[arg] = Cell(locals[arg])
+    "BOX_VALUE",         # push Cell(pop)
+    "DEREF",             # push pop.value
+    "INC_LOCAL",         # locals[arg] += 1
+    "DEC_LOCAL",         # locals[arg] -= 1
+    # fields, statics and arrays
+    "LOAD_THIS_FIELD",   # push locals[0].fields[arg]
+    "STORE_THIS_FIELD",  # locals[0].fields[arg] = pop
+    "LOAD_FIELD",        # obj = pop; push obj.fields[arg]
+    "STORE_FIELD",       # v = pop; obj = pop; obj.fields[arg] = v
+    "LOAD_FIELD_NAMED",  # field named consts[arg], resolved on the receiver's class
+    "STORE_FIELD_NAMED",
+    "MAKE_FIELD_REF",    # obj = pop; push FieldRef(obj, arg)
+    "MAKE_FIELD_REF_NAMED",
+    "LOAD_STATIC",       # push consts[arg].value (consts[arg] is the static Cell)
+    "STORE_STATIC",      # consts[arg].value = pop
+    "ARRAY_LOAD",        # i = pop; a = pop; push a[i]
+    "ARRAY_STORE",       # v = pop; i = pop; a = pop; a[i] = v
+    "MAKE_ELEM_REF",     # i = pop; a = pop; push ElementRef(a, i)
+    "NEW_ARRAY",         # consts[arg] = ArrayType; push new_array(consts[arg])
+    "BUILD_ARRAY",       # pop arg values into a new array
+    "BUILD_FLOAT_ARRAY", # pop arg values into a new float array
+    # operators
+    "ADD", "SUB", "MUL", "FDIV", "IDIV", "MOD", "CONCAT",
+    "EQ", "NE", "LT", "GT", "LE", "GE",
+    "NEG", "NOT",
+    # control flow
+    "JUMP",              # pc = arg
+    "JUMP_IF_FALSE",     # if not pop: pc = arg
+    "JUMP_IF_FALSE_OR_POP",
+    "JUMP_IF_TRUE_OR_POP",
+    "FOR_TEST",          # consts[arg] = (var slot, end slot, exit pc, ascending)
+    "FOR_NEXT",          # consts[arg] = (var slot, end slot, body pc, ascending); step, test and jump
+    "POP",
+    # calls and objects
+    "CALL_STATIC",       # consts[arg] = (CodeObject, argc, want_location)
+    "CALL_VIRTUAL",      # consts[arg] = (name, argc, want_location, adapt, InlineCache)
+    "CALL_DIRECT",       # consts[arg] = (CodeObject, argc, want_location); receiver below the args
+    "CALL_IO",           # consts[arg] = (name, argc)
+    "NEW",               # consts[arg] = (VMClass, constructor CodeObject or None, argc)
+    "RETURN",
+    "RETURN_NONE",
+    "RAISE",             # raise OPLangRuntimeError(consts[arg])
+    "CHECK_NIL",         # fail as a call of method consts[arg] if the top of the stack is nil
+    "DESTROY_LOCAL",     # run the destructor of the object in locals[arg] now, if it has not run
+]
+
+for _index, _name in enumerate(OPCODES):
+    globals()[_name] = _index
+
+BINARY_OPCODES = {
+    "+": ADD, "-": SUB, "*": MUL, "/": FDIV, "\\": IDIV, "%": MOD, "^": CONCAT,
+    "==": EQ, "!=": NE, "<": LT, ">": GT, "<=": LE, ">=": GE,
+}
+
+
+class CodeObject:
+    """One compiled method, constructor, destructor or initialiser.
+
+    Slot 0 of the locals holds ``this`` (None for static code) and the
+    parameters follow in slots 1..nparams.
+    """
+
+    def __init__(self, name: str, owner: str, nparams: int = 0, is_static: bool = False,
+                 returns_ref: bool = False, ref_params: tuple = ()):
+        self.name = name
+        self.owner = owner
+        self.nparams = nparams
+        self.is_static = is_static
+        self.returns_ref = returns_ref
+        self.ref_params = ref_params
+        self.nlocals = nparams + 1
+        self.code = array("i")
+        self.consts: List[Any] = []
+        # word offset -> member name, used to build error messages
+        self.names: Dict[int, str] = {}
+
+    def __repr__(self):
+        return f"<code {self.owner}.{self.name}>"
+
+
+class VMClass:
+    """Runtime class: field slot layout, static cells and own methods."""
+
+    def __init__(self, name: str, superclass: Optional["VMClass"] = None,
+                 layout: Optional[ClassLayout] = None, template: Optional[List[Any]] = None):
+        self.name = name
+        self.superclass = superclass
+        self.layout = layout
+        self.field_slots: Dict[str, int] = layout.slots if layout else {}
+        # initial field values of a new instance, one per slot
+        self.template: List[Any] = template if template is not None else []
+        self.statics: Dict[str, Any] = {}
+        self.methods: Dict[str, CodeObject] = {}
+        # own and inherited methods by name, filled in once all methods are declared
+        self.vtable: Dict[str, CodeObject] = {}
+        self.field_init: Optional[CodeObject] = None
+        self.destructor: Optional[CodeObject] = None
+
+    def build_vtable(self):
+        """Fill vtable from the superclass's, which must already be built."""
+        self.vtable = dict(self.superclass.vtable) if self.superclass else {}
+        self.vtable.update(self.methods)
+
+    def find_method(self, name: str) -> Optional[CodeObject]:
+        return self.vtable.get(name)
+
+    def find_static(self, name: str):
+        cls = self
+        while cls is not None:
+            cell = cls.statics.get(name)
+            if cell is not None:
+                return cell
+            cls = cls.superclass
+        return None
+
+    def __repr__(self):
+        return f"<class {self.name}>"
+
+
+# Receiver classes an inline cache remembers before the call site is megamorphic
+POLYMORPHIC_LIMIT = 4
+
+
+class InlineCache(dict):
+    """Cache of one CALL_VIRTUAL site from receiver VMClass to the method it calls.
+
+    A site that has seen one receiver class is monomorphic, up to
+    POLYMORPHIC_LIMIT polymorphic; beyond that, new classes are looked up
+    in their vtable without being cached.
+    """
+
+    __slots__ = ("name", "site", "hits", "misses")
+
+    def __init__(self, name: str, site: str):
+        super().__init__()
+        self.name = name
+        self.site = site
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def __repr__(self):
+        return f"<cache {self.name}>"
+
+
+class VMObject:
+    """Instance of a VMClass; fields are indexed by slot."""
+
+    __slots__ = ("cls", "fields")
+
+    def __init__(self, cls: VMClass, fields: List[Any]):
+        self.cls = cls
+        self.fields = fields
+
+    def __repr__(self):
+        return f"<{self.cls.name} object>"
+
+
+class Module:
+    """Result of compiling a Program."""
+
+    def __init__(self):
+        self.classes: Dict[str, VMClass] = {}
+        self.static_inits: List[CodeObject] = []
+        self.inline_caches: List[InlineCache] = []
+        self.entry: Optional[CodeObject] = None
+        self.entry_class: Optional[VMClass] = None
+        # constructor run on the object an instance main() is called on
+        self.entry_ctor: Optional[CodeObject] = None
+
+
+def disassemble(code: CodeObject) -> str:
+    """Return a readable listing of code, one instruction per line."""
+    lines = []
+    for pc in range(0, len(code.code), 2):
+        op, arg = code.code[pc], code.code[pc + 1]
+        name = OPCODES[op]
+        if name in ("LOAD_CONST", "RAISE", "CHECK_NIL", "NEW_ARRAY", "LOAD_FIELD_NAMED", "STORE_FIELD_NAMED",
+                    "MAKE_FIELD_REF_NAMED", "CALL_STATIC", "CALL_VIRTUAL", "CALL_DIRECT", "CALL_IO", "NEW",
+                    "FOR_TEST", "FOR_NEXT"):
+            detail = f" ({code.consts[arg]!r})"
+        elif name in ("LOAD_STATIC", "STORE_STATIC"):
+            detail = f" ({code.names.get(pc, '?')})"
+        else:
+            detail = ""
+        lines.append(f"{pc:4d} {name} {arg}{detail}")
+    return "\n".join(lines)
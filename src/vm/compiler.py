@@ -0,0 +1,781 @@
+"""
+Bytecode compiler for OPLang programs.
+This module translates a Program AST into a Module of CodeObjects for
+the virtual machine in src/vm/machine.py. Locals are resolved to slot
+indexes, static attributes to their Cells and instance attributes to
+field slots of the receiver's static type, using TypeInference.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional, Set
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.semantics.class_table import ClassTable, IO_CLASS
+from src.semantics.type_inference import TypeInference, IO_METHODS
+from src.analysis.lifetimes import LifetimeAnalysis
+from src.runtime.layout import ClassLayout, compute_layouts
+from src.runtime.values import INT_MAX, INT_MIN, Cell, ClassRef, default_value, decode_string
+from src.vm.bytecode import *
+
+
+def _unparen(expr: Expr) -> Expr:
+    while isinstance(expr, ParenthesizedExpression):
+        expr = expr.expr
+    return expr
+
+
+def _array_default(t: Type) -> Optional[ArrayType]:
+    """Return t without a reference if it is an array type, else None."""
+    if isinstance(t, ReferenceType):
+        t = t.referenced_type
+    return t if isinstance(t, ArrayType) else None
+
+
+class _BoxedNames(BaseVisitor):
+    """Collect the names of locals whose storage may be aliased.
+
+    A local is aliased when it is declared as a reference, bound by a
+    reference declaration, passed at a position where some method or
+    constructor of that name takes a reference parameter, or returned
+    from a method returning a reference.
+    """
+
+    def __init__(self, compiler: "Compiler", returns_ref: bool):
+        self.compiler = compiler
+        self.returns_ref = returns_ref
+        self.names: Set[str] = set()
+
+    def _add(self, expr):
+        expr = _unparen(expr)
+        if isinstance(expr, Identifier):
+            self.names.add(expr.name)
+
+    def visit_variable_decl(self, node, o=None):
+        if isinstance(node.var_type, ReferenceType):
+            for var in node.variables:
+                self.names.add(var.name)
+                if var.init_value:
+                    self._add(var.init_value)
+        super().visit_variable_decl(node, o)
+
+    def visit_method_call(self, node, o=None):
+        positions = self.compiler.method_ref_positions.get(node.method_name, ())
+        for i, arg in enumerate(node.args):
+            if i in positions:
+                self._add(arg)
+        super().visit_method_call(node, o)
+
+    def visit_object_creation(self, node, o=None):
+        positions = self.compiler.ctor_ref_positions.get(node.class_name, ())
+        for i, arg in enumerate(node.args):
+            if i in positions:
+                self._add(arg)
+        super().visit_object_creation(node, o)
+
+    def visit_return_statement(self, node, o=None):
+        if self.returns_ref and node.value:
+            self._add(node.value)
+        super().visit_return_statement(node, o)
+
+
+class _Loop:
+    def __init__(self, depth: int = 0):
+        self.breaks: List[int] = []
+        self.continues: List[int] = []
+        # number of enclosing blocks, whose owned objects outlive the loop
+        self.depth = depth
+
+
+class MethodCompiler(BaseVisitor):
+    """Compile the body of one method, constructor or initialiser."""
+
+    def __init__(self, compiler: "Compiler", code: CodeObject, class_name: str):
+        self.compiler = compiler
+        self.code = code
+        self.class_name = class_name
+        self.vmclass = compiler.module.classes[class_name]
+        self.words: List[int] = []
+        self.consts: List[Any] = []
+        self.const_index: Dict[Any, int] = {}
+        self.scopes: List[Dict[str, tuple]] = [{}]
+        self.loops: List[_Loop] = []
+        # slots of the locals owning their object, per enclosing block (src/analysis/lifetimes.py)
+        self.owned: List[List[int]] = []
+        self.boxed: Set[str] = set()
+        self.nslots = code.nparams + 1
+
+    # ------------------------------------------------------------------
+    # Emission helpers
+    # ------------------------------------------------------------------
+
+    def emit(self, op: int, arg: int = 0, name: Optional[str] = None) -> int:
+        pos = len(self.words)
+        self.words.append(op)
+        self.words.append(arg)
+        if name is not None:
+            self.code.names[pos] = name
+        return pos
+
+    def here(self) -> int:
+        return len(self.words)
+
+    def patch(self, pos: int, target: int):
+        self.words[pos + 1] = target
+
+    def const(self, value: Any) -> int:
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            key = (type(value), repr(value))
+        else:
+            key = ("id", id(value))
+        index = self.const_index.get(key)
+        if index is None:
+            index = self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def new_slot(self) -> int:
+        slot = self.nslots
+        self.nslots += 1
+        return slot
+
+    def declare(self, name: str, slot: int, boxed: bool):
+        self.scopes[-1][name] = (slot, boxed)
+
+    def raise_error(self, message: str):
+        self.emit(RAISE, self.const(message))
+
+    def finish(self):
+        self.code.code = array("i", self.words)
+        self.code.consts = self.consts
+        self.code.nlocals = self.nslots
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def compile_body(self, decl):
+        params = getattr(decl, "params", [])
+        finder = _BoxedNames(self.compiler, self.code.returns_ref)
+        finder.visit(decl.body)
+        self.boxed = finder.names
+        for i, param in enumerate(params):
+            slot = i + 1
+            if isinstance(param.param_type, ReferenceType):
+                self.declare(param.name, slot, True)
+            elif param.name in self.boxed:
+                self.emit(BOX_LOCAL, slot)
+                self.declare(param.name, slot, True)
+            else:
+                self.declare(param.name, slot, False)
+        self.visit(decl.body)
+        self.emit(RETURN_NONE)
+        self.finish()
+
+    def compile_field_init(self, attributes):
+        for decl, attr in attributes:
+            slot = self.vmclass.field_slots[attr.name]
+            if attr.init_value:
+                self.visit(attr.init_value)
+            else:
+                self.emit(NEW_ARRAY, self.const(_array_default(decl.attr_type)))
+            self.emit(STORE_THIS_FIELD, slot, attr.name)
+        self.emit(RETURN_NONE)
+        self.finish()
+
+    def compile_static_init(self, class_decl: ClassDecl):
+        for member in class_decl.members:
+            if isinstance(member, AttributeDecl) and member.is_static:
+                for attr in member.attributes:
+                    if attr.init_value:
+                        self.visit(attr.init_value)
+                    elif _array_default(member.attr_type):
+                        self.emit(NEW_ARRAY, self.const(_array_default(member.attr_type)))
+                    else:
+                        self.emit(LOAD_CONST, self.const(default_value(member.attr_type)))
+                    cell = self.vmclass.statics[attr.name]
+                    self.emit(STORE_STATIC, self.const(cell), attr.name)
+        self.emit(RETURN_NONE)
+        self.finish()
+
+    # ------------------------------------------------------------------
+    # Names
+    # ------------------------------------------------------------------
+
+    def resolve(self, name: str):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                slot, boxed = scope[name]
+                return ("local", slot, boxed)
+        if not self.code.is_static and name in self.vmclass.field_slots:
+            return ("field", self.vmclass.field_slots[name])
+        cell = self.vmclass.find_static(name)
+        if cell is not None:
+            return ("static", cell)
+        if name in self.compiler.class_table or name == IO_CLASS:
+            return ("class", name)
+        return None
+
+    def emit_load_name(self, name: str):
+        found = self.resolve(name)
+        if found is None:
+            self.raise_error(f"Undeclared identifier {name}")
+        elif found[0] == "local":
+            self.emit(LOAD_CELL if found[2] else LOAD_LOCAL, found[1])
+        elif found[0] == "field":
+            self.emit(LOAD_THIS_FIELD, found[1], name)
+        elif found[0] == "static":
+            self.emit(LOAD_STATIC, self.const(found[1]), name)
+        else:
+            self.emit(LOAD_CONST, self.const(ClassRef(name)))
+
+    def emit_store_name(self, name: str):
+        """Store the value on top of the stack into name."""
+        found = self.resolve(name)
+        if found is None or found[0] == "class":
+            self.raise_error(f"Undeclared identifier {name}")
+        elif found[0] == "local":
+            self.emit(STORE_CELL if found[2] else STORE_LOCAL, found[1])
+        elif found[0] == "field":
+            self.emit(STORE_THIS_FIELD, found[1], name)
+        else:
+            self.emit(STORE_STATIC, self.const(found[1]), name)
+
+    def emit_location(self, expr: Expr):
+        """Push a location (Cell, FieldRef or ElementRef) for expr."""
+        expr = _unparen(expr)
+        if isinstance(expr, Identifier):
+            found = self.resolve(expr.name)
+            if found and found[0] == "local":
+                self.emit(LOAD_LOCAL, found[1])
+                if not found[2]:
+                    self.emit(BOX_VALUE)
+                return
+            if found and found[0] == "field":
+                self.emit(LOAD_LOCAL, 0)
+                self.emit(MAKE_FIELD_REF, found[1], expr.name)
+                return
+            if found and found[0] == "static":
+                self.emit(LOAD_CONST, self.const(found[1]))
+                return
+        elif isinstance(expr, PostfixExpression):
+            self.emit_postfix(expr, location=True)
+            return
+        self.visit(expr)
+        self.emit(BOX_VALUE)
+
+    # ------------------------------------------------------------------
+    # Postfix chains and calls
+    # ------------------------------------------------------------------
+
+    def emit_primary(self, primary: Expr):
+        """Emit the primary of a postfix chain; return ('class', name) or ('value', type)."""
+        if isinstance(primary, Identifier):
+            found = self.resolve(primary.name)
+            if found and found[0] == "class":
+                return ("class", primary.name)
+        self.visit(primary)
+        return ("value", self.compiler.type_of(primary))
+
+    def emit_postfix(self, node: PostfixExpression, location: bool = False):
+        receiver = self.emit_primary(node.primary)
+        last = len(node.postfix_ops) - 1
+        for i, op in enumerate(node.postfix_ops):
+            want_location = location and i == last
+            if isinstance(op, MemberAccess):
+                self.emit_member(receiver, op.member_name, want_location)
+            elif isinstance(op, ArrayAccess):
+                if receiver[0] == "class":
+                    self.raise_error(f"Cannot index class {receiver[1]}")
+                self.visit(op.index)
+                self.emit(MAKE_ELEM_REF if want_location else ARRAY_LOAD)
+            else:
+                self.emit_call(receiver, op, want_location)
+            receiver = ("value", self.compiler.type_of(op))
+
+    def emit_member(self, receiver, name: str, want_location: bool):
+        kind, info = receiver
+        if kind == "class":
+            cell = self.compiler.static_cell(info, name)
+            if cell is None:
+                self.raise_error(f"Undeclared attribute {info}.{name}")
+            elif want_location:
+                self.emit(LOAD_CONST, self.const(cell))
+            else:
+                self.emit(LOAD_STATIC, self.const(cell), name)
+            return
+        class_name = info.class_name if isinstance(info, ClassType) else None
+        vmclass = self.compiler.module.classes.get(class_name)
+        if vmclass is not None and name in vmclass.field_slots:
+            self.emit(MAKE_FIELD_REF if want_location else LOAD_FIELD, vmclass.field_slots[name], name)
+        elif vmclass is not None and vmclass.find_static(name) is not None:
+            cell = vmclass.find_static(name)
+            self.emit(POP)
+            if want_location:
+                self.emit(LOAD_CONST, self.const(cell))
+            else:
+                self.emit(LOAD_STATIC, self.const(cell), name)
+        else:
+            op = MAKE_FIELD_REF_NAMED if want_location else LOAD_FIELD_NAMED
+            self.emit(op, self.const(name), name)
+
+    def emit_args(self, params: Optional[List[Parameter]], args: List[Expr], positions=()):
+        for i, arg in enumerate(args):
+            if params is not None:
+                is_ref = i < len(params) and isinstance(params[i].param_type, ReferenceType)
+            else:
+                is_ref = i in positions
+            if is_ref:
+                self.emit_location(arg)
+            else:
+                self.visit(arg)
+
+    def emit_call(self, receiver, node: MethodCall, want_location: bool):
+        kind, info = receiver
+        name, argc = node.method_name, len(node.args)
+        if kind == "class":
+            if info == IO_CLASS and info not in self.compiler.class_table:
+                if name not in IO_METHODS:
+                    self.raise_error(f"Undeclared method io.{name}")
+                    return
+                self.emit_args([], node.args)
+                self.emit(CALL_IO, self.const((name, argc)), name)
+                if want_location:
+                    self.emit(BOX_VALUE)
+                return
+            decl = self.compiler.class_table.lookup_method(info, name)
+            if decl is None:
+                self.raise_error(f"Undeclared method {info}.{name}")
+                return
+            if len(decl.params) != argc:
+                self.raise_error(f"Expected {len(decl.params)} arguments but got {argc}")
+                return
+            self.emit_args(decl.params, node.args)
+            target = self.compiler.codes[id(decl)]
+            self.emit(CALL_STATIC, self.const((target, argc, want_location)), name)
+            return
+        class_name = info.class_name if isinstance(info, ClassType) else None
+        decl = None
+        if class_name in self.compiler.class_table:
+            decl = self.compiler.class_table.lookup_method(class_name, name)
+        if decl is not None and getattr(node, "target", None) and not decl.is_static and len(decl.params) == argc:
+            # devirtualised by src/optimizer/inlining.py
+            self.emit_args(decl.params, node.args)
+            target = self.compiler.codes[id(decl)]
+            self.emit(CALL_DIRECT, self.const((target, argc, want_location)), name)
+            return
+        if decl is not None:
+            self.emit_args(decl.params, node.args)
+            adapt = False
+        else:
+            self.emit_args(None, node.args, self.compiler.method_ref_positions.get(name, ()))
+            adapt = True
+        cache = InlineCache(name, f"{self.code.owner}.{self.code.name}@{self.here()}")
+        self.compiler.module.inline_caches.append(cache)
+        self.emit(CALL_VIRTUAL, self.const((name, argc, want_location, adapt, cache)), name)
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visit_block_statement(self, node, o=None):
+        self.scopes.append({})
+        for decl in node.var_decls:
+            self.visit(decl)
+        self.owned.append([self.resolve(name)[1] for name in node.scoped])
+        for stmt in node.statements:
+            self.visit(stmt)
+        self.emit_destroy(self.owned.pop())
+        self.scopes.pop()
+
+    def emit_destroy(self, *blocks: List[int]):
+        """Destroy the objects owned by the given blocks, innermost and most recent first."""
+        for slots in reversed(blocks):
+            for slot in reversed(slots):
+                self.emit(DESTROY_LOCAL, slot)
+
+    def emit_default(self, t: Type):
+        if _array_default(t):
+            self.emit(NEW_ARRAY, self.const(_array_default(t)))
+        else:
+            self.emit(LOAD_CONST, self.const(default_value(t)))
+
+    def visit_variable_decl(self, node, o=None):
+        is_ref = isinstance(node.var_type, ReferenceType)
+        for var in node.variables:
+            slot = self.new_slot()
+            if is_ref:
+                if var.init_value:
+                    self.emit_location(var.init_value)
+                else:
+                    self.emit_default(node.var_type)
+                    self.emit(BOX_VALUE)
+                self.emit(STORE_LOCAL, slot)
+                self.declare(var.name, slot, True)
+                continue
+            if var.init_value:
+                self.visit(var.init_value)
+            else:
+                self.emit_default(node.var_type)
+            boxed = var.name in self.boxed
+            self.emit(NEW_CELL if boxed else STORE_LOCAL, slot)
+            self.declare(var.name, slot, boxed)
+
+    def visit_assignment_statement(self, node, o=None):
+        lhs = node.lhs
+        if isinstance(lhs, IdLHS):
+            self.visit(node.rhs)
+            self.emit_store_name(lhs.name)
+            return
+        expr = lhs.postfix_expr
+        if not isinstance(expr, PostfixExpression) or not expr.postfix_ops:
+            self.raise_error("Invalid assignment target")
+            return
+        receiver = self.emit_primary(expr.primary)
+        for op in expr.postfix_ops[:-1]:
+            if isinstance(op, MemberAccess):
+                self.emit_member(receiver, op.member_name, False)
+            elif isinstance(op, ArrayAccess):
+                self.visit(op.index)
+                self.emit(ARRAY_LOAD)
+            else:
+                self.emit_call(receiver, op, False)
+            receiver = ("value", self.compiler.type_of(op))
+        last = expr.postfix_ops[-1]
+        if isinstance(last, ArrayAccess):
+            self.visit(last.index)
+            self.visit(node.rhs)
+            self.emit(ARRAY_STORE)
+        elif isinstance(last, MemberAccess):
+            self.emit_store_member(receiver, last.member_name, node.rhs)
+        else:
+            self.raise_error("Cannot assign to a method call")
+
+    def emit_store_member(self, receiver, name: str, rhs: Expr):
+        kind, info = receiver
+        if kind == "class":
+            cell = self.compiler.static_cell(info, name)
+            if cell is None:
+                self.raise_error(f"Undeclared attribute {info}.{name}")
+                return
+            self.visit(rhs)
+            self.emit(STORE_STATIC, self.const(cell), name)
+            return
+        class_name = info.class_name if isinstance(info, ClassType) else None
+        vmclass = self.compiler.module.classes.get(class_name)
+        if vmclass is not None and name in vmclass.field_slots:
+            self.visit(rhs)
+            self.emit(STORE_FIELD, vmclass.field_slots[name], name)
+        elif vmclass is not None and vmclass.find_static(name) is not None:
+            self.emit(POP)
+            self.visit(rhs)
+            self.emit(STORE_STATIC, self.const(vmclass.find_static(name)), name)
+        else:
+            self.visit(rhs)
+            self.emit(STORE_FIELD_NAMED, self.const(name), name)
+
+    def visit_if_statement(self, node, o=None):
+        self.visit(node.condition)
+        to_else = self.emit(JUMP_IF_FALSE)
+        self.visit(node.then_stmt)
+        if node.else_stmt:
+            to_end = self.emit(JUMP)
+            self.patch(to_else, self.here())
+            self.visit(node.else_stmt)
+            self.patch(to_end, self.here())
+        else:
+            self.patch(to_else, self.here())
+
+    def visit_for_statement(self, node, o=None):
+        self.visit(node.start_expr)
+        found = self.resolve(node.variable)
+        if found is None or found[0] == "class":
+            slot = self.new_slot()
+            boxed = node.variable in self.boxed
+            self.emit(NEW_CELL if boxed else STORE_LOCAL, slot)
+            self.declare(node.variable, slot, boxed)
+            found = ("local", slot, boxed)
+        else:
+            self.emit_store_name(node.variable)
+        end_slot = self.new_slot()
+        self.visit(node.end_expr)
+        self.emit(STORE_LOCAL, end_slot)
+        up = node.direction == "to"
+        fast = found[0] == "local" and not found[2]
+        # a counted loop (see src/optimizer/loops.py) tests once and then steps, tests and jumps in one instruction
+        counted = fast and getattr(node, "counted", False)
+
+        loop = _Loop(len(self.owned))
+        self.loops.append(loop)
+        test = self.here()
+        if fast:
+            exit_jump = self.emit(FOR_TEST)
+        else:
+            self.emit_load_name(node.variable)
+            self.emit(LOAD_LOCAL, end_slot)
+            self.emit(LE if up else GE)
+            exit_jump = self.emit(JUMP_IF_FALSE)
+        body = self.here()
+        self.visit(node.body)
+        step = self.here()
+        if counted:
+            self.emit(FOR_NEXT, self.const((found[1], end_slot, body, up)))
+        elif fast:
+            self.emit(INC_LOCAL if up else DEC_LOCAL, found[1])
+        else:
+            self.emit_load_name(node.variable)
+            self.emit(LOAD_CONST, self.const(1))
+            self.emit(ADD if up else SUB)
+            self.emit_store_name(node.variable)
+        if not counted:
+            self.emit(JUMP, test)
+        end = self.here()
+        self.loops.pop()
+
+        if fast:
+            self.patch(exit_jump, self.const((found[1], end_slot, end, up)))
+        else:
+            self.patch(exit_jump, end)
+        for pos in loop.breaks:
+            self.patch(pos, end)
+        for pos in loop.continues:
+            self.patch(pos, step)
+
+    def visit_break_statement(self, node, o=None):
+        if not self.loops:
+            self.raise_error("Break outside loop")
+            return
+        self.emit_destroy(*self.owned[self.loops[-1].depth:])
+        self.loops[-1].breaks.append(self.emit(JUMP))
+
+    def visit_continue_statement(self, node, o=None):
+        if not self.loops:
+            self.raise_error("Continue outside loop")
+            return
+        self.emit_destroy(*self.owned[self.loops[-1].depth:])
+        self.loops[-1].continues.append(self.emit(JUMP))
+
+    def visit_return_statement(self, node, o=None):
+        if node.value is None:
+            self.emit_destroy(*self.owned)
+            self.emit(RETURN_NONE)
+            return
+        if self.code.returns_ref:
+            self.emit_location(node.value)
+        else:
+            self.visit(node.value)
+        self.emit_destroy(*self.owned)
+        self.emit(RETURN)
+
+    def visit_method_invocation_statement(self, node, o=None):
+        self.visit(node.method_call)
+        self.emit(POP)
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visit_binary_op(self, node, o=None):
+        if node.operator in ("&&", "||"):
+            self.visit(node.left)
+            jump = self.emit(JUMP_IF_FALSE_OR_POP if node.operator == "&&" else JUMP_IF_TRUE_OR_POP)
+            self.visit(node.right)
+            self.patch(jump, self.here())
+            return
+        self.visit(node.left)
+        self.visit(node.right)
+        self.emit(BINARY_OPCODES[node.operator])
+
+    def visit_unary_op(self, node, o=None):
+        self.visit(node.operand)
+        if node.operator == "-":
+            self.emit(NEG)
+        elif node.operator == "!":
+            self.emit(NOT)
+
+    def visit_postfix_expression(self, node, o=None):
+        self.emit_postfix(node)
+
+    def visit_object_creation(self, node, o=None):
+        name, argc = node.class_name, len(node.args)
+        if name not in self.compiler.class_table:
+            self.raise_error(f"Undeclared class {name}")
+            return
+        ctor = self.compiler.inference.constructor_of(node)
+        if ctor is None and argc:
+            self.raise_error(f"No constructor of {name} takes {argc} arguments")
+            return
+        self.emit_args(ctor.params if ctor else [], node.args)
+        target = self.compiler.codes[id(ctor)] if ctor else None
+        self.emit(NEW, self.const((self.compiler.module.classes[name], target, argc)), name)
+
+    def visit_identifier(self, node, o=None):
+        self.emit_load_name(node.name)
+
+    def visit_this_expression(self, node, o=None):
+        self.emit(LOAD_LOCAL, 0)
+
+    def visit_parenthesized_expression(self, node, o=None):
+        self.visit(node.expr)
+
+    def visit_nil_check(self, node, o=None):
+        self.visit(node.expr)
+        self.emit(CHECK_NIL, self.const(node.method_name))
+
+    def visit_int_literal(self, node, o=None):
+        if not INT_MIN <= node.value <= INT_MAX:
+            self.raise_error("Integer overflow")
+            return
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    def visit_float_literal(self, node, o=None):
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    def visit_bool_literal(self, node, o=None):
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    def visit_string_literal(self, node, o=None):
+        self.emit(LOAD_CONST, self.const(decode_string(node.value)))
+
+    def visit_array_literal(self, node, o=None):
+        for elem in node.value:
+            self.visit(elem)
+        t = self.compiler.type_of(node)
+        floats = isinstance(t, ArrayType) and isinstance(t.element_type, PrimitiveType) and t.element_type.type_name == "float"
+        self.emit(BUILD_FLOAT_ARRAY if floats else BUILD_ARRAY, len(node.value))
+
+    def visit_nil_literal(self, node, o=None):
+        self.emit(LOAD_CONST, self.const(None))
+
+
+class Compiler:
+    """Compile a Program into a Module for the VM."""
+
+    def __init__(self):
+        self.module: Optional[Module] = None
+        self.class_table: Optional[ClassTable] = None
+        self.inference: Optional[TypeInference] = None
+        self.layouts: Dict[str, ClassLayout] = {}
+        self.codes: Dict[int, CodeObject] = {}
+        self.method_ref_positions: Dict[str, Set[int]] = {}
+        self.ctor_ref_positions: Dict[str, Set[int]] = {}
+
+    def type_of(self, node: ASTNode) -> Optional[Type]:
+        return self.inference.type_of(node)
+
+    def static_cell(self, class_name: str, name: str) -> Optional[Cell]:
+        vmclass = self.module.classes.get(class_name)
+        return vmclass.find_static(name) if vmclass else None
+
+    def compile(self, program: Program) -> Module:
+        self.module = Module()
+        self.class_table = ClassTable(program)
+        self.layouts = compute_layouts(self.class_table)
+        LifetimeAnalysis(self.class_table).analyze(program)
+        self.inference = TypeInference()
+        self.inference.infer(program)
+        self.codes = {}
+
+        ordered = self._ordered_classes(program)
+        for class_decl in ordered:
+            self._declare_class(class_decl)
+        for class_decl in ordered:
+            self._declare_members(class_decl)
+        for class_decl in ordered:
+            self._compile_class(class_decl)
+
+        for class_decl in program.class_decls:
+            main = self.class_table.methods[class_decl.name].get("main")
+            if main and not main.params:
+                self.module.entry = self.codes[id(main)]
+                self.module.entry_class = self.module.classes[class_decl.name]
+                ctor = self.class_table.find_constructor(class_decl.name, [])
+                self.module.entry_ctor = self.codes[id(ctor)] if ctor else None
+                break
+        return self.module
+
+    def _ordered_classes(self, program: Program) -> List[ClassDecl]:
+        """Return class declarations with every superclass before its subclasses."""
+        ordered, done = [], set()
+
+        def add(class_decl):
+            if class_decl.name in done:
+                return
+            done.add(class_decl.name)
+            parent = self.class_table.classes.get(class_decl.superclass)
+            if parent is not None:
+                add(parent)
+            ordered.append(class_decl)
+
+        for class_decl in program.class_decls:
+            add(class_decl)
+        return ordered
+
+    def _declare_class(self, class_decl: ClassDecl):
+        parent = self.module.classes.get(class_decl.superclass)
+        layout = self.layouts[class_decl.name]
+        # arrays are created by the field initialiser, one per instance
+        template = [None if _array_default(decl.attr_type) else default_value(decl.attr_type)
+                    for decl, _ in layout.attributes]
+        vmclass = VMClass(class_decl.name, parent, layout, template)
+        self.module.classes[class_decl.name] = vmclass
+        for member in class_decl.members:
+            if isinstance(member, AttributeDecl) and member.is_static:
+                for attr in member.attributes:
+                    vmclass.statics[attr.name] = Cell()
+
+    def _declare_members(self, class_decl: ClassDecl):
+        vmclass = self.module.classes[class_decl.name]
+        for member in class_decl.members:
+            if isinstance(member, MethodDecl):
+                code = CodeObject(
+                    member.name, class_decl.name, len(member.params), member.is_static,
+                    isinstance(member.return_type, ReferenceType),
+                    tuple(isinstance(p.param_type, ReferenceType) for p in member.params),
+                )
+                vmclass.methods[member.name] = code
+                self._note_ref_positions(self.method_ref_positions, member.name, member.params)
+            elif isinstance(member, ConstructorDecl):
+                code = CodeObject(
+                    class_decl.name, class_decl.name, len(member.params), False, False,
+                    tuple(isinstance(p.param_type, ReferenceType) for p in member.params),
+                )
+                self._note_ref_positions(self.ctor_ref_positions, class_decl.name, member.params)
+            elif isinstance(member, DestructorDecl):
+                code = CodeObject("~" + class_decl.name, class_decl.name)
+            else:
+                continue
+            self.codes[id(member)] = code
+        dtor = self.class_table.find_destructor(class_decl.name)
+        if dtor is not None:
+            vmclass.destructor = self.codes.get(id(dtor))
+        vmclass.build_vtable()
+
+    @staticmethod
+    def _note_ref_positions(table, name, params):
+        positions = table.setdefault(name, set())
+        for i, param in enumerate(params):
+            if isinstance(param.param_type, ReferenceType):
+                positions.add(i)
+
+    def _compile_class(self, class_decl: ClassDecl):
+        name = class_decl.name
+        vmclass = self.module.classes[name]
+        for member in class_decl.members:
+            code = self.codes.get(id(member))
+            if code is not None:
+                MethodCompiler(self, code, name).compile_body(member)
+
+        inits = [
+            (decl, attr)
+            for decl, attr in self.class_table.instance_attributes(name)
+            if attr.init_value or _array_default(decl.attr_type)
+        ]
+        if inits:
+            vmclass.field_init = CodeObject("<init>", name)
+            MethodCompiler(self, vmclass.field_init, name).compile_field_init(inits)
+
+        if vmclass.statics:
+            clinit = CodeObject("<clinit>", name, is_static=True)
+            MethodCompiler(self, clinit, name).compile_static_init(class_decl)
+            self.module.static_inits.append(clinit)
@@ -0,0 +1,378 @@
+"""
+Virtual machine for compiled OPLang programs.
+This module executes the Modules produced by src/vm/compiler.py with a
+single dispatch loop per activation: each OPLang call is one Python call
+of VM.execute.
+"""
+
+from typing import Any, List, Optional
+
+from src.utils.nodes import ArrayType
+from src.runtime.errors import OPLangRuntimeError
+from src.runtime.io_runtime import IORuntime
+from src.runtime.stack import run_with_large_stack
+from src.runtime.values import INT_MAX, INT_MIN, Cell, ElementRef, FieldRef, LiveObjects, array_of, new_array
+from src.semantics.type_inference import FLOAT, IO_METHODS
+from src.vm.bytecode import *
+
+
+_LOCATIONS = (Cell, FieldRef, ElementRef)
+
+# type given to the literals of BUILD_FLOAT_ARRAY, whose storage depends on the element type only
+_FLOATS = ArrayType(FLOAT, 0)
+
+
+class VM:
+    """Execute a compiled Module starting from its entry method."""
+
+    def __init__(self, module: Module, io: Optional[IORuntime] = None):
+        self.module = module
+        self.io = io if io is not None else IORuntime()
+        self.io_methods = {name: getattr(self.io, name) for name in IO_METHODS}
+        self.live = LiveObjects()
+
+    def run(self):
+        if self.module.entry is None:
+            raise OPLangRuntimeError("No entry point main()")
+        run_with_large_stack(self._run)
+
+    def _run(self):
+        module = self.module
+        try:
+            for clinit in module.static_inits:
+                self.execute(clinit, [None] * clinit.nlocals)
+            this = None if module.entry.is_static else self.instantiate(module.entry_class, module.entry_ctor, [])
+            self.execute(module.entry, [this] + [None] * (module.entry.nlocals - 1))
+            while self.live:
+                obj = self.live.pop()
+                dtor = obj.cls.destructor
+                self.execute(dtor, [obj] + [None] * (dtor.nlocals - 1))
+        except RecursionError:
+            raise OPLangRuntimeError("Stack overflow") from None
+        finally:
+            self.io.flush()
+
+    def instantiate(self, cls: VMClass, ctor: Optional[CodeObject], args: List[Any]) -> VMObject:
+        obj = VMObject(cls, cls.template[:])
+        init = cls.field_init
+        if init is not None:
+            self.execute(init, [obj] + [None] * (init.nlocals - 1))
+        if ctor is not None:
+            self.execute(ctor, [obj] + args + [None] * (ctor.nlocals - len(args) - 1))
+        if cls.destructor is not None:
+            self.live.add(obj)
+        return obj
+
+    def _adapt(self, target: CodeObject, values: List[Any]):
+        """Fix up arguments compiled without knowing the callee's parameter modes."""
+        for i, is_ref in enumerate(target.ref_params, 1):
+            value = values[i]
+            if is_ref and not isinstance(value, _LOCATIONS):
+                values[i] = Cell(value)
+            elif not is_ref and isinstance(value, _LOCATIONS):
+                values[i] = value.value
+
+    def execute(self, code: CodeObject, L: List[Any], want_location: bool = False):
+        instrs = code.code
+        consts = code.consts
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        index = None
+        try:
+            while True:
+                op = instrs[pc]
+                arg = instrs[pc + 1]
+                pc += 2
+                if op == LOAD_LOCAL:
+                    push(L[arg])
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+                elif op == STORE_LOCAL:
+                    L[arg] = pop()
+                elif op == FOR_TEST:
+                    var, end, exit_pc, up = consts[arg]
+                    if (L[var] > L[end]) if up else (L[var] < L[end]):
+                        if not INT_MIN <= L[var] <= INT_MAX:
+                            raise OverflowError
+                        pc = exit_pc
+                elif op == FOR_NEXT:
+                    var, end, body_pc, up = consts[arg]
+                    if up:
+                        L[var] += 1
+                        if L[var] <= L[end]:
+                            pc = body_pc
+                        elif L[var] > INT_MAX:
+                            raise OverflowError
+                    else:
+                        L[var] -= 1
+                        if L[var] >= L[end]:
+                            pc = body_pc
+                        elif L[var] < INT_MIN:
+                            raise OverflowError
+                elif op == INC_LOCAL:
+                    L[arg] += 1
+                elif op == JUMP:
+                    pc = arg
+                elif op == JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+                elif op == ADD:
+                    b = pop()
+                    value = stack[-1] + b
+                    if (value > INT_MAX or value < INT_MIN) and type(value) is int:
+                        raise OverflowError
+                    stack[-1] = value
+                elif op == SUB:
+                    b = pop()
+                    value = stack[-1] - b
+                    if (value > INT_MAX or value < INT_MIN) and type(value) is int:
+                        raise OverflowError
+                    stack[-1] = value
+                elif op == MUL:
+                    b = pop()
+                    value = stack[-1] * b
+                    if (value > INT_MAX or value < INT_MIN) and type(value) is int:
+                        raise OverflowError
+                    stack[-1] = value
+                elif op == LT:
+                    b = pop()
+                    stack[-1] = stack[-1] < b
+                elif op == GT:
+                    b = pop()
+                    stack[-1] = stack[-1] > b
+                elif op == LE:
+                    b = pop()
+                    stack[-1] = stack[-1] <= b
+                elif op == GE:
+                    b = pop()
+                    stack[-1] = stack[-1] >= b
+                elif op == EQ:
+                    b = pop()
+                    stack[-1] = stack[-1] == b
+                elif op == NE:
+                    b = pop()
+                    stack[-1] = stack[-1] != b
+                elif op == LOAD_THIS_FIELD:
+                    push(L[0].fields[arg])
+                elif op == STORE_THIS_FIELD:
+                    L[0].fields[arg] = pop()
+                elif op == LOAD_FIELD:
+                    stack[-1] = stack[-1].fields[arg]
+                elif op == STORE_FIELD:
+                    value = pop()
+                    pop().fields[arg] = value
+                elif op == ARRAY_LOAD:
+                    index = pop()
+                    if index < 0:
+                        raise IndexError
+                    stack[-1] = stack[-1][index]
+                elif op == ARRAY_STORE:
+                    value = pop()
+                    index = pop()
+                    if index < 0:
+                        raise IndexError
+                    pop()[index] = value
+                elif op == LOAD_CELL:
+                    push(L[arg].value)
+                elif op == STORE_CELL:
+                    L[arg].value = pop()
+                elif op == LOAD_STATIC:
+                    push(consts[arg].value)
+                elif op == STORE_STATIC:
+                    consts[arg].value = pop()
+                elif op == CALL_VIRTUAL:
+                    name, argc, want, adapt, cache = consts[arg]
+                    n = argc + 1
+                    values = stack[-n:]
+                    del stack[-n:]
+                    cls = values[0].cls
+                    target = cache.get(cls)
+                    if target is None:
+                        target = self._dispatch(cls, cache, argc)
+                    else:
+                        cache.hits += 1
+                    if target.is_static:
+                        values[0] = None
+                    if adapt:
+                        self._adapt(target, values)
+                    values.extend([None] * (target.nlocals - n))
+                    push(self.execute(target, values, want))
+                elif op == CALL_DIRECT:
+                    target, argc, want = consts[arg]
+                    n = argc + 1
+                    values = stack[-n:]
+                    del stack[-n:]
+                    if values[0] is None:
+                        raise OPLangRuntimeError(f"Nil reference calling {target.name}")
+                    values.extend([None] * (target.nlocals - n))
+                    push(self.execute(target, values, want))
+                elif op == CALL_STATIC:
+                    target, argc, want = consts[arg]
+                    if argc:
+                        values = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        values = []
+                    push(self.execute(target, [None] + values + [None] * (target.nlocals - argc - 1), want))
+                elif op == RETURN:
+                    value = pop()
+                    if code.returns_ref:
+                        return value if want_location else value.value
+                    return Cell(value) if want_location else value
+                elif op == RETURN_NONE:
+                    return Cell(None) if want_location else None
+                elif op == POP:
+                    pop()
+                elif op == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1]:
+                        pop()
+                    else:
+                        pc = arg
+                elif op == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1]:
+                        pc = arg
+                    else:
+                        pop()
+                elif op == DEC_LOCAL:
+                    L[arg] -= 1
+                elif op == FDIV:
+                    b = pop()
+                    stack[-1] = stack[-1] / b
+                elif op == IDIV:
+                    b = pop()
+                    a = stack[-1]
+                    q = a // b
+                    if q < 0 and q * b != a:
+                        q += 1
+                    elif q > INT_MAX:
+                        raise OverflowError
+                    stack[-1] = q
+                elif op == MOD:
+                    b = pop()
+                    a = stack[-1]
+                    q = a // b
+                    if q < 0 and q * b != a:
+                        q += 1
+                    stack[-1] = a - b * q
+                elif op == CONCAT:
+                    b = pop()
+                    stack[-1] += b
+                elif op == NEG:
+                    value = -stack[-1]
+                    if value > INT_MAX and type(value) is int:
+                        raise OverflowError
+                    stack[-1] = value
+                elif op == NOT:
+                    stack[-1] = not stack[-1]
+                elif op == CALL_IO:
+                    name, argc = consts[arg]
+                    if argc:
+                        values = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        values = []
+                    push(self.io_methods[name](*values))
+                elif op == NEW:
+                    cls, ctor, argc = consts[arg]
+                    if argc:
+                        values = stack[-argc:]
+                        del stack[-argc:]
+                    else:
+                        values = []
+                    push(self.instantiate(cls, ctor, values))
+                elif op == NEW_ARRAY:
+                    push(new_array(consts[arg]))
+                elif op == BUILD_ARRAY or op == BUILD_FLOAT_ARRAY:
+                    if arg:
+                        values = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        values = []
+                    push(array_of(values, _FLOATS if op == BUILD_FLOAT_ARRAY else None))
+                elif op == NEW_CELL:
+                    L[arg] = Cell(pop())
+                elif op == BOX_LOCAL:
+                    L[arg] = Cell(L[arg])
+                elif op == BOX_VALUE:
+                    stack[-1] = Cell(stack[-1])
+                elif op == DEREF:
+                    stack[-1] = stack[-1].value
+                elif op == MAKE_FIELD_REF:
+                    obj = stack[-1]
+                    obj.fields
+                    stack[-1] = FieldRef(obj, arg)
+                elif op == MAKE_ELEM_REF:
+                    index = pop()
+                    array = stack[-1]
+                    if index < 0 or index >= len(array):
+                        raise IndexError
+                    stack[-1] = ElementRef(array, index)
+                elif op == LOAD_FIELD_NAMED:
+                    stack[-1] = self._named_location(stack[-1], consts[arg]).value
+                elif op == STORE_FIELD_NAMED:
+                    value = pop()
+                    self._named_location(pop(), consts[arg]).value = value
+                elif op == MAKE_FIELD_REF_NAMED:
+                    stack[-1] = self._named_location(stack[-1], consts[arg])
+                elif op == RAISE:
+                    raise OPLangRuntimeError(consts[arg])
+                elif op == CHECK_NIL:
+                    if stack[-1] is None:
+                        raise OPLangRuntimeError(f"Nil reference calling {consts[arg]}")
+                elif op == DESTROY_LOCAL:
+                    obj = L[arg]
+                    if self.live.release(obj):
+                        dtor = obj.cls.destructor
+                        self.execute(dtor, [obj] + [None] * (dtor.nlocals - 1))
+                        obj.fields.clear()
+                else:
+                    raise OPLangRuntimeError(f"Bad opcode {op}")
+        except OPLangRuntimeError:
+            raise
+        except ZeroDivisionError:
+            raise OPLangRuntimeError("Division by zero")
+        except OverflowError:
+            raise OPLangRuntimeError("Integer overflow")
+        except IndexError:
+            raise OPLangRuntimeError(f"Index {index} out of range")
+        except (AttributeError, TypeError):
+            raise self._translate(code, pc - 2, stack)
+
+    def _dispatch(self, cls: VMClass, cache: InlineCache, argc: int) -> CodeObject:
+        """Look up a call site's method in the receiver's vtable and cache it."""
+        cache.misses += 1
+        target = cls.vtable.get(cache.name)
+        if target is None:
+            raise OPLangRuntimeError(f"Undeclared method {cls.name}.{cache.name}")
+        if target.nparams != argc:
+            raise OPLangRuntimeError(f"Expected {target.nparams} arguments but got {argc}")
+        if len(cache) < POLYMORPHIC_LIMIT:
+            cache[cls] = target
+        return target
+
+    def _named_location(self, obj, name: str):
+        if obj is None:
+            raise OPLangRuntimeError(f"Nil reference accessing {name}")
+        if not isinstance(obj, VMObject):
+            raise OPLangRuntimeError(f"Cannot access {name} on a non-object")
+        slot = obj.cls.field_slots.get(name)
+        if slot is not None:
+            return FieldRef(obj, slot)
+        cell = obj.cls.find_static(name)
+        if cell is None:
+            raise OPLangRuntimeError(f"Undeclared attribute {name}")
+        return cell
+
+    def _translate(self, code: CodeObject, pc: int, stack: List[Any]) -> OPLangRuntimeError:
+        """Turn a Python error raised by instruction pc into an OPLang runtime error."""
+        op = code.code[pc]
+        name = code.names.get(pc, "?")
+        if op == CALL_VIRTUAL:
+            return OPLangRuntimeError(f"Nil reference calling {name}")
+        if op in (LOAD_FIELD, STORE_FIELD, LOAD_THIS_FIELD, STORE_THIS_FIELD, MAKE_FIELD_REF):
+            return OPLangRuntimeError(f"Nil reference accessing {name}")
+        if op in (ARRAY_LOAD, ARRAY_STORE, MAKE_ELEM_REF):
+            return OPLangRuntimeError("Nil array access")
+        return OPLangRuntimeError(f"Invalid operands for {OPCODES[op]}")
@@ -0,0 +1,116 @@
+from array import array
+
+from utils import ProgramRunner, VMRunner, TranspilerRunner
+from src.runtime.values import array_of, new_array
+from src.utils.nodes import ArrayType, ClassType, PrimitiveType
+
+
+def test_001():
+    """Test arrays of int, float and boolean get typed contiguous storage"""
+    ints = new_array(ArrayType(PrimitiveType("int"), 4))
+    floats = new_array(ArrayType(PrimitiveType("float"), 3))
+    flags = new_array(ArrayType(PrimitiveType("boolean"), 2))
+    assert isinstance(ints, array) and ints.typecode == "q" and list(ints) == [0, 0, 0, 0]
+    assert isinstance(floats, array) and floats.typecode == "d" and list(floats) == [0.0, 0.0, 0.0]
+    assert flags == bytearray(2)
+
+
+def test_002():
+    """Test arrays of strings and objects stay lists"""
+    assert new_array(ArrayType(PrimitiveType("string"), 2)) == ["", ""]
+    assert new_array(ArrayType(ClassType("Shape"), 2)) == [None, None]
+
+
+def test_003():
+    """Test array literals are typed by their elements as in type inference"""
+    assert array_of([1, 2]).typecode == "q"
+    assert array_of([1, 2.5]).typecode == "d"
+    assert array_of([True, False]) == bytearray([1, 0])
+    assert array_of(["a", "b"]) == ["a", "b"]
+    floats = array_of([1, 2], ArrayType(PrimitiveType("float"), 2))
+    assert floats.typecode == "d" and list(floats) == [1.0, 2.0]
+
+
+SOURCE = """class Main {
+    static void flip(boolean & b) { b := !b; }
+    static void bump(int & x) { x := x + 10; }
+    static void main() {
+        int[4] a;
+        float[3] f;
+        boolean[3] b;
+        string[2] s;
+        int[3] lit := {4, 5, 6};
+        float[2] mix := {1, 2.5};
+        boolean[2] flags := {true, false};
+        a[1] := 7;
+        f[2] := 1.5;
+        b[0] := true;
+        Main.flip(b[2]);
+        Main.bump(lit[0]);
+        io.writeIntLn(a[0] + a[1] + lit[0]);
+        io.writeFloatLn(f[0] + f[2] + mix[0]);
+        io.writeBoolLn(b[0]);
+        io.writeBoolLn(b[1]);
+        io.writeBoolLn(b[2] && flags[0]);
+        io.writeBoolLn(flags[1] == b[1]);
+        io.writeStrLn(s[0] ^ "x");
+        io.writeIntLn(a[4]);
+    }
+}"""
+
+EXPECTED = "21\n2.5\ntrue\nfalse\ntrue\ntrue\nx\nRuntime Error: Index 4 out of range"
+
+
+def test_004():
+    """Test the interpreter reads, writes and references elements of typed arrays"""
+    assert ProgramRunner(SOURCE).run() == EXPECTED
+
+
+def test_005():
+    """Test the VM reads, writes and references elements of typed arrays"""
+    assert VMRunner(SOURCE).run() == EXPECTED
+
+
+def test_006():
+    """Test transpiled code declares typed arrays and handles their elements"""
+    assert TranspilerRunner(SOURCE).run() == EXPECTED
+    source = TranspilerRunner(SOURCE).source("Main")
+    assert "_array('q', bytes(32))" in source and "bytearray(3)" in source
+
+
+FLOAT_LITERALS = """class Main {
+    static float[2] make() { return {5, 6}; }
+    static float first(float[2] a) { a[0] := a[0] + 0.25; return a[0]; }
+    static void main() {
+        float[3] f := {1, 2, 3};
+        float[2] m := Main.make();
+        f[0] := 2.5;
+        io.writeFloatLn(f[0] + f[1]);
+        f := {4, 5, 6};
+        f[1] := 0.5;
+        m[1] := 0.5;
+        io.writeFloatLn(Main.first({7, 8}) + f[1] + m[1]);
+    }
+}"""
+
+OVERFLOW = """class Main {
+    static void main() {
+        int[3] a;
+        int f := 1;
+        io.writeIntLn(1);
+        for i := 1 to 25 do f := f * i;
+        a[0] := f;
+    }
+}"""
+
+
+def test_007():
+    """Test int array literals stored as float arrays hold floats in every engine"""
+    for runner in (ProgramRunner, VMRunner, TranspilerRunner):
+        assert runner(FLOAT_LITERALS).run() == "4.5\n8.25\n"
+
+
+def test_008():
+    """Test an int beyond 64 bits is a runtime error before it reaches an int array in every engine"""
+    for runner in (ProgramRunner, VMRunner, TranspilerRunner):
+        assert runner(OVERFLOW).run() == "1\nRuntime Error: Integer overflow"
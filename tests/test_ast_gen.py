@@ -281,4 +281,20 @@ def test_028():
             AttributeDecl(False, False, PrimitiveType("int"), [Attribute("a", BinaryOp(IntLiteral(1), "<=", IntLiteral(2)))]),
             AttributeDecl(False, False, PrimitiveType("int"), [Attribute("a", BinaryOp(IntLiteral(1), ">=", IntLiteral(2)))]),
             AttributeDecl(False, False, PrimitiveType("int"), [Attribute("b", BinaryOp(IntLiteral(1), ">", BinaryOp(IntLiteral(2), "==", IntLiteral(3))))])])])
-    assert str(ASTGenerator(source).generate()) == str(expected)
\ No newline at end of file
+    assert str(ASTGenerator(source).generate()) == str(expected)
+
+def test_029():
+    """& makes only its own local variable a reference"""
+    source = """
+    class V {
+        void f() {
+            int a := 1, &b := a, &c := a, d := 5;
+        }
+    }
+    """
+    expected = Program([ClassDecl("V", None, [
+            MethodDecl(False, PrimitiveType("void"), "f", [], BlockStatement([
+                VariableDecl(False, PrimitiveType("int"), [Variable("a", IntLiteral(1))]),
+                VariableDecl(False, ReferenceType(PrimitiveType("int")), [Variable("b", Identifier("a")), Variable("c", Identifier("a"))]),
+                VariableDecl(False, PrimitiveType("int"), [Variable("d", IntLiteral(5))])], []))])])
+    assert str(ASTGenerator(source).generate()) == str(expected)
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from utils import ASTGenerator
+from src.astgen.async_frontend import AsyncFrontEnd, CompileError, FrontEndBusy
+
+
+SOURCE = "class Main { static void main() { io.writeIntLn(1); } }"
+# one statement per repetition; a few hundred take well over 10 ms to parse
+BIG = "class Main { static void main() { int x := 0; " + "x := x + 1; " * 500 + "} }"
+
+
+def test_001():
+    """Test compile returns the AST ASTGenerator builds and raises on syntax errors"""
+    async def run():
+        async with AsyncFrontEnd(workers=1, processes=False) as front_end:
+            program = await front_end.compile(SOURCE)
+            with pytest.raises(CompileError) as error:
+                await front_end.compile("class A {")
+            return program, error.value
+
+    program, error = asyncio.run(run())
+    assert str(program) == str(ASTGenerator(SOURCE).generate())
+    assert "Parser " + str(error) == ASTGenerator("class A {").generate()
+
+
+def test_002():
+    """Test concurrent requests in worker processes all complete"""
+    async def run():
+        async with AsyncFrontEnd(workers=2) as front_end:
+            return await asyncio.gather(*(front_end.compile(SOURCE) for _ in range(6)))
+
+    assert {str(program) for program in asyncio.run(run())} == {str(ASTGenerator(SOURCE).generate())}
+
+
+def test_003():
+    """Test a request over its deadline times out and frees its slot when done"""
+    async def run():
+        async with AsyncFrontEnd(workers=1, queue_size=0, processes=False) as front_end:
+            with pytest.raises(asyncio.TimeoutError):
+                await front_end.compile(BIG, timeout=0.01)
+            assert front_end.pending == 1
+            return await front_end.compile(SOURCE)
+
+    assert str(asyncio.run(run())) == str(ASTGenerator(SOURCE).generate())
+
+
+def test_004():
+    """Test a full queue makes non-blocking requests fail and blocking ones wait"""
+    async def run():
+        async with AsyncFrontEnd(workers=1, queue_size=1, processes=False) as front_end:
+            first = asyncio.ensure_future(front_end.compile(BIG))
+            second = asyncio.ensure_future(front_end.compile(SOURCE))
+            await asyncio.sleep(0)
+            with pytest.raises(FrontEndBusy):
+                await front_end.compile(SOURCE, block=False)
+            third = asyncio.ensure_future(front_end.compile(SOURCE))
+            await asyncio.sleep(0)
+            assert not third.done() and front_end.pending == 2
+            await asyncio.gather(first, second, third)
+            return front_end.pending
+
+    assert asyncio.run(run()) == 0
+
+
+def test_005():
+    """Test a cancelled request never reaches a worker"""
+    async def run():
+        async with AsyncFrontEnd(workers=1, processes=False) as front_end:
+            first = asyncio.ensure_future(front_end.compile(BIG))
+            queued = asyncio.ensure_future(front_end.compile("class A {"))
+            await asyncio.sleep(0)
+            queued.cancel()
+            await first
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            await asyncio.sleep(0)
+            return front_end.pending
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,92 @@
+from utils import ControlFlow
+
+
+SUM_ODD = """class Main {
+    static int f(int n) {
+        int s := 0, t;
+        for i := 1 to n do {
+            if i % 2 == 0 then continue;
+            s := s + i;
+        }
+        if s > 3 then t := 1;
+        return s + t;
+    }
+}"""
+
+
+def test_001():
+    """Test blocks and edges of loops, continue, if and return"""
+    expected = """B0: [Parameter def n] -> B2
+B1: []
+B2: [Variable def s; Variable def t; ForInit def i; ForEnd use n] -> B3
+B3: [ForTest use i] -> B6, B5
+B4: [ForStep def i use i] -> B3
+B5: [Branch use s] -> B11, B10
+B6: [Branch use i] -> B8, B7
+B7: [AssignmentStatement def s use s,i] -> B4
+B8: [] -> B4
+B9: [] -> B7
+B10: [ReturnStatement use s,t] -> B1
+B11: [AssignmentStatement def t] -> B10
+B12: [] -> B1"""
+    assert ControlFlow(SUM_ODD, "Main", "f").cfg() == expected
+
+
+def test_002():
+    """Test live variables on entry to each block"""
+    expected = """B0: 
+B1: 
+B2: n
+B3: s t i
+B4: s t i
+B5: s t
+B6: s t i
+B7: s t i
+B8: s t i
+B9: s t i
+B10: s t
+B11: s
+B12: """
+    assert ControlFlow(SUM_ODD, "Main", "f").live() == expected
+
+
+def test_003():
+    """Test reads of variables that are not assigned on every path"""
+    assert ControlFlow(SUM_ODD, "Main", "f").unassigned() == "t@10"
+
+
+def test_004():
+    """Test shadowed locals are distinct variables and break leaves the loop"""
+    source = """class Main {
+        void run() {
+            int x := 1;
+            { int x; x := 2; io.writeIntLn(x); }
+            for i := 1 to 3 do {
+                if x > 1 then break;
+                x := x + i;
+            }
+            io.writeIntLn(x);
+        }
+    }"""
+    expected = """B0: [] -> B2
+B1: []
+B2: [Variable def x; Variable def x; AssignmentStatement def x; MethodInvocationStatement use x; ForInit def i; ForEnd] -> B3
+B3: [ForTest use i] -> B6, B5
+B4: [ForStep def i use i] -> B3
+B5: [MethodInvocationStatement use x] -> B1
+B6: [Branch use x] -> B8, B7
+B7: [AssignmentStatement def x use x,i] -> B4
+B8: [] -> B5
+B9: [] -> B7"""
+    assert ControlFlow(source, "Main", "run").cfg() == expected
+    assert ControlFlow(source, "Main", "run").reaching() == "x@0 x@2 i@4 i@7 x@10"
+
+
+def test_005():
+    """Test a method with hundreds of statements"""
+    decls = " ".join(f"int v{i} := {i};" for i in range(100))
+    stmts = " ".join(f"if v{i} > 3 then v{(i + 1) % 100} := v{i} + 1; else v{i} := 2;" for i in range(100))
+    source = "class Main { static void main() { " + decls + " for k := 1 to 10 do { " + stmts + " } } }"
+    flow = ControlFlow(source, "Main", "main")
+    assert flow.live().count("\n") == 306
+    assert flow.unassigned() == ""
@@ -0,0 +1,479 @@
+from utils import JVMCodeGenerator, ProgramRunner, TranspilerRunner, VMRunner
+
+
+def test_001():
+    """Test static main writing literals on the JVM"""
+    source = """class Main {
+        static void main() {
+            io.writeIntLn(42);
+            io.writeFloatLn(1.5);
+            io.writeBoolLn(true);
+            io.writeStrLn("hello\\tworld");
+        }
+    }"""
+    expected = "42\n1.5\ntrue\nhello\tworld\n"
+    assert JVMCodeGenerator(source).run() == expected
+
+
+def test_002():
+    """Test arithmetic, integer division, remainder and coercion on the JVM"""
+    source = """class Main {
+        static void main() {
+            io.writeIntLn(1 + 2 * 3 - 4);
+            io.writeIntLn(7 \\ 2);
+            io.writeIntLn(-7 \\ 2);
+            io.writeIntLn(-7 % 3);
+            io.writeFloatLn(7 / 2);
+            io.writeFloatLn(2 + 0.5);
+            io.writeStrLn("a" ^ "b" ^ "c");
+        }
+    }"""
+    expected = "3\n3\n-3\n-1\n3.5\n2.5\nabc\n"
+    assert JVMCodeGenerator(source).run() == expected
+
+
+def test_003():
+    """Test recursive factorial reading its input from stdin"""
+    source = """class Example1 {
+        int factorial(int n){
+            if n == 0 then return 1; else return n * this.factorial(n - 1);
+        }
+        void main(){
+            int x;
+            x := io.readInt();
+            io.writeIntLn(this.factorial(x));
+        }
+    }"""
+    assert JVMCodeGenerator(source, "5\n").run() == "120\n"
+
+
+def test_004():
+    """Test for to/downto with break and continue on the JVM"""
+    source = """class Main {
+        static void main() {
+            int sum := 0;
+            for i := 1 to 10 do {
+                if i % 2 == 0 then continue;
+                if i > 7 then break;
+                sum := sum + i;
+            }
+            io.writeIntLn(sum);
+            for j := 3 downto 1 do io.writeInt(j);
+            io.writeStrLn("");
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "16\n321\n"
+
+
+def test_005():
+    """Test virtual dispatch and constructors inherited from the superclass"""
+    source = """class Shape {
+        float length, width;
+        float getArea() { return 0.0; }
+        Shape(float length; float width){
+            this.length := length;
+            this.width := width;
+        }
+    }
+    class Rectangle extends Shape {
+        float getArea(){ return this.length * this.width; }
+    }
+    class Triangle extends Shape {
+        float getArea(){ return this.length * this.width / 2; }
+    }
+    class Example2 {
+        void main(){
+            Shape s;
+            s := new Rectangle(3, 4);
+            io.writeFloatLn(s.getArea());
+            s := new Triangle(3, 4);
+            io.writeFloatLn(s.getArea());
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "12.0\n6.0\n"
+
+
+def test_006():
+    """Test static attributes, overloaded constructors and destructors"""
+    source = """class Rectangle {
+        float length, width;
+        static int count;
+        Rectangle() { this.length := 1.0; this.width := 1.0; Rectangle.count := Rectangle.count + 1; }
+        Rectangle(float length; float width) {
+            this.length := length;
+            this.width := width;
+            Rectangle.count := Rectangle.count + 1;
+        }
+        ~Rectangle() { Rectangle.count := Rectangle.count - 1; io.writeIntLn(Rectangle.count); }
+        float getArea() { return this.length * this.width; }
+    }
+    class Main {
+        static void main() {
+            Rectangle r1 := new Rectangle();
+            Rectangle r2 := new Rectangle(5.0, 3.0);
+            io.writeFloatLn(r1.getArea() + r2.getArea());
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "16.0\n1\n0\n"
+
+
+def test_007():
+    """Test reference parameters and reference variables share storage"""
+    source = """class MathUtils {
+        static void swap(int & a; int & b) {
+            int temp := a;
+            a := b;
+            b := temp;
+        }
+        static void modifyArray(int[5] & arr; int index; int value) {
+            arr[index] := value;
+        }
+    }
+    class Main {
+        static void main() {
+            int x := 10, y := 20;
+            int & xRef := x;
+            int[5] numbers := {1, 2, 3, 4, 5};
+            MathUtils.swap(x, y);
+            io.writeIntLn(x);
+            io.writeIntLn(y);
+            xRef := 7;
+            io.writeIntLn(x);
+            MathUtils.modifyArray(numbers, 2, 99);
+            io.writeIntLn(numbers[2]);
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "20\n10\n7\n99\n"
+
+
+def test_008():
+    """Test short-circuit conditions, string arrays and object chains"""
+    source = """class Node {
+        int value;
+        Node next;
+        Node(int v) { this.value := v; }
+        Node link(Node n) { this.next := n; return n; }
+    }
+    class Main {
+        static int calls := 0;
+        static boolean touch() { calls := calls + 1; return true; }
+        static void main() {
+            string[2] names;
+            Node head := new Node(1);
+            boolean b := false && Main.touch();
+            b := true || Main.touch();
+            b := true && Main.touch();
+            head.link(new Node(2)).link(new Node(3));
+            head.next.value := 20;
+            names[1] := "x";
+            io.writeIntLn(calls);
+            io.writeIntLn(head.value + head.next.value + head.next.next.value);
+            io.writeStrLn(names[0] ^ names[1]);
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "1\n24\nx\n"
+
+
+def test_009():
+    """Test the Jasmin listing of a counted loop uses long locals, lcmp and checked adds"""
+    source = """class Main {
+        static int sum(int n) {
+            int total := 0;
+            for i := 1 to n do total := total + i;
+            return total;
+        }
+        static void main() { io.writeIntLn(Main.sum(100)); }
+    }"""
+    expected = """.method public static sum(J)J
+	.limit stack 4
+	.limit locals 8
+	lconst_0
+	lstore 2
+	lconst_1
+	lstore 4
+	lload 0
+	lstore 6
+L1:
+	lload 4
+	lload 6
+	lcmp
+	ifgt L3
+	lload 2
+	lload 4
+	invokestatic java/lang/Math/addExact(JJ)J
+	lstore 2
+L2:
+	lload 4
+	lconst_1
+	invokestatic java/lang/Math/addExact(JJ)J
+	lstore 4
+	goto L1
+L3:
+	lload 2
+	lreturn
+.end method"""
+    assert JVMCodeGenerator(source).jasmin("Main", "sum") == expected
+    assert JVMCodeGenerator(source).run() == "5050\n"
+
+
+def test_010():
+    """Test the Jasmin class header, field defaults and the factory registering for destruction"""
+    source = """class A { int x; static string name; float[3] weights; }
+    class B extends A {
+        string label;
+        ~B() { io.writeStrLn("bye"); }
+    }
+    class Main { static void main() { B b := new B(); } }"""
+    expected = """.source B.j
+.class public B
+.super A
+.implements oplang/Destructible
+.field public label Ljava/lang/String;
+
+.method public <init>()V
+	.limit stack 2
+	.limit locals 1
+	aload 0
+	invokespecial A/<init>()V
+	aload 0
+	ldc ""
+	putfield B/label Ljava/lang/String;
+	return
+.end method
+
+.method public static new$()LB;
+	.limit stack 2
+	.limit locals 1
+	new B
+	dup
+	invokespecial B/<init>()V
+	astore 0
+	getstatic oplang/IO/live Ljava/util/ArrayList;
+	aload 0
+	invokevirtual java/util/ArrayList/add(Ljava/lang/Object;)Z
+	pop
+	aload 0
+	areturn
+.end method
+
+.method public destroy$()V
+	.limit stack 1
+	.limit locals 1
+	ldc "bye"
+	invokestatic oplang/IO/writeStrLn(Ljava/lang/String;)V
+	return
+.end method
+"""
+    assert JVMCodeGenerator(source).jasmin("B") == expected
+    assert JVMCodeGenerator(source).run() == "bye\n"
+
+
+def test_011():
+    """Test reference parameters, variables and returns bound to attributes and array elements"""
+    source = """class P {
+        int x;
+        static string name := "a";
+        int & getX() { return this.x; }
+    }
+    class Main {
+        static void swap(int & a; int & b) {
+            int temp := a;
+            a := b;
+            b := temp;
+        }
+        static void append(string & s) { s := s ^ "!"; }
+        static int & at(int[3] & arr; int i) { return arr[i]; }
+        static void main() {
+            int[3] a := {1, 2, 3};
+            int & r := Main.at(a, 1);
+            P p := new P();
+            int & x := p.getX();
+            r := 50;
+            io.writeIntLn(a[1]);
+            io.writeIntLn(Main.at(a, 2));
+            Main.swap(a[0], a[2]);
+            Main.swap(p.x, a[1]);
+            Main.append(P.name);
+            x := x + 1;
+            io.writeIntLn(a[0] * 100 + a[2]);
+            io.writeIntLn(p.x);
+            io.writeStrLn(P.name);
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "50\n3\n301\n51\na!\n"
+
+
+def test_012():
+    """Test return nil in a void method and float array literals of int elements"""
+    source = """class Main {
+        static void check(int n) {
+            if n > 1 then return nil;
+            io.writeIntLn(n);
+        }
+        static void main() {
+            float[3] f := {1, 2, 3};
+            Main.check(1);
+            Main.check(2);
+            io.writeFloatLn(f[0] + f[2] / 2);
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "1\n2.5\n"
+
+
+def test_013():
+    """Test floats are doubles printed as in the other engines"""
+    source = """class Box {
+        float w;
+        Box(float w) { this.w := w; }
+    }
+    class Wide extends Box { }
+    class Main {
+        static void scale(float & v; float by) { v := v * by; }
+        static void main() {
+            float[2] a := {0.5, 1e16};
+            Box b := new Wide(0.1);
+            Main.scale(b.w, 3);
+            Main.scale(a[0], 0.0002);
+            io.writeFloatLn(1 / 3);
+            io.writeFloatLn(b.w);
+            io.writeFloatLn(a[0]);
+            io.writeFloatLn(a[1]);
+            io.writeFloatLn(12345678.5);
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == "0.3333333333333333\n0.30000000000000004\n0.0001\n1e+16\n12345678.5\n"
+
+
+def test_014():
+    """Test ints are 64-bit in locals, arrays, references and loops"""
+    source = """class Main {
+        static void twice(int & v) { v := v * 2; }
+        static void main() {
+            int[2] a := {2147483647, 7};
+            int big := 4294967296;
+            Main.twice(a[0]);
+            io.writeIntLn(2147483647 + 1);
+            io.writeIntLn(a[0]);
+            io.writeIntLn(big \\ 3 - big % 3);
+            io.writeIntLn(-a[1] * big);
+            for big := 4294967297 downto 4294967296 do io.writeIntLn(big);
+            io.writeBoolLn(a[0] > 2147483647);
+        }
+    }"""
+    assert JVMCodeGenerator(source).run() == (
+        "2147483648\n4294967294\n1431655764\n-30064771072\n4294967297\n4294967296\ntrue\n")
+
+
+def test_015():
+    """Test runtime errors are reported as in the other engines"""
+    prelude = """class A { int x; static int s; int f() { return 1; } }
+    class Main {
+        static int loop(int n) { return Main.loop(n + 1); }
+        static void main() {
+            int[3] arr;
+            A a;
+            io.writeIntLn(1);
+            %s;
+        }
+    }"""
+    errors = {
+        "io.writeIntLn(arr[3])": "Index 3 out of range",
+        "arr := nil; arr[0] := 1": "Nil array access",
+        "io.writeIntLn(a.x)": "Nil reference accessing x",
+        "a.s := 2": "Nil reference accessing s",
+        "a.f()": "Nil reference calling f",
+        "io.writeIntLn(nil.x)": "Nil reference accessing x",
+        "io.writeFloatLn(1 / 0)": "Division by zero",
+        "io.writeIntLn(1 % 0)": "Division by zero",
+        "arr[0] := 9223372036854775807 * 2": "Integer overflow",
+        "io.writeIntLn(Main.loop(0))": "Stack overflow",
+        "io.writeIntLn(io.readInt())": "Invalid integer input: 1.5",
+        "io.writeFloatLn(io.readFloat() + io.readFloat())": "Unexpected end of input",
+    }
+    for statement, message in errors.items():
+        source = prelude % statement
+        assert JVMCodeGenerator(source, "1.5\n").run() == "1\nRuntime Error: " + message
+
+
+def test_016():
+    """Test no engine runs a superclass constructor, while a class without constructors uses its superclass's"""
+    sources = {
+        """class A { static int n; A() { A.n := A.n + 1; } }
+        class B extends A { B(int x) { A.n := A.n + 10; } }
+        class C extends B { C() { A.n := A.n + 100; } }
+        class Main { static void main() { B b := new B(1); C c := new C(); io.writeIntLn(A.n); } }""": "110\n",
+        """class A { int v := 5; A(int x) { this.v := this.v + x; } }
+        class B extends A { int w := 1; }
+        class Main { static void main() { B b := new B(2); io.writeIntLn(b.v + b.w); } }""": "8\n",
+    }
+    for source, expected in sources.items():
+        for runner in (ProgramRunner, VMRunner, TranspilerRunner, JVMCodeGenerator):
+            assert runner(source).run() == expected, runner.__name__
+
+
+def test_017():
+    """Test object and array references alias their location on every engine"""
+    b = "class B { int id; B(int i) { this.id := i; } }\n"
+    put = "static void put(B & dst; B src) { dst := src; }"
+    sources = {
+        # reference parameter bound to a nil local
+        b + "class Main { " + put + """
+            static void main() { B b; Main.put(b, new B(4)); io.writeIntLn(b.id); } }""": "4\n",
+        # reference parameter rebinding a local holding an object
+        b + "class Main { " + put + """
+            static void main() { B b := new B(1); Main.put(b, new B(4)); io.writeIntLn(b.id); } }""": "4\n",
+        # reference local
+        b + """class Main { static void main() {
+            B b := new B(1); B & r := b; r := new B(4); io.writeIntLn(b.id); } }""": "4\n",
+        # array reference parameter
+        """class Main {
+            static void put(int[2] & a; int[2] b) { a := b; }
+            static void main() { int[2] x := {1, 2}; int[2] y := {3, 4}; Main.put(x, y); io.writeIntLn(x[0]); } }""": "3\n",
+        # attributes and array elements
+        b + """class H { B b; int[2] a; }
+        class Main { """ + put + """
+            static void puta(int[2] & dst; int[2] src) { dst := src; }
+            static void main() {
+                H h := new H(); B[2] bs; int[2] y := {7, 8};
+                Main.put(h.b, new B(4)); Main.put(bs[1], new B(5)); Main.puta(h.a, y);
+                io.writeIntLn(h.b.id); io.writeIntLn(bs[1].id); io.writeIntLn(h.a[1]);
+            } }""": "4\n5\n8\n",
+        # reference return
+        b + """class Main {
+            static B keep;
+            static B & slot() { return Main.keep; }
+            static void main() { B & r := Main.slot(); r := new B(6); io.writeIntLn(Main.keep.id); } }""": "6\n",
+        # the owner of a rebound local destroys its new object
+        """class D { int id; D(int i) { this.id := i; } ~D() { io.writeIntLn(this.id); } }
+        class Main { static void main() { D a := new D(1); D & r := a; r := new D(2); io.writeIntLn(a.id); } }""": "2\n2\n1\n",
+    }
+    for source, expected in sources.items():
+        for runner in (ProgramRunner, VMRunner, TranspilerRunner, JVMCodeGenerator):
+            assert runner(source).run() == expected, runner.__name__
+
+
+def test_018():
+    """Test every engine gives ints 64 bits and fails on a literal, input or result beyond them"""
+    main = "class Main { static void main() { int x; %s } }"
+    sources = {
+        "x := 9223372036854775807; io.writeIntLn(x); x := x + 1;":
+            "9223372036854775807\nRuntime Error: Integer overflow",
+        "x := -9223372036854775807 - 1; io.writeIntLn(x); x := x - 1;":
+            "-9223372036854775808\nRuntime Error: Integer overflow",
+        "x := 4611686018427387904; io.writeIntLn(x * -2); io.writeIntLn(x * 2);":
+            "-9223372036854775808\nRuntime Error: Integer overflow",
+        "x := -9223372036854775807 - 1; io.writeIntLn(x % -1); io.writeIntLn(x \\ -1);":
+            "0\nRuntime Error: Integer overflow",
+        "x := -9223372036854775807 - 1; io.writeIntLn(-(x + 1)); io.writeIntLn(-x);":
+            "9223372036854775807\nRuntime Error: Integer overflow",
+        "for x := 9223372036854775806 to 9223372036854775807 do io.writeIntLn(x); io.writeIntLn(0);":
+            "9223372036854775806\n9223372036854775807\nRuntime Error: Integer overflow",
+        "io.writeIntLn(1); x := 9223372036854775808;":
+            "1\nRuntime Error: Integer overflow",
+        "x := io.readInt(); io.writeIntLn(x); x := io.readInt();":
+            "9223372036854775807\nRuntime Error: Invalid integer input: 9223372036854775808",
+    }
+    stdin = "9223372036854775807\n9223372036854775808\n"
+    for body, expected in sources.items():
+        for runner in (ProgramRunner, VMRunner, TranspilerRunner, JVMCodeGenerator):
+            assert runner(main % body, stdin).run() == expected, runner.__name__
@@ -0,0 +1,111 @@
+from utils import Optimizer
+
+
+def test_001():
+    """Test folding integer, float and string literal arithmetic"""
+    source = """class Main {
+        static void main() {
+            int x := 2 * 3 + 1;
+            float y := 7 / 2 + 1;
+            string s := "a" ^ "b" ^ "c";
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(x = IntLiteral(7))]), VariableDecl(PrimitiveType(float), [Variable(y = FloatLiteral(4.5))]), VariableDecl(PrimitiveType(string), [Variable(s = StringLiteral('abc'))])], stmts=[]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+
+
+def test_002():
+    """Test folding truncating division, remainder, comparisons and negation"""
+    source = """class Main {
+        static void main() {
+            int a := -7 \\ 2;
+            int b := -7 % 3;
+            boolean c := !(1 < 2.5) || "x" == "x";
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(a = IntLiteral(-3))]), VariableDecl(PrimitiveType(int), [Variable(b = IntLiteral(-1))]), VariableDecl(PrimitiveType(boolean), [Variable(c = BoolLiteral(True))])], stmts=[]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+
+
+def test_003():
+    """Test algebraic identities and removal of parentheses"""
+    source = """class Main {
+        static void main() {
+            int x := 5;
+            x := ((x + 0) * 1) - 0;
+            x := 0 + x \\ 1;
+            x := -(-x);
+            io.writeStrLn("" ^ "v" ^ "");
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(x = IntLiteral(5))])], stmts=[AssignmentStatement(IdLHS(x) := Identifier(x)), AssignmentStatement(IdLHS(x) := Identifier(x)), AssignmentStatement(IdLHS(x) := UnaryOp(-, UnaryOp(-, Identifier(x)))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeStrLn(StringLiteral('v'))))]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+
+
+def test_004():
+    """Test short-circuit operators with one literal operand"""
+    source = """class Main {
+        static boolean f() { return true; }
+        static void main() {
+            boolean a := true && Main.f();
+            boolean b := false && Main.f();
+            boolean c := Main.f() || false;
+            boolean d := Main.f() && false;
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(boolean) f([]), BlockStatement(stmts=[ReturnStatement(return BoolLiteral(True))])), MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(boolean), [Variable(a = PostfixExpression(Identifier(Main).f()))]), VariableDecl(PrimitiveType(boolean), [Variable(b = BoolLiteral(False))]), VariableDecl(PrimitiveType(boolean), [Variable(c = PostfixExpression(Identifier(Main).f()))]), VariableDecl(PrimitiveType(boolean), [Variable(d = BinaryOp(PostfixExpression(Identifier(Main).f()), &&, BoolLiteral(False)))])], stmts=[]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+
+
+def test_005():
+    """Test expressions that fail or overflow at run time are left alone"""
+    source = """class Main {
+        static void main() {
+            int big := 9223372036854775807 + 1;
+            io.writeIntLn(1 \\ 0);
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(big = BinaryOp(IntLiteral(9223372036854775807), +, IntLiteral(1)))])], stmts=[MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(BinaryOp(IntLiteral(1), \\, IntLiteral(0)))))]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+    assert Optimizer(source, ["fold"]).run() == "Runtime Error: Integer overflow"
+
+
+def test_006():
+    """Test identities do not turn a reference argument into an alias"""
+    source = """class Main {
+        static void inc(int & x) { x := x + 1; }
+        static void main() {
+            int a := 1;
+            int & r := a * 1;
+            Main.inc(a + 0);
+            Main.inc((a));
+            r := 10;
+            io.writeIntLn(a);
+        }
+    }"""
+    assert Optimizer(source, ["fold"]).run() == "2\n"
+
+
+def test_007():
+    """Test folding stops at the 64-bit int boundaries the engines overflow at"""
+    source = """class Main {
+        static void main() {
+            int a := 9223372036854775806 + 1;
+            int b := -9223372036854775807 - 1;
+            io.writeIntLn(a);
+            io.writeIntLn(b);
+            io.writeIntLn(-(-b));
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(a = IntLiteral(9223372036854775807))]), VariableDecl(PrimitiveType(int), [Variable(b = IntLiteral(-9223372036854775808))])], stmts=[MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(Identifier(a)))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(Identifier(b)))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(UnaryOp(-, UnaryOp(-, Identifier(b))))))]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+    assert Optimizer(source, ["fold"]).run() == "9223372036854775807\n-9223372036854775808\nRuntime Error: Integer overflow"
+    source = """class Main {
+        static void main() {
+            int c := -9223372036854775808;
+            int d := (-9223372036854775807 - 1) \\ -1;
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(c = UnaryOp(-, IntLiteral(9223372036854775808)))]), VariableDecl(PrimitiveType(int), [Variable(d = BinaryOp(IntLiteral(-9223372036854775808), \\, IntLiteral(-1)))])], stmts=[]))])])"
+    assert Optimizer(source, ["fold"]).optimize() == expected
+    assert Optimizer(source, ["fold"]).run() == "Runtime Error: Integer overflow"
@@ -0,0 +1,102 @@
+from utils import Optimizer
+
+
+def test_001():
+    """Test statements after return, break and continue are removed"""
+    source = """class Main {
+        static int f(int n) {
+            for i := 1 to n do {
+                if i == 2 then { continue; io.writeIntLn(0); }
+                break;
+                io.writeIntLn(i);
+            }
+            return n;
+            io.writeIntLn(n);
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(int) f([Parameter(PrimitiveType(int) n)]), BlockStatement(stmts=[ForStatement(for i := IntLiteral(1) to Identifier(n) do BlockStatement(stmts=[IfStatement(if BinaryOp(Identifier(i), ==, IntLiteral(2)) then BlockStatement(stmts=[ContinueStatement()])), BreakStatement()])), ReturnStatement(return Identifier(n))]))])])"
+    assert Optimizer(source, ["dce"]).optimize() == expected
+
+
+def test_002():
+    """Test statements after an if whose branches both return are removed"""
+    source = """class Main {
+        static int sign(int n) {
+            if n < 0 then return -1; else return 1;
+            return 0;
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(int) sign([Parameter(PrimitiveType(int) n)]), BlockStatement(stmts=[IfStatement(if BinaryOp(Identifier(n), <, IntLiteral(0)) then ReturnStatement(return UnaryOp(-, IntLiteral(1))), else ReturnStatement(return IntLiteral(1)))]))])])"
+    assert Optimizer(source, ["dce"]).optimize() == expected
+
+
+def test_003():
+    """Test constant conditions keep only the branch taken, after folding"""
+    source = """class Main {
+        static void main() {
+            if 1 > 2 then io.writeIntLn(1); else io.writeIntLn(2);
+            if true && true then io.writeIntLn(3);
+            if false then io.writeIntLn(4);
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(stmts=[MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(IntLiteral(2)))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(IntLiteral(3))))]))])])"
+    assert Optimizer(source, ["fold", "dce"]).optimize() == expected
+
+
+def test_004():
+    """Test unused locals are removed unless their initialiser has effects"""
+    source = """class Main {
+        static int f() { io.writeIntLn(1); return 1; }
+        static void main() {
+            int a := 1, b := a, c;
+            int d := Main.f();
+            int e := 1 \\ 0;
+            io.writeIntLn(c);
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(int) f([]), BlockStatement(stmts=[MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(IntLiteral(1)))), ReturnStatement(return IntLiteral(1))])), MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(c)]), VariableDecl(PrimitiveType(int), [Variable(d = PostfixExpression(Identifier(Main).f()))]), VariableDecl(PrimitiveType(int), [Variable(e = BinaryOp(IntLiteral(1), \\, IntLiteral(0)))])], stmts=[MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(Identifier(c))))]))])])"
+    assert Optimizer(source, ["dce"]).optimize() == expected
+
+
+def test_005():
+    """Test a loop that cannot iterate only assigns its variable"""
+    source = """class Main {
+        static void main() {
+            int i;
+            for i := 5 to 1 do io.writeIntLn(i);
+            for j := 1 downto 5 do io.writeIntLn(j);
+            io.writeIntLn(i);
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(i)])], stmts=[AssignmentStatement(IdLHS(i) := IntLiteral(5)), ForStatement(for j := IntLiteral(1) downto IntLiteral(5) do MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(Identifier(j))))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(Identifier(i))))]))])])"
+    assert Optimizer(source, ["dce"]).optimize() == expected
+    assert Optimizer(source, ["dce"]).run() == "5\n"
+
+
+def test_006():
+    """Test the report of removed code"""
+    source = """class Main {
+        static void main() {
+            int unused := 0;
+            if false then io.writeIntLn(1);
+            return nil;
+            io.writeIntLn(2);
+            io.writeIntLn(3);
+        }
+    }"""
+    expected = "Main.main: branch of constant condition false\nMain.main: 2 unreachable statements\nMain.main: unused variable unused"
+    assert Optimizer(source, ["dce"]).report() == expected
+
+
+def test_007():
+    """Test unused locals are kept when their int arithmetic may overflow"""
+    source = """class Main {
+        static void main() {
+            int a := 9223372036854775807;
+            int b := a + 1, c := -a, d := 9223372036854775808;
+            boolean e := a < 2;
+        }
+    }"""
+    expected = "Program([ClassDecl(Main, [MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(a = IntLiteral(9223372036854775807))]), VariableDecl(PrimitiveType(int), [Variable(b = BinaryOp(Identifier(a), +, IntLiteral(1))), Variable(c = UnaryOp(-, Identifier(a))), Variable(d = IntLiteral(9223372036854775808))])], stmts=[]))])])"
+    assert Optimizer(source, ["dce"]).optimize() == expected
+    assert Optimizer(source, ["dce"]).run() == "Runtime Error: Integer overflow"
@@ -0,0 +1,93 @@
+import io
+
+from utils import ASTGenerator, VMRunner, ProgramRunner
+from src.runtime.io_runtime import IORuntime
+from src.vm.compiler import Compiler
+from src.vm.machine import VM
+
+
+SHAPES = """class Shape {
+    float length, width;
+    float getArea() { return 0.0; }
+    string kind() { return "shape"; }
+}
+class Rectangle extends Shape {
+    Rectangle(float l; float w) { length := l; width := w; }
+    float getArea() { return length * width; }
+}
+class Triangle extends Shape {
+    Triangle(float l; float w) { length := l; width := w; }
+    float getArea() { return length * width / 2; }
+}
+class Square extends Rectangle {
+    Square(float s) { length := s; width := s; }
+}
+class Main {
+    static void main() {
+        Shape[4] shapes;
+        float total := 0.0;
+        shapes[0] := new Rectangle(2.0, 3.0);
+        shapes[1] := new Triangle(4.0, 2.0);
+        shapes[2] := new Square(2.0);
+        shapes[3] := new Shape();
+        for i := 1 to 10 do {
+            for j := 0 to 3 do total := total + shapes[j].getArea();
+        }
+        io.writeFloatLn(total);
+        io.writeStrLn(shapes[2].kind());
+    }
+}"""
+
+
+def run_vm(source):
+    module = Compiler().compile(ASTGenerator(source).generate())
+    VM(module, IORuntime(io.StringIO(), io.StringIO())).run()
+    return {cache.name: cache for cache in module.inline_caches}
+
+
+def test_001():
+    """Test vtables hold inherited and overriding methods"""
+    module = Compiler().compile(ASTGenerator(SHAPES).generate())
+    square = module.classes["Square"].vtable
+    assert square["getArea"] is module.classes["Rectangle"].methods["getArea"]
+    assert square["kind"] is module.classes["Shape"].methods["kind"]
+
+
+def test_002():
+    """Test a polymorphic call site caches each receiver class once"""
+    caches = run_vm(SHAPES)
+    area = caches["getArea"]
+    assert (area.hits, area.misses, len(area)) == (36, 4, 4)
+    assert area.hit_rate == 0.9
+
+
+def test_003():
+    """Test a monomorphic call site misses only on its first call"""
+    caches = run_vm(SHAPES)
+    assert (caches["kind"].hits, caches["kind"].misses) == (0, 1)
+
+
+def test_004():
+    """Test call sites with more receiver classes than the limit keep working"""
+    source = SHAPES.replace("Shape[4] shapes;", "Shape[5] shapes;").replace(
+        "shapes[3] := new Shape();", "shapes[3] := new Shape(); shapes[4] := new Rectangle(1.0, 1.0);").replace(
+        "j := 0 to 3", "j := 0 to 4").replace(
+        "class Main {", "class Cube extends Square { Cube(float s) { length := s; width := s; } }\nclass Main {").replace(
+        "new Rectangle(1.0, 1.0)", "new Cube(1.0)")
+    caches = run_vm(source)
+    assert len(caches["getArea"]) == 4 and caches["getArea"].misses == 14
+    assert VMRunner(source).run() == ProgramRunner(source).run() == "150.0\nshape\n"
+
+
+def test_005():
+    """Test dispatch errors are still reported through the cache"""
+    source = """class A { void f(int x) {} }
+    class Main {
+        static void main() {
+            A a := new A();
+            A b := nil;
+            a.f(1);
+            b.f(1);
+        }
+    }"""
+    assert VMRunner(source).run() == "Runtime Error: Nil reference calling f"
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+from utils import ASTGenerator
+from src.astgen import frontend
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = "class Main { static void main() { io.writeIntLn(1 + 2); } }"
+
+
+def test_001():
+    """Test importing the entry point does not import antlr4 or the generated parser"""
+    code = "import sys, src.astgen.frontend; print(sorted(m for m in ('antlr4', 'build.OPLangParser') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True)
+    assert result.stdout == "[]\n"
+
+
+def test_002():
+    """Test the entry point parses like ASTGenerator"""
+    assert str(frontend.parse(SOURCE)) == str(ASTGenerator(SOURCE).generate())
+    assert frontend.load() is frontend.load()
+
+
+def test_003():
+    """Test syntax errors are raised"""
+    try:
+        frontend.parse("class A {")
+        assert False
+    except Exception as e:
+        assert "Parser " + str(e) == ASTGenerator("class A {").generate()
@@ -0,0 +1,51 @@
+import random
+
+from utils import ASTGenerator
+from src.astgen import frontend
+from src.astgen.fuzzer import Fuzzer, GrammarGenerator, PIPELINES, minimise, reference
+
+
+def drops_last_class(source):
+    """A pipeline broken on programs of more than one class."""
+    program = frontend.parse(source)
+    program.class_decls = program.class_decls[:1]
+    return program
+
+
+def test_001():
+    """Test generated programs are accepted by the grammar"""
+    generator = GrammarGenerator(random.Random(0), max_tokens=80)
+    for _ in range(10):
+        source = " ".join(generator.program())
+        assert not isinstance(ASTGenerator(source).generate(), str), source
+
+
+def test_002():
+    """Test the reference matches ASTGenerator and reports coverage"""
+    expected, coverage = reference("class A { int x := 1; }")
+    assert expected == ("ast", str(ASTGenerator("class A { int x := 1; }").generate()))
+    assert len(coverage) > 10
+    expected, coverage = reference("class A { int x := ; }")
+    assert "Parser " + expected[1] == ASTGenerator("class A { int x := ; }").generate()
+    assert len(coverage) == 1
+
+
+def test_003():
+    """Test the built-in pipelines agree with the reference on valid and near-valid inputs"""
+    report = Fuzzer(PIPELINES, seed=1, max_tokens=60, batch=16).run(24)
+    assert report.inputs == 24 and 0 < report.valid < 24
+    assert report.mismatches == []
+
+
+def test_004():
+    """Test a mismatch is found and minimised"""
+    report = Fuzzer({"broken": drops_last_class}, seed=2, max_tokens=60, max_mismatches=1).run(16)
+    mismatch = report.mismatches[0]
+    assert mismatch.pipeline == "broken"
+    assert mismatch.minimised.count("class") == 2 and len(mismatch.minimised.split()) <= 8
+
+
+def test_005():
+    """Test delta debugging keeps only the tokens the failure needs"""
+    tokens = list("abcdefghij")
+    assert minimise(tokens, lambda t: "c" in t and "h" in t) == ["c", "h"]
@@ -0,0 +1,133 @@
+from utils import Optimizer
+
+
+SHAPES = """class Shape {
+    float length, width;
+    static int count;
+    float getArea() { return 0.0; }
+    float getLength() { return length; }
+    void setLength(float length) { this.length := length; }
+    void touch() {}
+}
+class Rectangle extends Shape {
+    float getArea() { return this.getLength() * width; }
+    float perimeter() { return 2 * (this.getLength() + this.width); }
+}
+class Main {
+    static int twice(int x) { return x + x; }
+    static void main() {
+        Rectangle r := new Rectangle();
+        Shape s := r;
+        int k := 2;
+        r.setLength(3.0);
+        r.width := 2.0;
+        r.touch();
+        io.writeFloatLn(r.getArea());
+        io.writeFloatLn(s.getArea());
+        io.writeIntLn(Main.twice(k) + Main.twice(k + 1));
+    }
+}"""
+
+
+def test_001():
+    """Test getters, setters and static methods are inlined"""
+    expected = "ClassDecl(Main, [MethodDecl(static PrimitiveType(int) twice([Parameter(PrimitiveType(int) x)]), BlockStatement(stmts=[ReturnStatement(return BinaryOp(Identifier(x), +, Identifier(x)))])), MethodDecl(static PrimitiveType(void) main([]), BlockStatement(vars=[VariableDecl(ClassType(Rectangle), [Variable(r = ObjectCreation(new Rectangle()))]), VariableDecl(ClassType(Shape), [Variable(s = Identifier(r))]), VariableDecl(PrimitiveType(int), [Variable(k = IntLiteral(2))])], stmts=[AssignmentStatement(PostfixLHS(PostfixExpression(NilCheck(Identifier(r), setLength).length)) := FloatLiteral(3.0)), AssignmentStatement(PostfixLHS(PostfixExpression(Identifier(r).width)) := FloatLiteral(2.0)), MethodInvocationStatement(PostfixExpression(Identifier(r).touch())), MethodInvocationStatement(PostfixExpression(Identifier(io).writeFloatLn(BinaryOp(PostfixExpression(NilCheck(Identifier(r), getArea).length), *, PostfixExpression(NilCheck(Identifier(r), getArea).width))))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeFloatLn(PostfixExpression(Identifier(s).getArea())))), MethodInvocationStatement(PostfixExpression(Identifier(io).writeIntLn(BinaryOp(BinaryOp(Identifier(k), +, Identifier(k)), +, PostfixExpression(Identifier(Main).twice(BinaryOp(Identifier(k), +, IntLiteral(1))))))))]))])"
+    program = Optimizer(SHAPES, ["inline"]).optimize()
+    assert program[program.index("ClassDecl(Main"):] == expected + "])"
+
+
+def test_002():
+    """Test inlining keeps the program's output"""
+    assert Optimizer(SHAPES, []).run() == "6.0\n6.0\n10\n"
+    assert Optimizer(SHAPES, ["inline"]).run() == "6.0\n6.0\n10\n"
+
+
+def test_003():
+    """Test monomorphic calls that are not inlined become direct VM calls"""
+    source = """class Fact {
+        int factorial(int n) {
+            if n == 0 then return 1; else return n * this.factorial(n - 1);
+        }
+    }
+    class Main {
+        static void main() {
+            Fact f := new Fact();
+            io.writeIntLn(f.factorial(5));
+        }
+    }"""
+    listing = Optimizer(source, ["inline"]).disassemble("Fact", "factorial")
+    assert "CALL_DIRECT" in listing and "CALL_VIRTUAL" not in listing
+    assert Optimizer(source, ["inline"]).run() == "120\n"
+
+
+def test_004():
+    """Test overridden methods stay virtual"""
+    listing = Optimizer(SHAPES, ["inline"]).disassemble("Main", "main")
+    assert listing.count("CALL_VIRTUAL") == 1
+    assert Optimizer(SHAPES, ["inline"]).optimize().count("getArea())") == 1
+
+
+def test_005():
+    """Test arguments bound to reference parameters are not replaced by lvalues"""
+    source = """class Box {
+        int v := 1;
+        int get() { return v; }
+    }
+    class Main {
+        static void inc(int & x) { x := x + 1; }
+        static void main() {
+            Box b := new Box();
+            Main.inc(b.get());
+            io.writeIntLn(b.v);
+        }
+    }"""
+    assert Optimizer(source, ["inline"]).run() == "1\n"
+    assert "Identifier(b).get()" in Optimizer(source, ["inline"]).optimize()
+
+
+def test_006():
+    """Test the report names inlined calls"""
+    expected = "Rectangle.getArea: inlined Shape.getLength\nRectangle.perimeter: inlined Shape.getLength\nMain.main: inlined Shape.setLength\nMain.main: inlined Rectangle.getArea\nMain.main: inlined Main.twice"
+    assert Optimizer(SHAPES, ["inline"]).report() == expected
+
+
+def test_007():
+    """Test calls through a variable are kept when the body would not fail on nil"""
+    source = """class A {
+        int v;
+        void f(int x) {}
+        int one() { return 1; }
+        void g() { this.f(2); }
+    }
+    class Main {
+        static void main() {
+            A a := new A();
+            A b := nil;
+            a.g();
+            io.writeIntLn(a.one());
+            b.f(1);
+        }
+    }"""
+    assert Optimizer(source, ["inline"]).run() == "1\nRuntime Error: Nil reference calling f"
+    assert Optimizer(source, ["inline"]).report() == "A.g: inlined A.f"
+
+
+def test_008():
+    """Test inlined calls through a nil variable fail as the call"""
+    source = """class A {
+        int x;
+        int get() { return x; }
+        void set(int v) { x := v; }
+    }
+    class Main {
+        static void main() {
+            A a := nil;
+            io.writeIntLn(1);
+            io.writeIntLn(a.get());
+        }
+    }"""
+    assert Optimizer(source, ["inline"]).report() == "Main.main: inlined A.get"
+    assert Optimizer(source, ["inline"]).run() == "1\nRuntime Error: Nil reference calling get"
+    assert "CHECK_NIL 3 ('get')\n  14 LOAD_FIELD 0" in Optimizer(source, ["inline"]).disassemble("Main", "main")
+    source = source.replace("io.writeIntLn(a.get());", "a.set(2);")
+    assert Optimizer(source, ["inline"]).run() == "1\nRuntime Error: Nil reference calling set"
@@ -0,0 +1,62 @@
+import tracemalloc
+
+import pytest
+
+from utils import ASTGenerator
+from src.astgen.ast_generation import ASTGeneration
+from src.astgen.instrumentation import FrontEndReport, ast_size, build_ast
+
+
+SOURCE = """class Main {
+    static void main() {
+        int x := 1 + 2;
+        io.writeIntLn(x);
+    }
+}"""
+
+
+def test_001():
+    """Test the report counts tokens, parse-tree nodes and AST nodes"""
+    report = FrontEndReport()
+    program = build_ast(SOURCE, report)
+    assert list(report.phases) == ["lex", "parse", "ast"]
+    assert report.tokens == 26
+    assert report.ast_nodes == ast_size(program) == 16
+    assert report.tree_nodes > report.tokens
+    assert all(stats.seconds >= 0 and stats.peak_bytes is None for stats in report.phases.values())
+
+
+def test_002():
+    """Test memory peaks are recorded on request and tracing is stopped afterwards"""
+    report = FrontEndReport(trace_memory=True)
+    build_ast(SOURCE, report)
+    assert all(stats.peak_bytes > 0 for stats in report.phases.values())
+    assert not tracemalloc.is_tracing()
+    assert set(report.as_dict()["phases"]["parse"]) == {"seconds", "peak_bytes"}
+
+
+def test_003():
+    """Test instrumented and plain AST generation agree"""
+    report = FrontEndReport()
+    assert str(ASTGenerator(SOURCE, report).generate()) == str(ASTGenerator(SOURCE).generate())
+    assert report.tokens == 26
+    assert ASTGenerator("class A {", FrontEndReport()).generate() == ASTGenerator("class A {").generate()
+
+
+def test_004():
+    """Test a syntax error before a lexical error is reported as without a report"""
+    source = "class A { int x := 1 + ; } @"
+    assert ASTGenerator(source, FrontEndReport()).generate() == ASTGenerator(source).generate()
+    assert ASTGenerator("class A { @ }", FrontEndReport()).generate() == "Parser Error Token @"
+
+
+def test_005():
+    """Test an AST builder error is raised, not reported as a parser error"""
+    def fail(self, ctx):
+        raise ValueError("builder bug")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(ASTGeneration, "visitProgram", fail)
+        with pytest.raises(ValueError, match="builder bug"):
+            ASTGenerator(SOURCE, FrontEndReport()).generate()
+        with pytest.raises(ValueError, match="builder bug"):
+            ASTGenerator(SOURCE).generate()
@@ -0,0 +1,83 @@
+import io
+
+from utils import ProgramRunner, TranspilerRunner, VMRunner
+from src.runtime.errors import OPLangRuntimeError
+from src.runtime.io_runtime import IORuntime
+
+
+class CountingIO(io.StringIO):
+    """A StringIO counting the calls that reach it."""
+
+    def __init__(self, value=""):
+        super().__init__(value)
+        self.reads = self.writes = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+ECHO = """class Main {
+    static void main() {
+        int n := io.readInt();
+        int total := 0;
+        for i := 1 to n do {
+            int x := io.readInt();
+            total := total + x;
+            io.writeInt(x);
+            io.writeStr(" ");
+        }
+        io.writeStrLn("");
+        io.writeIntLn(total \\ 0);
+    }
+}"""
+
+
+def test_001():
+    """Test output is written in batches and on flush"""
+    stdout = CountingIO()
+    runtime = IORuntime(io.StringIO(), stdout, batch=3)
+    runtime.writeInt(1)
+    runtime.writeStr("a")
+    assert stdout.getvalue() == ""
+    runtime.writeBoolLn(True)
+    assert stdout.getvalue() == "1atrue\n" and stdout.writes == 1
+    runtime.writeFloatLn(2)
+    runtime.flush()
+    assert stdout.getvalue() == "1atrue\n2.0\n" and stdout.writes == 2
+
+
+def test_002():
+    """Test input is read in blocks and split into lines"""
+    stdin = CountingIO("3\r\n4.5\ntrue\nlast")
+    runtime = IORuntime(stdin, io.StringIO())
+    assert runtime.readInt() == 3
+    assert runtime.readFloat() == 4.5
+    assert runtime.readBool() is True
+    assert runtime.readStr() == "last"
+    assert stdin.reads == 2
+    try:
+        runtime.readStr()
+        assert False
+    except OPLangRuntimeError as e:
+        assert str(e) == "Runtime Error: Unexpected end of input"
+
+
+def test_003():
+    """Test an in-memory io class"""
+    runtime = IORuntime.in_memory("7\n")
+    runtime.writeIntLn(runtime.readInt() * 2)
+    assert runtime.output() == "14\n"
+
+
+def test_004():
+    """Test buffered output is flushed before a runtime error is reported"""
+    expected = "1 2 3 \nRuntime Error: Division by zero"
+    stdin = "3\n1\n2\n3\n"
+    assert ProgramRunner(ECHO, stdin).run() == expected
+    assert VMRunner(ECHO, stdin).run() == expected
+    assert TranspilerRunner(ECHO, stdin).run() == expected
@@ -0,0 +1,70 @@
+from utils import ASTGenerator, ProgramRunner, VMRunner
+from src.runtime.layout import SlotResolver, compute_layouts
+from src.semantics.class_table import ClassTable
+from src.semantics.type_inference import TypeInference
+
+
+SOURCE = """class Shape {
+    float length, width;
+    static int count;
+    int id := 7;
+    float area() { return length * width; }
+}
+class Square extends Shape {
+    int id := 9;
+    string label := "sq";
+    Square(float side) { length := side; this.width := side; }
+}
+class Main {
+    static void grow(float & x) { x := x * 2; }
+    static void main() {
+        Square s := new Square(3.0);
+        Shape p := s;
+        Main.grow(s.width);
+        io.writeFloatLn(p.area());
+        io.writeIntLn(p.id + s.id);
+        io.writeStrLn(s.label);
+        p := nil;
+        io.writeFloatLn(p.length);
+    }
+}"""
+
+
+def layouts():
+    return compute_layouts(ClassTable(ASTGenerator(SOURCE).generate()))
+
+
+def test_001():
+    """Test inherited attributes come first and statics get no slot"""
+    result = layouts()
+    assert result["Shape"].slots == {"length": 0, "width": 1, "id": 2}
+    assert result["Square"].slots == {"length": 0, "width": 1, "id": 2, "label": 3}
+    assert result["Main"].slots == {}
+
+
+def test_002():
+    """Test a redeclared attribute keeps the inherited slot with the new declaration"""
+    decl, attr = layouts()["Square"].attributes[2]
+    assert attr.name == "id" and str(attr.init_value) == "IntLiteral(9)"
+
+
+def test_003():
+    """Test member accesses on receivers of known class are resolved to slots"""
+    program = ASTGenerator(SOURCE).generate()
+    inference = TypeInference()
+    inference.infer(program)
+    assert SlotResolver(compute_layouts(ClassTable(program)), inference).resolve(program) == 6
+
+
+def test_004():
+    """Test a cyclic hierarchy is laid out without looping"""
+    program = ASTGenerator("class A extends B { int a; } class B extends A { int b; }").generate()
+    result = compute_layouts(ClassTable(program))
+    assert len(result["A"]) + len(result["B"]) == 3
+
+
+def test_005():
+    """Test the interpreter and the VM agree on slot-based objects"""
+    expected = "18.0\n18\nsq\nRuntime Error: Nil reference accessing length"
+    assert ProgramRunner(SOURCE).run() == expected
+    assert VMRunner(SOURCE).run() == expected
@@ -0,0 +1,121 @@
+from utils import ASTGenerator, ProgramRunner, TranspilerRunner, VMRunner
+from src.analysis.lifetimes import LifetimeAnalysis
+from src.semantics.class_table import ClassTable
+
+
+SOURCE = """class Res {
+    int id;
+    static int alive;
+    Res(int id) { this.id := id; Res.alive := Res.alive + 1; }
+    ~Res() { Res.alive := Res.alive - 1; io.writeStrLn("free " ^ Res.name(id)); }
+    static string name(int id) { if id == 1 then return "one"; else if id == 2 then return "two"; else return "n"; }
+    int get() { return id; }
+    void keep() { Holder.last := this; }
+}
+class Holder {
+    static Res last;
+}
+class Main {
+    static int find(int n) {
+        Res r := new Res(2);
+        if n > 0 then return r.get() + n;
+        return 0;
+    }
+    static void main() {
+        Res outer := new Res(1);
+        int total := 0;
+        for i := 1 to 3 do {
+            Res tmp := new Res(3);
+            if i == 2 then continue;
+            total := total + tmp.get();
+            if i == 3 then break;
+        }
+        io.writeIntLn(total);
+        io.writeIntLn(Main.find(5));
+        {
+            Res kept := new Res(2);
+            kept.keep();
+        }
+        io.writeIntLn(Res.alive);
+        io.writeIntLn(outer.get());
+    }
+}"""
+
+EXPECTED = "free n\nfree n\nfree n\n6\nfree two\n7\n2\n1\nfree one\nfree two\n"
+
+
+def scoped(source):
+    program = ASTGenerator(source).generate()
+    LifetimeAnalysis(ClassTable(program)).analyze(program)
+    result = []
+    for class_decl in program.class_decls:
+        for member in class_decl.members:
+            body = getattr(member, "body", None)
+            if body is not None:
+                result.extend(body.scoped)
+                result.extend(name for stmt in body.statements for name in getattr(stmt, "scoped", []))
+    return result
+
+
+def test_001():
+    """Test locals owning a new object are scoped unless the object escapes"""
+    assert scoped(SOURCE) == ["r", "outer"]
+
+
+def test_002():
+    """Test passing, assigning or returning the local keeps it alive to program end"""
+    source = """class R {
+        ~R() { io.writeStrLn("free"); }
+    }
+    class Main {
+        static void use(R r) {}
+        static R make() { R r := new R(); return r; }
+        static void main() {
+            R a := new R();
+            R b := new R();
+            R c := new R();
+            R d := b;
+            Main.use(a);
+            c := nil;
+        }
+    }"""
+    assert scoped(source) == []
+
+
+def test_003():
+    """Test the interpreter destroys scoped objects on every way out of their block"""
+    assert ProgramRunner(SOURCE).run() == EXPECTED
+
+
+def test_004():
+    """Test the VM destroys scoped objects like the interpreter"""
+    assert VMRunner(SOURCE).run() == EXPECTED
+    listing = VMRunner(SOURCE).disassemble("Main", "find")
+    assert listing.count("DESTROY_LOCAL") == 3
+
+
+def test_005():
+    """Test the transpiler destroys scoped objects like the interpreter"""
+    assert TranspilerRunner(SOURCE).run() == EXPECTED
+    assert TranspilerRunner(SOURCE).source("Main").count("_release(") == 7
+
+
+def test_006():
+    """Test a destructor letting `this` escape keeps its objects alive to program end"""
+    source = """class A {
+        static A last;
+        int[1] v;
+        A() { v[0] := 1; }
+        ~A() { A.last := this; }
+    }
+    class Main {
+        static void main() {
+            {
+                A a := new A();
+            }
+            io.writeIntLn(A.last.v[0]);
+        }
+    }"""
+    assert scoped(source) == []
+    for runner in (ProgramRunner, VMRunner, TranspilerRunner):
+        assert runner(source).run() == "Runtime Error: Nil reference accessing v"
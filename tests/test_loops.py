@@ -0,0 +1,139 @@
+from utils import Optimizer
+
+
+def test_001():
+    """Test loop-invariant arithmetic is hoisted out of a for loop"""
+    source = """class Main {
+        static void main() {
+            float n := 1.5, k := 2, s := 0;
+            int i;
+            for i := 1 to 4 do s := s + n * k + i;
+            io.writeFloatLn(s);
+        }
+    }"""
+    expected = "BlockStatement(vars=[VariableDecl(PrimitiveType(float), [Variable(_inv1 = BinaryOp(Identifier(n), *, Identifier(k)))])], stmts=[ForStatement(for i := IntLiteral(1) to IntLiteral(4) do AssignmentStatement(IdLHS(s) := BinaryOp(BinaryOp(Identifier(s), +, Identifier(_inv1)), +, Identifier(i))))])"
+    assert expected in Optimizer(source, ["loops"]).optimize()
+    assert Optimizer(source, ["loops"]).report() == "Main.main: hoisted _inv1"
+    assert Optimizer(source, ["loops"]).run() == "22.0\n"
+
+
+def test_002():
+    """Test array indices linear in the loop variable are strength-reduced, also before continue"""
+    source = """class Main {
+        static void main() {
+            int[10] a;
+            int i;
+            for i := 0 to 4 do {
+                if i == 2 then continue;
+                a[i * 2 + 1] := i;
+            }
+            io.writeIntLn(a[3] + a[9]);
+        }
+    }"""
+    expected = "BlockStatement(vars=[VariableDecl(PrimitiveType(int), [Variable(_idx1)])], stmts=[AssignmentStatement(IdLHS(i) := IntLiteral(0)), AssignmentStatement(IdLHS(_idx1) := BinaryOp(BinaryOp(Identifier(i), *, IntLiteral(2)), +, IntLiteral(1))), ForStatement(for i := Identifier(i) to IntLiteral(4) do BlockStatement(stmts=[BlockStatement(stmts=[IfStatement(if BinaryOp(Identifier(i), ==, IntLiteral(2)) then BlockStatement(stmts=[AssignmentStatement(IdLHS(_idx1) := BinaryOp(Identifier(_idx1), +, IntLiteral(2))), ContinueStatement()])), AssignmentStatement(PostfixLHS(PostfixExpression(Identifier(a)[Identifier(_idx1)])) := Identifier(i))]), AssignmentStatement(IdLHS(_idx1) := BinaryOp(Identifier(_idx1), +, IntLiteral(2)))]))])"
+    assert expected in Optimizer(source, ["loops"]).optimize()
+    assert Optimizer(source, ["loops"]).run() == "5\n"
+
+
+def test_003():
+    """Test nothing is hoisted that may fail or overflow, read a field or change through a reference"""
+    source = """class Counter {
+        int step;
+        static void bump(int & x) { x := x + 1; }
+    }
+    class Main {
+        static void main() {
+            Counter c := new Counter();
+            int n := 6, k := 2, i, s := 0;
+            c.step := 1;
+            for i := 1 to 3 do {
+                s := s + n \\ k + c.step * 2 + k * 3 + n * n;
+                Counter.bump(k);
+            }
+            io.writeIntLn(s);
+        }
+    }"""
+    assert Optimizer(source, ["loops"]).report() == ""
+    assert Optimizer(source, ["loops"]).run() == "147\n"
+
+
+def test_004():
+    """Test counted loops run with FOR_NEXT on the VM"""
+    source = """class Main {
+        static void main() {
+            int i, j, s := 0;
+            for i := 1 to 5 do s := s + i;
+            for j := 10 downto 1 do j := j - 1;
+            io.writeIntLn(s);
+            io.writeIntLn(i);
+            io.writeIntLn(j);
+        }
+    }"""
+    listing = Optimizer(source, ["loops"]).disassemble("Main", "main")
+    assert listing.count("FOR_NEXT") == 1 and listing.count("FOR_TEST") == 2
+    assert "FOR_NEXT 3 ((1, 4, 22, True))" in listing
+    assert Optimizer(source, ["loops"]).run() == "15\n6\n0\n"
+
+
+def test_005():
+    """Test a loop variable bound to a reference parameter is not counted"""
+    source = """class Main {
+        static void skip(int & x) { x := x + 1; }
+        static void main() {
+            int i;
+            for i := 1 to 6 do {
+                io.writeInt(i);
+                Main.skip(i);
+            }
+            io.writeIntLn(i);
+        }
+    }"""
+    assert "FOR_NEXT" not in Optimizer(source, ["loops"]).disassemble("Main", "main")
+    assert Optimizer(source, ["loops"]).run() == "1357\n"
+
+
+def test_006():
+    """Test nested loops keep their output after optimisation"""
+    source = """class Main {
+        static void main() {
+            int[100] a;
+            int n := 3, k := 2, i, j, s := 0;
+            for i := 0 to 9 do {
+                a[i * 4 + 1] := n * k + 1;
+                if i == 5 then continue;
+                s := s + a[i * 4 + 1] + (n - k) * i;
+                for j := 3 downto 0 do {
+                    a[j * k - 1 + 2] := a[j * k - 1 + 2] + j;
+                    if j == 2 then break;
+                }
+            }
+            io.writeIntLn(s);
+            io.writeIntLn(i);
+            io.writeIntLn(j);
+            for i := 9 downto 0 do s := s - a[i * 2];
+            io.writeIntLn(s);
+        }
+    }"""
+    assert Optimizer(source, []).run() == "103\n10\n2\n103\n"
+    assert Optimizer(source, ["loops"]).run() == "103\n10\n2\n103\n"
+    assert Optimizer(source).run() == "103\n10\n2\n103\n"
+
+
+def test_007():
+    """Test a loop over an attribute does not make it a local of later loops"""
+    source = """class Main {
+        int n;
+        void bump() { n := n + 10; }
+        void run() {
+            int i;
+            for n := 1 to 3 do {}
+            for i := 1 to 3 do {
+                this.bump();
+                io.writeIntLn(n + 1);
+            }
+        }
+        static void main() { new Main().run(); }
+    }"""
+    assert Optimizer(source, []).run() == "15\n25\n35\n"
+    assert Optimizer(source, ["loops"]).run() == "15\n25\n35\n"
+    assert Optimizer(source, ["loops"]).report() == ""
@@ -0,0 +1,43 @@
+from utils import Parser
+from src.astgen.profiling import profile_parse
+
+
+SOURCE = """class A {
+    int x;
+    A me() { return this; }
+    void run() {
+        if x > 0 then if x > 1 then x := 1; else x := 2;
+        this.me().me().x := 3;
+        this.me().me().run();
+    }
+}"""
+
+
+def test_001():
+    """Test decisions are attributed to their rules"""
+    assert Parser(SOURCE).parse() == "success"
+    profile = profile_parse(SOURCE)
+    rules = {stats.rule for stats in profile.decisions.values()}
+    assert {"exprDot", "if_stmt", "statement"} <= rules
+    assert profile.rules["program"].invocations == 1
+    assert profile.rules["exprDot"].prediction_seconds > 0
+
+
+def test_002():
+    """Test lookahead depth and full-context fallbacks are measured"""
+    profile = profile_parse(SOURCE)
+    dangling = [s for s in profile.decisions.values() if s.rule == "if_stmt"][0]
+    # only the inner if, followed by else, is ambiguous under SLL
+    assert dangling.invocations == 2 and dangling.ll_fallbacks == 1
+    statement = [s for s in profile.decisions.values() if s.rule == "statement"][0]
+    # this.me().me().run(); is only told from an assignment at its 14th token, the ;
+    assert statement.sll_max_lookahead == 14
+
+
+def test_003():
+    """Test a warm parse reuses the DFA instead of simulating the ATN"""
+    profile_parse(SOURCE, cold=False)
+    cold = profile_parse(SOURCE)
+    warm = profile_parse(SOURCE, cold=False)
+    assert sum(s.atn_transitions for s in warm.decisions.values()) < sum(s.atn_transitions for s in cold.decisions.values())
+    assert "decision" in str(warm) and "rule" in warm.format(1)
@@ -0,0 +1,69 @@
+import json
+
+from utils import ASTGenerator
+from src.astgen.recovery import parse
+from src.astgen.server import CompileServer
+
+
+SOURCE = """class A {
+    int x;
+    void f() {
+        x := 1
+        x := 2;
+        y := ;
+    }
+}
+class B { int y; }"""
+
+
+def test_001():
+    """Test every syntax error is reported with its position and fail-fast message"""
+    program, diagnostics = parse(SOURCE)
+    assert [(d.kind, d.line, d.column) for d in diagnostics] == [("syntax", 5, 8), ("syntax", 6, 13)]
+    assert diagnostics[0].message == "Error on line 5 col 8: x"
+    # fail-fast mode is unchanged and stops at the first of them
+    assert ASTGenerator(SOURCE).generate() == "Parser " + diagnostics[0].message
+
+
+def test_002():
+    """Test erroneous statements become error nodes in a partial AST"""
+    program, _ = parse(SOURCE)
+    assert str(program) == (
+        "Program([ClassDecl(A, [AttributeDecl(PrimitiveType(int), [Attribute(x)]), "
+        "MethodDecl(PrimitiveType(void) f([]), BlockStatement(stmts=[ErrorNode('x := 1'), "
+        "AssignmentStatement(IdLHS(x) := IntLiteral(2)), ErrorNode('y := ;')]))]), "
+        "ClassDecl(B, [AttributeDecl(PrimitiveType(int), [Attribute(y)])])])"
+    )
+
+
+def test_003():
+    """Test lexer errors are reported and the tokens skipped"""
+    source = 'class A { void f() { x := 1 @ ; s := "a\\q; } } $'
+    program, diagnostics = parse(source)
+    assert [(d.kind, d.column, d.message) for d in diagnostics] == [
+        ("lexer", 28, "Error Token @"),
+        ("lexer", 37, "Illegal Escape In String: a\\q"),
+        ("syntax", 41, "Error on line 1 col 41: ;"),
+        ("lexer", 47, "Error Token $"),
+    ]
+    assert str(program).count("ErrorNode") == 1
+    assert ASTGenerator(source).generate() == "Parser Error Token @"
+
+
+def test_004():
+    """Test a valid source gives the usual AST and no errors"""
+    source = "class Main { static void main() { int a := 1; io.writeIntLn(a); } }"
+    program, diagnostics = parse(source)
+    assert diagnostics == []
+    assert str(program) == str(ASTGenerator(source).generate())
+
+
+def test_005():
+    """Test the compile server answers recovering requests with every error"""
+    server = CompileServer()
+    try:
+        response = json.loads(server.handle(json.dumps({"id": 1, "source": SOURCE, "recover": True})))
+    finally:
+        server.close()
+    assert response["ast"] == str(parse(SOURCE)[0])
+    assert [e["line"] for e in response["errors"]] == [5, 6]
@@ -0,0 +1,35 @@
+import io
+import json
+
+from utils import ASTGenerator
+from src.astgen.server import CompileServer
+
+
+SOURCE = "class Main { static void main() { io.writeIntLn(1); } }"
+
+
+def test_001():
+    """Test one request is answered with the AST or the error ASTGenerator gives"""
+    server = CompileServer()
+    try:
+        response = json.loads(server.handle(json.dumps({"id": 7, "source": SOURCE})))
+        assert response == {"id": 7, "ast": str(ASTGenerator(SOURCE).generate())}
+        response = json.loads(server.handle(json.dumps({"id": "x", "source": "class A {"})))
+        assert response == {"id": "x", "error": ASTGenerator("class A {").generate()}
+        assert json.loads(server.handle("{}")) == {"id": None, "error": "Bad request"}
+    finally:
+        server.close()
+
+
+def test_002():
+    """Test a stream of requests is answered one line per request"""
+    requests = "".join(json.dumps({"id": i, "source": SOURCE}) + "\n" for i in range(5))
+    out = io.StringIO()
+    server = CompileServer()
+    try:
+        server.serve_stream(io.StringIO(requests + "\n"), out)
+    finally:
+        server.close()
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(r["id"] for r in responses) == [0, 1, 2, 3, 4]
+    assert all("ast" in r for r in responses)
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from utils import ASTGenerator
+from src.astgen.streaming import _ReaderStream, iter_classes, parse
+
+
+SOURCE = """class A { int x := 1; }
+class B extends A {
+    void f() { this.x := "s"; }
+}
+class Main { static void main() { io.writeIntLn(1); } }"""
+
+
+def test_001():
+    """Test the streamed classes are those of the whole-file AST"""
+    expected = str(ASTGenerator(SOURCE).generate())
+    assert str(parse(SOURCE)) == expected
+    # blocks smaller than a token are refilled and trimmed mid-token
+    assert str(parse(io.StringIO(SOURCE), block=3)) == expected
+
+
+def test_002():
+    """Test classes are yielded before a later error is reached"""
+    classes = iter_classes("class A { } class B { int x := @; }")
+    assert next(classes).name == "A"
+    with pytest.raises(Exception) as error:
+        next(classes)
+    assert str(error.value) == "Error Token @"
+
+
+def test_003():
+    """Test errors carry the messages of the whole-file parser"""
+    for source in ["", "class A {", "class A { } x", "class A { } class", 'class A { string s := "abc']:
+        with pytest.raises(Exception) as error:
+            parse(source)
+        assert "Parser " + str(error.value) == ASTGenerator(source).generate()
+
+
+def test_004():
+    """Test the character stream keeps about a block past the token being lexed"""
+    stream = _ReaderStream(io.StringIO("x" * 1000), block=16)
+    longest = 0
+    while stream.LA(1) != -1:
+        marker = stream.mark()
+        stream.consume()
+        stream.release(marker)
+        longest = max(longest, len(stream.buffer))
+    assert stream.index == 1000 and longest <= 32
@@ -0,0 +1,253 @@
+from utils import TranspilerRunner
+from src.transpiler.executor import CodeCache
+from src.transpiler.runtime import translate_error
+
+
+def test_001():
+    """Test arithmetic, integer division, remainder and concatenation"""
+    source = """class Main {
+        static void main() {
+            io.writeIntLn(1 + 2 * 3 - 4);
+            io.writeIntLn(7 \\ 2);
+            io.writeIntLn(-7 \\ 2);
+            io.writeIntLn(-7 % 3);
+            io.writeFloatLn(7 / 2);
+            io.writeStrLn("a" ^ "b" ^ "c");
+        }
+    }"""
+    expected = "3\n3\n-3\n-1\n3.5\nabc\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_002():
+    """Test short-circuit evaluation of && and ||"""
+    source = """class Main {
+        static int count;
+        static boolean tick(boolean b) { Main.count := Main.count + 1; return b; }
+        static void main() {
+            io.writeBoolLn(Main.tick(false) && Main.tick(true));
+            io.writeBoolLn(Main.tick(true) || Main.tick(false));
+            io.writeBoolLn(!(Main.tick(true) && Main.tick(false)));
+            io.writeIntLn(Main.count);
+        }
+    }"""
+    expected = "false\ntrue\ntrue\n4\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_003():
+    """Test reference parameters bound to locals, attributes and elements"""
+    source = """class Main {
+        int f := 1;
+        static void inc(int & x) { x := x + 1; }
+        void main() {
+            int a := 10;
+            int[3] arr := {1, 2, 3};
+            Main.inc(a);
+            Main.inc(this.f);
+            Main.inc(f);
+            Main.inc(arr[2]);
+            io.writeIntLn(a);
+            io.writeIntLn(this.f);
+            io.writeIntLn(arr[2]);
+        }
+    }"""
+    expected = "11\n3\n4\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_004():
+    """Test reference variables and reference returns"""
+    source = """class Main {
+        static int & pick(int[3] & arr; int i) { return arr[i]; }
+        static void main() {
+            int x := 1;
+            int & y := x;
+            int[3] arr := {7, 8, 9};
+            y := 5;
+            io.writeIntLn(x);
+            io.writeIntLn(Main.pick(arr, 1) + 1);
+        }
+    }"""
+    expected = "5\n9\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_005():
+    """Test for loops leave the variable past the bound, also when the body assigns it"""
+    source = """class Main {
+        static void main() {
+            int i, j;
+            for i := 1 to 3 do io.writeInt(i);
+            io.writeIntLn(i);
+            for j := 10 downto 1 do {
+                if j % 2 == 0 then continue;
+                j := j - 2;
+                io.writeInt(j);
+            }
+            io.writeIntLn(j);
+        }
+    }"""
+    expected = "1234\n73-1-2\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_006():
+    """Test inheritance, virtual dispatch and constructors"""
+    source = """class Shape {
+        float length, width;
+        float getArea() { return 0.0; }
+        Shape(float length; float width) {
+            this.length := length;
+            this.width := width;
+        }
+    }
+    class Rectangle extends Shape {
+        Rectangle(float length; float width) {
+            this.length := length;
+            this.width := width;
+        }
+        float getArea() { return this.length * this.width; }
+    }
+    class Main {
+        static void main() {
+            Shape s := new Rectangle(2.0, 3.5);
+            io.writeFloatLn(s.getArea());
+            s := new Shape(1.0, 1.0);
+            io.writeFloatLn(s.getArea());
+        }
+    }"""
+    expected = "7.0\n0.0\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_007():
+    """Test destructors run in reverse creation order at program end"""
+    source = """class Res {
+        string name;
+        Res(string name) { this.name := name; }
+        ~Res() { io.writeStrLn("free " ^ this.name); }
+    }
+    class Main {
+        static void main() {
+            Res a := new Res("a");
+            Res b := new Res("b");
+            io.writeStrLn("done");
+        }
+    }"""
+    expected = "done\nfree b\nfree a\n"
+    assert TranspilerRunner(source).run() == expected
+
+
+def test_008():
+    """Test runtime errors keep the interpreter's messages"""
+    source = """class Node { int value; }
+    class Main {
+        static void main() {
+            Node n := nil;
+            io.writeIntLn(1);
+            io.writeIntLn(n.value);
+        }
+    }"""
+    assert TranspilerRunner(source).run() == "1\nRuntime Error: Nil reference accessing value"
+    source = """class Main {
+        static void main() {
+            int[2] a;
+            int zero := 0;
+            io.writeIntLn(a[1]);
+            io.writeIntLn(3 \\ zero);
+        }
+    }"""
+    assert TranspilerRunner(source).run() == "0\nRuntime Error: Division by zero"
+
+
+def test_009():
+    """Test generated Python source of a class"""
+    source = """class Counter {
+        int count := 1;
+        static int total;
+        void add(int & n) {
+            for i := 1 to n do this.count := this.count * 2;
+            n := this.count;
+        }
+    }
+    class Main { static void main() {} }"""
+    expected = """class C_Counter(_Object):
+    __slots__ = ('f_count',)
+    s_total = None
+
+    def __init__(self):
+        self.f_count = 1
+
+    @staticmethod
+    def _clinit():
+        C_Counter.s_total = 0
+
+    def m_add(self, v_n):
+        v_i = 1
+        _t1 = v_n.value
+        for v_i in range(v_i, _t1 + 1):
+            self.f_count = _check_int(self.f_count * 2)
+        else:
+            if v_i <= _t1: v_i = _check_int(_t1 + 1)
+        v_n.value = self.f_count
+"""
+    assert TranspilerRunner(source).source("Counter") == expected
+
+
+def test_010():
+    """Test code objects are cached per class and reused across programs"""
+    main = """class Main {
+        static void main() { io.writeIntLn(new Box().get()); }
+    }"""
+    cache = CodeCache()
+    first = "class Box { int get() { return 1; } }\n" + main
+    second = "class Box { int get() { return 2; } }\n" + main
+    assert TranspilerRunner(first, cache=cache).run() == "1\n"
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert TranspilerRunner(first, cache=cache).run() == "1\n"
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert TranspilerRunner(second, cache=cache).run() == "2\n"
+    assert (cache.hits, cache.misses) == (5, 4)
+
+
+def test_011():
+    """Test unbounded recursion is a stack overflow"""
+    source = """class Main {
+        static int loop(int n) { return Main.loop(n + 1); }
+        static void main() { io.writeIntLn(1); io.writeIntLn(Main.loop(0)); }
+    }"""
+    assert TranspilerRunner(source).run() == "1\nRuntime Error: Stack overflow"
+
+
+def test_012():
+    """Test constructor arguments are evaluated before the field initialisers"""
+    source = """class K { static int c; static int next() { K.c := K.c + 1; return K.c; } }
+    class A { int id := K.next(); A(int x) { io.writeIntLn(x); io.writeIntLn(this.id); } }
+    class Main { static void main() { A a := new A(K.next()); } }"""
+    assert TranspilerRunner(source).run() == "1\n2\n"
+
+
+def test_013():
+    """Test deep recursion and stack overflow"""
+    source = """class Main {
+        static int sum(int n) {
+            if n == 0 then return 0;
+            return n + Main.sum(n - 1);
+        }
+        static void main() { io.writeIntLn(Main.sum(5000)); }
+    }"""
+    assert TranspilerRunner(source).run() == "12502500\n"
+    source = """class Main {
+        static int loop(int n) { return Main.loop(n + 1); }
+        static void main() { io.writeIntLn(1); io.writeIntLn(Main.loop(0)); }
+    }"""
+    assert TranspilerRunner(source).run() == "1\nRuntime Error: Stack overflow"
+
+
+def test_014():
+    """Test only errors generated code raises on purpose become runtime errors"""
+    error = translate_error(AttributeError("'NoneType' object has no attribute 'm_area'"))
+    assert str(error) == "Runtime Error: Nil reference calling area"
+    assert translate_error(AttributeError("'C_Box' object has no attribute 'f_size'")) is None
+    assert translate_error(TypeError("unsupported operand type(s)")) is None
@@ -0,0 +1,177 @@
+
+from utils import ASTGenerator, JVMCodeGenerator, ProgramRunner, TranspilerRunner, TypeInferencer, VMRunner
+from src.semantics.type_inference import TypeInference
+from src.utils.nodes import ObjectCreation
+from src.utils.visitor import BaseVisitor
+
+
+def test_001():
+    """Test integer arithmetic stays integer"""
+    source = """class V { int a := 1 + 2 * 3 - 4; }"""
+    expected = "PrimitiveType(int)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_002():
+    """Test int/float coercion in arithmetic"""
+    source = """class V { float a := 1 + 2.0; float b := 2.5 * 3; }"""
+    expected = "PrimitiveType(float), PrimitiveType(float)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_003():
+    """Test float division always yields float"""
+    source = """class V { float a := 4 / 2; }"""
+    expected = "PrimitiveType(float)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_004():
+    """Test integer division and remainder"""
+    source = """class V { int a := 7 \\ 2; int b := 7 % 2; float c := 7.0 % 2; }"""
+    expected = "PrimitiveType(int), PrimitiveType(int), None"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_005():
+    """Test string concatenation"""
+    source = """class V { string a := "a" ^ "b" ^ "c"; int b := 1 ^ 2; }"""
+    expected = "PrimitiveType(string), None"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_006():
+    """Test boolean and relational operators"""
+    source = """class V { boolean a := !true && false || true; boolean b := 1 < 2.5; boolean c := 1 == 2; boolean d := 1.0 == 2.0; }"""
+    expected = "PrimitiveType(boolean), PrimitiveType(boolean), PrimitiveType(boolean), None"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_007():
+    """Test unary operators and parentheses"""
+    source = """class V { float a := -(1.5 + 2); int b := +3; boolean c := !(1 > 2); }"""
+    expected = "PrimitiveType(float), PrimitiveType(int), PrimitiveType(boolean)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_008():
+    """Test identifiers resolve to parameters, locals and attributes"""
+    source = """class V {
+        float f;
+        void m(int p) {
+            string s := "x";
+            int a := p + 1;
+            float b := f * p;
+            string c := s ^ s;
+        }
+    }"""
+    expected = "PrimitiveType(string), PrimitiveType(int), PrimitiveType(float), PrimitiveType(string)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_009():
+    """Test object creation, member access and inherited methods"""
+    source = """class Shape {
+        float length, width;
+        float getArea() { return 0.0; }
+    }
+    class Rectangle extends Shape {
+        void m() {
+            Rectangle r := new Rectangle();
+            float a := r.getArea();
+            float l := r.length + this.width;
+        }
+    }"""
+    expected = "ClassType(Rectangle), PrimitiveType(float), PrimitiveType(float)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_010():
+    """Test io built-in calls"""
+    source = """class V { void main() { int x := io.readInt(); float y := io.readFloat() + x; string s := io.readStr(); } }"""
+    expected = "PrimitiveType(int), PrimitiveType(float), PrimitiveType(string)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_011():
+    """Test array access and array literals"""
+    source = """class V { void main() { int[3] a := {1, 2, 3}; int x := a[1] * 2; float[2] b := {1, 2.0}; } }"""
+    expected = "ArrayType(PrimitiveType(int)[3]), PrimitiveType(int), ArrayType(PrimitiveType(float)[2])"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_012():
+    """Test static attribute access, nil and for variables"""
+    source = """class A {
+        static int count;
+        A next;
+        void m() {
+            A n := nil;
+            for i := 1 to 10 do {
+                int k := i + A.count;
+            }
+        }
+    }"""
+    expected = "ClassType(nil), PrimitiveType(int)"
+    assert TypeInferencer(source).infer() == expected
+
+
+def test_013():
+    """Test int array literals initialising float arrays have the float array type"""
+    source = """class V {
+        static float[2] s := {1, 2};
+        void main() { float[3] f := {1, 2, 3}; int[2] a := {1, 2}; }
+    }"""
+    expected = "ArrayType(PrimitiveType(float)[2]), ArrayType(PrimitiveType(float)[3]), ArrayType(PrimitiveType(int)[2])"
+    assert TypeInferencer(source).infer() == expected
+
+
+RECTANGLE = """class Rectangle {
+    float length, width;
+    Rectangle() { this.length := 1.0; this.width := 1.0; }
+    Rectangle(Rectangle other) { this.length := other.length; this.width := other.width; }
+    Rectangle(float side) { this.length := side; this.width := side; }
+    Rectangle(float length; float width) { this.length := length; this.width := width; }
+    float getArea() { return this.length * this.width; }
+}
+class Main {
+    static void main() {
+        Rectangle r2 := new Rectangle(5.0, 3.0);
+        Rectangle r3 := new Rectangle(r2);
+        Rectangle r4 := new Rectangle(2);
+        Rectangle r5 := new Rectangle(nil);
+    }
+}"""
+
+
+def test_014():
+    """Test constructors are chosen by the types of the arguments"""
+    class Creations(BaseVisitor):
+        def __init__(self):
+            self.found = []
+
+        def visit_object_creation(self, node, o=None):
+            self.found.append(node)
+
+    ast = ASTGenerator(RECTANGLE).generate()
+    inference = TypeInference()
+    inference.infer(ast)
+    creations = Creations()
+    creations.visit(ast)
+    chosen = [[str(p.param_type) for p in inference.constructor_of(node).params] for node in creations.found]
+    assert chosen == [
+        ["PrimitiveType(float)", "PrimitiveType(float)"],
+        ["ClassType(Rectangle)"],
+        ["PrimitiveType(float)"],
+        ["ClassType(Rectangle)"],
+    ]
+
+
+def test_015():
+    """Test every engine calls the copy constructor chosen by argument types"""
+    source = RECTANGLE.replace("Rectangle r5 := new Rectangle(nil);", """
+        io.writeFloatLn(r3.getArea());
+        io.writeFloatLn(r4.getArea());
+        io.writeFloatLn(new Rectangle().getArea());""")
+    for runner in (ProgramRunner, VMRunner, TranspilerRunner, JVMCodeGenerator):
+        assert runner(source).run() == "15.0\n4.0\n1.0\n"
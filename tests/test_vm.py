@@ -0,0 +1,361 @@
+
+from utils import VMRunner
+
+
+def test_001():
+    """Test static main writing literals"""
+    source = """class Main {
+        static void main() {
+            io.writeIntLn(42);
+            io.writeFloatLn(1.5);
+            io.writeBoolLn(true);
+            io.writeStrLn("hello\\tworld");
+        }
+    }"""
+    expected = "42\n1.5\ntrue\nhello\tworld\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_002():
+    """Test arithmetic, integer division, remainder and coercion"""
+    source = """class Main {
+        static void main() {
+            io.writeIntLn(1 + 2 * 3 - 4);
+            io.writeIntLn(7 \\ 2);
+            io.writeIntLn(-7 \\ 2);
+            io.writeIntLn(-7 % 3);
+            io.writeFloatLn(7 / 2);
+            io.writeFloatLn(2 + 0.5);
+            io.writeStrLn("a" ^ "b" ^ "c");
+        }
+    }"""
+    expected = "3\n3\n-3\n-1\n3.5\n2.5\nabc\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_003():
+    """Test recursive factorial from the specification with input"""
+    source = """class Example1 {
+        int factorial(int n){
+            if n == 0 then return 1; else return n * this.factorial(n - 1);
+        }
+
+        void main(){
+            int x;
+            x := io.readInt();
+            io.writeIntLn(this.factorial(x));
+        }
+    }"""
+    expected = "120\n"
+    assert VMRunner(source, "5\n").run() == expected
+
+
+def test_004():
+    """Test for to/downto with break and continue"""
+    source = """class Main {
+        static void main() {
+            int sum := 0;
+            for i := 1 to 10 do {
+                if i % 2 == 0 then continue;
+                if i > 7 then break;
+                sum := sum + i;
+            }
+            io.writeIntLn(sum);
+            for j := 3 downto 1 do io.writeInt(j);
+            io.writeStrLn("");
+        }
+    }"""
+    expected = "16\n321\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_005():
+    """Test inheritance, virtual dispatch and superclass constructors"""
+    source = """class Shape {
+        float length, width;
+        float getArea() { return 0.0; }
+        Shape(float length; float width){
+            this.length := length;
+            this.width := width;
+        }
+    }
+    class Rectangle extends Shape {
+        float getArea(){ return this.length * this.width; }
+    }
+    class Triangle extends Shape {
+        float getArea(){ return this.length * this.width / 2; }
+    }
+    class Example2 {
+        void main(){
+            Shape s;
+            s := new Rectangle(3, 4);
+            io.writeFloatLn(s.getArea());
+            s := new Triangle(3, 4);
+            io.writeFloatLn(s.getArea());
+        }
+    }"""
+    expected = "12.0\n6.0\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_006():
+    """Test static attributes, constructors overloads and destructors"""
+    source = """class Rectangle {
+        float length, width;
+        static int count;
+        Rectangle() {
+            this.length := 1.0;
+            this.width := 1.0;
+            Rectangle.count := Rectangle.count + 1;
+        }
+        Rectangle(Rectangle other) {
+            this.length := other.length;
+            this.width := other.width;
+            Rectangle.count := Rectangle.count + 1;
+        }
+        Rectangle(float length; float width) {
+            this.length := length;
+            this.width := width;
+            Rectangle.count := Rectangle.count + 1;
+        }
+        ~Rectangle() {
+            Rectangle.count := Rectangle.count - 1;
+            io.writeStrLn("Rectangle destroyed");
+        }
+        float getArea() { return this.length * this.width; }
+        static int getCount() { return Rectangle.count; }
+    }
+    class Example3 {
+        static void main() {
+            Rectangle r1 := new Rectangle();
+            Rectangle r2 := new Rectangle(5.0, 3.0);
+            Rectangle r3 := new Rectangle(r2);
+            io.writeFloatLn(r1.getArea());
+            io.writeFloatLn(r3.getArea());
+            io.writeIntLn(Rectangle.getCount());
+        }
+    }"""
+    expected = "1.0\n15.0\n3\nRectangle destroyed\nRectangle destroyed\nRectangle destroyed\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_007():
+    """Test reference parameters and reference variables"""
+    source = """class MathUtils {
+        static void swap(int & a; int & b) {
+            int temp := a;
+            a := b;
+            b := temp;
+        }
+        static void modifyArray(int[5] & arr; int index; int value) {
+            arr[index] := value;
+        }
+    }
+    class Main {
+        static void main() {
+            int x := 10, y := 20;
+            int & xRef := x;
+            int[5] numbers := {1, 2, 3, 4, 5};
+            MathUtils.swap(x, y);
+            io.writeIntLn(x);
+            io.writeIntLn(y);
+            xRef := 7;
+            io.writeIntLn(x);
+            MathUtils.modifyArray(numbers, 2, 99);
+            io.writeIntLn(numbers[2]);
+        }
+    }"""
+    expected = "20\n10\n7\n99\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_008():
+    """Test reference return values alias array elements"""
+    source = """class Main {
+        static int & at(int[3] & arr; int i) {
+            return arr[i];
+        }
+        static void main() {
+            int[3] a := {1, 2, 3};
+            int & r := Main.at(a, 1);
+            r := 50;
+            io.writeIntLn(a[1]);
+            io.writeIntLn(Main.at(a, 2));
+        }
+    }"""
+    expected = "50\n3\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_009():
+    """Test short-circuit evaluation and bare attribute names"""
+    source = """class Main {
+        static int calls := 0;
+        static boolean touch() {
+            calls := calls + 1;
+            return true;
+        }
+        static void main() {
+            boolean b := false && Main.touch();
+            b := true || Main.touch();
+            b := true && Main.touch();
+            io.writeIntLn(calls);
+        }
+    }"""
+    expected = "1\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_010():
+    """Test method chaining on objects and member assignment through arrays"""
+    source = """class Node {
+        int value;
+        Node next;
+        Node(int v) { this.value := v; }
+        Node link(Node n) { this.next := n; return n; }
+    }
+    class Main {
+        static void main() {
+            Node[2] nodes;
+            Node head := new Node(1);
+            head.link(new Node(2)).link(new Node(3));
+            nodes[0] := head;
+            nodes[0].next.value := 20;
+            io.writeIntLn(head.value + head.next.value + head.next.next.value);
+        }
+    }"""
+    expected = "24\n"
+    assert VMRunner(source).run() == expected
+
+
+def test_011():
+    """Test runtime errors"""
+    source = """class Main {
+        static void main() {
+            int[2] a;
+            io.writeIntLn(1);
+            a[2] := 1;
+        }
+    }"""
+    expected = "1\nRuntime Error: Index 2 out of range"
+    assert VMRunner(source).run() == expected
+
+
+def test_012():
+    """Test division by zero and nil dereference"""
+    source = """class A { int x; }
+    class Main {
+        static void main() {
+            A a;
+            io.writeIntLn(a.x);
+        }
+    }"""
+    expected = "Runtime Error: Nil reference accessing x"
+    assert VMRunner(source).run() == expected
+    source = """class Main { static void main() { io.writeIntLn(1 \\ 0); } }"""
+    assert VMRunner(source).run() == "Runtime Error: Division by zero"
+
+
+def test_013():
+    """Test counted loops compile to FOR_TEST with resolved local slots"""
+    source = """class Main {
+        static int sum(int n) {
+            int s := 0;
+            for i := 1 to n do s := s + i;
+            return s;
+        }
+        static void main() { io.writeIntLn(Main.sum(100)); }
+    }"""
+    expected = """   0 LOAD_CONST 0 (0)
+   2 STORE_LOCAL 2
+   4 LOAD_CONST 1 (1)
+   6 STORE_LOCAL 3
+   8 LOAD_LOCAL 1
+  10 STORE_LOCAL 4
+  12 FOR_TEST 2 ((3, 4, 26, True))
+  14 LOAD_LOCAL 2
+  16 LOAD_LOCAL 3
+  18 ADD 0
+  20 STORE_LOCAL 2
+  22 INC_LOCAL 3
+  24 JUMP 12
+  26 LOAD_LOCAL 2
+  28 RETURN 0
+  30 RETURN_NONE 0"""
+    assert VMRunner(source).disassemble("Main", "sum") == expected
+    assert VMRunner(source).run() == "5050\n"
+
+
+def test_014():
+    """Test fields are resolved to slots with inherited fields first"""
+    source = """class A { int x; }
+    class B extends A {
+        int y;
+        int get(B other) { return this.x + other.y; }
+    }
+    class Main { static void main() { io.writeIntLn(new B().get(new B())); } }"""
+    expected = """   0 LOAD_LOCAL 0
+   2 LOAD_FIELD 0
+   4 LOAD_LOCAL 1
+   6 LOAD_FIELD 1
+   8 ADD 0
+  10 RETURN 0
+  12 RETURN_NONE 0"""
+    assert VMRunner(source).disassemble("B", "get") == expected
+    assert VMRunner(source).run() == "0\n"
+
+
+def test_015():
+    """Test unbounded recursion is a stack overflow"""
+    source = """class Main {
+        static int loop(int n) { return Main.loop(n + 1); }
+        static void main() { io.writeIntLn(1); io.writeIntLn(Main.loop(0)); }
+    }"""
+    assert VMRunner(source).run() == "1\nRuntime Error: Stack overflow"
+
+
+def test_016():
+    """Test fields of statically unknown receivers are accessed by name"""
+    source = """class Main {
+        static void main() { io.writeIntLn(1); io.writeIntLn(nil.x); }
+    }"""
+    expected = """   0 LOAD_CONST 0 (1)
+   2 CALL_IO 1 (('writeIntLn', 1))
+   4 POP 0
+   6 LOAD_CONST 2 (None)
+   8 LOAD_FIELD_NAMED 3 ('x')
+  10 CALL_IO 4 (('writeIntLn', 1))
+  12 POP 0
+  14 RETURN_NONE 0"""
+    assert VMRunner(source).disassemble("Main", "main") == expected
+    assert VMRunner(source).run() == "1\nRuntime Error: Nil reference accessing x"
+    source = """class Main { static void main() { nil.x := 2; } }"""
+    assert VMRunner(source).run() == "Runtime Error: Nil reference accessing x"
+
+
+def test_017():
+    """Test an instance main runs on an object built by the no-argument constructor"""
+    source = """class Main {
+        int x := 1;
+        Main() { this.x := this.x + 4; }
+        Main(int x) { this.x := x; }
+        void main() { io.writeIntLn(this.x); }
+    }"""
+    assert VMRunner(source).run() == "5\n"
+
+
+def test_018():
+    """Test deep recursion and stack overflow"""
+    source = """class Main {
+        static int sum(int n) {
+            if n == 0 then return 0;
+            return n + Main.sum(n - 1);
+        }
+        static void main() { io.writeIntLn(Main.sum(5000)); }
+    }"""
+    assert VMRunner(source).run() == "12502500\n"
+    source = """class Main {
+        static int loop(int n) { return Main.loop(n + 1); }
+        static void main() { io.writeIntLn(1); io.writeIntLn(Main.loop(0)); }
+    }"""
+    assert VMRunner(source).run() == "1\nRuntime Error: Stack overflow"
@@ -42,7 +42,8 @@ class Tokenizer:
         return ",".join(tokens)
 
 from build.OPLangParser import OPLangParser
-from src.utils.error_listener import NewErrorListener
+from src.utils.error_listener import NewErrorListener, SyntaxException
+from lexererr import LexerError
 class Parser:
     def __init__(self, input_string):
         self.input_stream = InputStream(input_string)
@@ -60,12 +61,18 @@ class Parser:
             return str(e)
         
 from src.astgen.ast_generation import ASTGeneration
+from src.astgen.instrumentation import FrontEndReport, build_ast
 from src.utils.nodes import *
 class ASTGenerator:
-    """Class to generate AST from CS source code."""
+    """Class to generate AST from CS source code.
 
-    def __init__(self, input_string):
+    Given a FrontEndReport, generate() records the time, counts and memory
+    of each front-end phase into it.
+    """
+
+    def __init__(self, input_string, report=None):
         self.input_string = input_string
+        self.report = report
         self.input_stream = InputStream(input_string)
         self.lexer = OPLangLexer(self.input_stream)
         self.token_stream = CommonTokenStream(self.lexer)
@@ -76,6 +83,12 @@ class ASTGenerator:
 
     def generate(self):
         """Generate AST from the input string."""
+        if self.report is not None:
+            # only lexical and syntax errors are parser errors; AST builder errors propagate as below
+            try:
+                return build_ast(self.input_string, self.report)
+            except (SyntaxException, LexerError) as e:
+                return "Parser " + str(e)
         try:
             parse_tree = self.parser.program() 
         except Exception as e:
@@ -84,3 +97,249 @@ class ASTGenerator:
         # Generate AST using the visitor
         ast = self.ast_generator.visit(parse_tree)
         return ast
+
+
+from src.utils.visitor import BaseVisitor
+from src.semantics.type_inference import TypeInference
+class TypeInferencer:
+    """Class to infer the static types of initialiser expressions."""
+
+    class _InitCollector(BaseVisitor):
+        def __init__(self):
+            self.inits = []
+
+        def visit_attribute(self, node, o=None):
+            if node.init_value:
+                self.inits.append(node.init_value)
+
+        def visit_variable(self, node, o=None):
+            if node.init_value:
+                self.inits.append(node.init_value)
+
+    def __init__(self, input_string):
+        self.input_string = input_string
+
+    def infer(self):
+        """Return the inferred type of every attribute/variable initialiser, in order."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        inference = TypeInference()
+        inference.infer(ast)
+        collector = self._InitCollector()
+        collector.visit(ast)
+        return ", ".join(str(inference.type_of(e)) for e in collector.inits)
+
+
+import io
+from src.runtime.errors import OPLangRuntimeError
+from src.runtime.interpreter import Interpreter
+from src.runtime.io_runtime import IORuntime
+class ProgramRunner:
+    """Class to run OPLang source code and capture its output."""
+
+    def __init__(self, input_string, stdin=""):
+        self.input_string = input_string
+        self.stdin = stdin
+
+    def run(self):
+        """Run the program and return everything it wrote."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        stdout = io.StringIO()
+        try:
+            Interpreter(ast, IORuntime(io.StringIO(self.stdin), stdout)).run()
+        except OPLangRuntimeError as e:
+            return stdout.getvalue() + str(e)
+        return stdout.getvalue()
+
+
+from src.vm.bytecode import disassemble
+from src.vm.compiler import Compiler
+from src.vm.machine import VM
+class VMRunner:
+    """Class to compile OPLang source code to bytecode and run it on the VM."""
+
+    def __init__(self, input_string, stdin=""):
+        self.input_string = input_string
+        self.stdin = stdin
+
+    def run(self):
+        """Run the program and return everything it wrote."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        stdout = io.StringIO()
+        try:
+            module = Compiler().compile(ast)
+            VM(module, IORuntime(io.StringIO(self.stdin), stdout)).run()
+        except OPLangRuntimeError as e:
+            return stdout.getvalue() + str(e)
+        return stdout.getvalue()
+
+    def disassemble(self, class_name, method_name):
+        """Return the bytecode listing of one compiled method."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        module = Compiler().compile(ast)
+        return disassemble(module.classes[class_name].methods[method_name])
+
+
+from src.codegen.codegen import CodeGenerator
+from src.codegen.runner import JVMRunner
+class JVMCodeGenerator:
+    """Class to compile OPLang source code for the JVM."""
+
+    def __init__(self, input_string, stdin=""):
+        self.input_string = input_string
+        self.stdin = stdin
+
+    def jasmin(self, class_name, method_name=None):
+        """Return the Jasmin listing of a generated class, or of one of its methods."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        cb = CodeGenerator().generate(ast)[class_name]
+        if method_name is None:
+            return cb.to_jasmin()
+        return "\n".join("\n".join(m.to_jasmin()) for m in cb.methods if m.name == method_name)
+
+    def run(self):
+        """Run the program on the JVM and return its standard output."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        result = JVMRunner().run(ast, self.stdin, timeout=30)
+        return result.stdout + result.stderr
+
+
+from src.transpiler.executor import CodeCache, Executor
+from src.transpiler.transpiler import Transpiler
+class TranspilerRunner:
+    """Class to transpile OPLang source code to Python and run it."""
+
+    def __init__(self, input_string, stdin="", cache=None):
+        self.input_string = input_string
+        self.stdin = stdin
+        self.cache = cache
+
+    def run(self):
+        """Run the program and return everything it wrote."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        stdout = io.StringIO()
+        try:
+            Executor(ast, IORuntime(io.StringIO(self.stdin), stdout), self.cache).run()
+        except OPLangRuntimeError as e:
+            return stdout.getvalue() + str(e)
+        return stdout.getvalue()
+
+    def source(self, class_name=None):
+        """Return the Python source generated for one class, or for the whole program."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        translation = Transpiler().transpile(ast)
+        if class_name is None:
+            return str(translation)
+        return translation.sources[class_name]
+
+
+from src.optimizer.pipeline import optimize
+class Optimizer:
+    """Class to optimise the AST of OPLang source code."""
+
+    def __init__(self, input_string, passes=None, stdin=""):
+        self.input_string = input_string
+        self.passes = passes
+        self.stdin = stdin
+
+    def optimize(self):
+        """Return the string form of the optimised AST."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        return str(optimize(ast, self.passes))
+
+    def report(self):
+        """Return the notes the passes made while optimising, one per line."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        report = []
+        optimize(ast, self.passes, report)
+        return "\n".join(report)
+
+    def disassemble(self, class_name, method_name):
+        """Return the VM bytecode listing of one method of the optimised program."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        module = Compiler().compile(optimize(ast, self.passes))
+        return disassemble(module.classes[class_name].methods[method_name])
+
+    def run(self):
+        """Run the optimised program with the interpreter and return its output."""
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        stdout = io.StringIO()
+        try:
+            Interpreter(optimize(ast, self.passes), IORuntime(io.StringIO(self.stdin), stdout)).run()
+        except OPLangRuntimeError as e:
+            return stdout.getvalue() + str(e)
+        return stdout.getvalue()
+
+
+from src.analysis.cfg import build_cfg
+from src.analysis.dataflow import live_variables, reaching_definitions, unassigned_reads
+class ControlFlow:
+    """Class to build the CFG of one member of OPLang source code and analyse it."""
+
+    def __init__(self, input_string, class_name, member_name):
+        self.input_string = input_string
+        self.class_name = class_name
+        self.member_name = member_name
+
+    def _cfg(self):
+        ast = ASTGenerator(self.input_string).generate()
+        if isinstance(ast, str):
+            return ast
+        for class_decl in ast.class_decls:
+            if class_decl.name == self.class_name:
+                for member in class_decl.members:
+                    if getattr(member, "name", None) == self.member_name:
+                        return build_cfg(member)
+        return f"No member {self.class_name}.{self.member_name}"
+
+    def cfg(self):
+        """Return the listing of the CFG's blocks."""
+        return str(self._cfg())
+
+    def live(self):
+        """Return the variables live on entry to each block, one block per line."""
+        cfg = self._cfg()
+        if isinstance(cfg, str):
+            return cfg
+        result = live_variables(cfg)
+        return "\n".join(f"B{b}: {' '.join(cfg.names(result.before[b]))}" for b in range(cfg.num_blocks))
+
+    def reaching(self):
+        """Return the definitions reaching the exit, as 'variable@element' items."""
+        cfg = self._cfg()
+        if isinstance(cfg, str):
+            return cfg
+        bits = reaching_definitions(cfg).before[1]
+        return " ".join(
+            f"{cfg.names(cfg.defs[i])[0]}@{i}" for i in range(len(cfg.elements)) if bits >> i & 1
+        )
+
+    def unassigned(self):
+        """Return the variables read before being definitely assigned."""
+        cfg = self._cfg()
+        if isinstance(cfg, str):
+            return cfg
+        return " ".join(f"{name}@{i}" for i, name in unassigned_reads(cfg))